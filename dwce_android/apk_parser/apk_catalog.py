@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do parser. Executado
+# como script, o diretório deste arquivo (sys.path[0]) traria o apk_parser.py no lugar do pacote
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apk_parser.apk_parser import APKParser
+from apk_parser.arsc_parser import DEFAULT_CONFIG
+
+# --- Catálogo de APKs Instalados ---
+# Indexa diretórios de APKs distribuindo a análise (manifesto, permissões, bibliotecas
+# nativas, rótulo e ícone) entre um pool de processos. Os resultados ficam em um índice
+# SQLite local chaveado pelo SHA-256 do APK; a tabela de arquivos guarda o estado
+# (tamanho, mtime, inode) de cada caminho, então uma nova indexação só reabre APKs que
+# mudaram, e um APK copiado ou apenas tocado é reaproveitado pelo digest sem reanálise.
+# Rótulo e ícone dependem da configuração do dispositivo: cada registro guarda a
+# configuração usada, e indexar com outra configuração reanalisa os APKs.
+# A gaveta de apps e as consultas por pacote leem só o índice, sem abrir nenhum ZIP.
+
+DEFAULT_INDEX = os.path.join(os.path.expanduser("~"), ".cache", "dwce", "apk_catalog.sqlite")
+DIGEST_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS apks (
+    digest TEXT PRIMARY KEY,
+    package TEXT,
+    label TEXT,
+    icon TEXT,
+    main_activity TEXT,
+    permissions TEXT,
+    native_libs TEXT,
+    dex_files TEXT,
+    error TEXT,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    ino INTEGER,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS apks_package ON apks(package);
+CREATE INDEX IF NOT EXISTS files_digest ON files(digest);
+"""
+
+_JSON_COLUMNS = ('permissions', 'native_libs', 'dex_files')
+_APK_COLUMNS = ('digest', 'package', 'label', 'icon', 'main_activity') + _JSON_COLUMNS + ('error',)
+
+def _config_key(config):
+    """Identificação estável da ResConfig usada para resolver rótulo e ícone."""
+    return json.dumps(list(config))
+
+# Digests já indexados, enviados uma vez para cada processo do pool
+_known_digests = frozenset()
+
+def _init_worker(known_digests):
+    global _known_digests
+    _known_digests = known_digests
+
+def discover_apks(roots):
+    """Lista os .apk sob os diretórios (sem seguir links simbólicos)."""
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith('.apk') and not os.path.islink(path):
+                    yield path
+
+def apk_digest(path):
+    """SHA-256 do APK, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DIGEST_CHUNK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def index_apk(path, config=DEFAULT_CONFIG):
+    """
+    Analisa um APK (executado nos processos do pool).
+    Retorna (digest, registro), com registro None se o digest já está no índice.
+    """
+    try:
+        digest = apk_digest(path)
+    except OSError as e:
+        return None, {'error': str(e)}
+    if digest in _known_digests:
+        return digest, None
+
+    # O parser reporta erros no console; aqui eles viram o campo 'error' do registro
+    messages = io.StringIO()
+    parser = APKParser(path)
+    with contextlib.redirect_stdout(messages):
+        try:
+            ok = parser.parse()
+            label = parser.get_label(config) if ok else None
+            icon = parser.get_icon(config) if ok else None
+        except Exception as e:
+            ok = False
+            print(f"Erro: {e}")
+
+    if not ok:
+        return digest, {'digest': digest, 'error': messages.getvalue().strip()}
+    return digest, {
+        'digest': digest,
+        'package': parser.package_name,
+        'label': label if isinstance(label, str) else None,
+        'icon': icon if isinstance(icon, str) else None,
+        'main_activity': parser.main_activity,
+        'permissions': parser.permissions,
+        'native_libs': parser.native_libs,
+        'dex_files': parser.dex_files,
+        'error': None,
+    }
+
+def _file_state(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+def _row_to_record(row):
+    record = dict(row)
+    for column in _JSON_COLUMNS:
+        if column in record and record[column] is not None:
+            record[column] = json.loads(record[column])
+    return record
+
+class APKCatalog:
+    def __init__(self, index_path=DEFAULT_INDEX):
+        self.index_path = index_path
+        if index_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.db = sqlite3.connect(index_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+        # Índices criados antes da coluna config: registros sem configuração são reanalisados
+        if 'config' not in {row['name'] for row in self.db.execute("PRAGMA table_info(apks)")}:
+            self.db.execute("ALTER TABLE apks ADD COLUMN config TEXT")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def index(self, roots, workers=None, config=DEFAULT_CONFIG, chunksize=8):
+        """
+        (Re)indexa os APKs dos diretórios. Retorna as contagens
+        {'indexed', 'reused', 'unchanged', 'removed', 'errors'}.
+        """
+        roots = [os.path.abspath(root) for root in roots]
+        config_key = _config_key(config)
+        known_files = {}
+        current = set() # Caminhos cujo registro foi resolvido com a mesma configuração
+        for row in self.db.execute("SELECT files.path, files.size, files.mtime_ns, files.ino, apks.config "
+                                   "FROM files LEFT JOIN apks ON apks.digest = files.digest"):
+            known_files[row['path']] = (row['size'], row['mtime_ns'], row['ino'])
+            if row['config'] == config_key:
+                current.add(row['path'])
+        stats = {'indexed': 0, 'reused': 0, 'unchanged': 0, 'removed': 0, 'errors': 0}
+
+        present = set()
+        pending = []
+        for path in discover_apks(roots):
+            try:
+                state = _file_state(path)
+            except OSError:
+                continue
+            present.add(path)
+            if known_files.get(path) == state and path in current:
+                stats['unchanged'] += 1
+            else:
+                pending.append((path, state))
+
+        known_digests = frozenset(row[0] for row in self.db.execute("SELECT digest FROM apks WHERE config = ?", (config_key,)))
+        results = []
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(known_digests,)) as executor:
+                results = list(executor.map(index_apk, [path for path, _ in pending], [config] * len(pending),
+                                            chunksize=chunksize))
+
+        with self.db:
+            for (path, state), (digest, record) in zip(pending, results):
+                if digest is None: # Arquivo sumiu ou ficou ilegível durante a indexação
+                    present.discard(path)
+                    stats['errors'] += 1
+                    continue
+                if record is None:
+                    stats['reused'] += 1
+                else:
+                    stats['indexed' if record['error'] is None else 'errors'] += 1
+                    values = [record.get(column) for column in _APK_COLUMNS]
+                    values = [json.dumps(value) if column in _JSON_COLUMNS and value is not None else value
+                              for column, value in zip(_APK_COLUMNS, values)]
+                    self.db.execute(f"INSERT OR REPLACE INTO apks ({', '.join(_APK_COLUMNS)}, config) "
+                                    f"VALUES ({', '.join('?' * len(_APK_COLUMNS))}, ?)", values + [config_key])
+                self.db.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, ino, digest) VALUES (?, ?, ?, ?, ?)",
+                                (path, *state, digest))
+
+            # APKs removidos dos diretórios indexados saem do índice (e seus digests órfãos também)
+            for path in known_files:
+                if path not in present and any(path.startswith(root + os.sep) for root in roots):
+                    self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+                    stats['removed'] += 1
+            self.db.execute("DELETE FROM apks WHERE digest NOT IN (SELECT digest FROM files)")
+        return stats
+
+    # --- Consultas (apenas o índice, sem abrir os APKs) ---
+
+    def _query(self, where="", parameters=()):
+        rows = self.db.execute(
+            "SELECT files.path, apks.* FROM files JOIN apks ON apks.digest = files.digest "
+            f"WHERE apks.error IS NULL {where} ORDER BY apks.package, files.path", parameters)
+        return [_row_to_record(row) for row in rows]
+
+    def apps(self):
+        """Registros de todos os APKs válidos (gaveta de apps)."""
+        return self._query()
+
+    def launchable(self):
+        """Apps com atividade de launcher: (pacote, rótulo, ícone, atividade, caminho)."""
+        return [(record['package'], record['label'], record['icon'], record['main_activity'], record['path'])
+                for record in self._query("AND apks.main_activity IS NOT NULL")]
+
+    def find_package(self, package):
+        """Registro do pacote, ou None."""
+        records = self._query("AND apks.package = ?", (package,))
+        return records[0] if records else None
+
+    def with_permission(self, permission):
+        """Pacotes que declaram a permissão."""
+        # Comparação exata: com LIKE, '_' e '%' no nome da permissão seriam curingas
+        return [record['package'] for record in self._query(
+            "AND EXISTS (SELECT 1 FROM json_each(apks.permissions) WHERE json_each.value = ?)", (permission,))]
+
+    def errors(self):
+        """{caminho: erro} dos APKs que não puderam ser analisados."""
+        rows = self.db.execute("SELECT files.path, apks.error FROM files JOIN apks ON apks.digest = files.digest "
+                               "WHERE apks.error IS NOT NULL ORDER BY files.path")
+        return {row['path']: row['error'] for row in rows}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice paralelo de APKs instalados do Winlinos.")
+    parser.add_argument('roots', nargs='+', help="Diretórios com APKs")
+    parser.add_argument('--index', default=DEFAULT_INDEX, help="Banco SQLite do índice")
+    parser.add_argument('--workers', type=int, default=None, help="Número de processos do pool")
+    parser.add_argument('--list', action='store_true', help="Lista os apps com launcher após indexar")
+    args = parser.parse_args(argv)
+
+    with APKCatalog(args.index) as catalog:
+        stats = catalog.index(args.roots, args.workers)
+        print(json.dumps(stats))
+        if args.list:
+            for package, label, _, activity, path in catalog.launchable():
+                print(f"{package}\t{label or ''}\t{activity}\t{path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import mmap
+import struct
+import zipfile
+import zlib
+
+# --- Índice do APK (diretório central do ZIP) ---
+# Em vez de passar pelo zipfile, o APK é mapeado via mmap e apenas o diretório central
+# (no fim do arquivo) é lido, uma única vez, para uma tabela nome -> (offset, método,
+# tamanhos). Entradas STORED (resources.arsc, .so não comprimidas, DEX alinhados) são
+# expostas como memoryview sobre o mapeamento, sem cópia; entradas DEFLATED são
+# descomprimidas em fluxo, em blocos. Nenhum byte fora do diretório central e das
+# entradas efetivamente lidas é tocado, mesmo em APKs de centenas de MB.
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+STREAM_CHUNK = 256 * 1024
+
+_EOCD = struct.Struct('<4sHHHHLLH') # End of Central Directory (22 bytes + comentário)
+_EOCD64_LOCATOR = struct.Struct('<4sLQL')
+_EOCD64 = struct.Struct('<4sQHHLLQQQQ')
+_CENTRAL_ENTRY = struct.Struct('<4sHHHHHHLLLHHHHHLL') # 46 bytes
+_LOCAL_HEADER = struct.Struct('<4sHHHHHLLLHH') # 30 bytes
+_MAX_COMMENT = 0xFFFF
+
+class APKEntry:
+    """Entrada do diretório central; o início dos dados é resolvido no primeiro acesso."""
+    __slots__ = ('name', 'method', 'flags', 'crc', 'compressed_size', 'size', 'header_offset', 'data_offset')
+
+    def __init__(self, name, method, flags, crc, compressed_size, size, header_offset):
+        self.name = name
+        self.method = method
+        self.flags = flags
+        self.crc = crc
+        self.compressed_size = compressed_size
+        self.size = size
+        self.header_offset = header_offset
+        self.data_offset = None
+
+    @property
+    def is_stored(self):
+        return self.method == ZIP_STORED
+
+class APKIndex:
+    def __init__(self, apk_path):
+        self.apk_path = apk_path
+        self.entries = {} # {nome: APKEntry} na ordem do diretório central
+        self._view = None
+        with open(apk_path, 'rb') as f:
+            try:
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise zipfile.BadZipFile("APK vazio")
+        try:
+            self._view = memoryview(self._mapping)
+            self._read_central_directory()
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise zipfile.BadZipFile(f"diretório central inválido: {e}")
+        except zipfile.BadZipFile:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Fecha o mapeamento; views STORED ainda em uso o mantêm vivo até o GC."""
+        try:
+            if self._view is not None:
+                self._view.release()
+            self._mapping.close()
+        except BufferError:
+            pass
+        self._view = None
+
+    def _read_central_directory(self):
+        mapping = self._mapping
+        # EOCD: assinatura procurada de trás para frente, apenas na janela do comentário
+        window_start = max(0, len(mapping) - _EOCD.size - _MAX_COMMENT)
+        eocd = mapping.rfind(b'PK\x05\x06', window_start)
+        if eocd < 0:
+            raise zipfile.BadZipFile("End of Central Directory não encontrado")
+        _, _, _, _, count, cd_size, cd_offset, _ = _EOCD.unpack_from(mapping, eocd)
+
+        # ZIP64: tamanhos e offsets reais no registro EOCD64
+        locator = eocd - _EOCD64_LOCATOR.size
+        if locator >= 0 and mapping[locator:locator + 4] == b'PK\x06\x07':
+            _, _, eocd64, _ = _EOCD64_LOCATOR.unpack_from(mapping, locator)
+            signature, _, _, _, _, _, _, count, cd_size, cd_offset = _EOCD64.unpack_from(mapping, eocd64)
+            if signature != b'PK\x06\x06':
+                raise zipfile.BadZipFile("registro ZIP64 inválido")
+        if cd_offset + cd_size > len(mapping):
+            raise zipfile.BadZipFile("diretório central fora do arquivo")
+
+        offset = cd_offset
+        for _ in range(count):
+            (signature, _, _, flags, method, _, _, crc, compressed_size, size, name_size, extra_size,
+             comment_size, _, _, _, header_offset) = _CENTRAL_ENTRY.unpack_from(mapping, offset)
+            if signature != b'PK\x01\x02':
+                raise zipfile.BadZipFile(f"entrada do diretório central inválida em {offset}")
+            start = offset + _CENTRAL_ENTRY.size
+            name = mapping[start:start + name_size].decode('utf-8' if flags & 0x800 else 'cp437')
+            if 0xFFFFFFFF in (compressed_size, size, header_offset):
+                size, compressed_size, header_offset = self._zip64_extra(
+                    mapping[start + name_size:start + name_size + extra_size], size, compressed_size, header_offset)
+            self.entries[name] = APKEntry(name, method, flags, crc, compressed_size, size, header_offset)
+            offset = start + name_size + extra_size + comment_size
+
+    @staticmethod
+    def _zip64_extra(extra, size, compressed_size, header_offset):
+        """Campos de 64 bits do extra ZIP64 (0x0001), na ordem da especificação."""
+        position = 0
+        while position + 4 <= len(extra):
+            tag, length = struct.unpack_from('<HH', extra, position)
+            if tag == 0x0001:
+                values = iter(struct.unpack_from(f'<{length // 8}Q', extra, position + 4))
+                if size == 0xFFFFFFFF:
+                    size = next(values)
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = next(values)
+                if header_offset == 0xFFFFFFFF:
+                    header_offset = next(values)
+                break
+            position += 4 + length
+        return size, compressed_size, header_offset
+
+    def names(self):
+        return list(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def entry(self, name):
+        entry = self.entries.get(name)
+        if entry is None:
+            raise KeyError(f"{name} não está no APK")
+        return entry
+
+    def _data_offset(self, entry):
+        # O extra do cabeçalho local pode diferir do central (alinhamento do zipalign)
+        if entry.data_offset is None:
+            signature, _, flags, _, _, _, _, _, _, name_size, extra_size = \
+                _LOCAL_HEADER.unpack_from(self._mapping, entry.header_offset)
+            if signature != b'PK\x03\x04':
+                raise zipfile.BadZipFile(f"cabeçalho local inválido para {entry.name}")
+            if flags & 0x1:
+                raise zipfile.BadZipFile(f"{entry.name} está criptografado")
+            entry.data_offset = entry.header_offset + _LOCAL_HEADER.size + name_size + extra_size
+        end = entry.data_offset + entry.compressed_size
+        if end > len(self._mapping):
+            raise zipfile.BadZipFile(f"{entry.name} truncado")
+        return entry.data_offset
+
+    def view(self, name):
+        """memoryview sem cópia de uma entrada STORED."""
+        entry = self.entry(name)
+        if not entry.is_stored:
+            raise ValueError(f"{name} é comprimido (método {entry.method}); use stream() ou read()")
+        start = self._data_offset(entry)
+        return self._view[start:start + entry.size]
+
+    def stream(self, name, chunk_size=STREAM_CHUNK):
+        """Blocos descomprimidos da entrada, com CRC-32 conferido no final."""
+        entry = self.entry(name)
+        start = self._data_offset(entry)
+        compressed = self._view[start:start + entry.compressed_size]
+        if entry.is_stored:
+            crc = 0
+            for position in range(0, entry.size, chunk_size):
+                block = compressed[position:position + chunk_size]
+                crc = zlib.crc32(block, crc)
+                yield block
+            if crc != entry.crc:
+                raise zipfile.BadZipFile(f"{name}: CRC-32 divergente")
+            return
+        if entry.method != ZIP_DEFLATED:
+            raise zipfile.BadZipFile(f"{name}: método de compressão {entry.method} não suportado")
+
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        crc = 0
+        produced = 0
+        try:
+            for position in range(0, entry.compressed_size, chunk_size):
+                block = decompressor.decompress(compressed[position:position + chunk_size], chunk_size)
+                while block:
+                    crc = zlib.crc32(block, crc)
+                    produced += len(block)
+                    yield block
+                    block = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+            block = decompressor.flush()
+        except zlib.error as e:
+            raise zipfile.BadZipFile(f"{name}: fluxo DEFLATE inválido: {e}")
+        if block:
+            crc = zlib.crc32(block, crc)
+            produced += len(block)
+            yield block
+        if produced != entry.size or crc != entry.crc:
+            raise zipfile.BadZipFile(f"{name}: CRC-32 ou tamanho divergente após descompressão")
+
+    def read(self, name):
+        """Conteúdo da entrada: memoryview sem cópia (STORED) ou bytes descomprimidos (DEFLATED)."""
+        entry = self.entry(name)
+        if entry.is_stored:
+            return self.view(name)
+        data = bytearray()
+        for block in self.stream(name):
+            data += block
+        return bytes(data)
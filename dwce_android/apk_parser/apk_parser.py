@@ -1,18 +1,37 @@
 import zipfile
 import os
-import xml.etree.ElementTree as ET
+import struct
+import sys
+
+# Adiciona a camada Android (dwce_android) ao PATH para importar o carregador de DEX. Executado
+# como script, o diretório deste arquivo (sys.path[0]) esconderia o pacote apk_parser
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_multidex import MultiDexLoader, discover_dex_entries
+from apk_parser.axml_parser import manifest_events, AXMLError, ANDROID_NS, END
+from apk_parser.apk_index import APKIndex
+from apk_parser.arsc_parser import ResourceTable, DEFAULT_CONFIG, parse_reference
+from apk_parser.native_libs import NativeLibStore, select_abi, host_abis
 
 # --- Constantes ---
 ANDROID_MANIFEST = "AndroidManifest.xml"
+RESOURCES_ARSC = "resources.arsc"
 DEX_FILE = "classes.dex"
 
 class APKParser:
     def __init__(self, apk_path):
         self.apk_path = apk_path
-        self.manifest_xml = None
         self.package_name = None
         self.main_activity = None
         self.permissions = []
+        self.native_libs = [] # Todas as .so, de todas as ABIs
+        self.abi = None # ABI escolhida para o host (a primeira da preferência presente no APK)
+        self.dex_files = [] # classes.dex, classes2.dex, ... na ordem de carga
+        self.label = None # android:label da <application> (literal ou '@0x7f......')
+        self.icon = None
+        self.resources = None # ResourceTable, carregada só quando um recurso é resolvido
 
     def parse(self):
         """
@@ -23,29 +42,27 @@ class APKParser:
             return False
 
         try:
-            with zipfile.ZipFile(self.apk_path, 'r') as zf:
+            # Só o diretório central é lido; o manifesto é a única entrada tocada
+            with APKIndex(self.apk_path) as index:
+                names = index.names()
                 # 1. Extrair o AndroidManifest.xml
-                if ANDROID_MANIFEST in zf.namelist():
-                    # O AndroidManifest.xml dentro do APK é binário.
-                    # Em um SO real, usaríamos uma ferramenta como `aapt` ou `axmlparser` para converter.
-                    # Aqui, simulamos a conversão e a leitura.
-                    
-                    # Simulação de leitura do XML convertido:
-                    manifest_content = self._simulate_manifest_conversion(zf.read(ANDROID_MANIFEST))
-                    self.manifest_xml = ET.fromstring(manifest_content)
-                    
-                    self._extract_info_from_manifest()
+                if ANDROID_MANIFEST in index:
+                    # O AndroidManifest.xml dentro do APK é XML binário (AXML): os eventos de
+                    # elemento saem direto dos bytes da entrada, sem XML de texto intermediário
+                    self._extract_info_from_manifest(manifest_events(index.read(ANDROID_MANIFEST)))
                     
                 else:
                     print("Erro: AndroidManifest.xml não encontrado no APK.")
                     return False
                     
-                # 2. Verificar a presença do arquivo DEX
-                if DEX_FILE not in zf.namelist():
+                # 2. Descobrir os arquivos DEX (multidex: classes.dex ... classesN.dex)
+                self.dex_files = discover_dex_entries(names)
+                if not self.dex_files:
                     print("Aviso: Arquivo classes.dex não encontrado. APK pode ser um recurso ou inválido.")
                     
                 # 3. Extrair bibliotecas nativas (.so)
-                self.native_libs = [name for name in zf.namelist() if name.endswith('.so')]
+                self.native_libs = [name for name in names if name.endswith('.so')]
+                self.abi, _ = select_abi(self.native_libs, host_abis())
                 
             print(f"APK Parser: {self.package_name} analisado com sucesso.")
             return True
@@ -53,66 +70,86 @@ class APKParser:
         except zipfile.BadZipFile:
             print("Erro: Arquivo não é um ZIP válido (APK).")
             return False
+        except (AXMLError, struct.error) as e:
+            print(f"Erro: AndroidManifest.xml inválido: {e}")
+            return False
         except Exception as e:
             print(f"Erro durante a análise do APK: {e}")
             return False
 
-    def _simulate_manifest_conversion(self, binary_manifest):
-        """
-        Simula a conversão do AndroidManifest.xml binário para XML de texto.
-        (Em um ambiente real, esta seria uma função complexa)
-        """
-        # Retorna um XML de exemplo para simulação
-        return """
-<manifest xmlns:android="http://schemas.android.com/apk/res/android"
-    package="com.example.myapp"
-    android:versionCode="1"
-    android:versionName="1.0">
-    <uses-permission android:name="android.permission.INTERNET" />
-    <uses-permission android:name="android.permission.ACCESS_NETWORK_STATE" />
-    <application
-        android:label="My App"
-        android:icon="@drawable/icon">
-        <activity
-            android:name="com.example.myapp.MainActivity"
-            android:label="My App">
-            <intent-filter>
-                <action android:name="android.intent.action.MAIN" />
-                <category android:name="android.intent.category.LAUNCHER" />
-            </intent-filter>
-        </activity>
-    </application>
-</manifest>
-"""
-
-    def _extract_info_from_manifest(self):
-        """Extrai informações cruciais do XML do Manifest."""
-        if self.manifest_xml is None:
-            return
-            
-        # Namespace do Android
-        ns = {'android': 'http://schemas.android.com/apk/res/android'}
+    def _extract_info_from_manifest(self, events):
+        """Extrai informações cruciais do Manifest a partir dos eventos de elemento (AXML)."""
+        name_attr = f"{{{ANDROID_NS}}}name"
+        path = [] # Tags abertas, da raiz até o elemento atual
+        activity = None # Atividade (ou alias) cujo conteúdo está sendo lido
+        is_main = is_launcher = False
         
-        # Nome do Pacote
-        self.package_name = self.manifest_xml.get('package')
-        
-        # Permissões
-        for perm in self.manifest_xml.findall('uses-permission'):
-            self.permissions.append(perm.get('{http://schemas.android.com/apk/res/android}name'))
+        for event, tag, attributes in events:
+            if event == END:
+                path.pop()
+                if tag == 'intent-filter' and activity is not None and is_main and is_launcher and self.main_activity is None:
+                    # Atividade Principal (Launcher Activity)
+                    self.main_activity = activity
+                elif tag in ('activity', 'activity-alias'):
+                    activity = None
+                continue
             
-        # Atividade Principal (Launcher Activity)
-        for activity in self.manifest_xml.findall('./application/activity'):
-            for intent_filter in activity.findall('intent-filter'):
-                is_main = any(action.get('{http://schemas.android.com/apk/res/android}name') == 'android.intent.action.MAIN'
-                              for action in intent_filter.findall('action'))
-                is_launcher = any(category.get('{http://schemas.android.com/apk/res/android}name') == 'android.intent.category.LAUNCHER'
-                                  for category in intent_filter.findall('category'))
-                
-                if is_main and is_launcher:
-                    self.main_activity = activity.get('{http://schemas.android.com/apk/res/android}name')
-                    break
-            if self.main_activity:
-                break
+            path.append(tag)
+            depth = len(path)
+            if depth == 1 and tag == 'manifest':
+                # Nome do Pacote
+                self.package_name = attributes.get('package')
+            elif depth == 2 and tag == 'uses-permission':
+                # Permissões
+                self.permissions.append(attributes.get(name_attr))
+            elif depth == 2 and tag == 'application':
+                self.label = attributes.get(f"{{{ANDROID_NS}}}label")
+                self.icon = attributes.get(f"{{{ANDROID_NS}}}icon")
+            elif depth == 3 and tag in ('activity', 'activity-alias') and path[1] == 'application':
+                activity = self._qualify_class_name(attributes.get(name_attr))
+            elif tag == 'intent-filter':
+                is_main = is_launcher = False
+            elif tag == 'action' and attributes.get(name_attr) == 'android.intent.action.MAIN':
+                is_main = True
+            elif tag == 'category' and attributes.get(name_attr) == 'android.intent.category.LAUNCHER':
+                is_launcher = True
+
+    def _qualify_class_name(self, name):
+        """'.MainActivity' -> 'com.example.myapp.MainActivity' (nomes relativos ao pacote)."""
+        if name and self.package_name and (name.startswith('.') or '.' not in name):
+            return f"{self.package_name}.{name.lstrip('.')}"
+        return name
+
+    def load_resources(self):
+        """Indexa o resources.arsc (sem decodificar valores); None se o APK não tiver um."""
+        if self.resources is None:
+            with APKIndex(self.apk_path) as index:
+                if RESOURCES_ARSC not in index:
+                    return None
+                # STORED (o normal para o arsc): a tabela fica sobre o mmap do APK
+                self.resources = ResourceTable(index.read(RESOURCES_ARSC))
+        return self.resources
+
+    def resolve_resource(self, value, config=DEFAULT_CONFIG):
+        """Resolve um atributo do manifesto ('@0x7f...') para o valor na configuração; literais passam direto."""
+        res_id = parse_reference(value)
+        if res_id is None:
+            return value
+        resources = self.load_resources()
+        if resources is None:
+            return None
+        try:
+            return resources.resolve(res_id, config)
+        except KeyError:
+            return None
+
+    def get_label(self, config=DEFAULT_CONFIG):
+        """Rótulo do app para o launcher (android:label resolvido para a configuração)."""
+        return self.resolve_resource(self.label, config)
+
+    def get_icon(self, config=DEFAULT_CONFIG):
+        """Caminho do ícone no APK (ex.: 'res/drawable-xhdpi/icon.png') para a configuração."""
+        return self.resolve_resource(self.icon, config)
 
     def get_info(self):
         """Retorna um dicionário com as informações extraídas."""
@@ -121,15 +158,36 @@ class APKParser:
             "main_activity": self.main_activity,
             "permissions": self.permissions,
             "native_libs": self.native_libs,
-            "dex_file_present": DEX_FILE in self.native_libs # Erro: DEX_FILE é classes.dex, não uma lib nativa
+            "abi": self.abi,
+            "dex_file_present": DEX_FILE in self.dex_files,
+            "dex_files": self.dex_files
         }
 
+    def extract_native_libs(self, lib_dir, store=None, abis=None, workers=None):
+        """
+        Extrai as bibliotecas da ABI do host para lib_dir, deduplicadas no armazenamento
+        compartilhado. Retorna {nome_da_so: caminho}.
+        """
+        store = NativeLibStore() if store is None else store
+        self.abi, installed = store.extract(self.apk_path, lib_dir, abis, workers)
+        return installed
+
+    def load_dex(self, workers=None, artifact_cache=None):
+        """Carrega todos os DEX do APK em paralelo e retorna o MultiDexLoader (ou None)."""
+        loader = MultiDexLoader(self.apk_path, workers=workers, artifact_cache=artifact_cache)
+        return loader if loader.load() else None
+
 # Exemplo de uso (para teste interno)
 if __name__ == "__main__":
     # Crie um arquivo APK simulado para teste
     simulated_apk_path = "/tmp/test_app.apk"
     with zipfile.ZipFile(simulated_apk_path, 'w') as zf:
-        zf.writestr(ANDROID_MANIFEST, "Binary Manifest Data")
+        # Manifesto em texto (aceito como fallback; APKs reais trazem o AXML compilado pelo aapt)
+        zf.writestr(ANDROID_MANIFEST, '<manifest xmlns:android="http://schemas.android.com/apk/res/android" '
+                                      'package="com.example.myapp"><application><activity android:name=".MainActivity">'
+                                      '<intent-filter><action android:name="android.intent.action.MAIN"/>'
+                                      '<category android:name="android.intent.category.LAUNCHER"/></intent-filter>'
+                                      '</activity></application></manifest>')
         zf.writestr(DEX_FILE, "DEX Bytecode")
         zf.writestr("lib/arm64-v8a/libnative.so", "Native Library")
         
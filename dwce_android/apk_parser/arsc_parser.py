@@ -0,0 +1,301 @@
+import os
+import struct
+import sys
+from collections import namedtuple
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do parser
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apk_parser.axml_parser import (StringPool, AXMLError, RES_STRING_POOL_TYPE, NO_ENTRY, TYPE_REFERENCE,
+                                    TYPE_STRING, TYPE_INT_DEC, TYPE_INT_HEX, TYPE_INT_BOOLEAN)
+
+# --- Tabela de Recursos (resources.arsc) ---
+# A carga só percorre os cabeçalhos dos chunks de nível superior: pool global de strings e
+# um PackageIndex por pacote. O conteúdo de um pacote (pools de tipos e chaves, chunks
+# typeSpec/type com a configuração de cada um) é indexado na primeira consulta àquele
+# pacote, e nenhum valor é decodificado até que um ID seja resolvido. A escolha da
+# melhor configuração para um dispositivo é memoizada por (pacote, tipo, configuração):
+# o launcher resolve rótulo e ícone de milhares de apps com o mesmo perfil de tela.
+
+RES_TABLE_TYPE = 0x0002
+RES_TABLE_PACKAGE_TYPE = 0x0200
+RES_TABLE_TYPE_TYPE = 0x0201
+RES_TABLE_TYPE_SPEC_TYPE = 0x0202
+
+# Flags de ResTable_type e ResTable_entry
+TYPE_FLAG_SPARSE = 0x01
+TYPE_FLAG_OFFSET16 = 0x02
+ENTRY_FLAG_COMPLEX = 0x0001
+ENTRY_FLAG_COMPACT = 0x0008
+
+TYPE_FIRST_COLOR = 0x1C
+TYPE_LAST_COLOR = 0x1F
+
+DENSITY_DEFAULT = 0
+DENSITY_MEDIUM = 160
+DENSITY_ANY = 0xFFFE
+DENSITY_NONE = 0xFFFF
+MAX_REFERENCE_DEPTH = 16
+
+_CHUNK_HEADER = struct.Struct('<HHL')
+_PACKAGE_HEADER = struct.Struct('<L256sLLLL') # id, nome (UTF-16), typeStrings, lastPublicType, keyStrings, lastPublicKey
+_TYPE_HEADER = struct.Struct('<BBHLL') # id, flags, reservado, entryCount, entriesStart
+_CONFIG = struct.Struct('<LHH2s2sBBHBBBBHHHHBBHHH') # Primeiros 36 bytes de ResTable_config
+_ENTRY = struct.Struct('<HHL') # size (ou chave no formato compacto), flags, key (ou dado)
+_VALUE = struct.Struct('<HBBL') # size, res0, dataType, data
+_MAP_HEADER = struct.Struct('<LL') # parent, count
+
+# Qualificadores de ResTable_config considerados na escolha (0 = não especificado)
+ResConfig = namedtuple('ResConfig', (
+    'mcc', 'mnc', 'language', 'country', 'orientation', 'touchscreen', 'density', 'keyboard',
+    'navigation', 'screen_width', 'screen_height', 'sdk_version', 'screen_layout', 'ui_mode',
+    'smallest_screen_width_dp', 'screen_width_dp', 'screen_height_dp'),
+    defaults=(0, 0, '', '', 0, 0, DENSITY_DEFAULT, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+
+DEFAULT_CONFIG = ResConfig()
+
+def parse_config(data, offset):
+    """ResConfig a partir de um ResTable_config (campos além dos 36 bytes iniciais são ignorados)."""
+    size = struct.unpack_from('<L', data, offset)[0]
+    raw = bytes(data[offset:offset + min(size, _CONFIG.size)]).ljust(_CONFIG.size, b'\x00')
+    (_, mcc, mnc, language, country, orientation, touchscreen, density, keyboard, navigation, _, _,
+     screen_width, screen_height, sdk_version, _, screen_layout, ui_mode, smallest, width_dp, height_dp) = _CONFIG.unpack(raw)
+    return ResConfig(mcc, mnc, language.rstrip(b'\x00').decode('latin-1'), country.rstrip(b'\x00').decode('latin-1'),
+                     orientation, touchscreen, density, keyboard, navigation, screen_width, screen_height, sdk_version,
+                     screen_layout, ui_mode, smallest, width_dp, height_dp)
+
+def config_matches(candidate, device):
+    """Se os qualificadores definidos em candidate são compatíveis com o dispositivo."""
+    for field in ('mcc', 'mnc', 'language', 'country', 'orientation', 'touchscreen', 'keyboard', 'navigation'):
+        value = getattr(candidate, field)
+        if value and value != getattr(device, field):
+            return False
+    # Mínimos: a configuração vale a partir do valor indicado
+    for field in ('sdk_version', 'smallest_screen_width_dp', 'screen_width_dp', 'screen_height_dp'):
+        value = getattr(candidate, field)
+        if value and value > getattr(device, field):
+            return False
+    # uiMode: tipo (bits 0-3) e modo noturno (bits 4-5) comparados separadamente
+    for mask in (0x0F, 0x30):
+        if candidate.ui_mode & mask and candidate.ui_mode & mask != device.ui_mode & mask:
+            return False
+    return True
+
+def _density_score(density, target):
+    """Preferência de densidade: exata, depois a menor acima do alvo (reduzir), depois a maior abaixo."""
+    if density == DENSITY_ANY:
+        return (3, 0)
+    if density == DENSITY_NONE:
+        return (-1, 0)
+    density = density or DENSITY_MEDIUM
+    target = target or DENSITY_MEDIUM
+    if density == target:
+        return (2, 0)
+    return (1, -density) if density > target else (0, density)
+
+def config_rank(candidate, device):
+    """Chave de ordenação (maior = melhor) na ordem de precedência dos qualificadores do Android."""
+    return (bool(candidate.mcc), bool(candidate.mnc), bool(candidate.language), bool(candidate.country),
+            candidate.smallest_screen_width_dp, candidate.screen_width_dp, candidate.screen_height_dp,
+            bool(candidate.orientation), bool(candidate.ui_mode & 0x0F), bool(candidate.ui_mode & 0x30),
+            _density_score(candidate.density, device.density), bool(candidate.touchscreen),
+            bool(candidate.keyboard), bool(candidate.navigation), candidate.sdk_version)
+
+class ResourceValue(namedtuple('ResourceValue', ('data_type', 'data'))):
+    """Res_value bruto; format() o converte para o valor Python usado pelos chamadores."""
+    __slots__ = ()
+
+class _TypeChunk:
+    __slots__ = ('config', 'offset', 'entry_count', 'entries_start', 'flags', 'header_size')
+
+    def __init__(self, config, offset, entry_count, entries_start, flags, header_size):
+        self.config = config
+        self.offset = offset
+        self.entry_count = entry_count
+        self.entries_start = entries_start
+        self.flags = flags
+        self.header_size = header_size
+
+class PackageIndex:
+    """Pacote do resources.arsc; os chunks internos são indexados na primeira consulta."""
+
+    def __init__(self, data, offset, size):
+        package_id, name, type_strings, _, key_strings, _ = _PACKAGE_HEADER.unpack_from(data, offset + 8)
+        self.data = data
+        self.id = package_id
+        self.name = name.decode('utf-16-le', errors='replace').split('\x00', 1)[0]
+        self.offset = offset
+        self.size = size
+        self._type_strings_offset = offset + type_strings
+        self._key_strings_offset = offset + key_strings
+        self.type_strings = None
+        self.key_strings = None
+        self.types = None # {type_id: [_TypeChunk]} (None até a primeira consulta)
+
+    def _index(self):
+        data = self.data
+        header_size = _CHUNK_HEADER.unpack_from(data, self.offset)[1]
+        self.type_strings = StringPool(data, self._type_strings_offset)
+        self.key_strings = StringPool(data, self._key_strings_offset)
+        self.types = {}
+        position = self.offset + header_size
+        end = self.offset + self.size
+        while position + _CHUNK_HEADER.size <= end:
+            chunk_type, chunk_header_size, chunk_size = _CHUNK_HEADER.unpack_from(data, position)
+            if chunk_size < _CHUNK_HEADER.size or position + chunk_size > end:
+                raise AXMLError(f"chunk inválido no pacote {self.name} em {position}")
+            if chunk_type == RES_TABLE_TYPE_TYPE:
+                type_id, flags, _, entry_count, entries_start = _TYPE_HEADER.unpack_from(data, position + 8)
+                config = parse_config(data, position + 8 + _TYPE_HEADER.size)
+                self.types.setdefault(type_id, []).append(
+                    _TypeChunk(config, position, entry_count, entries_start, flags, chunk_header_size))
+            position += chunk_size
+
+    def type_chunks(self, type_id):
+        if self.types is None:
+            self._index()
+        return self.types.get(type_id, ())
+
+    def type_name(self, type_id):
+        if self.types is None:
+            self._index()
+        return self.type_strings[type_id - 1]
+
+    def entry_offset(self, chunk, entry_idx):
+        """Offset absoluto da entrada em um chunk de tipo, ou None se a configuração não a define."""
+        data = self.data
+        offsets = chunk.offset + chunk.header_size
+        if chunk.flags & TYPE_FLAG_SPARSE:
+            # Pares (índice u16, offset/4 u16) ordenados por índice
+            count = chunk.entry_count
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if struct.unpack_from('<H', data, offsets + middle * 4)[0] < entry_idx:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == count:
+                return None
+            idx, offset = struct.unpack_from('<HH', data, offsets + low * 4)
+            return chunk.offset + chunk.entries_start + offset * 4 if idx == entry_idx else None
+        if entry_idx >= chunk.entry_count:
+            return None
+        if chunk.flags & TYPE_FLAG_OFFSET16:
+            offset = struct.unpack_from('<H', data, offsets + entry_idx * 2)[0]
+            return None if offset == 0xFFFF else chunk.offset + chunk.entries_start + offset * 4
+        offset = struct.unpack_from('<L', data, offsets + entry_idx * 4)[0]
+        return None if offset == NO_ENTRY else chunk.offset + chunk.entries_start + offset
+
+class ResourceTable:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.strings = None # Pool global (valores string)
+        self.packages = {} # {package_id: PackageIndex}
+        self.decoded_entries = 0 # Entradas efetivamente decodificadas (para medir a carga preguiçosa)
+        self._ranked = {} # {(package_id, type_id, configuração): [_TypeChunk] da melhor para a pior}
+
+        chunk_type, header_size, size = _CHUNK_HEADER.unpack_from(self.data, 0)
+        if chunk_type != RES_TABLE_TYPE or size > len(self.data):
+            raise AXMLError(f"não é um resources.arsc (tipo {chunk_type:#06x})")
+        position = header_size
+        while position + _CHUNK_HEADER.size <= size:
+            chunk_type, _, chunk_size = _CHUNK_HEADER.unpack_from(self.data, position)
+            if chunk_size < _CHUNK_HEADER.size or position + chunk_size > size:
+                raise AXMLError(f"chunk inválido em {position}")
+            if chunk_type == RES_STRING_POOL_TYPE:
+                self.strings = StringPool(self.data, position)
+            elif chunk_type == RES_TABLE_PACKAGE_TYPE:
+                package = PackageIndex(self.data, position, chunk_size)
+                self.packages[package.id] = package
+            position += chunk_size
+
+    def _ranked_chunks(self, package, type_id, config):
+        """Chunks do tipo compatíveis com a configuração, do melhor para o pior (memoizado)."""
+        key = (package.id, type_id, config)
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            candidates = [chunk for chunk in package.type_chunks(type_id) if config_matches(chunk.config, config)]
+            ranked = self._ranked[key] = sorted(candidates, key=lambda chunk: config_rank(chunk.config, config),
+                                                reverse=True)
+        return ranked
+
+    def _split(self, res_id):
+        package = self.packages.get(res_id >> 24)
+        if package is None:
+            raise KeyError(f"pacote do recurso {res_id:#010x} não existe na tabela")
+        return package, (res_id >> 16) & 0xFF, res_id & 0xFFFF
+
+    def name(self, res_id):
+        """'pacote:tipo/nome' de um ID (usa a entrada da primeira configuração que o define)."""
+        package, type_id, entry_idx = self._split(res_id)
+        for chunk in package.type_chunks(type_id):
+            offset = package.entry_offset(chunk, entry_idx)
+            if offset is not None:
+                size, flags, key = _ENTRY.unpack_from(self.data, offset)
+                key = size if flags & ENTRY_FLAG_COMPACT else key
+                return f"{package.name}:{package.type_name(type_id)}/{package.key_strings[key]}"
+        raise KeyError(f"recurso {res_id:#010x} não encontrado")
+
+    def lookup(self, res_id, config=DEFAULT_CONFIG):
+        """ResourceValue bruto (ou dict para recursos complexos) da melhor configuração."""
+        package, type_id, entry_idx = self._split(res_id)
+        for chunk in self._ranked_chunks(package, type_id, config):
+            offset = package.entry_offset(chunk, entry_idx)
+            if offset is not None:
+                return self._decode_entry(offset)
+        raise KeyError(f"recurso {res_id:#010x} sem valor para a configuração {config}")
+
+    def _decode_entry(self, offset):
+        self.decoded_entries += 1
+        size, flags, key = _ENTRY.unpack_from(self.data, offset)
+        if flags & ENTRY_FLAG_COMPACT:
+            return ResourceValue(flags >> 8, key)
+        if flags & ENTRY_FLAG_COMPLEX:
+            _, count = _MAP_HEADER.unpack_from(self.data, offset + 8)
+            position = offset + size
+            bag = {}
+            for _ in range(count):
+                name = struct.unpack_from('<L', self.data, position)[0]
+                _, _, data_type, data = _VALUE.unpack_from(self.data, position + 4)
+                bag[name] = ResourceValue(data_type, data)
+                position += 12
+            return bag
+        _, _, data_type, data = _VALUE.unpack_from(self.data, offset + size)
+        return ResourceValue(data_type, data)
+
+    def resolve(self, res_id, config=DEFAULT_CONFIG):
+        """Valor Python do recurso para a configuração, seguindo referências (@string/..., @drawable/...)."""
+        for _ in range(MAX_REFERENCE_DEPTH):
+            value = self.lookup(res_id, config)
+            if isinstance(value, dict):
+                return {name: self.format(item) for name, item in value.items()}
+            if value.data_type != TYPE_REFERENCE or value.data == 0:
+                return self.format(value)
+            res_id = value.data
+        raise KeyError(f"ciclo de referências a partir de {res_id:#010x}")
+
+    def format(self, value):
+        data_type, data = value
+        if data_type == TYPE_STRING:
+            return self.strings[data]
+        if data_type == TYPE_INT_BOOLEAN:
+            return bool(data)
+        if data_type == TYPE_INT_DEC:
+            return data - (1 << 32) if data & 0x80000000 else data
+        if data_type == TYPE_INT_HEX:
+            return data
+        if TYPE_FIRST_COLOR <= data_type <= TYPE_LAST_COLOR:
+            return f"#{data:08x}"
+        if data_type == TYPE_REFERENCE:
+            return f"@0x{data:08x}"
+        return data
+
+def parse_reference(value):
+    """ID de recurso de um atributo do manifesto ('@0x7f020000'), ou None para valores literais."""
+    if isinstance(value, str) and value.startswith('@0x'):
+        try:
+            return int(value[3:], 16)
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,179 @@
+import io
+import struct
+import xml.etree.ElementTree as ET
+
+# --- Parser de XML Binário Android (AXML) ---
+# O AndroidManifest.xml dentro do APK é compilado pelo aapt em chunks ResChunk: um
+# RES_XML_TYPE contendo o pool de strings, o mapa de IDs de recurso dos atributos e a
+# árvore como uma sequência plana de START_ELEMENT/END_ELEMENT. iter_events percorre os
+# chunks direto sobre os bytes da entrada do ZIP e produz eventos de início e fim de
+# elemento, sem montar XML de texto nem DOM. As strings do pool são decodificadas sob
+# demanda (um manifesto típico usa só uma fração delas).
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+
+# Tipos de chunk (ResourceTypes.h)
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_NAMESPACE_TYPE = 0x0100
+RES_XML_END_NAMESPACE_TYPE = 0x0101
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_END_ELEMENT_TYPE = 0x0103
+RES_XML_CDATA_TYPE = 0x0104
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+UTF8_FLAG = 0x100
+NO_ENTRY = 0xFFFFFFFF
+
+# Tipos de Res_value usados em manifestos
+TYPE_REFERENCE = 0x01
+TYPE_STRING = 0x03
+TYPE_FLOAT = 0x04
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+TYPE_INT_BOOLEAN = 0x12
+
+# Atributos android:* por ID de recurso (o nome no pool pode ter sido removido por ofuscadores)
+ANDROID_ATTRIBUTES = {
+    0x01010001: 'label', 0x01010002: 'icon', 0x01010003: 'name', 0x0101020C: 'minSdkVersion',
+    0x0101021B: 'versionCode', 0x0101021C: 'versionName', 0x01010270: 'targetSdkVersion',
+}
+
+START, END = 'start', 'end'
+
+_CHUNK_HEADER = struct.Struct('<HHL') # type, header_size, size
+_STRING_POOL_HEADER = struct.Struct('<LLLLL') # string_count, style_count, flags, strings_start, styles_start
+_ELEMENT_HEADER = struct.Struct('<LLLLHHHHHH') # line, comment, ns, name, attribute_start/size/count, id/class/style
+_END_ELEMENT = struct.Struct('<LLLL') # line, comment, ns, name
+_ATTRIBUTE = struct.Struct('<LLLHBBL') # ns, name, raw_value, size, res0, data_type, data
+
+class AXMLError(ValueError):
+    """Manifesto binário malformado."""
+
+class StringPool:
+    """Pool de strings de um chunk RES_STRING_POOL_TYPE (UTF-8 ou UTF-16), decodificado sob demanda."""
+
+    def __init__(self, data, offset):
+        _, header_size, size = _CHUNK_HEADER.unpack_from(data, offset)
+        count, _, flags, strings_start, _ = _STRING_POOL_HEADER.unpack_from(data, offset + _CHUNK_HEADER.size)
+        if offset + size > len(data) or offset + header_size + count * 4 > len(data):
+            raise AXMLError("pool de strings fora do arquivo")
+        self.data = data
+        self.utf8 = bool(flags & UTF8_FLAG)
+        self.offsets = struct.unpack_from(f'<{count}L', data, offset + header_size)
+        self.strings_start = offset + strings_start
+        self._decoded = [None] * count
+
+    def __len__(self):
+        return len(self._decoded)
+
+    def __getitem__(self, index):
+        if index == NO_ENTRY:
+            return None
+        value = self._decoded[index]
+        if value is None:
+            value = self._decoded[index] = self._decode(self.strings_start + self.offsets[index])
+        return value
+
+    def _decode(self, position):
+        data = self.data
+        if self.utf8:
+            # Tamanho em caracteres UTF-16 e depois em bytes, cada um com 1 ou 2 bytes
+            position += 2 if data[position] & 0x80 else 1
+            length = data[position]
+            if length & 0x80:
+                length = ((length & 0x7F) << 8) | data[position + 1]
+                position += 1
+            position += 1
+            return bytes(data[position:position + length]).decode('utf-8', errors='replace')
+        length = data[position] | (data[position + 1] << 8)
+        position += 2
+        if length & 0x8000:
+            length = ((length & 0x7FFF) << 16) | data[position] | (data[position + 1] << 8)
+            position += 2
+        return bytes(data[position:position + length * 2]).decode('utf-16-le', errors='replace')
+
+def format_value(strings, raw_value, data_type, value):
+    """Valor de um atributo como texto, no formato que o aapt usa ao descompilar."""
+    if raw_value != NO_ENTRY:
+        return strings[raw_value]
+    if data_type == TYPE_STRING:
+        return strings[value]
+    if data_type == TYPE_INT_BOOLEAN:
+        return 'true' if value else 'false'
+    if data_type == TYPE_INT_DEC:
+        return str(value - (1 << 32) if value & 0x80000000 else value)
+    if data_type == TYPE_INT_HEX:
+        return f"0x{value:x}"
+    if data_type == TYPE_REFERENCE:
+        return f"@0x{value:08x}"
+    if data_type == TYPE_FLOAT:
+        return repr(struct.unpack('<f', struct.pack('<L', value))[0])
+    return str(value)
+
+def iter_events(data):
+    """
+    Eventos do manifesto binário, na ordem do documento:
+      (START, tag, {atributo: valor}) e (END, tag, None)
+    Atributos com namespace usam a notação do ElementTree: '{http://...android}name'.
+    """
+    data = memoryview(data)
+    if len(data) < _CHUNK_HEADER.size:
+        raise AXMLError("manifesto truncado")
+    chunk_type, header_size, size = _CHUNK_HEADER.unpack_from(data, 0)
+    if chunk_type != RES_XML_TYPE or size > len(data):
+        raise AXMLError(f"não é um XML binário (tipo {chunk_type:#06x})")
+
+    strings = None
+    resource_ids = ()
+    names = {} # (namespace, nome) no pool -> chave do atributo, resolvida uma vez por documento
+    offset = header_size
+    while offset + _CHUNK_HEADER.size <= size:
+        chunk_type, header_size, chunk_size = _CHUNK_HEADER.unpack_from(data, offset)
+        if chunk_size < _CHUNK_HEADER.size or offset + chunk_size > size:
+            raise AXMLError(f"chunk inválido em {offset}")
+        body = offset + header_size
+
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = StringPool(data, offset)
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            resource_ids = struct.unpack_from(f'<{(chunk_size - header_size) // 4}L', data, body)
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            if strings is None:
+                raise AXMLError("elemento antes do pool de strings")
+            _, _, _, name, attribute_start, attribute_size, attribute_count, _, _, _ = \
+                _ELEMENT_HEADER.unpack_from(data, offset + 8)
+            attributes = {}
+            position = offset + 16 + attribute_start
+            for _ in range(attribute_count):
+                ns, attribute_name, raw_value, _, _, data_type, value = _ATTRIBUTE.unpack_from(data, position)
+                position += attribute_size
+                key = names.get((ns, attribute_name))
+                if key is None:
+                    key = strings[attribute_name]
+                    if attribute_name < len(resource_ids) and resource_ids[attribute_name] in ANDROID_ATTRIBUTES:
+                        key = ANDROID_ATTRIBUTES[resource_ids[attribute_name]]
+                    namespace = strings[ns]
+                    if namespace:
+                        key = f"{{{namespace}}}{key}"
+                    names[(ns, attribute_name)] = key
+                attributes[key] = format_value(strings, raw_value, data_type, value)
+            yield START, strings[name], attributes
+        elif chunk_type == RES_XML_END_ELEMENT_TYPE:
+            _, _, _, name = _END_ELEMENT.unpack_from(data, offset + 8)
+            yield END, strings[name], None
+        # Namespaces e CDATA não afetam os eventos de elemento
+        offset += chunk_size
+
+def iter_text_events(data):
+    """Mesmos eventos para um manifesto em XML de texto (APKs descompactados por ferramentas)."""
+    for event, element in ET.iterparse(io.BytesIO(bytes(data)), events=(START, END)):
+        yield event, element.tag, (dict(element.attrib) if event == START else None)
+        if event == END:
+            element.clear()
+
+def manifest_events(data):
+    """Eventos do manifesto, binário (AXML) ou texto."""
+    if bytes(data[:64]).lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+        return iter_text_events(data)
+    return iter_events(data)
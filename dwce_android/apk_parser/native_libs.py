@@ -0,0 +1,211 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona a camada Android (dwce_android) e o DWCE Core ao PATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             'dragon-winlinos-compatibility-engine'))
+
+from apk_parser.apk_index import APKIndex
+
+try:
+    import dwce_core
+except ImportError:
+    dwce_core = None
+
+# --- Extração de Bibliotecas Nativas (armazenamento endereçado por conteúdo) ---
+# Como o PackageManager do Android, a instalação escolhe UMA ABI para o app inteiro (a
+# primeira da lista de preferência do host presente no APK) e extrai só as .so dela. Cada
+# biblioteca vai para um armazenamento compartilhado nomeado pelo SHA-256 do conteúdo e é
+# ligada (hardlink) no diretório lib/ do app: as cópias idênticas de libc++_shared.so ou
+# libcrypto.so que vários apps embutem ocupam o disco uma única vez. O CRC-32 e o
+# tamanho do diretório central são só uma dica de qual digest esperar (o CRC-32 não
+# resiste a colisões): uma biblioteca já conhecida é confirmada pelo SHA-256 em fluxo,
+# sem gravar nada no disco, antes de ser ligada. As entradas são descomprimidas em
+# paralelo (zlib e hashlib liberam o GIL em blocos grandes).
+
+DEFAULT_STORE = os.path.join(os.path.expanduser("~"), ".cache", "dwce", "native_libs")
+LIB_PREFIX = "lib/"
+OBJECT_MODE = 0o555 # Objetos compartilhados entre apps: somente leitura
+
+# ABIs na ordem de preferência para cada (máquina, arquitetura efetiva). As ABIs ARM no
+# fim das listas x86 são executadas via tradução binária.
+ABI_PREFERENCES = {
+    ('x86_64', '64bit'): ('x86_64', 'x86', 'arm64-v8a', 'armeabi-v7a', 'armeabi'),
+    ('x86_64', '32bit'): ('x86', 'armeabi-v7a', 'armeabi'),
+    ('x86', '32bit'): ('x86', 'armeabi-v7a', 'armeabi'),
+    ('arm64', '64bit'): ('arm64-v8a', 'armeabi-v7a', 'armeabi'),
+    ('arm64', '32bit'): ('armeabi-v7a', 'armeabi'),
+    ('arm', '32bit'): ('armeabi-v7a', 'armeabi'),
+}
+
+_MACHINE_ALIASES = {
+    'amd64': 'x86_64', 'i386': 'x86', 'i486': 'x86', 'i586': 'x86', 'i686': 'x86',
+    'aarch64': 'arm64', 'armv8l': 'arm', 'armv7l': 'arm', 'armv7': 'arm',
+}
+
+def host_abis(machine=None, effective_arch=None):
+    """ABIs suportadas pelo host, da preferida para a menos preferida."""
+    if machine is None and dwce_core is not None:
+        machine = dwce_core.get_system_architecture()
+        if effective_arch is None:
+            effective_arch = dwce_core.get_effective_architecture()
+    machine = _MACHINE_ALIASES.get((machine or 'x86_64').lower(), (machine or 'x86_64').lower())
+    if effective_arch is None or machine == 'arm64':
+        # dwce_core não reconhece 'aarch64' como 64-bit
+        effective_arch = '64bit' if machine in ('x86_64', 'arm64') else '32bit'
+    return ABI_PREFERENCES.get((machine, effective_arch), ABI_PREFERENCES[('x86', '32bit')])
+
+def select_abi(names, abis):
+    """
+    Escolhe a ABI do app e suas bibliotecas: (abi, {nome_da_so: entrada_no_apk}).
+    Retorna (None, {}) se o APK não tiver .so para nenhuma das ABIs.
+    """
+    by_abi = {}
+    for name in names:
+        if name.startswith(LIB_PREFIX) and name.endswith('.so'):
+            parts = name.split('/')
+            if len(parts) == 3 and parts[2]: # lib/<abi>/<biblioteca>.so, sem subdiretórios
+                by_abi.setdefault(parts[1], {})[parts[2]] = name
+    for abi in abis:
+        if abi in by_abi:
+            return abi, by_abi[abi]
+    return None, {}
+
+def _link(source, target):
+    """Hardlink atômico de source em target; cópia se o link não for possível (outro sistema de arquivos)."""
+    temporary = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copyfile(source, temporary)
+        os.chmod(temporary, OBJECT_MODE)
+    os.replace(temporary, target)
+
+class NativeLibStore:
+    def __init__(self, store_dir=DEFAULT_STORE):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, "sha256")
+        self.crc_dir = os.path.join(store_dir, "crc32")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.crc_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.extracted = 0 # Bibliotecas descomprimidas e gravadas no armazenamento
+        self.deduplicated = 0 # Bibliotecas já presentes (confirmadas pelo digest)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _crc_path(self, entry):
+        return os.path.join(self.crc_dir, f"{entry.crc:08x}-{entry.size}")
+
+    @staticmethod
+    def _read_hint(crc_path):
+        """Digest gravado na dica de CRC, ou None se ausente ou inválida."""
+        try:
+            with open(crc_path, 'rb') as f:
+                digest = f.read(65).decode('ascii', errors='replace').strip()
+        except OSError:
+            return None
+        return digest if len(digest) == 64 and all(c in '0123456789abcdef' for c in digest) else None
+
+    def _hinted_object(self, entry):
+        """(digest, caminho) sugerido pelo CRC-32 e tamanho da entrada, ou None se não houver objeto."""
+        digest = self._read_hint(self._crc_path(entry))
+        if digest is None:
+            return None
+        object_path = self._object_path(digest)
+        return (digest, object_path) if os.path.exists(object_path) else None
+
+    def _write_hint(self, entry, digest):
+        temporary = f"{self._crc_path(entry)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, 'w') as f:
+                f.write(digest)
+            os.replace(temporary, self._crc_path(entry))
+        except OSError:
+            pass # A dica é só um atalho; o objeto por digest continua válido
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def add(self, index, entry):
+        """Garante a entrada do APK no armazenamento e retorna o caminho do objeto."""
+        hint = self._hinted_object(entry)
+        if hint is not None:
+            # Conteúdo provavelmente conhecido: só descomprime e confere o SHA-256, sem temporário
+            digest = hashlib.sha256()
+            for block in index.stream(entry.name):
+                digest.update(block)
+            if digest.hexdigest() == hint[0]:
+                self._count('deduplicated')
+                return hint[1]
+
+        # Descompressão em fluxo para um temporário no próprio armazenamento, com hash no caminho
+        digest = hashlib.sha256()
+        fd, temporary = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in index.stream(entry.name):
+                    digest.update(block)
+                    f.write(block)
+            os.chmod(temporary, OBJECT_MODE)
+            object_path = self._object_path(digest.hexdigest())
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            if os.path.exists(object_path):
+                self._count('deduplicated')
+            else:
+                os.replace(temporary, object_path)
+                self._count('extracted')
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._write_hint(entry, digest.hexdigest())
+        return object_path
+
+    def extract(self, apk_path, lib_dir, abis=None, workers=None):
+        """
+        Extrai as bibliotecas da melhor ABI do APK para lib_dir (hardlinks para o armazenamento).
+        Retorna (abi, {nome_da_so: caminho_em_lib_dir}); bibliotecas antigas de lib_dir são removidas.
+        """
+        abis = host_abis() if abis is None else abis
+        with APKIndex(apk_path) as index:
+            abi, libraries = select_abi(index.names(), abis)
+            os.makedirs(lib_dir, exist_ok=True)
+            names = sorted(libraries)
+            entries = [index.entry(libraries[name]) for name in names]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                objects = list(executor.map(lambda entry: self.add(index, entry), entries))
+
+        installed = {}
+        for name, object_path in zip(names, objects):
+            target = os.path.join(lib_dir, name)
+            _link(object_path, target)
+            installed[name] = target
+        for name in os.listdir(lib_dir):
+            if name.endswith('.so') and name not in installed:
+                os.remove(os.path.join(lib_dir, name))
+        return abi, installed
+
+    def gc(self):
+        """Remove objetos que nenhum app referencia mais (só o nome por digest). Retorna quantos."""
+        removed = 0
+        for directory, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                object_path = os.path.join(directory, filename)
+                if os.stat(object_path).st_nlink == 1:
+                    os.remove(object_path)
+                    removed += 1
+        # Dicas de CRC que apontam para objetos removidos
+        for crc_name in os.listdir(self.crc_dir):
+            crc_path = os.path.join(self.crc_dir, crc_name)
+            digest = self._read_hint(crc_path)
+            if digest is None or not os.path.exists(self._object_path(digest)):
+                os.remove(crc_path)
+        return removed
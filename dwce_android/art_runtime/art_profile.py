@@ -0,0 +1,311 @@
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem NumPy os bitmaps são montados e percorridos byte a byte em Python puro
+    np = None
+
+# --- Perfis PGO Persistentes (no espírito dos arquivos .prof do ART) ---
+# Cada app tem um perfil binário por pacote. Para cada DEX (identificado pelo nome no APK,
+# checksum e tamanho das tabelas) o perfil guarda bitmaps indexados por method_idx com os
+# flags quente, inicialização e pós-inicialização, e um bitmap por type_idx com as classes
+# usadas. Em memória os bitmaps são inteiros Python: a mescla de perfis é um OR por bitmap
+# (operação em C, proporcional ao tamanho do DEX e não ao número de métodos), e inteiros
+# são imutáveis, então um instantâneo para gravação custa só copiar as referências. A
+# gravação é assíncrona, em uma thread dedicada, e mescla com o que já está em disco.
+
+PROFILE_DIR = os.environ.get("DWCE_PROFILE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dwce", "profiles"))
+PROFILE_MAGIC = b'DWPF'
+PROFILE_VERSION = 1
+
+# Flags de método (como os MethodHotness do ART)
+FLAG_HOT = 0x1
+FLAG_STARTUP = 0x2
+FLAG_POST_STARTUP = 0x4
+METHOD_FLAGS = (FLAG_HOT, FLAG_STARTUP, FLAG_POST_STARTUP)
+
+# Formato do arquivo (little-endian):
+#   cabeçalho: magic (4s), versão (H), número de DEX (H)
+#   por DEX:   tamanho do nome (H), checksum (L), método_ids (L), type_ids (L), nome (utf-8)
+#   corpo:     comprimido com zlib; por DEX, os bitmaps quente/inicialização/pós-inicialização
+#              (ceil(method_ids / 8) bytes cada) e o de classes (ceil(type_ids / 8) bytes)
+_FILE_HEADER = struct.Struct('<4sHH')
+_DEX_ENTRY = struct.Struct('<HLLL')
+
+class ProfileError(ValueError):
+    """Arquivo de perfil malformado ou de outra versão."""
+
+def bitmap_from_indices(indices, size):
+    """Bitmap (inteiro) com os bits dos índices ligados."""
+    if np is not None:
+        bits = np.zeros(size, dtype=bool)
+        if not isinstance(indices, np.ndarray):
+            indices = np.fromiter(indices, dtype=np.int64)
+        bits[indices] = True
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+    bits = bytearray((size + 7) // 8)
+    for index in indices:
+        bits[index >> 3] |= 1 << (index & 7)
+    return int.from_bytes(bits, 'little')
+
+def indices_from_bitmap(bitmap):
+    """Índices dos bits ligados, em ordem crescente."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    if np is not None:
+        return np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder='little')).tolist()
+    return [position * 8 + bit for position, byte in enumerate(data) if byte for bit in range(8) if byte >> bit & 1]
+
+def _count(bitmap):
+    return bin(bitmap).count('1')
+
+class DexProfile:
+    """Bitmaps de um DEX: um por flag de método e um de classes."""
+    __slots__ = ('checksum', 'num_methods', 'num_types', 'methods', 'classes')
+
+    def __init__(self, checksum, num_methods, num_types, methods=None, classes=0):
+        self.checksum = checksum
+        self.num_methods = num_methods
+        self.num_types = num_types
+        self.methods = dict(methods) if methods else {flag: 0 for flag in METHOD_FLAGS} # {flag: bitmap}
+        self.classes = classes
+
+    def same_dex(self, other):
+        return (self.checksum, self.num_methods, self.num_types) == (other.checksum, other.num_methods, other.num_types)
+
+    def copy(self):
+        return DexProfile(self.checksum, self.num_methods, self.num_types, self.methods, self.classes)
+
+    def merge(self, other):
+        """OR dos bitmaps de outro perfil do mesmo DEX; retorna True se algo mudou."""
+        changed = False
+        for flag in METHOD_FLAGS:
+            merged = self.methods[flag] | other.methods[flag]
+            changed |= merged != self.methods[flag]
+            self.methods[flag] = merged
+        merged = self.classes | other.classes
+        changed |= merged != self.classes
+        self.classes = merged
+        return changed
+
+class Profile:
+    def __init__(self):
+        self.dex = {} # {nome do DEX no APK: DexProfile}
+
+    def __bool__(self):
+        return any(self.method_count(name) or entry.classes for name, entry in self.dex.items())
+
+    def copy(self):
+        profile = Profile()
+        profile.dex = {name: entry.copy() for name, entry in self.dex.items()}
+        return profile
+
+    def add(self, dex_name, checksum, num_methods, num_types, methods=(), flags=FLAG_HOT, classes=()):
+        """
+        Marca methods (method_idx) com flags e classes (type_idx) como usadas.
+        Um DEX com outro checksum (app atualizado) descarta o perfil antigo dele.
+        Retorna True se o perfil mudou.
+        """
+        incoming = DexProfile(checksum, num_methods, num_types)
+        if methods:
+            bitmap = bitmap_from_indices(methods, num_methods)
+            for flag in METHOD_FLAGS:
+                if flags & flag:
+                    incoming.methods[flag] = bitmap
+        if classes:
+            incoming.classes = bitmap_from_indices(classes, num_types)
+        return self.merge_dex(dex_name, incoming, replace_stale=True)
+
+    def merge_dex(self, dex_name, incoming, replace_stale=False):
+        current = self.dex.get(dex_name)
+        if current is None or (replace_stale and not current.same_dex(incoming)):
+            self.dex[dex_name] = incoming.copy()
+            return True
+        if not current.same_dex(incoming):
+            return False # Perfil de outra versão do DEX: o atual prevalece
+        return current.merge(incoming)
+
+    def merge(self, other):
+        """Mescla outro perfil (ex.: o do disco) neste; DEX de outra versão são ignorados."""
+        changed = False
+        for name, entry in other.dex.items():
+            changed |= self.merge_dex(name, entry)
+        return changed
+
+    # --- Consultas ---
+
+    def has_method(self, dex_name, method_idx, flags=FLAG_HOT):
+        entry = self.dex.get(dex_name)
+        if entry is None:
+            return False
+        return all(entry.methods[flag] >> method_idx & 1 for flag in METHOD_FLAGS if flags & flag)
+
+    def has_class(self, dex_name, type_idx):
+        entry = self.dex.get(dex_name)
+        return entry is not None and bool(entry.classes >> type_idx & 1)
+
+    def methods(self, dex_name, flag=FLAG_HOT):
+        entry = self.dex.get(dex_name)
+        return indices_from_bitmap(entry.methods[flag]) if entry is not None else []
+
+    def classes(self, dex_name):
+        entry = self.dex.get(dex_name)
+        return indices_from_bitmap(entry.classes) if entry is not None else []
+
+    def method_count(self, dex_name=None, flag=None):
+        """Métodos com o flag (ou com qualquer flag, se None), em um DEX ou em todos."""
+        entries = self.dex.values() if dex_name is None else [self.dex[dex_name]] if dex_name in self.dex else []
+        total = 0
+        for entry in entries:
+            if flag is None:
+                total += _count(entry.methods[FLAG_HOT] | entry.methods[FLAG_STARTUP] | entry.methods[FLAG_POST_STARTUP])
+            else:
+                total += _count(entry.methods[flag])
+        return total
+
+    # --- Formato binário ---
+
+    def serialize(self):
+        header = bytearray(_FILE_HEADER.pack(PROFILE_MAGIC, PROFILE_VERSION, len(self.dex)))
+        body = bytearray()
+        for name, entry in self.dex.items():
+            encoded = name.encode('utf-8')
+            header += _DEX_ENTRY.pack(len(encoded), entry.checksum, entry.num_methods, entry.num_types) + encoded
+            method_bytes = (entry.num_methods + 7) // 8
+            for flag in METHOD_FLAGS:
+                body += entry.methods[flag].to_bytes(method_bytes, 'little')
+            body += entry.classes.to_bytes((entry.num_types + 7) // 8, 'little')
+        return bytes(header) + zlib.compress(bytes(body))
+
+    @classmethod
+    def parse(cls, data):
+        try:
+            magic, version, count = _FILE_HEADER.unpack_from(data, 0)
+            if magic != PROFILE_MAGIC or version != PROFILE_VERSION:
+                raise ProfileError(f"perfil de formato desconhecido ({magic!r} v{version})")
+            offset = _FILE_HEADER.size
+            entries = []
+            for _ in range(count):
+                name_size, checksum, num_methods, num_types = _DEX_ENTRY.unpack_from(data, offset)
+                offset += _DEX_ENTRY.size
+                name = bytes(data[offset:offset + name_size]).decode('utf-8')
+                offset += name_size
+                entries.append((name, checksum, num_methods, num_types))
+            body = zlib.decompress(data[offset:])
+        except (struct.error, UnicodeDecodeError, zlib.error) as e:
+            raise ProfileError(f"perfil malformado: {e}")
+
+        profile = cls()
+        position = 0
+        for name, checksum, num_methods, num_types in entries:
+            method_bytes = (num_methods + 7) // 8
+            methods = {}
+            for flag in METHOD_FLAGS:
+                methods[flag] = int.from_bytes(body[position:position + method_bytes], 'little')
+                position += method_bytes
+            type_bytes = (num_types + 7) // 8
+            classes = int.from_bytes(body[position:position + type_bytes], 'little')
+            position += type_bytes
+            profile.dex[name] = DexProfile(checksum, num_methods, num_types, methods, classes)
+        if position != len(body):
+            raise ProfileError("tamanho do corpo do perfil não confere com os DEX declarados")
+        return profile
+
+class ProfileStore:
+    def __init__(self, profile_dir=PROFILE_DIR):
+        self.profile_dir = profile_dir
+        self.profiles = {} # {pacote: Profile} carregados ou coletados nesta execução
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._writer = None # Thread única de gravação (criada no primeiro flush)
+        self.flushes = 0
+
+    def _path(self, package_name):
+        return os.path.join(self.profile_dir, f"{package_name}.prof")
+
+    def _read(self, package_name):
+        try:
+            with open(self._path(package_name), 'rb') as f:
+                return Profile.parse(f.read())
+        except FileNotFoundError:
+            return Profile()
+        except (OSError, ProfileError) as e:
+            print(f"Aviso: perfil PGO de {package_name} ignorado: {e}")
+            return Profile()
+
+    def get(self, package_name):
+        """Perfil do pacote (lido do disco na primeira consulta; vazio se não existir)."""
+        with self._lock:
+            profile = self.profiles.get(package_name)
+            if profile is None:
+                profile = self.profiles[package_name] = self._read(package_name)
+            return profile
+
+    def record(self, package_name, dex_name, checksum, num_methods, num_types, methods=(), flags=FLAG_HOT, classes=()):
+        """Mescla métodos/classes observados no perfil em memória; a gravação fica para o flush."""
+        profile = self.get(package_name)
+        with self._lock:
+            if profile.add(dex_name, checksum, num_methods, num_types, methods, flags, classes):
+                self._dirty.add(package_name)
+
+    def flush(self, wait=False):
+        """
+        Grava os perfis alterados em segundo plano (mesclando com o conteúdo atual do disco).
+        Retorna o Future da gravação, ou None se nada mudou. O resultado do Future é a lista
+        de pacotes cuja gravação falhou: eles voltam a ficar pendentes para o próximo flush.
+        """
+        with self._lock:
+            if not self._dirty:
+                return None
+            snapshot = {package_name: self.profiles[package_name].copy() for package_name in self._dirty}
+            self._dirty.clear()
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1)
+        future = self._writer.submit(self._write, snapshot)
+        if wait:
+            future.result()
+        return future
+
+    def _write(self, snapshot):
+        failed = []
+        for package_name, profile in snapshot.items():
+            temporary = None
+            try:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                # Outro processo pode ter gravado entre a carga e agora: o disco entra na mescla
+                profile.merge(self._read(package_name))
+                fd, temporary = tempfile.mkstemp(dir=self.profile_dir, suffix=".tmp")
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(profile.serialize())
+                os.replace(temporary, self._path(package_name))
+            except OSError as e:
+                if temporary is not None and os.path.exists(temporary):
+                    os.remove(temporary)
+                print(f"Aviso: perfil PGO de {package_name} não gravado (fica pendente): {e}")
+                failed.append(package_name)
+        with self._lock:
+            # O perfil em memória continua com tudo: basta marcá-lo de novo para o próximo flush
+            self._dirty.update(failed)
+            self.flushes += 1
+        return failed
+
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread de gravação."""
+        self.flush(wait=True)
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+
+_default_store = None
+
+def get_profile_store():
+    """Retorna o armazenamento de perfis padrão do motor."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ProfileStore()
+    return _default_store
@@ -1,16 +1,35 @@
 import os
 import sys
 import time
-# from ..dex_loader.dex_loader import DEXLoader # Assumindo integração
+
+# Adiciona a camada Android (dwce_android) ao PATH para o interpretador Dalvik. Executado
+# como script, o diretório deste arquivo (sys.path[0]) esconderia o pacote art_runtime
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from art_runtime.dalvik_interpreter import Interpreter, DalvikError
+from art_runtime.art_profile import get_profile_store, FLAG_HOT, FLAG_STARTUP, FLAG_POST_STARTUP
 
 # --- ART Runtime (Android Runtime) ---
 # O ART é o motor de execução do Android. Ele gerencia o ciclo de vida das aplicações,
 # a coleta de lixo (Garbage Collection) e a execução do código.
 
+# Pacotes fornecidos pelo boot classpath (framework), nunca pelo APK
+BOOT_CLASS_PREFIXES = ('Ljava/', 'Ljavax/', 'Landroid/', 'Ldalvik/', 'Lorg/json/', 'Lorg/xml/', 'Lorg/w3c/')
+
+# Chamadas a partir das quais um método entra no perfil como quente
+HOT_INVOCATIONS = 8
+
 class ART_Runtime:
-    def __init__(self):
+    def __init__(self, profile_store=None):
         self.running_apps = {} # {package_name: app_instance}
-        self.profile_data = {} # {package_name: [methods_called]}
+        self.profiles = profile_store # ProfileStore (None -> armazenamento padrão, na inicialização)
+        self._startup_invocations = {} # {package_name: contadores do interpretador ao fim da inicialização}
+        self.dex_files = {} # {package_name: MultiDexLoader ou DEXLoader}
+        self.class_table = {} # {package_name: {descritor: classe ligada}}
+        self.interpreters = {} # {package_name: Interpreter} (tier base de execução)
+        self.classes_linked = 0
 
         self.memory_heap = {} # Simulação de heap de memória
         self.is_initialized = False
@@ -71,12 +90,31 @@ class ART_Runtime:
         return True
 
     def _execute_entry_point(self, app_instance):
-        """Simula a execução do método de entrada da Activity."""
+        """Executa o ciclo de vida da Activity de entrada (interpretado quando há DEX associado)."""
         print(f"ART Runtime: Executando {app_instance['entry_point']} (PID: {app_instance['pid']})")
         
-        # Em um SO real, isso seria a execução do código nativo compilado pelo DEX Loader
+        interpreter = self.interpreters.get(app_instance['package'])
+        if interpreter is not None:
+            # 'com.example.myapp.MainActivity.onCreate' -> 'Lcom/example/myapp/MainActivity;'
+            class_name = app_instance['entry_point'].rpartition('.')[0]
+            descriptor = 'L' + class_name.replace('.', '/') + ';'
+            for callback in ("onCreate", "onStart", "onResume"):
+                try:
+                    interpreter.run(descriptor, callback)
+                    print(f"  -> Activity: {callback}() [interpretado]")
+                except DalvikError as e:
+                    if e.exception_class == "Ljava/lang/NoSuchMethodError;":
+                        print(f"  -> Activity: {callback}() [implementação do framework]")
+                        continue
+                    print(f"  -> Activity: {callback}() falhou: {e}")
+                    break
+            print(f"  Interpretador: {interpreter.instructions} instruções executadas.")
+            # Contadores de invocação por método alimentam o PGO: tudo até aqui é inicialização
+            self._collect_pgo_data(app_instance['package'], interpreter, FLAG_STARTUP)
+            self._startup_invocations[app_instance['package']] = interpreter.invocations.copy()
+            return
         
-        # Simulação do ciclo de vida: onCreate -> onStart -> onResume
+        # Sem DEX associado: simulação do ciclo de vida: onCreate -> onStart -> onResume
         time.sleep(0.1)
         print("  -> Activity: onCreate()")
         time.sleep(0.1)
@@ -85,11 +123,8 @@ class ART_Runtime:
         print("  -> Activity: onResume() - Aplicação visível e interativa.")
         
         # O loop principal da aplicação Android (Main Looper) começaria aqui
-        
-        # Simulação de coleta de perfil (PGO)
-        self._collect_pgo_data(app_instance['package'], ["onCreate", "onStart", "onResume", "onDrawFrame"])
+        # (sem DEX não há method_idx para registrar no perfil PGO)
 
-        
     def stop_app(self, package_name):
         """Para um aplicativo em execução."""
         if package_name in self.running_apps:
@@ -101,38 +136,115 @@ class ART_Runtime:
             print("  -> Activity: onStop()")
             print("  -> Activity: onDestroy()")
             
+            # Métodos executados desde a inicialização entram no perfil como pós-inicialização
+            interpreter = self.interpreters.get(package_name)
+            if interpreter is not None and package_name in self._startup_invocations:
+                self._collect_pgo_data(package_name, interpreter, FLAG_POST_STARTUP,
+                                       since=self._startup_invocations.pop(package_name))
+                self.profiles.flush()
+            
             del self.running_apps[package_name]
             print(f"ART Runtime: {package_name} encerrado.")
             return True
         return False
 
+    def attach_dex(self, package_name, dex):
+        """Associa os DEX carregados (MultiDexLoader ou DEXLoader) ao aplicativo."""
+        self.dex_files[package_name] = dex
+        self.class_table[package_name] = {}
+        self.interpreters[package_name] = Interpreter(dex)
+
+    def execute_method(self, package_name, descriptor, name, args=None):
+        """Executa um método do aplicativo no interpretador Dalvik."""
+        interpreter = self.interpreters.get(package_name)
+        if interpreter is None:
+            raise KeyError(f"Nenhum DEX associado a {package_name}")
+        return interpreter.run(descriptor, name, args)
+
+    def resolve_class(self, package_name, descriptor):
+        """
+        Liga uma classe do aplicativo. A definição vem do índice de descritores dos DEX
+        (consulta O(1), sem varrer class_defs) e a superclasse é ligada antes.
+        Retorna {'descriptor', 'dex', 'class_def', 'superclass', 'boot'} ou None
+        (NoClassDefFoundError).
+        """
+        table = self.class_table.get(package_name)
+        if table is None:
+            return None
+        if descriptor in table:
+            return table[descriptor]
+
+        dex = self.dex_files[package_name]
+        found = dex.find_class(descriptor)
+        if isinstance(found, int): # DEXLoader único: apenas o índice em class_defs
+            found = (dex, found)
+        if found is None:
+            if not descriptor.startswith(BOOT_CLASS_PREFIXES):
+                return None
+            linked = {'descriptor': descriptor, 'dex': None, 'class_def': None, 'superclass': None, 'boot': True}
+        else:
+            loader, class_def_idx = found
+            linked = {'descriptor': descriptor, 'dex': loader, 'class_def': class_def_idx, 'superclass': None, 'boot': False}
+            table[descriptor] = linked # Registrada antes da superclasse: hierarquias cíclicas não recursam
+            superclass = loader.superclass_of(class_def_idx)
+            if superclass is not None:
+                linked['superclass'] = self.resolve_class(package_name, superclass)
+                if linked['superclass'] is None:
+                    del table[descriptor]
+                    return None
+        table[descriptor] = linked
+        self.classes_linked += 1
+        return linked
+
+    def link_package(self, package_name, package, recursive=True):
+        """Liga todas as classes de um pacote Java ('com.example.game'); retorna quantas foram ligadas."""
+        dex = self.dex_files.get(package_name)
+        if dex is None:
+            return 0
+        linked = [self.resolve_class(package_name, descriptor) for descriptor in dex.classes_in_package(package, recursive)]
+        return sum(1 for entry in linked if entry is not None)
+
     def _load_pgo_profiles(self):
-        """Carrega perfis de otimização guiada por perfil (PGO) do disco."""
-        # Em um SO real, leria um arquivo de perfil
-        self.profile_data = {
-            "com.example.myapp": ["onCreate", "onStart", "onResume"] # Exemplo de perfil
-        }
-        print("ART Runtime: Perfis PGO carregados.")
+        """Abre o armazenamento de perfis PGO (cada perfil é lido do disco no primeiro uso)."""
+        if self.profiles is None:
+            self.profiles = get_profile_store()
+        print(f"ART Runtime: Perfis PGO em {self.profiles.profile_dir}.")
 
     def _optimize_and_compile(self, package_name):
         """Otimiza e compila o código DEX usando PGO."""
-        if package_name in self.profile_data:
-            profile = self.profile_data[package_name]
-            print(f"  PGO Ativado: Otimizando {len(profile)} métodos para inicialização rápida.")
+        profile = self.profiles.get(package_name)
+        if profile:
+            print(f"  PGO Ativado: Otimizando {profile.method_count()} métodos "
+                  f"({profile.method_count(flag=FLAG_HOT)} quentes, {profile.method_count(flag=FLAG_STARTUP)} de inicialização).")
             # Em um SO real, o DEX seria recompilado para código nativo otimizado
         else:
             print("  PGO Desativado: Compilação AOT padrão.")
 
-    def _collect_pgo_data(self, package_name, methods):
-        """Coleta dados de perfil de execução para otimizações futuras."""
-        if package_name not in self.profile_data:
-            self.profile_data[package_name] = []
-            
-        for method in methods:
-            if method not in self.profile_data[package_name]:
-                self.profile_data[package_name].append(method)
+    def _collect_pgo_data(self, package_name, interpreter, flags, since=None):
+        """
+        Registra no perfil os métodos executados pelo interpretador (com flags, e FLAG_HOT
+        para os chamados ao menos HOT_INVOCATIONS vezes) e as classes que os declaram.
+        """
+        dex = self.dex_files.get(package_name)
+        names = getattr(dex, 'dex_names', None) or ["classes.dex"]
+        observed = {} # {loader: ([method_idx], [method_idx quentes])}
+        for loader, method_idx, count in interpreter.profiled_methods(since):
+            methods, hot = observed.setdefault(loader, ([], []))
+            methods.append(method_idx)
+            if count >= HOT_INVOCATIONS:
+                hot.append(method_idx)
+        
+        for loader, (methods, hot) in observed.items():
+            header = loader.header
+            name = names[interpreter.loaders.index(loader)]
+            classes = {loader.method_ids[method_idx][0] for method_idx in methods}
+            self.profiles.record(package_name, name, header.checksum, header.method_ids_size, header.type_ids_size,
+                                 methods, flags, classes)
+            if hot:
+                self.profiles.record(package_name, name, header.checksum, header.method_ids_size, header.type_ids_size,
+                                     hot, FLAG_HOT)
                 
-        print(f"  PGO Coletado: {len(methods)} métodos registrados para otimização futura.")
+        print(f"  PGO Coletado: {sum(len(methods) for methods, _ in observed.values())} métodos registrados para otimização futura.")
 
 # Exemplo de uso (para teste interno)
 if __name__ == "__main__":
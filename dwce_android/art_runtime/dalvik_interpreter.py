@@ -0,0 +1,360 @@
+import os
+import sys
+import time
+from collections import Counter
+
+# Adiciona a camada Android (dwce_android) ao PATH para importar o código pré-decodificado
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_code import OPCODES
+
+# --- Interpretador Dalvik (tier base de execução do ART) ---
+# Executa o bytecode pré-decodificado pelo DEXLoader (dex_code.DecodedCode). Na primeira
+# chamada de um método, cada instrução é ligada uma única vez a (handler, a, b, c): o
+# handler vem de uma tabela opcode -> função montada na criação do interpretador, e
+# operandos que dependem do DEX (strings, campos, métodos) já ficam resolvidos. O laço
+# de despacho apenas chama o handler da instrução corrente, que devolve o índice da
+# próxima (-1 encerra o método) — sem decodificar nada durante a execução.
+#
+# Valores wide (long) ocupam o registrador baixo do par; o alto é reservado, como no
+# Dalvik, para que as listas de argumentos mantenham o mesmo layout. Objetos ainda não
+# existem neste tier: invoke-virtual/interface resolvem pelo tipo estático.
+
+MAX_CALL_DEPTH = 250 # Cada chamada Dalvik usa três frames Python (limite padrão de recursão: 1000)
+RESULT = -1 # Último slot de cada frame: valor de retorno / resultado da última chamada
+
+class DalvikError(Exception):
+    """Exceção Java lançada pelo código interpretado (sem try/catch neste tier)."""
+
+    def __init__(self, exception_class, message=""):
+        super().__init__(f"{exception_class} {message}".strip())
+        self.exception_class = exception_class
+
+def _i32(value):
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+def _i64(value):
+    return ((value + 0x8000000000000000) & 0xFFFFFFFFFFFFFFFF) - 0x8000000000000000
+
+def _div(a, b):
+    """Divisão Java: trunca em direção a zero."""
+    if b == 0:
+        raise DalvikError("Ljava/lang/ArithmeticException;", "divide by zero")
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+def _rem(a, b):
+    return a - b * _div(a, b)
+
+INT_OPS = {
+    'add': lambda a, b: _i32(a + b), 'sub': lambda a, b: _i32(a - b), 'mul': lambda a, b: _i32(a * b),
+    'div': lambda a, b: _i32(_div(a, b)), 'rem': lambda a, b: _i32(_rem(a, b)),
+    'and': lambda a, b: a & b, 'or': lambda a, b: a | b, 'xor': lambda a, b: a ^ b,
+    'shl': lambda a, b: _i32(a << (b & 0x1F)), 'shr': lambda a, b: a >> (b & 0x1F),
+    'ushr': lambda a, b: _i32((a & 0xFFFFFFFF) >> (b & 0x1F)),
+    'rsub': lambda a, b: _i32(b - a),
+}
+LONG_OPS = {
+    'add': lambda a, b: _i64(a + b), 'sub': lambda a, b: _i64(a - b), 'mul': lambda a, b: _i64(a * b),
+    'div': lambda a, b: _i64(_div(a, b)), 'rem': lambda a, b: _i64(_rem(a, b)),
+    'and': lambda a, b: a & b, 'or': lambda a, b: a | b, 'xor': lambda a, b: a ^ b,
+    'shl': lambda a, b: _i64(a << (b & 0x3F)), 'shr': lambda a, b: a >> (b & 0x3F),
+    'ushr': lambda a, b: _i64((a & 0xFFFFFFFFFFFFFFFF) >> (b & 0x3F)),
+}
+
+# --- Handlers: (registradores, a, b, c, pc) -> próximo pc ---
+
+def _nop(regs, a, b, c, pc):
+    return pc + 1
+
+def _move(regs, a, b, c, pc):
+    regs[a] = regs[b]
+    return pc + 1
+
+def _move_result(regs, a, b, c, pc):
+    regs[a] = regs[RESULT]
+    return pc + 1
+
+def _const(regs, a, b, c, pc):
+    regs[a] = b
+    return pc + 1
+
+def _return_void(regs, a, b, c, pc):
+    regs[RESULT] = None
+    return -1
+
+def _return(regs, a, b, c, pc):
+    regs[RESULT] = regs[a]
+    return -1
+
+def _goto(regs, a, b, c, pc):
+    return a
+
+def _unary(operation):
+    def handler(regs, a, b, c, pc):
+        regs[a] = operation(regs[b])
+        return pc + 1
+    return handler
+
+def _binary(operation):
+    def handler(regs, a, b, c, pc):
+        regs[a] = operation(regs[b], regs[c])
+        return pc + 1
+    return handler
+
+def _binary_2addr(operation):
+    def handler(regs, a, b, c, pc):
+        regs[a] = operation(regs[a], regs[b])
+        return pc + 1
+    return handler
+
+def _binary_literal(operation):
+    def handler(regs, a, b, c, pc):
+        regs[a] = operation(regs[b], c)
+        return pc + 1
+    return handler
+
+def _if(compare):
+    def handler(regs, a, b, c, pc):
+        return c if compare(regs[a], regs[b]) else pc + 1
+    return handler
+
+def _if_zero(compare):
+    def handler(regs, a, b, c, pc):
+        return b if compare(regs[a], 0) else pc + 1
+    return handler
+
+_COMPARISONS = [lambda x, y: x == y, lambda x, y: x != y, lambda x, y: x < y,
+                lambda x, y: x >= y, lambda x, y: x > y, lambda x, y: x <= y]
+
+def _build_static_handlers():
+    """Tabela opcode -> handler dos opcodes que não dependem do interpretador."""
+    handlers = [None] * 256
+    handlers[0x00] = _nop
+    for opcode in (0x01, 0x02, 0x04, 0x05, 0x07, 0x08, 0x81):
+        handlers[opcode] = _move
+    for opcode in (0x0A, 0x0B, 0x0C):
+        handlers[opcode] = _move_result
+    handlers[0x0E] = _return_void
+    for opcode in (0x0F, 0x10, 0x11):
+        handlers[opcode] = _return
+    for opcode in (0x12, 0x13, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A):
+        handlers[opcode] = _const # const-string: b já ligado à string
+    for opcode in (0x28, 0x29, 0x2A):
+        handlers[opcode] = _goto
+    for i, compare in enumerate(_COMPARISONS):
+        handlers[0x32 + i] = _if(compare)
+        handlers[0x38 + i] = _if_zero(compare)
+    handlers[0x7B] = _unary(lambda value: _i32(-value))
+    handlers[0x7D] = _unary(lambda value: _i64(-value))
+    handlers[0x84] = _unary(_i32)
+    for opcode, (name, _) in OPCODES.items():
+        operation = name.partition('/')[0]
+        if 0x90 <= opcode <= 0xAF:
+            op, _, kind = operation.partition('-')
+            handlers[opcode] = _binary((INT_OPS if kind == 'int' else LONG_OPS)[op])
+        elif 0xB0 <= opcode <= 0xCF:
+            op, _, kind = operation.partition('-')
+            handlers[opcode] = _binary_2addr((INT_OPS if kind == 'int' else LONG_OPS)[op])
+        elif 0xD0 <= opcode <= 0xE2:
+            handlers[opcode] = _binary_literal(INT_OPS[operation.partition('-')[0]])
+    return handlers
+
+STATIC_HANDLERS = _build_static_handlers()
+
+class _MethodRef:
+    """Referência a um method_id, resolvida na primeira chamada."""
+    __slots__ = ('loader', 'method_idx', 'target')
+
+    def __init__(self, loader, method_idx):
+        self.loader = loader
+        self.method_idx = method_idx
+        self.target = None # _BoundMethod, ou (nome, função nativa) para métodos fora do app
+
+class _BoundMethod:
+    __slots__ = ('name', 'registers', 'ins', 'code', 'loader', 'method_idx')
+
+    def __init__(self, name, registers, ins, code, loader=None, method_idx=None):
+        self.name = name
+        self.loader = loader
+        self.method_idx = method_idx
+        self.registers = registers
+        self.ins = ins
+        self.code = code # [(handler, a, b, c)]
+
+class Interpreter:
+    def __init__(self, dex):
+        """dex: DEXLoader ou MultiDexLoader já carregado."""
+        self.dex = dex
+        self.loaders = dex.loaders if hasattr(dex, 'loaders') else [dex]
+        self.handlers = list(STATIC_HANDLERS)
+        self.handlers[0x60] = self.handlers[0x61] = self.handlers[0x62] = self._sget
+        self.handlers[0x67] = self.handlers[0x68] = self.handlers[0x69] = self._sput
+        for opcode in (0x6E, 0x6F, 0x70, 0x71, 0x72, 0x74, 0x75, 0x76, 0x77, 0x78):
+            self.handlers[opcode] = self._invoke
+        self.statics = {} # {(classe, campo): valor}
+        self.natives = {} # {'Lclasse;->nome': função(args)} para métodos do framework
+        self.invocations = Counter() # Chamadas por método do app (alimenta o PGO)
+        self.external_calls = Counter()
+        self.instructions = 0
+        self.depth = 0
+        self._bound = {} # {(id(loader), method_idx): _BoundMethod}
+        self._refs = {} # {(id(loader), method_idx): _MethodRef}
+
+    # --- Ligação ---
+
+    def _ref(self, loader, method_idx):
+        key = (id(loader), method_idx)
+        ref = self._refs.get(key)
+        if ref is None:
+            ref = self._refs[key] = _MethodRef(loader, method_idx)
+        return ref
+
+    def _bind(self, loader, method_idx):
+        """Liga o código pré-decodificado à tabela de despacho (uma vez por método)."""
+        key = (id(loader), method_idx)
+        bound = self._bound.get(key)
+        if bound is not None:
+            return bound
+        decoded = loader.code[method_idx]
+        descriptor, name, signature = loader.method_signature(method_idx)
+        code = []
+        handlers = self.handlers
+        for opcode, a, b, c in zip(decoded.opcodes, decoded.a, decoded.b, decoded.c):
+            if opcode == 0x1A: # const-string
+                b = loader.string(b)
+            elif 0x60 <= opcode <= 0x69: # sget/sput: chave (classe, nome) vale entre DEX
+                class_idx, _, name_idx = loader.field_ids[b]
+                b = (loader.type_descriptor(class_idx), loader.string(name_idx))
+            elif 0x6E <= opcode <= 0x72:
+                a, b = self._ref(loader, a), tuple((b >> (4 * i)) & 0xF for i in range(c))
+            elif 0x74 <= opcode <= 0x78:
+                a, b = self._ref(loader, a), tuple(range(b, b + c))
+            code.append((handlers[opcode], a, b, c))
+        bound = self._bound[key] = _BoundMethod(f"{descriptor}->{name}{signature}", decoded.registers, decoded.ins, code,
+                                                   loader, method_idx)
+        return bound
+
+    def _find_class(self, descriptor):
+        if hasattr(self.dex, 'loaders'):
+            return self.dex.find_class(descriptor)
+        class_def_idx = self.dex.find_class(descriptor)
+        return (self.dex, class_def_idx) if class_def_idx is not None else None
+
+    def _resolve(self, ref):
+        """Localiza o código do método no app (subindo pelas superclasses) ou no framework."""
+        descriptor, name, signature = ref.loader.method_signature(ref.method_idx)
+        current = descriptor
+        while current is not None:
+            found = self._find_class(current)
+            if found is None:
+                break
+            loader, class_def_idx = found
+            for method_idx, _, code_off in loader.class_methods(class_def_idx):
+                if loader.method_signature(method_idx)[1:] != (name, signature):
+                    continue
+                if method_idx in loader.code:
+                    return self._bind(loader, method_idx)
+                if method_idx in loader.rejected:
+                    raise DalvikError("Ljava/lang/VerifyError;", f"{current}->{name}: {loader.rejected[method_idx]}")
+                current = None # Nativo/abstrato: tratado como método externo
+                break
+            else:
+                current = loader.superclass_of(class_def_idx)
+        key = f"{descriptor}->{name}"
+        native = self.natives.get(key)
+        if native is None:
+            default = None if signature.rpartition(')')[2][0] in 'VL[' else 0
+            native = lambda args, default=default: default
+        return (key, native)
+
+    # --- Handlers que dependem do estado do interpretador ---
+
+    def _sget(self, regs, a, b, c, pc):
+        regs[a] = self.statics.get(b, 0)
+        return pc + 1
+
+    def _sput(self, regs, a, b, c, pc):
+        self.statics[b] = regs[a]
+        return pc + 1
+
+    def _invoke(self, regs, a, b, c, pc):
+        regs[RESULT] = self.invoke(a, [regs[register] for register in b])
+        return pc + 1
+
+    # --- Execução ---
+
+    def invoke(self, ref, args):
+        target = ref.target
+        if target is None:
+            target = ref.target = self._resolve(ref)
+        if type(target) is tuple:
+            self.external_calls[target[0]] += 1
+            return target[1](args)
+        return self._execute(target, args)
+
+    def _execute(self, method, args):
+        if len(args) != method.ins:
+            raise DalvikError("Ljava/lang/VerifyError;", f"{method.name} espera {method.ins} registradores de argumento")
+        self.invocations[method.name] += 1
+        regs = [0] * (method.registers + 1)
+        regs[method.registers - method.ins:method.registers] = args
+        code = method.code
+        pc = executed = 0
+        self.depth += 1
+        try:
+            if self.depth > MAX_CALL_DEPTH:
+                raise DalvikError("Ljava/lang/StackOverflowError;", method.name)
+            while pc >= 0:
+                handler, a, b, c = code[pc]
+                pc = handler(regs, a, b, c, pc)
+                executed += 1
+        finally:
+            self.instructions += executed
+            self.depth -= 1
+        return regs[RESULT]
+
+    def run(self, descriptor, name, args=None, signature=None):
+        """Executa um método do app; args None preenche os registradores de entrada com zero."""
+        found = self._find_class(descriptor)
+        if found is None:
+            raise DalvikError("Ljava/lang/NoClassDefFoundError;", descriptor)
+        loader, class_def_idx = found
+        for method_idx, _, _ in loader.class_methods(class_def_idx):
+            _, method_name, method_signature = loader.method_signature(method_idx)
+            if method_name == name and (signature is None or method_signature == signature):
+                ref = self._ref(loader, method_idx)
+                if args is None:
+                    decoded = loader.code.get(method_idx)
+                    args = [0] * (decoded.ins if decoded is not None else 0)
+                return self.invoke(ref, list(args))
+        raise DalvikError("Ljava/lang/NoSuchMethodError;", f"{descriptor}->{name}")
+
+    def hot_methods(self, limit=None):
+        """Métodos do app da mais para a menos chamada (entrada do PGO)."""
+        return [name for name, _ in self.invocations.most_common(limit)]
+
+    def profiled_methods(self, since=None):
+        """
+        (loader, method_idx, chamadas) dos métodos do app executados (entrada do PGO); com
+        since (uma cópia anterior de invocations), só os chamados depois dela.
+        """
+        invocations = self.invocations
+        for method in self._bound.values():
+            count = invocations[method.name]
+            if count > (since[method.name] if since is not None else 0):
+                yield method.loader, method.method_idx, count
+
+    def benchmark(self, descriptor, name, args=None, repeat=5):
+        """Microbenchmark do laço de despacho: instruções executadas por segundo."""
+        self.run(descriptor, name, args) # Aquece: liga os métodos antes de medir
+        instructions = self.instructions
+        start = time.perf_counter()
+        for _ in range(repeat):
+            self.run(descriptor, name, args)
+        elapsed = time.perf_counter() - start
+        executed = self.instructions - instructions
+        result = {'instructions': executed, 'seconds': elapsed, 'ips': executed / elapsed if elapsed else 0.0}
+        print(f"Interpretador Dalvik: {executed} instruções em {elapsed * 1000:.1f} ms "
+              f"({result['ips'] / 1e6:.2f} M instr/s).")
+        return result
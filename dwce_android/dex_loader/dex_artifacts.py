@@ -0,0 +1,226 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do loader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_code import DecodedCode, RUNTIME_VERSION
+
+# --- Cache de Artefatos Compilados (estilo odex/vdex) ---
+# O resultado de _compile_bytecode (código pré-decodificado e a lista de métodos
+# rejeitados pela verificação) é gravado em disco, um arquivo por DEX, chaveado pelo
+# checksum Adler-32 do cabeçalho e pela versão do runtime que o produziu. Na carga
+# seguinte do mesmo DEX os arrays são mapeados via mmap e usados diretamente (views sem
+# cópia), sem verificar nem decodificar nada. O diretório é compartilhado entre apps e
+# limitado em tamanho: os artefatos usados há mais tempo (mtime) são removidos primeiro.
+
+CACHE_DIR = os.environ.get("DWCE_ARTIFACT_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "dwce", "artifacts"))
+CACHE_MAGIC = b'DWVX'
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Formato do arquivo (little-endian, arrays alinhados em 8 bytes):
+#   cabeçalho: magic (4s), versão (H), tamanho da versão do runtime (H), checksum (L),
+#              signature SHA-1 (20s), file_size (L), métodos (L), rejeitados (L), offset dos rejeitados (L),
+#              versão do runtime
+#   métodos:   por método -> method_idx (L), registers (H), ins (H), instruções (L), offset (L)
+#   dados:     por método -> opcodes (B), a, b, c (q)
+#   rejeitados: por método -> method_idx (L), tamanho (H), motivo (utf-8)
+_FILE_HEADER = struct.Struct('<4sHHL20sLLLL')
+_METHOD_ENTRY = struct.Struct('<LHHLL')
+_REJECTED_ENTRY = struct.Struct('<LH')
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+def _words(view, little_endian=sys.byteorder == 'little'):
+    """Coluna 'q' sobre o mapeamento (sem cópia em máquinas little-endian)."""
+    if little_endian:
+        return view.cast('q')
+    words = array('q')
+    words.frombytes(view)
+    words.byteswap()
+    return words
+
+class CompiledArtifact:
+    """Código de um DEX restaurado do cache, mantido aberto sobre o mmap do arquivo."""
+
+    def __init__(self, mapping, code, rejected):
+        self._mapping = mapping
+        self.code = code # {method_idx: DecodedCode} com arrays sobre o mmap
+        self.rejected = rejected
+
+    def close(self):
+        self.code = {}
+        try:
+            self._mapping.close()
+        except BufferError:
+            # Algum array ainda está em uso; o mapeamento é liberado pelo GC
+            pass
+
+class ArtifactCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, runtime_version=RUNTIME_VERSION):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.max_bytes = max_bytes
+        self.runtime_version = runtime_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock() # Carga multidex grava vários artefatos em paralelo
+
+    def _entry_path(self, header):
+        return os.path.join(self.cache_dir, f"{header.checksum:08x}-{self.runtime_version}.vdex")
+
+    def load(self, header):
+        """CompiledArtifact do DEX descrito por header (DexHeader), ou None."""
+        path = self._entry_path(header)
+        try:
+            with open(path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        view = code = None
+        try:
+            magic, version, runtime_size, checksum, signature, file_size, methods, rejected_count, rejected_off = \
+                _FILE_HEADER.unpack_from(mapping, 0)
+            offset = _FILE_HEADER.size
+            runtime_version = mapping[offset:offset + runtime_size].decode('utf-8')
+            # O checksum só escolhe o arquivo: signature e tamanho confirmam que é o mesmo DEX
+            if (magic != CACHE_MAGIC or version != CACHE_VERSION or runtime_version != self.runtime_version
+                    or checksum != header.checksum or signature != header.signature or file_size != header.file_size):
+                raise ValueError("artefato obsoleto")
+            offset = _align(offset + runtime_size)
+
+            view = memoryview(mapping)
+            code = {}
+            for _ in range(methods):
+                method_idx, registers, ins, count, data_offset = _METHOD_ENTRY.unpack_from(mapping, offset)
+                offset += _METHOD_ENTRY.size
+                operands = _align(data_offset + count)
+                if operands + count * 24 > len(mapping):
+                    raise ValueError("artefato truncado")
+                code[method_idx] = DecodedCode(
+                    registers, ins, view[data_offset:data_offset + count],
+                    _words(view[operands:operands + count * 8]),
+                    _words(view[operands + count * 8:operands + count * 16]),
+                    _words(view[operands + count * 16:operands + count * 24]))
+
+            rejected = {}
+            offset = rejected_off
+            for _ in range(rejected_count):
+                method_idx, size = _REJECTED_ENTRY.unpack_from(mapping, offset)
+                offset += _REJECTED_ENTRY.size
+                rejected[method_idx] = mapping[offset:offset + size].decode('utf-8')
+                offset += size
+        except (struct.error, ValueError, UnicodeDecodeError):
+            view = code = None # Libera as views antes de fechar o mapeamento
+            mapping.close()
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Acerto renova o artefato na ordem de remoção (LRU por mtime)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return CompiledArtifact(mapping, code, rejected)
+
+    def store(self, header, code, rejected):
+        """Grava o código pré-decodificado ({method_idx: DecodedCode}) e os métodos rejeitados."""
+        runtime_version = self.runtime_version.encode('utf-8')
+        methods = sorted(code.items())
+        offset = _align(_align(_FILE_HEADER.size + len(runtime_version)) + _METHOD_ENTRY.size * len(methods))
+
+        table = bytearray()
+        payload = bytearray()
+        for method_idx, decoded in methods:
+            count = len(decoded)
+            table += _METHOD_ENTRY.pack(method_idx, decoded.registers, decoded.ins, count, offset + len(payload))
+            payload += bytes(decoded.opcodes)
+            payload += b'\x00' * (_align(len(payload)) - len(payload))
+            for column in (decoded.a, decoded.b, decoded.c):
+                words = array('q', column)
+                if sys.byteorder != 'little':
+                    words.byteswap()
+                payload += words.tobytes()
+
+        rejected_data = bytearray()
+        for method_idx, reason in sorted(rejected.items()):
+            encoded = reason.encode('utf-8')[:0xFFFF]
+            rejected_data += _REJECTED_ENTRY.pack(method_idx, len(encoded)) + encoded
+
+        content = bytearray(_FILE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(runtime_version), header.checksum,
+                                              header.signature, header.file_size, len(methods), len(rejected),
+                                              offset + len(payload)))
+        content += runtime_version
+        content += b'\x00' * (_align(len(content)) - len(content))
+        content += table
+        content += b'\x00' * (_align(len(content)) - len(content))
+        content += payload
+        content += rejected_data
+
+        # Escrita atômica: um leitor concorrente nunca vê um artefato pela metade
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, self._entry_path(header))
+        except OSError as e:
+            print(f"Artifact Cache: Aviso - Não foi possível gravar o artefato do DEX {header.checksum:08x}: {e}")
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Remove os artefatos menos usados até o diretório caber em max_bytes."""
+        with self._lock:
+            try:
+                entries = []
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.vdex'):
+                        st = os.stat(os.path.join(self.cache_dir, name))
+                        entries.append((st.st_mtime_ns, st.st_size, name))
+            except OSError:
+                return 0
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue # Ainda mapeado por outro processo (Windows)
+                total -= size
+                removed += 1
+            self.evictions += removed
+            return removed
+
+    def size(self):
+        """Total em bytes dos artefatos no diretório."""
+        try:
+            return sum(os.path.getsize(os.path.join(self.cache_dir, name))
+                       for name in os.listdir(self.cache_dir) if name.endswith('.vdex'))
+        except OSError:
+            return 0
+
+_default_cache = None
+
+def get_artifact_cache():
+    """Retorna o cache de artefatos padrão do motor."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ArtifactCache()
+    return _default_cache
@@ -0,0 +1,47 @@
+import hashlib
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Verificação de Integridade DEX (checksum e signature) ---
+# O cabeçalho traz o Adler-32 de tudo após o campo checksum (offset 12) e o SHA-1 de tudo
+# após o campo signature (offset 32). Os dois são calculados em uma única passada por
+# blocos grandes sobre uma memoryview do DEX (bytes ou mmap), sem copiar o arquivo.
+# zlib.adler32 e hashlib liberam o GIL em blocos desse tamanho, então a verificação de
+# vários DEX roda de fato em paralelo nas threads da carga multidex.
+
+CHECKSUM_OFFSET = 12 # Adler-32 cobre data[12:]
+SIGNATURE_OFFSET = 32 # SHA-1 cobre data[32:]
+CHUNK_SIZE = 1024 * 1024
+
+def compute_checksums(data, chunk_size=CHUNK_SIZE):
+    """(adler32 de data[12:], SHA-1 de data[32:]) calculados por blocos."""
+    view = memoryview(data)
+    try:
+        adler = zlib.adler32(view[CHECKSUM_OFFSET:SIGNATURE_OFFSET])
+        sha1 = hashlib.sha1()
+        for start in range(SIGNATURE_OFFSET, len(view), chunk_size):
+            chunk = view[start:start + chunk_size]
+            adler = zlib.adler32(chunk, adler)
+            sha1.update(chunk)
+        return adler, sha1.digest()
+    finally:
+        view.release()
+
+def verify_dex(data, header, chunk_size=CHUNK_SIZE):
+    """Motivo da falha de integridade do DEX descrito por header (DexHeader), ou None."""
+    if header.file_size != len(data):
+        return f"file_size {header.file_size} difere do tamanho real ({len(data)} bytes)"
+    checksum, signature = compute_checksums(data, chunk_size)
+    if checksum != header.checksum:
+        return f"checksum Adler-32 inválido ({checksum:08x}, esperado {header.checksum:08x})"
+    if signature != bytes(header.signature):
+        return "signature SHA-1 inválida"
+    return None
+
+def verify_all(buffers, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Verifica vários DEX em paralelo (instalação em lote).
+    buffers: [(dados, DexHeader)]; retorna a lista de motivos (None para os íntegros).
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: verify_dex(item[0], item[1], chunk_size), buffers))
@@ -0,0 +1,71 @@
+from bisect import bisect_left
+
+# --- Índice de Classes por Descritor ---
+# Tabela hash descritor -> (número do DEX, índice em class_defs), montada durante a carga.
+# A ligação de classes do ART resolve dezenas de milhares de descritores na
+# inicialização: cada consulta é O(1), sem varrer class_defs. Para enumerar pacotes, os
+# descritores também são agrupados por pacote, e a lista ordenada de pacotes permite
+# buscar subpacotes por prefixo com bisect.
+
+def package_of(descriptor):
+    """'Lcom/example/Foo;' -> 'com/example' ('' para o pacote padrão)."""
+    name = descriptor[1:-1] if descriptor.startswith('L') and descriptor.endswith(';') else descriptor
+    return name.rpartition('/')[0]
+
+def _normalize_package(package):
+    """Aceita 'com.example' ou 'com/example' (com ou sem barra final)."""
+    return package.replace('.', '/').strip('/')
+
+class ClassIndex:
+    def __init__(self):
+        self.entries = {} # {descritor: (número do DEX, índice em class_defs)}
+        self.shadowed = [] # [(descritor, número do DEX sombreado)]
+        self.packages = {} # {pacote: [descritores]} na ordem de inserção
+        self._sorted_packages = None # Reconstruída sob demanda após inserções
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, descriptor):
+        return descriptor in self.entries
+
+    def add(self, descriptor, dex_number, class_def_idx):
+        """Registra uma definição; a primeira vence e as seguintes ficam sombreadas."""
+        if descriptor in self.entries:
+            self.shadowed.append((descriptor, dex_number))
+            return False
+        self.entries[descriptor] = (dex_number, class_def_idx)
+        package = package_of(descriptor)
+        if package not in self.packages:
+            self.packages[package] = []
+            self._sorted_packages = None
+        self.packages[package].append(descriptor)
+        return True
+
+    def add_dex(self, dex_number, descriptors):
+        """Registra todos os class_defs de um DEX (descritores na ordem da tabela)."""
+        for class_def_idx, descriptor in enumerate(descriptors):
+            self.add(descriptor, dex_number, class_def_idx)
+
+    def lookup(self, descriptor):
+        """(número do DEX, índice em class_defs), ou None."""
+        return self.entries.get(descriptor)
+
+    def in_package(self, package, recursive=False):
+        """Descritores de um pacote ('com.example'); com recursive, inclui os subpacotes."""
+        package = _normalize_package(package)
+        if not recursive:
+            return list(self.packages.get(package, ()))
+        if self._sorted_packages is None:
+            self._sorted_packages = sorted(self.packages)
+        if not package:
+            return [descriptor for name in self._sorted_packages for descriptor in self.packages[name]]
+
+        # Subpacotes de 'com/example' ficam contíguos a partir de 'com/example/' na ordem lexicográfica
+        descriptors = list(self.packages.get(package, ()))
+        prefix = package + '/'
+        position = bisect_left(self._sorted_packages, prefix)
+        while position < len(self._sorted_packages) and self._sorted_packages[position].startswith(prefix):
+            descriptors.extend(self.packages[self._sorted_packages[position]])
+            position += 1
+        return descriptors
@@ -0,0 +1,244 @@
+import os
+import struct
+import sys
+from array import array
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do loader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_strings import read_uleb128
+
+# --- Código Dalvik Pré-Decodificado ---
+# class_data_item e code_item são lidos do DEX e cada método é decodificado uma única vez
+# para arrays paralelos (opcode, a, b, c): saltos já convertidos de deslocamentos em
+# unidades de código para índices de instrução, e literais já estendidos com sinal. O
+# resultado é apenas dado (sem referências a funções), pronto para ser ligado à tabela
+# de despacho do interpretador ou gravado em um cache de artefatos. A decodificação
+# também verifica a estrutura: registradores dentro de registers_size, saltos para
+# instruções válidas e nenhum caminho caindo para fora do método.
+
+# Versão do formato pré-decodificado e do subconjunto de opcodes: artefatos em cache de
+# outra versão do runtime são descartados
+RUNTIME_VERSION = "dwce-art1"
+
+_CODE_ITEM = struct.Struct('<HHHHLL') # registers_size, ins_size, outs_size, tries_size, debug_info_off, insns_size
+
+# Formatos de instrução -> tamanho em unidades de código (16 bits)
+FORMAT_SIZES = {'10x': 1, '12x': 1, '11n': 1, '11x': 1, '10t': 1,
+                '20t': 2, '22x': 2, '21t': 2, '21s': 2, '21h': 2, '21c': 2, '23x': 2, '22b': 2, '22t': 2, '22s': 2,
+                '30t': 3, '31i': 3, '35c': 3, '3rc': 3, '51l': 5}
+
+# Subconjunto suportado: {opcode: (mnemônico, formato)}
+OPCODES = {
+    0x00: ('nop', '10x'), 0x01: ('move', '12x'), 0x02: ('move/from16', '22x'), 0x04: ('move-wide', '12x'),
+    0x05: ('move-wide/from16', '22x'), 0x07: ('move-object', '12x'), 0x08: ('move-object/from16', '22x'),
+    0x0A: ('move-result', '11x'), 0x0B: ('move-result-wide', '11x'), 0x0C: ('move-result-object', '11x'),
+    0x0E: ('return-void', '10x'), 0x0F: ('return', '11x'), 0x10: ('return-wide', '11x'), 0x11: ('return-object', '11x'),
+    0x12: ('const/4', '11n'), 0x13: ('const/16', '21s'), 0x14: ('const', '31i'), 0x15: ('const/high16', '21h'),
+    0x16: ('const-wide/16', '21s'), 0x17: ('const-wide/32', '31i'), 0x18: ('const-wide', '51l'),
+    0x19: ('const-wide/high16', '21h'), 0x1A: ('const-string', '21c'),
+    0x28: ('goto', '10t'), 0x29: ('goto/16', '20t'), 0x2A: ('goto/32', '30t'),
+    0x32: ('if-eq', '22t'), 0x33: ('if-ne', '22t'), 0x34: ('if-lt', '22t'),
+    0x35: ('if-ge', '22t'), 0x36: ('if-gt', '22t'), 0x37: ('if-le', '22t'),
+    0x38: ('if-eqz', '21t'), 0x39: ('if-nez', '21t'), 0x3A: ('if-ltz', '21t'),
+    0x3B: ('if-gez', '21t'), 0x3C: ('if-gtz', '21t'), 0x3D: ('if-lez', '21t'),
+    0x60: ('sget', '21c'), 0x61: ('sget-wide', '21c'), 0x62: ('sget-object', '21c'),
+    0x67: ('sput', '21c'), 0x68: ('sput-wide', '21c'), 0x69: ('sput-object', '21c'),
+    0x6E: ('invoke-virtual', '35c'), 0x6F: ('invoke-super', '35c'), 0x70: ('invoke-direct', '35c'),
+    0x71: ('invoke-static', '35c'), 0x72: ('invoke-interface', '35c'),
+    0x74: ('invoke-virtual/range', '3rc'), 0x75: ('invoke-super/range', '3rc'), 0x76: ('invoke-direct/range', '3rc'),
+    0x77: ('invoke-static/range', '3rc'), 0x78: ('invoke-interface/range', '3rc'),
+    0x7B: ('neg-int', '12x'), 0x7D: ('neg-long', '12x'), 0x81: ('int-to-long', '12x'), 0x84: ('long-to-int', '12x'),
+}
+_BINARY_OPS = ('add', 'sub', 'mul', 'div', 'rem', 'and', 'or', 'xor', 'shl', 'shr', 'ushr')
+for _i, _op in enumerate(_BINARY_OPS):
+    OPCODES[0x90 + _i] = (f'{_op}-int', '23x')
+    OPCODES[0x9B + _i] = (f'{_op}-long', '23x')
+    OPCODES[0xB0 + _i] = (f'{_op}-int/2addr', '12x')
+    OPCODES[0xBB + _i] = (f'{_op}-long/2addr', '12x')
+for _i, _op in enumerate(('add', 'rsub', 'mul', 'div', 'rem', 'and', 'or', 'xor')):
+    OPCODES[0xD0 + _i] = (f'{_op}-int/lit16', '22s')
+for _i, _op in enumerate(('add', 'rsub', 'mul', 'div', 'rem', 'and', 'or', 'xor', 'shl', 'shr', 'ushr')):
+    OPCODES[0xD8 + _i] = (f'{_op}-int/lit8', '22b')
+
+RETURN_OPCODES = frozenset((0x0E, 0x0F, 0x10, 0x11))
+GOTO_OPCODES = frozenset((0x28, 0x29, 0x2A))
+BRANCH_FORMATS = frozenset(('10t', '20t', '30t', '21t', '22t'))
+
+class VerifyError(ValueError):
+    """Código rejeitado na pré-decodificação (opcode não suportado ou estrutura inválida)."""
+
+def _s8(value):
+    return value - 0x100 if value & 0x80 else value
+
+def _s16(value):
+    return value - 0x10000 if value & 0x8000 else value
+
+def _s32(value):
+    return value - 0x100000000 if value & 0x80000000 else value
+
+def parse_class_data(data, offset):
+    """
+    class_data_item: (campos estáticos, campos de instância, métodos diretos, métodos virtuais).
+    Campos: [(field_idx, access_flags)]; métodos: [(method_idx, access_flags, code_off)].
+    """
+    sizes = []
+    for _ in range(4):
+        value, offset = read_uleb128(data, offset)
+        sizes.append(value)
+    groups = []
+    for group, count in enumerate(sizes):
+        entries = []
+        index = 0
+        for _ in range(count):
+            diff, offset = read_uleb128(data, offset)
+            access_flags, offset = read_uleb128(data, offset)
+            index += diff # Índices codificados como diferença em relação ao anterior
+            if group < 2:
+                entries.append((index, access_flags))
+            else:
+                code_off, offset = read_uleb128(data, offset)
+                entries.append((index, access_flags, code_off))
+        groups.append(entries)
+    return tuple(groups)
+
+class DecodedCode:
+    """Método pré-decodificado: arrays paralelos indexados pela instrução (não pela unidade de código)."""
+    __slots__ = ('registers', 'ins', 'opcodes', 'a', 'b', 'c')
+
+    def __init__(self, registers, ins, opcodes, a, b, c):
+        self.registers = registers
+        self.ins = ins
+        self.opcodes = opcodes # array('B')
+        self.a = a # array('q')
+        self.b = b
+        self.c = c
+
+    def __len__(self):
+        return len(self.opcodes)
+
+def decode_code_item(data, offset):
+    """Lê o code_item em offset e pré-decodifica as instruções (levanta VerifyError)."""
+    if offset + _CODE_ITEM.size > len(data):
+        raise VerifyError("code_item fora do arquivo")
+    registers, ins, _, _, _, insns_size = _CODE_ITEM.unpack_from(data, offset)
+    start = offset + _CODE_ITEM.size
+    if start + insns_size * 2 > len(data):
+        raise VerifyError("insns truncado")
+    units = array('H')
+    units.frombytes(bytes(data[start:start + insns_size * 2]))
+    if sys.byteorder != 'little':
+        units.byteswap()
+    return decode_instructions(units, registers, ins)
+
+def decode_instructions(units, registers, ins):
+    if ins > registers:
+        raise VerifyError("ins_size maior que registers_size")
+    opcodes, operands_a, operands_b, operands_c = array('B'), array('q'), array('q'), array('q')
+    positions = {} # unidade de código -> índice da instrução
+    branches = [] # (índice da instrução, formato, unidade de código alvo)
+    pc = 0
+    while pc < len(units):
+        w0 = units[pc]
+        opcode = w0 & 0xFF
+        if opcode not in OPCODES or (opcode == 0x00 and w0 >> 8):
+            raise VerifyError(f"opcode não suportado {hex(opcode)} em {pc}")
+        name, fmt = OPCODES[opcode]
+        size = FORMAT_SIZES[fmt]
+        if pc + size > len(units):
+            raise VerifyError(f"{name} truncado em {pc}")
+        w = units[pc:pc + size]
+        a = b = c = 0
+        registers_used = ()
+        if fmt == '12x':
+            a, b = (w0 >> 8) & 0xF, w0 >> 12
+            registers_used = (a, b)
+        elif fmt == '11n':
+            a, b = (w0 >> 8) & 0xF, ((w0 >> 12) - 16 if w0 >> 15 else w0 >> 12)
+            registers_used = (a,)
+        elif fmt == '11x':
+            a = w0 >> 8
+            registers_used = (a,)
+        elif fmt == '10t':
+            a = _s8(w0 >> 8)
+        elif fmt == '20t':
+            a = _s16(w[1])
+        elif fmt == '30t':
+            a = _s32(w[1] | (w[2] << 16))
+        elif fmt == '22x':
+            a, b = w0 >> 8, w[1]
+            registers_used = (a, b)
+        elif fmt == '21t':
+            a, b = w0 >> 8, _s16(w[1])
+            registers_used = (a,)
+        elif fmt == '21s':
+            a, b = w0 >> 8, _s16(w[1])
+            registers_used = (a,)
+        elif fmt == '21h':
+            a, b = w0 >> 8, _s16(w[1]) << (48 if opcode == 0x19 else 16)
+            registers_used = (a,)
+        elif fmt == '21c':
+            a, b = w0 >> 8, w[1]
+            registers_used = (a,)
+        elif fmt == '23x':
+            a, b, c = w0 >> 8, w[1] & 0xFF, w[1] >> 8
+            registers_used = (a, b, c)
+        elif fmt == '22b':
+            a, b, c = w0 >> 8, w[1] & 0xFF, _s8(w[1] >> 8)
+            registers_used = (a, b)
+        elif fmt in ('22t', '22s'):
+            a, b, c = (w0 >> 8) & 0xF, w0 >> 12, _s16(w[1])
+            registers_used = (a, b)
+        elif fmt == '31i':
+            a, b = w0 >> 8, _s32(w[1] | (w[2] << 16))
+            registers_used = (a,)
+        elif fmt == '51l':
+            a = w0 >> 8
+            b = w[1] | (w[2] << 16) | (w[3] << 32) | (w[4] << 48)
+            b = b - (1 << 64) if b >> 63 else b
+            registers_used = (a,)
+        elif fmt == '35c':
+            # a = method_idx, b = registradores em nibbles (C, D, E, F, G), c = quantidade
+            count, g = w0 >> 12, (w0 >> 8) & 0xF
+            if count > 5:
+                raise VerifyError(f"{name} com {count} argumentos em {pc}")
+            nibbles = [w[2] & 0xF, (w[2] >> 4) & 0xF, (w[2] >> 8) & 0xF, w[2] >> 12, g][:count]
+            a, c = w[1], count
+            b = sum(register << (4 * i) for i, register in enumerate(nibbles))
+            registers_used = tuple(nibbles)
+        elif fmt == '3rc':
+            # a = method_idx, b = primeiro registrador, c = quantidade
+            a, b, c = w[1], w[2], w0 >> 8
+            registers_used = (b + c - 1,) if c else ()
+
+        for register in registers_used:
+            if register >= registers:
+                raise VerifyError(f"{name} usa v{register} com registers_size={registers} em {pc}")
+        if fmt in BRANCH_FORMATS:
+            branch = a if fmt in ('10t', '20t', '30t') else (b if fmt == '21t' else c)
+            branches.append((len(opcodes), fmt, pc + branch))
+
+        positions[pc] = len(opcodes)
+        opcodes.append(opcode)
+        operands_a.append(a)
+        operands_b.append(b)
+        operands_c.append(c)
+        pc += size
+
+    if not opcodes:
+        raise VerifyError("método sem instruções")
+    last = opcodes[-1]
+    if last not in RETURN_OPCODES and last not in GOTO_OPCODES:
+        raise VerifyError("a execução pode cair para fora do método")
+
+    # Alvos de salto: unidades de código -> índices de instrução
+    for index, fmt, target in branches:
+        if target not in positions:
+            raise VerifyError(f"salto para {target}, que não é início de instrução")
+        if fmt in ('10t', '20t', '30t'):
+            operands_a[index] = positions[target]
+        elif fmt == '21t':
+            operands_b[index] = positions[target]
+        else:
+            operands_c[index] = positions[target]
+    return DecodedCode(registers, ins, opcodes, operands_a, operands_b, operands_c)
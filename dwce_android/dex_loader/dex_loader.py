@@ -1,98 +1,372 @@
 import struct
 import os
+import sys
+
+# Adiciona o DWCE Core ao PATH para importação do Header Cache
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dwce_core'))
+
+from header_cache.header_cache import get_header_cache
+from binary_records.binary_records import record_type, RecordLayout
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do loader. Executado
+# como script, o diretório deste arquivo (sys.path[0]) esconderia o pacote dex_loader
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_tables import parse_id_tables, NO_INDEX
+from dex_loader.dex_strings import StringPool, DEFAULT_STRING_CACHE, decode_mutf8, utf16_key
+from dex_loader.dex_class_index import ClassIndex
+from dex_loader.dex_code import parse_class_data, decode_code_item, VerifyError
+from dex_loader.dex_artifacts import get_artifact_cache
+from dex_loader.dex_checksum import verify_dex, compute_checksums
 
 # --- Constantes DEX (Simplificadas) ---
 DEX_MAGIC = b'dex\n035\x00' # Versão 035 (Android 4.0.x)
+DEX_VERSIONS = (b'035', b'037', b'038', b'039') # 037: Android 7, 038: Android 8, 039: Android 9+
+DEX_HEADER_SIZE = 0x70
+ENDIAN_CONSTANT = 0x12345678
+
+# Campos do cabeçalho DEX após o magic: do checksum (0x08) até data_off
+DEX_HEADER_FIELDS = (
+    'checksum', 'signature', 'file_size', 'header_size', 'endian_tag',
+    'link_size', 'link_off', 'map_off',
+    'string_ids_size', 'string_ids_off', 'type_ids_size', 'type_ids_off',
+    'proto_ids_size', 'proto_ids_off', 'field_ids_size', 'field_ids_off',
+    'method_ids_size', 'method_ids_off', 'class_defs_size', 'class_defs_off',
+    'data_size', 'data_off'
+)
+
+class DexHeader(record_type('DexHeader', ('raw_magic',) + DEX_HEADER_FIELDS)):
+    __slots__ = ()
+
+    @property
+    def magic(self):
+        return self.raw_magic[:3].decode('ascii')
+
+    @property
+    def version(self):
+        return self.raw_magic[4:7].decode('ascii')
+
+DEX_HEADER = RecordLayout('<8sL20s20L', DexHeader) # Cabeçalho completo (0x70 bytes) em um único unpack
 
 class DEXLoader:
-    def __init__(self, dex_data):
+    def __init__(self, dex_data, source_path=None, use_cache=True, header_cache=None, string_cache_size=DEFAULT_STRING_CACHE,
+                 artifact_cache=None, verify=True, log=print):
         self.dex_data = dex_data
-        self.header = {}
-        self.string_ids = []
-        self.type_ids = []
-        self.proto_ids = []
-        self.field_ids = []
-        self.method_ids = []
-        self.class_defs = []
-
-    def load(self):
+        self.log = log # Mensagens de progresso (o MultiDexLoader as acumula por DEX e imprime em ordem)
+        # Origem do DEX para o Header Cache: um arquivo ou 'app.apk!classes.dex'
+        self.source_path = source_path
+        self.use_cache = use_cache
+        self.header_cache = header_cache # None -> cache padrão do motor
+        self.artifact_cache = artifact_cache # Código compilado (None -> cache padrão, se a origem é conhecida)
+        self.verify = verify # Confere checksum Adler-32 e signature SHA-1 do cabeçalho
+        self.verified = False
+        self.header = None # DexHeader
+        # Tabelas de IDs (IdTable colunar, preenchidas em load())
+        self.string_ids = None
+        self.type_ids = None
+        self.proto_ids = None
+        self.field_ids = None
+        self.method_ids = None
+        self.class_defs = None
+        self.string_cache_size = string_cache_size
+        self.strings = None # StringPool (decodificação sob demanda)
+        self.class_index = None # ClassIndex descritor -> class_def
+        self.code = {} # {method_idx: DecodedCode} pré-decodificado para o interpretador
+        self.rejected = {} # {method_idx: motivo} métodos que o interpretador não executa
+        self._class_methods = {} # {class_def_idx: [(method_idx, access_flags, code_off)]}
+        self._artifact = None # CompiledArtifact mapeado quando o código veio do cache
+        self.from_artifacts = False
+
+    def load(self, compile_code=True):
         """
         Analisa o arquivo DEX e prepara as classes para o ART Runtime.
+        compile_code=False deixa a pré-decodificação do bytecode para uma chamada
+        posterior de _compile_bytecode().
         """
         if not self.dex_data:
-            print("Erro: Dados DEX vazios.")
+            self.log("Erro: Dados DEX vazios.")
             return False
 
-        if not self._parse_header():
+        cached = self._load_cached_headers()
+        if not cached and not self._parse_header():
             return False
+
+        # Integridade: o resultado vai junto do cabeçalho no Header Cache, então um
+        # arquivo inalterado (caminho, tamanho, mtime, inode) não é verificado de novo
+        if self.verify and not self.verified:
+            if not self._verify_integrity():
+                return False
+            cached = False
+        if not cached:
+            self._store_cached_headers()
+
+        # 1. Tabelas de IDs (strings, tipos, protótipos, campos, métodos e classes)
+        if not self._parse_id_tables():
+            return False
+
+        # 2. Índice de classes por descritor (ligação de classes sem varrer class_defs)
+        self.class_index = ClassIndex()
+        self.class_index.add_dex(0, self.class_descriptors())
             
-        # Em um SO real, o processo seria:
-        # 1. Carregar as tabelas de IDs (strings, tipos, métodos, etc.)
-        # 2. Carregar as definições de classe (class_defs)
+        # Em um SO real, o processo seguiria com:
         # 3. Fazer a verificação e otimização do bytecode (Verificação Dalvik/ART)
         # 4. Compilar o bytecode para código de máquina nativo (AOT/JIT)
         
-        print(f"DEX Loader: Arquivo DEX carregado. Versão: {self.header.get('version')}")
-        print(f"  Total de Strings: {self.header.get('string_ids_size')}")
-        print(f"  Total de Classes: {self.header.get('class_defs_size')}")
+        self.log(f"DEX Loader: Arquivo DEX carregado. Versão: {self.header.version}")
+        self.log(f"  Total de Strings: {self.header.string_ids_size}")
+        self.log(f"  Total de Classes: {self.header.class_defs_size}")
+        self.log(f"  Total de Métodos: {self.header.method_ids_size}")
         
         # Simulação de compilação AOT (Ahead-Of-Time)
-        self._compile_bytecode()
+        if compile_code:
+            self._compile_bytecode()
         
         return True
 
     def _parse_header(self):
         """Analisa o cabeçalho DEX."""
         # 1. Assinatura (8 bytes)
-        magic = self.dex_data[:8]
-        if magic != DEX_MAGIC:
-            print(f"Erro: Assinatura DEX inválida. Encontrado: {magic[:3].decode('ascii')}")
+        magic = bytes(self.dex_data[:8])
+        if magic[:4] != b'dex\n' or magic[7:8] != b'\x00' or magic[4:7] not in DEX_VERSIONS:
+            self.log(f"Erro: Assinatura DEX inválida. Encontrado: {magic!r}")
             return False
             
-        self.header['magic'] = magic[:3].decode('ascii')
-        self.header['version'] = magic[4:7].decode('ascii')
-        
-        # 2. Checksum (4 bytes), Signature (20 bytes), File Size (4 bytes)
-        # 3. Header Size (4 bytes) - deve ser 0x70 (112)
-        # 4. Endian Tag (4 bytes)
-        
-        # 5. Offsets e Tamanhos (os campos mais importantes para o loader)
-        # string_ids_size (4 bytes) @ offset 0x38
-        # string_ids_off (4 bytes) @ offset 0x3C
-        # type_ids_size (4 bytes) @ offset 0x40
-        # type_ids_off (4 bytes) @ offset 0x44
-        # class_defs_size (4 bytes) @ offset 0x60
-        # class_defs_off (4 bytes) @ offset 0x64
-        
-        # Estrutura de unpack para os campos de tamanho/offset
-        # <LLLLLLLLLLLL> (12 unsigned long - 4 bytes cada)
-        # Começa no offset 0x20 (link_size)
-        
-        # Simulação de extração dos campos
-        self.header['string_ids_size'] = struct.unpack('<L', self.dex_data[0x38:0x3C])[0]
-        self.header['class_defs_size'] = struct.unpack('<L', self.dex_data[0x60:0x64])[0]
+        # Checksum, Signature, File Size, Header Size (0x70), Endian Tag e os pares
+        # tamanho/offset das tabelas (strings, tipos, protos, campos, métodos, classes, dados)
+        if len(self.dex_data) < DEX_HEADER_SIZE:
+            self.log("Erro: Cabeçalho DEX truncado.")
+            return False
+        header = DEX_HEADER.unpack_from(self.dex_data)
+        if header.endian_tag != ENDIAN_CONSTANT:
+            self.log(f"Erro: DEX com endian_tag não suportado: {hex(header.endian_tag)}")
+            return False
+        self.header = header
         
         return True
 
+    def _verify_integrity(self):
+        """Confere checksum e signature em uma passada por blocos sobre o DEX."""
+        reason = verify_dex(self.dex_data, self.header)
+        if reason is not None:
+            self.log(f"Erro: DEX corrompido: {reason}")
+            return False
+        self.verified = True
+        return True
+
+    def _parse_id_tables(self):
+        """Lê todas as tabelas de IDs em uma passada (views sem cópia com NumPy)."""
+        try:
+            tables = parse_id_tables(self.dex_data, self.header)
+        except ValueError as e:
+            self.log(f"Erro: {e}")
+            return False
+        for name, table in tables.items():
+            setattr(self, name, table)
+        self.strings = StringPool(self.dex_data, self.string_ids, self.string_cache_size)
+        return True
+
+    # --- Consultas sobre as tabelas de IDs ---
+
+    def string(self, string_idx):
+        """String string_idx, decodificada no primeiro acesso (ver StringPool)."""
+        return self.strings[string_idx]
+
+    def string_index(self, text):
+        """Busca binária em string_ids (ordenadas por unidades UTF-16, como no DEX), ou None."""
+        key = utf16_key(text)
+        low, high = 0, len(self.string_ids)
+        while low < high:
+            middle = (low + high) // 2
+            if utf16_key(self.string(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self.string_ids) and self.string(low) == text else None
+
+    def type_descriptor(self, type_idx):
+        return self.string(int(self.type_ids.column('descriptor_idx')[type_idx]))
+
+    def type_index(self, descriptor):
+        """type_idx de um descritor ('Lcom/example/Foo;'), ou None (type_ids segue a ordem de string_ids)."""
+        string_idx = self.string_index(descriptor)
+        if string_idx is None:
+            return None
+        return self.type_ids.search_sorted('descriptor_idx', string_idx)
+
+    def methods_of(self, descriptor):
+        """Índices de method_ids declarados ou referenciados na classe descriptor."""
+        type_idx = self.type_index(descriptor)
+        return self.method_ids.select('class_idx', type_idx) if type_idx is not None else []
+
+    def fields_of(self, descriptor):
+        """Índices de field_ids pertencentes à classe descriptor."""
+        type_idx = self.type_index(descriptor)
+        return self.field_ids.select('class_idx', type_idx) if type_idx is not None else []
+
+    def references_to(self, descriptor):
+        """
+        Referências cruzadas a um tipo: campos desse tipo e métodos que o retornam.
+        Retorna {'fields': índices de field_ids, 'methods': índices de method_ids}.
+        """
+        type_idx = self.type_index(descriptor)
+        if type_idx is None:
+            return {'fields': [], 'methods': []}
+        protos = self.proto_ids.select('return_type_idx', type_idx)
+        return {
+            'fields': self.field_ids.select('type_idx', type_idx),
+            'methods': self.method_ids.select('proto_idx', {int(index) for index in protos}),
+        }
+
+    def method_name(self, method_idx):
+        """'Lcom/example/Foo;->nome' de um method_id."""
+        class_idx, _, name_idx = self.method_ids[method_idx]
+        return f"{self.type_descriptor(class_idx)}->{self.string(name_idx)}"
+
+    def class_descriptors(self):
+        """Descritores de todos os class_defs, na ordem da tabela (decodificados fora do LRU)."""
+        descriptor_idx = self.type_ids.column('descriptor_idx')
+        return [decode_mutf8(self.strings.raw(int(descriptor_idx[class_idx])))
+                for class_idx in self.class_defs.column('class_idx')]
+
+    def find_class(self, descriptor):
+        """Índice em class_defs da classe descriptor (consulta O(1) no ClassIndex), ou None."""
+        entry = self.class_index.lookup(descriptor)
+        return entry[1] if entry is not None else None
+
+    def classes_in_package(self, package, recursive=False):
+        """Descritores definidos em um pacote ('com.example'), opcionalmente com subpacotes."""
+        return self.class_index.in_package(package, recursive)
+
+    def class_methods(self, class_def_idx):
+        """Métodos diretos e virtuais de um class_def: [(method_idx, access_flags, code_off)]."""
+        methods = self._class_methods.get(class_def_idx)
+        if methods is None:
+            class_data_off = int(self.class_defs.column('class_data_off')[class_def_idx])
+            if class_data_off == 0:
+                methods = []
+            else:
+                _, _, direct, virtual = parse_class_data(self.dex_data, class_data_off)
+                methods = direct + virtual
+            self._class_methods[class_def_idx] = methods
+        return methods
+
+    def proto_signature(self, proto_idx):
+        """Assinatura no formato '(IJ)V' de um proto_id."""
+        _, return_type_idx, parameters_off = self.proto_ids[proto_idx]
+        parameters = []
+        if parameters_off:
+            size = struct.unpack_from('<L', self.dex_data, parameters_off)[0]
+            parameters = struct.unpack_from(f'<{size}H', self.dex_data, parameters_off + 4)
+        return '(' + ''.join(self.type_descriptor(t) for t in parameters) + ')' + self.type_descriptor(return_type_idx)
+
+    def method_signature(self, method_idx):
+        """(descritor da classe, nome, assinatura) de um method_id."""
+        class_idx, proto_idx, name_idx = self.method_ids[method_idx]
+        return self.type_descriptor(class_idx), self.string(name_idx), self.proto_signature(proto_idx)
+
+    def find_method(self, descriptor, name, signature=None):
+        """method_idx de um método declarado (com código ou não) neste DEX, ou None."""
+        for method_idx in self.methods_of(descriptor):
+            _, method_name, method_signature = self.method_signature(int(method_idx))
+            if method_name == name and (signature is None or method_signature == signature):
+                return int(method_idx)
+        return None
+
+    def superclass_of(self, class_def_idx):
+        """Descritor da superclasse de um class_def, ou None (java.lang.Object)."""
+        superclass_idx = int(self.class_defs.column('superclass_idx')[class_def_idx])
+        return None if superclass_idx == NO_INDEX else self.type_descriptor(superclass_idx)
+
+    def _get_cache(self):
+        if not self.use_cache or self.source_path is None:
+            return None
+        return self.header_cache if self.header_cache is not None else get_header_cache()
+
+    def _load_cached_headers(self):
+        """Restaura o cabeçalho DEX do Header Cache (apenas quando a origem é conhecida)."""
+        cache = self._get_cache()
+        cached = cache.load('dex', self.source_path) if cache is not None else None
+        if cached is None:
+            return False
+
+        try:
+            self.header = DexHeader._make(cached['header'][0])
+            if 'verified' in cached:
+                self.verified = tuple(cached['verified'][0]) == (self.header.checksum, self.header.signature)
+        except (KeyError, IndexError, TypeError):
+            return False
+        finally:
+            cached.close()
+        return True
+
+    def _store_cached_headers(self):
+        """Grava o cabeçalho analisado no Header Cache."""
+        cache = self._get_cache()
+        if cache is None:
+            return
+        tables = {'header': (DEX_HEADER.struct.format, [self.header])}
+        if self.verified:
+            tables['verified'] = ('<L20s', [(self.header.checksum, self.header.signature)])
+        cache.store('dex', self.source_path, tables)
+
+    def _get_artifact_cache(self):
+        if not self.use_cache:
+            return None
+        if self.artifact_cache is not None:
+            return self.artifact_cache
+        return get_artifact_cache() if self.source_path is not None else None
+
+    def _load_artifacts(self):
+        """Restaura o código compilado de uma carga anterior deste DEX (mesmo checksum e runtime)."""
+        cache = self._get_artifact_cache()
+        artifact = cache.load(self.header) if cache is not None else None
+        if artifact is None:
+            return False
+        self._artifact = artifact
+        self.code = artifact.code
+        self.rejected = artifact.rejected
+        self.from_artifacts = True
+        return True
+
     def _compile_bytecode(self):
         """
-        Simula a compilação do bytecode DEX para código de máquina nativo (AOT).
-        Este é o coração do nosso ART Runtime.
+        Pré-decodifica e verifica o bytecode de todos os métodos para o interpretador do ART
+        (tier base de execução). Métodos com opcodes fora do subconjunto suportado ficam
+        em self.rejected. O resultado é gravado no cache de artefatos, e uma carga seguinte
+        do mesmo DEX pula verificação e decodificação.
         """
-        print("DEX Loader: Iniciando compilação AOT (Ahead-Of-Time) para código de máquina Winlinos.")
+        if self._load_artifacts():
+            self.log(f"DEX Loader: Artefatos compilados reutilizados do cache ({len(self.code)} métodos, verificação ignorada).")
+            return
+
+        self.log("DEX Loader: Iniciando pré-decodificação do bytecode Dalvik.")
         
-        # Em um SO real, isso envolveria:
+        # Em um SO real, o passo seguinte (AOT/JIT) envolveria:
         # - Tradução do bytecode Dalvik/ART para um formato intermediário (ex: LLVM IR)
         # - Otimização do código intermediário
         # - Geração do código de máquina nativo (x86_64, i386, ARM)
         
-        # Simulação:
-        if self.header.get('class_defs_size', 0) > 0:
-            print(f"  {self.header['class_defs_size']} classes compiladas para código nativo.")
-        else:
-            print("  Nenhuma classe para compilar.")
+        if self.header.class_defs_size == 0:
+            self.log("  Nenhuma classe para compilar.")
+        for class_def_idx in range(len(self.class_defs)):
+            for method_idx, _, code_off in self.class_methods(class_def_idx):
+                if code_off == 0: # abstract/native
+                    continue
+                try:
+                    self.code[method_idx] = decode_code_item(self.dex_data, code_off)
+                except VerifyError as e:
+                    self.rejected[method_idx] = str(e)
+        if self.header.class_defs_size > 0:
+            self.log(f"  {self.header.class_defs_size} classes: {len(self.code)} métodos pré-decodificados, "
+                  f"{len(self.rejected)} fora do subconjunto do interpretador.")
+
+        cache = self._get_artifact_cache()
+        if cache is not None:
+            cache.store(self.header, self.code, self.rejected)
             
-        print("DEX Loader: Compilação AOT concluída.")
+        self.log("DEX Loader: Compilação AOT concluída.")
         
     def get_entry_point(self):
         """Retorna o ponto de entrada (método main) após o carregamento."""
@@ -101,9 +375,14 @@ class DEXLoader:
 
 # Exemplo de uso (para teste interno)
 if __name__ == "__main__":
-    # Simulação de dados DEX (apenas o cabeçalho mágico)
-    simulated_dex_data = DEX_MAGIC + b'\x00' * 104 # 112 bytes de cabeçalho
+    # Simulação de dados DEX: só o cabeçalho (112 bytes), com tabelas vazias
+    simulated_dex_data = bytearray(0x70)
+    simulated_dex_data[:8] = DEX_MAGIC
+    struct.pack_into('<LLL', simulated_dex_data, 32, len(simulated_dex_data), 0x70, ENDIAN_CONSTANT)
+    # A signature (SHA-1 de [32:]) entra antes do checksum, que a cobre
+    simulated_dex_data[12:32] = compute_checksums(simulated_dex_data)[1]
+    struct.pack_into('<L', simulated_dex_data, 8, compute_checksums(simulated_dex_data)[0])
     
-    loader = DEXLoader(simulated_dex_data)
+    loader = DEXLoader(bytes(simulated_dex_data))
     if loader.load():
         print(f"Ponto de Entrada: {loader.get_entry_point()}")
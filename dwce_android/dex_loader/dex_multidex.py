@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona a camada Android (dwce_android) ao PATH para os módulos irmãos do loader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dex_loader.dex_loader import DEXLoader
+from dex_loader.dex_class_index import ClassIndex
+from apk_parser.apk_index import APKIndex
+
+# --- Carregador Multidex ---
+# APKs modernos trazem classes.dex, classes2.dex ... classesN.dex. Só a parte de cada DEX
+# que libera o GIL roda em paralelo: descompressão zlib, checksum/signature (zlib e
+# hashlib em blocos grandes) e as tabelas de IDs. A pré-decodificação do bytecode é
+# Python puro, então roda em sequência na thread chamadora (threads só disputariam o
+# GIL); o cache de artefatos a elimina nas cargas seguintes. As mensagens de cada DEX são
+# acumuladas no worker e impressas em ordem. Os índices de classes são mesclados em um
+# único ClassIndex na ordem do ART: a primeira definição de um descritor vence e as
+# cópias nos DEX seguintes ficam sombreadas.
+
+def dex_entry_name(number):
+    """Nome do n-ésimo DEX (1 -> classes.dex, 2 -> classes2.dex, ...)."""
+    return "classes.dex" if number == 1 else f"classes{number}.dex"
+
+def discover_dex_entries(names):
+    """
+    DEX de um APK na ordem de carga. Como no ART, a numeração precisa ser contínua:
+    a busca para no primeiro classesN.dex ausente.
+    """
+    available = set(names)
+    entries = []
+    while dex_entry_name(len(entries) + 1) in available:
+        entries.append(dex_entry_name(len(entries) + 1))
+    return entries
+
+class MultiDexLoader:
+    def __init__(self, apk_path=None, dex_buffers=None, workers=None, use_cache=True, header_cache=None,
+                 artifact_cache=None, verify=True):
+        """
+        apk_path: APK de onde os DEX são descobertos e lidos
+        dex_buffers: alternativa sem APK, lista de (nome, bytes) já na ordem de carga
+        """
+        self.apk_path = apk_path
+        self.dex_buffers = dex_buffers
+        self.workers = workers
+        self.use_cache = use_cache
+        self.header_cache = header_cache
+        self.artifact_cache = artifact_cache
+        self.verify = verify # checksum/signature de cada DEX, verificados em paralelo nos workers
+        self.dex_names = []
+        self.loaders = [] # DEXLoader por arquivo, na ordem de carga
+        self.class_index = ClassIndex()
+
+    @property
+    def classes(self):
+        """{descritor: (número do DEX, índice em class_defs)} das definições visíveis."""
+        return self.class_index.entries
+
+    @property
+    def shadowed(self):
+        return self.class_index.shadowed
+
+    def _load_one(self, source):
+        """Etapa paralela: cabeçalho, integridade e tabelas (sem o bytecode). Retorna (loader, mensagens)."""
+        name, data, source_path = source
+        messages = []
+        loader = DEXLoader(data, source_path=source_path, use_cache=self.use_cache, header_cache=self.header_cache,
+                           artifact_cache=self.artifact_cache, verify=self.verify, log=messages.append)
+        if not loader.load(compile_code=False):
+            raise ValueError(f"{name} inválido ({'; '.join(messages) or 'sem detalhes'})")
+        return loader, messages
+
+    def _read_entry(self, index, name):
+        # DEX STORED (alinhados) viram views sobre o mmap do APK; comprimidos são descomprimidos em fluxo
+        return name, index.read(name), f"{self.apk_path}!{name}"
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            if self.dex_buffers is not None:
+                sources = [(name, data, None) for name, data in self.dex_buffers]
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    results = list(executor.map(self._load_one, sources))
+            else:
+                # close() não invalida as views em uso pelos DEXLoader: o mmap vive até o GC
+                with APKIndex(self.apk_path) as index:
+                    names = discover_dex_entries(index.names())
+                    # Leitura e análise de cada DEX no mesmo worker (o mapeamento aceita leituras concorrentes)
+                    with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                        results = list(executor.map(lambda name: self._load_one(self._read_entry(index, name)), names))
+        except (OSError, zipfile.BadZipFile, ValueError) as e:
+            print(f"Multidex: Erro ao carregar os DEX: {e}")
+            return False
+
+        if not results:
+            print("Multidex: Nenhum arquivo DEX encontrado.")
+            return False
+
+        # Pré-decodificação e mescla sequenciais, na ordem de carga: a primeira definição vence
+        self.dex_names = [name for name, *_ in self.dex_buffers] if self.dex_buffers is not None else names
+        self.loaders = []
+        self.class_index = ClassIndex()
+        for dex_number, (loader, messages) in enumerate(results):
+            for message in messages:
+                print(message)
+            loader.log = print
+            loader._compile_bytecode()
+            self.loaders.append(loader)
+            for descriptor, (_, class_def_idx) in loader.class_index.entries.items():
+                self.class_index.add(descriptor, dex_number, class_def_idx)
+
+        print(f"Multidex: {len(self.loaders)} arquivos DEX, {len(self.classes)} classes "
+              f"({len(self.shadowed)} sombreadas) em {(time.perf_counter() - start) * 1000:.1f} ms.")
+        return True
+
+    def find_class(self, descriptor):
+        """(DEXLoader, índice em class_defs) da definição visível, ou None."""
+        entry = self.class_index.lookup(descriptor)
+        if entry is None:
+            return None
+        return self.loaders[entry[0]], entry[1]
+
+    def classes_in_package(self, package, recursive=False):
+        """Descritores visíveis de um pacote ('com.example'), opcionalmente com subpacotes."""
+        return self.class_index.in_package(package, recursive)
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+# --- Pool de Strings DEX (MUTF-8 sob demanda) ---
+# Cada string_data_item é um ULEB128 com o tamanho em unidades UTF-16 seguido dos bytes
+# MUTF-8 terminados em NUL. Decodificar o pool inteiro na carga desperdiça tempo e
+# memória com strings que o app nunca usa: aqui cada entrada é decodificada no primeiro
+# acesso e mantida em um LRU de tamanho limitado. Ferramentas que precisam de tudo usam
+# o caminho em lote (decode_all), que não passa pelo LRU.
+
+DEFAULT_STRING_CACHE = 8192 # Entradas mantidas decodificadas por DEX
+
+def read_uleb128(data, offset):
+    """(valor, próximo offset) de um ULEB128 (tamanhos de string e class_data)."""
+    result = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+def decode_mutf8(raw):
+    """
+    Decodifica MUTF-8: NUL codificado como C0 80 e caracteres suplementares como
+    pares de surrogates de 3 bytes cada.
+    """
+    if raw.isascii():
+        return raw.decode('ascii')
+    text = raw.replace(b'\xc0\x80', b'\x00').decode('utf-8', errors='surrogatepass')
+    if any('\ud800' <= c <= '\udfff' for c in text):
+        text = text.encode('utf-16-le', errors='surrogatepass').decode('utf-16-le', errors='replace')
+    return text
+
+def utf16_key(text):
+    """Chave de ordenação de string_ids: unidades UTF-16, não code points (ver a especificação DEX)."""
+    return text.encode('utf-16-be', errors='surrogatepass')
+
+class StringPool:
+    """Strings de um DEX indexadas por string_idx, decodificadas sob demanda."""
+
+    def __init__(self, data, string_ids, capacity=DEFAULT_STRING_CACHE):
+        self.data = data
+        self.offsets = string_ids.column('string_data_off')
+        self.capacity = capacity
+        self._cache = OrderedDict() # {string_idx: str}, da menos para a mais recentemente usada
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        cached = self._cache.get(index)
+        if cached is not None:
+            self.hits += 1
+            self._cache.move_to_end(index)
+            return cached
+        self.misses += 1
+        if not 0 <= index < len(self.offsets):
+            raise IndexError(index)
+        text = decode_mutf8(self.raw(index))
+        self._cache[index] = text
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return text
+
+    def raw(self, index):
+        """Bytes MUTF-8 da entrada, sem decodificar nem passar pelo LRU."""
+        data = self.data
+        length, start = read_uleb128(data, int(self.offsets[index]))
+        # ASCII: o tamanho em UTF-16 é o tamanho em bytes, sem precisar procurar o NUL
+        end = start + length
+        raw = bytes(data[start:end])
+        if end < len(data) and data[end] == 0 and raw.isascii():
+            return raw
+        # Caso geral: até 3 bytes por unidade UTF-16; busca o NUL só nessa janela (vale para bytes e memoryview)
+        window = bytes(data[start:start + 3 * length + 1])
+        return window[:window.find(b'\x00')]
+
+    def decode_all(self, start=0, stop=None):
+        """Decodifica um intervalo (por padrão o pool inteiro) sem tocar no LRU."""
+        stop = len(self.offsets) if stop is None else min(stop, len(self.offsets))
+        return [decode_mutf8(self.raw(index)) for index in range(start, stop)]
+
+    def resize(self, capacity):
+        self.capacity = capacity
+        while len(self._cache) > capacity:
+            self._cache.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'strings': len(self.offsets), 'resident': len(self._cache), 'capacity': self.capacity,
+                'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0}
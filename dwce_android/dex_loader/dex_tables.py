@@ -0,0 +1,106 @@
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem NumPy cada coluna vira um array.array compacto (consultas em Python puro)
+    np = None
+
+# --- Tabelas de IDs DEX (colunares) ---
+# string_ids, type_ids, proto_ids, field_ids, method_ids e class_defs são lidas em uma
+# única passada direto do buffer do DEX. Com NumPy cada tabela é um array estruturado
+# (view sem cópia sobre o buffer), e consultas cruzadas como "todos os métodos da
+# classe X" viram comparações vetorizadas em vez de laços sobre objetos por entrada.
+
+NO_INDEX = 0xFFFFFFFF # NO_INDEX da especificação (superclasse/arquivo-fonte ausentes)
+
+# (tabela, [(campo, código struct)]) na ordem do cabeçalho DEX
+ID_TABLE_LAYOUTS = {
+    'string_ids': (('string_data_off', 'I'),),
+    'type_ids': (('descriptor_idx', 'I'),),
+    'proto_ids': (('shorty_idx', 'I'), ('return_type_idx', 'I'), ('parameters_off', 'I')),
+    'field_ids': (('class_idx', 'H'), ('type_idx', 'H'), ('name_idx', 'I')),
+    'method_ids': (('class_idx', 'H'), ('proto_idx', 'H'), ('name_idx', 'I')),
+    'class_defs': (('class_idx', 'I'), ('access_flags', 'I'), ('superclass_idx', 'I'), ('interfaces_off', 'I'),
+                   ('source_file_idx', 'I'), ('annotations_off', 'I'), ('class_data_off', 'I'),
+                   ('static_values_off', 'I')),
+}
+
+class IdTable:
+    """
+    Tabela de IDs em formato colunar.
+    rows: array estruturado do NumPy (None no modo de fallback)
+    column(nome): coluna inteira (ndarray ou array.array) para consultas em lote
+    """
+
+    def __init__(self, name, data, offset, count):
+        self.name = name
+        self.count = count
+        layout = ID_TABLE_LAYOUTS[name]
+        self.fields = tuple(field for field, _ in layout)
+        self.struct = struct.Struct('<' + ''.join(code for _, code in layout))
+        end = offset + count * self.struct.size
+        if count and (offset <= 0 or end > len(data)):
+            raise ValueError(f"{name} fora dos limites do arquivo DEX")
+
+        if np is not None:
+            dtype = np.dtype([(field, '<u2' if code == 'H' else '<u4') for field, code in layout])
+            self.rows = np.frombuffer(data, dtype=dtype, count=count, offset=offset) if count else np.zeros(0, dtype)
+            self._columns = {field: self.rows[field] for field in self.fields}
+        else:
+            self.rows = None
+            columns = [array(code) for _, code in layout]
+            view = memoryview(data)[offset:end]
+            try:
+                for values in self.struct.iter_unpack(view):
+                    for column, value in zip(columns, values):
+                        column.append(value)
+            finally:
+                view.release()
+            self._columns = dict(zip(self.fields, columns))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """Uma entrada como tupla (campos na ordem do binário)."""
+        if not -self.count <= index < self.count:
+            raise IndexError(index)
+        return tuple(int(self._columns[field][index]) for field in self.fields)
+
+    def column(self, field):
+        return self._columns[field]
+
+    def select(self, field, values):
+        """Índices das entradas cujo campo está em values (um valor ou um conjunto)."""
+        column = self._columns[field]
+        if np is not None:
+            if isinstance(values, (set, frozenset, list, tuple)):
+                return np.flatnonzero(np.isin(column, np.fromiter(values, dtype=np.int64, count=len(values))))
+            return np.flatnonzero(column == values)
+        if isinstance(values, (set, frozenset, list, tuple)):
+            wanted = set(values)
+            return array('I', (index for index, value in enumerate(column) if value in wanted))
+        return array('I', (index for index, value in enumerate(column) if value == values))
+
+    def search_sorted(self, field, value):
+        """Índice de value em uma coluna ordenada (type_ids, por exemplo), ou None."""
+        column = self._columns[field]
+        if np is not None:
+            position = int(np.searchsorted(column, value))
+        else:
+            low, high = 0, len(column)
+            while low < high:
+                middle = (low + high) // 2
+                if column[middle] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            position = low
+        return position if position < len(column) and column[position] == value else None
+
+def parse_id_tables(data, header):
+    """Todas as tabelas de IDs descritas pelo DexHeader: {nome: IdTable}."""
+    return {name: IdTable(name, data, getattr(header, name + '_off'), getattr(header, name + '_size'))
+            for name in ID_TABLE_LAYOUTS}
@@ -0,0 +1,67 @@
+import struct
+from collections import namedtuple
+from operator import itemgetter
+
+# --- Registros Binários (camada compartilhada dos loaders) ---
+# Cabeçalhos de tamanho fixo (seções PE, program headers ELF, cabeçalho DEX) viram
+# registros imutáveis com __slots__ vazios (sem dicionário por instância), descritos
+# por um layout struct pré-compilado. Tabelas inteiras são desempacotadas em uma
+# única passada de iter_unpack, sem recompilar formatos a cada campo.
+
+def record_type(name, fields):
+    """Cria a classe de registro: acesso por atributo, memória de uma tupla."""
+    return namedtuple(name, fields)
+
+class RecordLayout:
+    """
+    Layout binário de um registro.
+    fields: ordem dos campos no binário, quando difere da ordem canônica do registro
+    (ex.: ELF32 e ELF64 guardam p_flags em posições diferentes).
+    """
+
+    def __init__(self, fmt, record, fields=None):
+        self.struct = struct.Struct(fmt)
+        self.size = self.struct.size
+        self.record = record
+        self.fields = tuple(fields) if fields is not None else record._fields
+        if self.fields != record._fields:
+            reorder = itemgetter(*(self.fields.index(field) for field in record._fields))
+            self._make = lambda values: record._make(reorder(values))
+            self._binary_order = itemgetter(*(record._fields.index(field) for field in self.fields))
+        else:
+            self._make = record._make
+            self._binary_order = None
+
+    def unpack_from(self, buffer, offset=0):
+        return self._make(self.struct.unpack_from(buffer, offset))
+
+    def unpack_table(self, buffer, offset, count, stride=None):
+        """
+        Desempacota count registros consecutivos. Com o passo igual ao tamanho do registro
+        a tabela inteira sai de um único iter_unpack; passos maiores (e_phentsize estendido)
+        são lidos registro a registro.
+        """
+        if count <= 0:
+            return []
+        stride = stride or self.size
+        end = offset + (count - 1) * stride + self.size
+        if offset < 0 or end > len(buffer):
+            raise ValueError("tabela de registros truncada")
+        if stride != self.size:
+            return [self.unpack_from(buffer, offset + index * stride) for index in range(count)]
+        view = memoryview(buffer)[offset:end]
+        try:
+            return list(map(self._make, self.struct.iter_unpack(view)))
+        finally:
+            view.release()
+
+    def iter_records(self, rows):
+        """Converte tuplas já desempacotadas na ordem do binário (ex.: do Header Cache)."""
+        return map(self._make, rows)
+
+    def astuple(self, record):
+        """Valores na ordem do binário, prontos para struct.pack ou para o Header Cache."""
+        return tuple(record) if self._binary_order is None else self._binary_order(record)
+
+    def pack(self, record):
+        return self.struct.pack(*self.astuple(record))
@@ -0,0 +1,191 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona as camadas Windows e Linux ao PATH para importação dos loaders
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(_REPO_ROOT, 'dwce_windows'))
+sys.path.append(os.path.join(_REPO_ROOT, 'dwce_linux'))
+
+from pe_loader.pe_loader import PELoader, IMAGE_FILE_MACHINE_AMD64
+from elf_loader.elf_loader import ELFLoader, ELF_MAGIC, EM_X86_64
+
+# --- Catalog Scanner (Inventário de executáveis PE/ELF) ---
+# Percorre os diretórios de programas Windows (via PATH_MAP) e as bibliotecas Linux,
+# distribuindo a análise apenas-de-cabeçalhos entre um pool de processos.
+# Os resultados saem como JSON lines e um manifesto incremental evita reanalisar
+# arquivos que não mudaram desde a última varredura.
+
+LINUX_LIBRARY_PATHS = ["/lib", "/lib64", "/usr/lib", "/usr/lib64", "/usr/local/lib"]
+DEFAULT_MANIFEST = os.path.join(os.path.expanduser("~"), ".cache", "dwce", "catalog_manifest.json")
+
+# Subsistemas PE (campo Subsystem do Optional Header)
+PE_SUBSYSTEMS = {
+    1: "native",
+    2: "windows_gui",
+    3: "windows_cui",
+    9: "windows_ce_gui",
+    10: "efi_application",
+}
+
+def default_roots():
+    """Diretórios varridos por padrão: Program Files (mapeado) e bibliotecas Linux."""
+    # Importado sob demanda: o módulo de filesystem inicializa o ambiente Windows ao ser carregado
+    from filesystem.filesystem import PATH_MAP, WINDOWS_DRIVE_LETTER
+    windows_roots = [PATH_MAP[f"{WINDOWS_DRIVE_LETTER}\\Program Files"],
+                     PATH_MAP[f"{WINDOWS_DRIVE_LETTER}\\Program Files (x86)"]]
+    return windows_roots + LINUX_LIBRARY_PATHS
+
+def discover_files(roots):
+    """Lista os arquivos candidatos (sem seguir links simbólicos, para não duplicar entradas)."""
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if not os.path.islink(path):
+                    yield path
+
+def _file_state(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'ino': st.st_ino}
+
+def scan_file(path):
+    """
+    Analisa apenas os cabeçalhos de um arquivo (executado nos processos do pool).
+    Retorna um registro do catálogo, ou None se o arquivo não for PE/ELF.
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+    except OSError:
+        return None
+
+    if magic[:2] == b'MZ':
+        loader = PELoader(path, use_cache=False)
+    elif magic == ELF_MAGIC:
+        loader = ELFLoader(path, use_cache=False)
+    else:
+        return None
+
+    # Os loaders reportam erros no console; aqui eles viram o campo 'error' do registro.
+    # A montagem do registro fica sob a mesma proteção: um cabeçalho malformado que passa
+    # pela análise não pode derrubar a varredura inteira no pool.
+    messages = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(messages):
+            try:
+                if loader.parse_headers():
+                    return _build_record(path, loader)
+            except Exception as e:
+                print(f"Erro: {e}")
+        return {'path': path, 'format': 'pe' if magic[:2] == b'MZ' else 'elf', 'error': messages.getvalue().strip()}
+    finally:
+        loader.close()
+
+def _build_record(path, loader):
+    """Registro do catálogo a partir de um loader com os cabeçalhos já analisados."""
+    if isinstance(loader, PELoader):
+        imports = {}
+        for entry in loader.imports:
+            imports.setdefault(entry['dll'], []).append(entry['name'] or f"#{entry['ordinal']}")
+        version_info = loader.resources.version_info()
+        return {
+            'path': path,
+            'format': 'pe',
+            'arch': 'x86_64' if loader.file_header.machine == IMAGE_FILE_MACHINE_AMD64 else 'i386',
+            'entry_point': loader.entry_point,
+            'subsystem': PE_SUBSYSTEMS.get(loader.subsystem, str(loader.subsystem)),
+            'version': version_info['file_version'] if version_info else None,
+            'imports': imports,
+        }
+
+    return {
+        'path': path,
+        'format': 'elf',
+        'arch': 'x86_64' if loader.machine == EM_X86_64 else 'i386',
+        'entry_point': loader.entry_point,
+        'subsystem': None,
+        'version': None,
+        'interpreter': loader.interpreter,
+        'imports': loader.needed,
+    }
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest_path, manifest):
+    """Grava o manifesto de forma atômica."""
+    directory = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path)
+
+def scan(roots=None, manifest_path=DEFAULT_MANIFEST, workers=None, include_unchanged=False, chunksize=16):
+    """
+    Gera os registros do catálogo à medida que os workers terminam.
+    Arquivos cujo (tamanho, mtime, inode) bate com o manifesto não são reanalisados;
+    com include_unchanged=True o registro anterior é emitido novamente.
+    """
+    roots = roots if roots is not None else default_roots()
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+    updated = {}
+
+    pending = []
+    for path in discover_files(roots):
+        try:
+            state = _file_state(path)
+        except OSError:
+            continue
+        previous = manifest.get(path)
+        if previous is not None and previous['state'] == state:
+            updated[path] = previous
+            if include_unchanged and previous['record'] is not None:
+                yield previous['record']
+            continue
+        pending.append((path, state))
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            records = executor.map(scan_file, [path for path, _ in pending], chunksize=chunksize)
+            for (path, state), record in zip(pending, records):
+                updated[path] = {'state': state, 'record': record}
+                if record is not None:
+                    yield record
+    finally:
+        # Arquivos removidos saem do manifesto; o que foi analisado até aqui é preservado
+        if manifest_path:
+            save_manifest(manifest_path, updated)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inventário paralelo de executáveis PE/ELF do Winlinos.")
+    parser.add_argument('roots', nargs='*', help="Diretórios a varrer (padrão: Program Files e bibliotecas Linux)")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help="Manifesto incremental")
+    parser.add_argument('--no-manifest', action='store_true', help="Reanalisa tudo, sem ler nem gravar o manifesto")
+    parser.add_argument('--workers', type=int, default=None, help="Número de processos do pool")
+    parser.add_argument('--all', action='store_true', help="Emite também os registros de arquivos inalterados")
+    parser.add_argument('--output', default='-', help="Arquivo JSON lines de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for record in scan(args.roots or None, None if args.no_manifest else args.manifest,
+                           args.workers, args.all):
+            output.write(json.dumps(record) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
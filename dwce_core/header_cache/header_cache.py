@@ -0,0 +1,241 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+
+# --- Header Cache (Cache persistente de cabeçalhos analisados) ---
+# Os loaders (PE, ELF e DEX) guardam aqui as tabelas de cabeçalho já analisadas
+# (seções, program headers, tabelas de IDs). Cada entrada é chaveada por
+# (caminho, tamanho, mtime, inode) e gravada em um formato binário de registros
+# de tamanho fixo, lido de volta via mmap: um acerto no cache não analisa o binário.
+# O diretório é limitado em tamanho e idade: cada acerto atualiza o mtime da entrada, e
+# após cada gravação as entradas não usadas há mais de max_age e, depois, as usadas há
+# mais tempo são removidas até caber em max_bytes.
+
+CACHE_DIR = os.environ.get("DWCE_HEADER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "dwce", "headers"))
+CACHE_MAGIC = b'DWHC'
+CACHE_VERSION = 2 # v2: tabelas com os registros de cabeçalho completos
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600 # segundos sem uso
+
+# Formato do arquivo:
+#   cabeçalho: magic (4s), versão (H), número de tabelas (H), tamanho da chave (L), chave (utf-8)
+#   índice:    por tabela -> nome (16s), formato struct (32s), quantidade (L), offset (L), tamanho (L)
+#   dados:     registros empacotados de cada tabela
+_FILE_HEADER = struct.Struct('<4sHHL')
+_TOC_ENTRY = struct.Struct('<16s32sLLL')
+
+# Formato reservado para tabelas de strings (offsets + blob utf-8)
+STRINGS_FORMAT = 'strings'
+
+class CachedTable:
+    """Tabela de registros de tamanho fixo lida diretamente do arquivo mapeado."""
+
+    def __init__(self, buffer, fmt, count):
+        self.struct = struct.Struct(fmt)
+        self.buffer = buffer # memoryview sobre o mmap
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.struct.unpack_from(self.buffer, index * self.struct.size)
+
+    def __iter__(self):
+        return self.struct.iter_unpack(self.buffer) if self.count else iter(())
+
+class CachedStrings:
+    """Lista de strings decodificadas sob demanda a partir do blob mapeado."""
+
+    def __init__(self, buffer, count):
+        self.count = count
+        self._offsets_buffer = buffer[:(count + 1) * 4]
+        self.blob = buffer[(count + 1) * 4:]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start, end = struct.unpack_from('<LL', self._offsets_buffer, index * 4)
+        return bytes(self.blob[start:end]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+class CachedHeaders:
+    """Conjunto de tabelas de um binário, mantido aberto sobre o mmap do arquivo de cache."""
+
+    def __init__(self, mapping, tables):
+        self._mapping = mapping
+        self.tables = tables
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def __contains__(self, name):
+        return name in self.tables
+
+    def close(self):
+        self.tables = {}
+        try:
+            self._mapping.close()
+        except BufferError:
+            # Alguma tabela ainda está em uso; o mapeamento é liberado pelo GC
+            pass
+
+def _pack_strings(strings):
+    """Empacota uma lista de strings como offsets (L) seguidos do blob utf-8."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack(f'<{len(offsets)}L', *offsets) + b''.join(encoded), len(encoded)
+
+class HeaderCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_for(self, path):
+        """
+        Calcula a chave (caminho, tamanho, mtime, inode) de um binário.
+        Caminhos no formato 'arquivo.apk!classes2.dex' identificam um membro de um contêiner:
+        a identidade vem do arquivo externo e o nome do membro entra na chave.
+        """
+        real_path, _, member = path.partition('!')
+        real_path = os.path.abspath(real_path)
+        st = os.stat(real_path)
+        return f"{real_path}!{member}|{st.st_size}|{st.st_mtime_ns}|{st.st_ino}"
+
+    def _entry_path(self, kind, path):
+        # Um arquivo de cache por binário: uma nova versão do binário sobrescreve a anterior
+        real_path, _, member = path.partition('!')
+        digest = hashlib.sha1(f"{kind}:{os.path.abspath(real_path)}!{member}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{kind}-{digest}.hdr")
+
+    def load(self, kind, path):
+        """Retorna um CachedHeaders se houver entrada válida para o binário, ou None."""
+        entry_path = self._entry_path(kind, path)
+        try:
+            key = self.key_for(path).encode('utf-8')
+            with open(entry_path, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        try:
+            magic, version, table_count, key_size = _FILE_HEADER.unpack_from(mapping, 0)
+            offset = _FILE_HEADER.size
+            if magic != CACHE_MAGIC or version != CACHE_VERSION or mapping[offset:offset + key_size] != key:
+                raise ValueError("entrada obsoleta")
+            offset += key_size
+
+            view = memoryview(mapping)
+            tables = {}
+            for _ in range(table_count):
+                name, fmt, count, data_offset, data_size = _TOC_ENTRY.unpack_from(mapping, offset)
+                offset += _TOC_ENTRY.size
+                name = name.rstrip(b'\x00').decode('ascii')
+                fmt = fmt.rstrip(b'\x00').decode('ascii')
+                buffer = view[data_offset:data_offset + data_size]
+                if fmt == STRINGS_FORMAT:
+                    tables[name] = CachedStrings(buffer, count)
+                else:
+                    tables[name] = CachedTable(buffer, fmt, count)
+            view.release()
+        except (struct.error, ValueError, UnicodeDecodeError):
+            mapping.close()
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(entry_path) # Usada agora: fica por último na ordem de remoção
+        except OSError:
+            pass
+        return CachedHeaders(mapping, tables)
+
+    def store(self, kind, path, tables):
+        """
+        Grava as tabelas de um binário.
+        tables: {nome: (formato_struct, [tuplas])} ou {nome: (STRINGS_FORMAT, [strings])}
+        """
+        try:
+            key = self.key_for(path).encode('utf-8')
+        except OSError:
+            return False
+
+        toc_size = _FILE_HEADER.size + len(key) + _TOC_ENTRY.size * len(tables)
+        toc = bytearray()
+        payload = bytearray()
+        for name, (fmt, rows) in tables.items():
+            if len(name) > 16 or len(fmt) > 32:
+                raise ValueError(f"Nome ou formato de tabela longo demais: {name} {fmt}")
+            if fmt == STRINGS_FORMAT:
+                data, count = _pack_strings(rows)
+            else:
+                record = struct.Struct(fmt)
+                data, count = b''.join(record.pack(*row) for row in rows), len(rows)
+            toc += _TOC_ENTRY.pack(name.encode('ascii'), fmt.encode('ascii'), count, toc_size + len(payload), len(data))
+            payload += data
+
+        content = _FILE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(tables), len(key)) + key + toc + payload
+
+        # Escrita atômica: um leitor concorrente nunca vê um arquivo pela metade
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, self._entry_path(kind, path))
+        except OSError as e:
+            print(f"Header Cache: Aviso - Não foi possível gravar o cache de {path}: {e}")
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """Remove entradas sem uso há mais de max_age e as menos usadas além de max_bytes. Retorna quantas."""
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.hdr'):
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+        except OSError:
+            return 0
+        oldest_allowed = time.time() - self.max_age
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, name in sorted(entries):
+            if mtime >= oldest_allowed and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.evictions += removed
+        return removed
+
+_default_cache = None
+
+def get_header_cache():
+    """Retorna o cache de cabeçalhos padrão do motor."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HeaderCache()
+    return _default_cache
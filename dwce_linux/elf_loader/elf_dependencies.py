@@ -0,0 +1,349 @@
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Adiciona a camada Linux (dwce_linux) ao PATH para importar o loader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elf_loader.elf_loader import ELFLoader, ELF_MAGIC
+
+# --- Resolvedor de Dependências (DT_NEEDED) ---
+# Monta o grafo completo de bibliotecas compartilhadas de um binário seguindo a ordem
+# de busca do ld.so: DT_RPATH (sem DT_RUNPATH), LD_LIBRARY_PATH, DT_RUNPATH e, por fim,
+# um índice persistente nome -> caminho dos diretórios de bibliotecas (como o
+# ld.so.cache). Cada nível do grafo é analisado em paralelo, e bibliotecas e grafos já
+# resolvidos ficam memorizados: libc/libstdc++/libGL são resolvidas uma única vez. A
+# memorização vale enquanto os arquivos do grafo e os diretórios de busca não mudarem.
+
+DEFAULT_LIBRARY_DIRS = ["/lib64", "/usr/lib64", "/lib", "/usr/lib",
+                        "/lib/x86_64-linux-gnu", "/usr/lib/x86_64-linux-gnu",
+                        "/lib/i386-linux-gnu", "/usr/lib/i386-linux-gnu", "/usr/local/lib"]
+LD_SO_CONF = "/etc/ld.so.conf"
+DEFAULT_INDEX = os.path.join(os.path.expanduser("~"), ".cache", "dwce", "soname_index.json")
+INDEX_VERSION = 1
+
+def read_ld_so_conf(path=LD_SO_CONF, _seen=None):
+    """Diretórios declarados em /etc/ld.so.conf, seguindo as diretivas 'include'."""
+    seen = _seen if _seen is not None else set()
+    if path in seen:
+        return []
+    seen.add(path)
+    try:
+        with open(path, 'r') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    directories = []
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith('include'):
+            pattern = line.split(None, 1)[1] if len(line.split(None, 1)) > 1 else ''
+            if not os.path.isabs(pattern):
+                pattern = os.path.join(os.path.dirname(path), pattern)
+            for included in sorted(glob.glob(pattern)):
+                directories.extend(read_ld_so_conf(included, seen))
+        else:
+            directories.append(line)
+    return directories
+
+def system_library_dirs():
+    """Ordem do ldconfig: ld.so.conf primeiro, depois os diretórios padrão."""
+    directories = []
+    for directory in read_ld_so_conf() + DEFAULT_LIBRARY_DIRS:
+        if directory not in directories and os.path.isdir(directory):
+            directories.append(directory)
+    return directories
+
+def _probe(path):
+    """Lê apenas e_ident/e_machine: (classe ELF, máquina) ou None se não for ELF."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(20)
+    except OSError:
+        return None
+    if len(header) < 20 or header[:4] != ELF_MAGIC:
+        return None
+    return header[4], int.from_bytes(header[18:20], 'little')
+
+class SonameIndex:
+    """
+    Índice persistente nome -> caminho dos diretórios de bibliotecas.
+    Cada diretório guarda seu mtime: apenas diretórios alterados são varridos de novo.
+    """
+
+    def __init__(self, directories=None, index_path=DEFAULT_INDEX):
+        self.directories = directories if directories is not None else system_library_dirs()
+        self.index_path = index_path
+        self.entries = {} # {nome: [(caminho_real, classe, máquina)]} na ordem dos diretórios
+        self.rescanned = [] # Diretórios varridos na última atualização
+        self.refresh()
+
+    def _load(self):
+        if not self.index_path:
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('directories', {})
+
+    def _save(self, directories):
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': INDEX_VERSION, 'directories': directories}, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Soname Index: Aviso - Não foi possível gravar o índice: {e}")
+
+    def _scan_directory(self, directory):
+        files = {}
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return files
+        for name in names:
+            if '.so' not in name:
+                continue
+            path = os.path.join(directory, name)
+            real_path = os.path.realpath(path)
+            if not os.path.isfile(real_path):
+                continue
+            probe = _probe(real_path)
+            if probe is not None:
+                files[name] = [real_path, probe[0], probe[1]]
+        return files
+
+    def refresh(self):
+        """Revalida o índice contra o mtime de cada diretório."""
+        stored = self._load()
+        current = {}
+        self.rescanned = []
+        for directory in self.directories:
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            previous = stored.get(directory)
+            if previous is not None and previous['mtime_ns'] == mtime_ns:
+                current[directory] = previous
+            else:
+                current[directory] = {'mtime_ns': mtime_ns, 'files': self._scan_directory(directory)}
+                self.rescanned.append(directory)
+
+        self.entries = {}
+        for directory in self.directories:
+            for name, entry in current.get(directory, {}).get('files', {}).items():
+                self.entries.setdefault(name, []).append(tuple(entry))
+        if self.index_path and (self.rescanned or set(current) != set(stored)):
+            self._save(current)
+
+    def lookup(self, name, elf_class, machine):
+        """Primeiro candidato com a mesma classe (32/64-bit) e máquina do solicitante."""
+        for path, candidate_class, candidate_machine in self.entries.get(name, ()):
+            if candidate_class == elf_class and candidate_machine == machine:
+                return path
+        return None
+
+class DependencyGraph:
+    def __init__(self, root):
+        self.root = root
+        self.nodes = {} # {caminho: {'soname', 'needed': {nome: caminho ou None}}}
+        self.order = [] # Ordem de carga (largura, como a lista de busca do ld.so)
+        self.missing = [] # [(solicitante, nome)]
+        self.states = {} # {caminho: estado do arquivo} para validar a memorização
+        self.directories = {} # {diretório de busca: mtime} (bibliotecas novas ou removidas)
+
+    @property
+    def libraries(self):
+        return self.order[1:]
+
+    def ldd(self):
+        """Pares (nome, caminho) no estilo do ldd, na ordem de carga."""
+        seen = {}
+        for path in self.order:
+            for name, resolved in self.nodes[path]['needed'].items():
+                seen.setdefault(name, resolved)
+        return list(seen.items())
+
+def _file_state(path):
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+def _dir_state(directory):
+    """mtime do diretório: muda quando uma biblioteca é instalada, removida ou renomeada nele."""
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+def _expand_origin(entries, origin):
+    """Separa DT_RPATH/DT_RUNPATH em diretórios, expandindo $ORIGIN."""
+    directories = []
+    for entry in entries.split(':') if entries else ():
+        if entry:
+            directories.append(entry.replace('${ORIGIN}', origin).replace('$ORIGIN', origin))
+    return tuple(directories)
+
+class DependencyResolver:
+    def __init__(self, index=None, library_path=None, workers=None, use_cache=True, header_cache=None):
+        self._index = index # None -> índice do sistema, construído no primeiro uso
+        self.use_cache = use_cache # Repassados ao ELFLoader de cada objeto analisado
+        self.header_cache = header_cache
+        if library_path is None:
+            library_path = os.environ.get('LD_LIBRARY_PATH', '')
+        self.library_path = tuple(d for d in library_path.split(':') if d)
+        self.workers = workers
+        self._objects = {} # {caminho_real: (estado, informações do objeto)}
+        self._lookups = {} # {(nome, diretórios, classe, máquina): (mtimes dos diretórios, geração do índice, caminho)}
+        self._index_states = {} # {diretório do índice: mtime} na última atualização do índice
+        self._index_generation = 0
+        self._graphs = {} # {caminho_real: DependencyGraph}
+        self._lock = threading.Lock()
+        self.objects_parsed = 0
+        self.graph_hits = 0
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = SonameIndex()
+            self._index_states = {d: _dir_state(d) for d in self._index.directories}
+        return self._index
+
+    def _refresh_index(self):
+        """Revalida o índice se algum diretório do sistema mudou desde a última leitura."""
+        index = self.index
+        states = {d: _dir_state(d) for d in index.directories}
+        if states != self._index_states:
+            index.refresh()
+            self._index_states = states
+            self._index_generation += 1
+
+    def _object(self, path):
+        """Informações de DT_NEEDED/RPATH/RUNPATH de um objeto (memorizadas por estado do arquivo)."""
+        state = _file_state(path)
+        with self._lock:
+            cached = self._objects.get(path)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        with ELFLoader(path, use_cache=self.use_cache, header_cache=self.header_cache) as loader:
+            if not loader.parse_headers():
+                raise ValueError(f"{path} não é um ELF válido")
+            origin = os.path.dirname(path)
+            info = {
+                'soname': loader.soname,
+                'needed': loader.needed,
+                'rpath': _expand_origin(loader.rpath, origin),
+                'runpath': _expand_origin(loader.runpath, origin),
+                'class': 2 if loader.is_64bit else 1,
+                'machine': loader.machine,
+            }
+        with self._lock:
+            self._objects[path] = (state, info)
+            self.objects_parsed += 1
+        return info
+
+    def _search(self, name, info, inherited_rpath, dir_states):
+        """
+        Ordem do ld.so para localizar um DT_NEEDED. dir_states acumula o mtime de cada
+        diretório consultado; a busca memorizada só vale enquanto eles não mudarem.
+        """
+        if '/' in name:
+            return os.path.realpath(name) if os.path.isfile(name) else None
+
+        # DT_RPATH (do objeto e de quem o carregou) só vale sem DT_RUNPATH
+        directories = (() if info['runpath'] else info['rpath'] + inherited_rpath) + self.library_path + info['runpath']
+        for directory in directories:
+            if directory not in dir_states:
+                dir_states[directory] = _dir_state(directory)
+        states = tuple(dir_states[d] for d in directories)
+        key = (name, directories, info['class'], info['machine'])
+        with self._lock:
+            cached = self._lookups.get(key)
+        if cached is not None and cached[:2] == (states, self._index_generation):
+            return cached[2]
+
+        resolved = None
+        for directory in directories:
+            candidate = os.path.join(directory, name)
+            probe = _probe(candidate) if os.path.isfile(candidate) else None
+            if probe == (info['class'], info['machine']):
+                resolved = os.path.realpath(candidate)
+                break
+        if resolved is None:
+            resolved = self.index.lookup(name, info['class'], info['machine'])
+
+        # Falhas não são memorizadas: a biblioteca pode ser instalada a qualquer momento
+        if resolved is not None:
+            with self._lock:
+                self._lookups[key] = (states, self._index_generation, resolved)
+        return resolved
+
+    def _graph_is_current(self, graph):
+        if any(_dir_state(d) != state for d, state in graph.directories.items()):
+            return False
+        # Dependências ausentes podem ter sido instaladas nos diretórios do sistema
+        if graph.missing and any(_dir_state(d) != state for d, state in self._index_states.items()):
+            return False
+        try:
+            return all(_file_state(path) == state for path, state in graph.states.items())
+        except OSError:
+            return False
+
+    def resolve(self, path):
+        """Grafo de dependências de um binário (memorizado enquanto nenhum arquivo mudar)."""
+        root = os.path.realpath(path)
+        graph = self._graphs.get(root)
+        if graph is not None and self._graph_is_current(graph):
+            self.graph_hits += 1
+            return graph
+
+        # Bibliotecas já vistas resolvem a partir de _objects; novas são analisadas em paralelo
+        self._refresh_index() # Constrói (ou revalida) o índice antes de espalhar o trabalho entre threads
+        graph = DependencyGraph(root)
+        inherited = {root: ()}
+        level = [root]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while level:
+                infos = list(executor.map(self._object, level))
+                next_level = []
+                for node_path, info in zip(level, infos):
+                    graph.order.append(node_path)
+                    graph.states[node_path] = _file_state(node_path)
+                    rpath_chain = (() if info['runpath'] else info['rpath']) + inherited[node_path]
+                    needed = {}
+                    for name in info['needed']:
+                        resolved = self._search(name, info, inherited[node_path], graph.directories)
+                        needed[name] = resolved
+                        if resolved is None:
+                            graph.missing.append((node_path, name))
+                        elif resolved not in inherited:
+                            inherited[resolved] = rpath_chain
+                            next_level.append(resolved)
+                    graph.nodes[node_path] = {'soname': info['soname'], 'needed': needed}
+                level = next_level
+
+        self._graphs[root] = graph
+        return graph
+
+_shared_resolver = None
+
+def get_dependency_resolver():
+    """Retorna o resolvedor compartilhado do motor (memorização entre binários)."""
+    global _shared_resolver
+    if _shared_resolver is None:
+        _shared_resolver = DependencyResolver()
+    return _shared_resolver
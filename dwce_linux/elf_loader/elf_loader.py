@@ -1,34 +1,80 @@
 import struct
 import os
+import sys
 import mmap
 
+# Adiciona o DWCE Core ao PATH para importação do Header Cache
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dwce_core'))
+
+from header_cache.header_cache import get_header_cache
+from binary_records.binary_records import record_type, RecordLayout
+
+# Adiciona a camada Linux (dwce_linux) ao PATH para os módulos irmãos do loader. Executado
+# como script, o diretório deste arquivo (sys.path[0]) esconderia o pacote elf_loader
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elf_loader.elf_symbols import DynamicSymbolTable
+from elf_loader.elf_sections import (parse_section_headers, SymbolTable, AddressIndex,
+                                     SHT_SYMTAB, SHT_DYNSYM, SHN_LORESERVE, SHN_XINDEX)
+
 # --- Constantes ELF (Simplificadas) ---
 ELF_MAGIC = b'\x7fELF'
 EM_X86_64 = 0x3E # x86-64
 EM_386 = 0x03    # i386
 
+# Tipos de segmento (p_type)
+PT_LOAD = 1
+PT_DYNAMIC = 2
+PT_INTERP = 3
+
+# Tags da seção dinâmica (d_tag)
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_SONAME = 14
+DT_RPATH = 15
+DT_RUNPATH = 29
+
+# --- Registros de cabeçalho (layouts pré-compilados para ELF32 e ELF64) ---
+ElfHeader = record_type('ElfHeader', ('ident', 'type', 'machine', 'version', 'entry', 'phoff', 'shoff', 'flags',
+                                      'ehsize', 'phentsize', 'phnum', 'shentsize', 'shnum', 'shstrndx'))
+ELF64_HEADER = RecordLayout('<16sHHLQQQLHHHHHH', ElfHeader)
+ELF32_HEADER = RecordLayout('<16sHHLLLLLHHHHHH', ElfHeader)
+
+# Ordem canônica do ELF64; no ELF32 p_flags vem depois de p_memsz
+ProgramHeader = record_type('ProgramHeader', ('type', 'flags', 'offset', 'vaddr', 'paddr', 'filesz', 'memsz', 'align'))
+ELF64_PROGRAM_HEADER = RecordLayout('<LLQQQQQQ', ProgramHeader)
+ELF32_PROGRAM_HEADER = RecordLayout('<LLLLLLLL', ProgramHeader,
+                                    ('type', 'offset', 'vaddr', 'paddr', 'filesz', 'memsz', 'flags', 'align'))
+
+# Layouts das tabelas gravadas no Header Cache (sempre no formato 64-bit)
+_CACHE_DYNAMIC_FORMAT = '<qQ' # d_tag, d_val
+
 class ELFLoader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_cache=True, header_cache=None):
         self.file_path = file_path
+        self.use_cache = use_cache # Reaproveita cabeçalhos analisados em execuções anteriores
+        self.header_cache = header_cache # None -> cache padrão do motor
         self.elf_data = None
         self.is_64bit = False
+        self.machine = 0
         self.entry_point = 0
+        self.header = None # ElfHeader
         self.program_headers = []
-        self.hash_table = None # Tabela de hash ELF para carregamento rápido
+        self.dynamic = [] # [(d_tag, d_val)] do segmento PT_DYNAMIC
+        self.hash_table = None # Tabela de símbolos dinâmicos (DT_GNU_HASH / DT_HASH)
+        self._sections = None # Section headers, lidos apenas quando pedidos
+        self._section_names = None
+        self.address_index = None # Índice endereço -> símbolo, montado por build_address_index()
+        self._mmap = None
+        self._image = None # Objeto base (mmap ou bytes) para buscas como find()
 
 
     def load(self):
         """Carrega e mapeia o binário ELF na memória."""
-        try:
-            with open(self.file_path, 'rb') as f:
-                self.elf_data = f.read()
-        except FileNotFoundError:
-            print(f"Erro: Binário ELF não encontrado em {self.file_path}")
-            return False
-
-        if not self._parse_header():
-            return False
-        if not self._parse_program_headers():
+        if not self.parse_headers():
             return False
         
         # Nova otimização: Pré-computação de Hash
@@ -42,85 +88,287 @@ class ELFLoader:
         
         return True
 
+    def parse_headers(self):
+        """
+        Abre o binário e analisa apenas os cabeçalhos (sem mapeamento nem saída de console),
+        para ferramentas que só precisam de metadados.
+        """
+        if not self._open_image():
+            return False
+
+        if not self._load_cached_headers():
+            if not self._parse_header():
+                return False
+            if not self._parse_program_headers():
+                return False
+            if not self._parse_dynamic():
+                return False
+            self._store_cached_headers()
+        return True
+
+    def _open_image(self):
+        """Mapeia o binário via mmap: só as páginas realmente lidas chegam à memória."""
+        try:
+            with open(self.file_path, 'rb') as f:
+                try:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._image = self._mmap
+                except (ValueError, OSError):
+                    # Arquivos vazios (ou não mapeáveis) voltam para a leitura tradicional
+                    self._image = f.read()
+                self.elf_data = memoryview(self._image)
+        except FileNotFoundError:
+            print(f"Erro: Binário ELF não encontrado em {self.file_path}")
+            return False
+        return True
+
+    def close(self):
+        """Libera o mapeamento do binário."""
+        self.hash_table = None
+        self.address_index = None
+        if self.elf_data is not None:
+            self.elf_data.release()
+            self.elf_data = None
+        self._image = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_cache(self):
+        if not self.use_cache:
+            return None
+        return self.header_cache if self.header_cache is not None else get_header_cache()
+
+    def _load_cached_headers(self):
+        """Restaura cabeçalho e program headers do Header Cache, sem analisar o binário."""
+        cache = self._get_cache()
+        cached = cache.load('elf', self.file_path) if cache is not None else None
+        if cached is None:
+            return False
+
+        try:
+            self._set_header(ElfHeader._make(cached['header'][0]))
+            self.dynamic = list(cached['dynamic'])
+            self.program_headers = list(ELF64_PROGRAM_HEADER.iter_records(cached['program_headers']))
+        except (KeyError, IndexError, TypeError, ValueError):
+            return False
+        finally:
+            cached.close()
+        return True
+
+    def _store_cached_headers(self):
+        """Grava os cabeçalhos analisados no Header Cache para as próximas execuções."""
+        cache = self._get_cache()
+        if cache is None:
+            return
+        cache.store('elf', self.file_path, {
+            'header': (ELF64_HEADER.struct.format, [self.header]),
+            'program_headers': (ELF64_PROGRAM_HEADER.struct.format, self.program_headers),
+            'dynamic': (_CACHE_DYNAMIC_FORMAT, self.dynamic),
+        })
+
     def _parse_header(self):
-        """Analisa o cabeçalho ELF (e_ident e e_header)."""
-        if self.elf_data[:4] != ELF_MAGIC:
+        """Analisa o cabeçalho ELF (e_ident e os campos de ELF32/ELF64)."""
+        if len(self.elf_data) < ELF32_HEADER.size or self.elf_data[:4] != ELF_MAGIC:
             print("Erro: Assinatura ELF inválida.")
             return False
             
         # e_ident[EI_CLASS] (offset 4) - 1=32bit, 2=64bit
-        elf_class = self.elf_data[4]
-        self.is_64bit = (elf_class == 2)
-        
-        # e_machine (offset 0x12)
-        e_machine = struct.unpack('<H', self.elf_data[0x12:0x14])[0]
-        if e_machine not in (EM_X86_64, EM_386):
-            print(f"Erro: Arquitetura de máquina ELF não suportada: {hex(e_machine)}")
+        layout = ELF64_HEADER if self.elf_data[4] == 2 else ELF32_HEADER
+        if len(self.elf_data) < layout.size:
+            print("Erro: Cabeçalho ELF truncado.")
             return False
-            
-        # e_entry (offset 0x18 para 32bit, 0x18 para 64bit)
-        entry_offset = 0x18
-        if self.is_64bit:
-            # 64-bit: e_entry é um QWORD (8 bytes)
-            self.entry_point = struct.unpack('<Q', self.elf_data[entry_offset:entry_offset + 8])[0]
-            self.p_header_offset = struct.unpack('<Q', self.elf_data[0x20:0x28])[0] # e_phoff
-            self.p_header_size = struct.unpack('<H', self.elf_data[0x36:0x38])[0] # e_phentsize
-            self.p_header_num = struct.unpack('<H', self.elf_data[0x38:0x3A])[0] # e_phnum
-        else:
-            # 32-bit: e_entry é um DWORD (4 bytes)
-            self.entry_point = struct.unpack('<L', self.elf_data[entry_offset:entry_offset + 4])[0]
-            self.p_header_offset = struct.unpack('<L', self.elf_data[0x1C:0x20])[0] # e_phoff
-            self.p_header_size = struct.unpack('<H', self.elf_data[0x2A:0x2C])[0] # e_phentsize
-            self.p_header_num = struct.unpack('<H', self.elf_data[0x2C:0x2E])[0] # e_phnum
-            
+        header = layout.unpack_from(self.elf_data)
+        if header.machine not in (EM_X86_64, EM_386):
+            print(f"Erro: Arquitetura de máquina ELF não suportada: {hex(header.machine)}")
+            return False
+        self._set_header(header)
         return True
 
+    def _set_header(self, header):
+        self.header = header
+        self.is_64bit = header.ident[4] == 2
+        self.machine = header.machine
+        self.entry_point = header.entry
+        self.p_header_offset = header.phoff # e_phoff
+        self.p_header_size = header.phentsize # e_phentsize
+        self.p_header_num = header.phnum # e_phnum
+
     def _parse_program_headers(self):
-        """Analisa os cabeçalhos de programa (segmentos)."""
-        offset = self.p_header_offset
-        for i in range(self.p_header_num):
-            header_data = self.elf_data[offset:offset + self.p_header_size]
-            
-            # Campos importantes: p_type, p_offset, p_vaddr, p_filesz, p_memsz, p_flags
-            if self.is_64bit:
-                # 64-bit: 8 bytes cada
-                p_type, p_flags, p_offset, p_vaddr, p_paddr, p_filesz, p_memsz, p_align = struct.unpack('<LLQQQQQQ', header_data)
-            else:
-                # 32-bit: 4 bytes cada
-                p_type, p_offset, p_vaddr, p_paddr, p_filesz, p_memsz, p_flags, p_align = struct.unpack('<LLLLLLLL', header_data)
-                
-            self.program_headers.append({
-                'type': p_type,
-                'offset': p_offset,
-                'vaddr': p_vaddr,
-                'filesz': p_filesz,
-                'memsz': p_memsz,
-                'flags': p_flags
-            })
-            offset += self.p_header_size
-            
+        """Analisa os cabeçalhos de programa (segmentos) em uma única passada."""
+        layout = ELF64_PROGRAM_HEADER if self.is_64bit else ELF32_PROGRAM_HEADER
+        if self.p_header_num and self.p_header_size < layout.size:
+            print("Erro: e_phentsize menor que o program header.")
+            return False
+        try:
+            self.program_headers = layout.unpack_table(self.elf_data, self.p_header_offset, self.p_header_num,
+                                                       self.p_header_size)
+        except ValueError:
+            print("Erro: Tabela de program headers truncada.")
+            return False
         return True
 
+    def _parse_dynamic(self):
+        """Lê as entradas (d_tag, d_val) do segmento PT_DYNAMIC até DT_NULL."""
+        self.dynamic = []
+        entry_format = '<qQ' if self.is_64bit else '<lL'
+        entry_size = struct.calcsize(entry_format)
+        for header in self.program_headers:
+            if header.type != PT_DYNAMIC:
+                continue
+            count = (min(header.offset + header.filesz, len(self.elf_data)) - header.offset) // entry_size
+            for d_tag, d_val in struct.iter_unpack(entry_format, self.elf_data[header.offset:header.offset + count * entry_size]):
+                if d_tag == DT_NULL:
+                    break
+                self.dynamic.append((d_tag, d_val))
+            break
+        return True
+
+    def vaddr_to_offset(self, vaddr):
+        """Converte um endereço virtual para offset no arquivo através dos segmentos PT_LOAD."""
+        for header in self.program_headers:
+            if header.type == PT_LOAD and header.vaddr <= vaddr < header.vaddr + header.filesz:
+                return vaddr - header.vaddr + header.offset
+        return None
+
+    def _dynamic_values(self, tag):
+        return [d_val for d_tag, d_val in self.dynamic if d_tag == tag]
+
+    def _read_dynamic_string(self, string_offset):
+        """Lê uma string da tabela DT_STRTAB."""
+        strtab = self._dynamic_values(DT_STRTAB)
+        base = self.vaddr_to_offset(strtab[0]) if strtab else None
+        if base is None:
+            return None
+        start = base + string_offset
+        end = self._image.find(b'\x00', start)
+        if end < 0:
+            return None
+        return bytes(self.elf_data[start:end]).decode('utf-8', errors='replace')
+
+    @property
+    def interpreter(self):
+        """Caminho do linker dinâmico (PT_INTERP), ou None para binários estáticos."""
+        for header in self.program_headers:
+            if header.type == PT_INTERP:
+                path_end = header.offset + header.filesz
+                return bytes(self.elf_data[header.offset:path_end]).decode('ascii', errors='replace').strip('\x00')
+        return None
+
+    @property
+    def needed(self):
+        """Bibliotecas DT_NEEDED, na ordem declarada."""
+        return [self._read_dynamic_string(value) for value in self._dynamic_values(DT_NEEDED)]
+
+    @property
+    def soname(self):
+        values = self._dynamic_values(DT_SONAME)
+        return self._read_dynamic_string(values[0]) if values else None
+
+    @property
+    def rpath(self):
+        values = self._dynamic_values(DT_RPATH)
+        return self._read_dynamic_string(values[0]) if values else None
+
+    @property
+    def runpath(self):
+        values = self._dynamic_values(DT_RUNPATH)
+        return self._read_dynamic_string(values[0]) if values else None
+
+    @property
+    def sections(self):
+        """Section headers (em uma única passada, no primeiro acesso)."""
+        if self._sections is None:
+            self._sections = parse_section_headers(self)
+        return self._sections
+
+    def section_name(self, section):
+        """Nome de uma seção via .shstrtab (e_shstrndx)."""
+        if self._section_names is None:
+            index = self.header.shstrndx
+            if index == SHN_XINDEX and self.sections:
+                index = self.sections[0].link # Numeração estendida
+            if not self.sections or index >= min(len(self.sections), SHN_LORESERVE):
+                return None
+            self._section_names = self.sections[index]
+        start = self._section_names.offset + section.name
+        end = self._image.find(b'\x00', start, self._section_names.offset + self._section_names.size)
+        if end < 0:
+            return None
+        return bytes(self.elf_data[start:end]).decode('utf-8', errors='replace')
+
+    def section_by_name(self, name):
+        for section in self.sections:
+            if self.section_name(section) == name:
+                return section
+        return None
+
+    def symbol_tables(self, dynamic=None):
+        """Tabelas .symtab (dynamic=False), .dynsym (dynamic=True) ou ambas (None)."""
+        wanted = {False: (SHT_SYMTAB,), True: (SHT_DYNSYM,), None: (SHT_SYMTAB, SHT_DYNSYM)}[dynamic]
+        tables = []
+        for section in self.sections:
+            if section.type in wanted and section.link < len(self.sections):
+                tables.append(SymbolTable(self, section, self.sections[section.link]))
+        return tables
+
+    def symbols(self, dynamic=None):
+        """Gera os símbolos das tabelas pedidas, sem carregá-las inteiras na memória."""
+        for table in self.symbol_tables(dynamic):
+            yield from table
+
+    def build_address_index(self):
+        """Monta (uma vez) o índice endereço -> símbolo; .symtab tem prioridade sobre .dynsym."""
+        if self.address_index is None:
+            tables = self.symbol_tables(dynamic=False) or self.symbol_tables(dynamic=True)
+            self.address_index = AddressIndex(tables)
+        return self.address_index
+
+    def symbolize(self, address):
+        """Nome+deslocamento do símbolo que contém um endereço (IP amostrado), ou None."""
+        return self.build_address_index().symbolize(address)
+
+    def resolve_dependencies(self, resolver=None):
+        """Grafo completo de bibliotecas (DT_NEEDED) do binário, via resolvedor compartilhado."""
+        # Importado sob demanda: o resolvedor depende deste módulo
+        from elf_loader.elf_dependencies import get_dependency_resolver
+        resolver = resolver if resolver is not None else get_dependency_resolver()
+        return resolver.resolve(self.file_path)
+
+    def prelink(self, resolver=None, cache=None):
+        """
+        Relocações dinâmicas do grafo inteiro já resolvidas (estilo prelink).
+        Execuções repetidas com as mesmas bibliotecas vêm do cache em disco.
+        """
+        from elf_loader.elf_relocations import get_prelink_cache
+        cache = cache if cache is not None else get_prelink_cache()
+        return cache.get(self.resolve_dependencies(resolver))
+
     def _map_segments(self):
         """Mapeia os segmentos na memória virtual do Winlinos."""
         print("\n--- Mapeamento de Segmentos ELF ---")
         for header in self.program_headers:
-            if header['type'] == 1: # PT_LOAD (Segmento carregável)
+            if header.type == 1: # PT_LOAD (Segmento carregável)
                 # 1. Alocar memória (mmap) no endereço virtual (vaddr)
                 # 2. Copiar dados do arquivo (offset) para a memória (filesz)
                 # 3. Preencher o restante do segmento com zeros (memsz - filesz)
                 
                 # Simulação de alocação e cópia
-                print(f"  Mapeando segmento LOAD: VAddr={hex(header['vaddr'])}, FileSize={header['filesz']}, MemSize={header['memsz']}")
+                print(f"  Mapeando segmento LOAD: VAddr={hex(header.vaddr)}, FileSize={header.filesz}, MemSize={header.memsz}")
                 
                 # Em um SO real, o kernel faria o mmap e a cópia.
                 # No Winlinos, garantimos que o processo seja otimizado e utilize o nosso
                 # gerenciador de memória unificado (Fase 6).
                 
-            elif header['type'] == 3: # PT_INTERP (Caminho para o interpretador/linker dinâmico)
+            elif header.type == 3: # PT_INTERP (Caminho para o interpretador/linker dinâmico)
                 # O Winlinos pode usar seu próprio linker dinâmico otimizado
-                path_end = header['offset'] + header['filesz']
-                interp_path = self.elf_data[header['offset']:path_end].decode('ascii').strip('\x00')
+                interp_path = self.interpreter
                 print(f"  Interpretador Dinâmico (Linker): {interp_path}")
                 # Aqui, o Winlinos injetaria seu próprio linker otimizado se necessário.
 
@@ -136,19 +384,27 @@ class ELFLoader:
 
     def _precompute_hash(self):
         """
-        Simula a pré-computação da tabela de hash ELF (DT_HASH ou DT_GNU_HASH)
-        para acelerar a resolução de símbolos dinâmicos.
+        Prepara a tabela de símbolos dinâmicos (.dynsym/.dynstr) com os índices
+        DT_GNU_HASH (filtro de Bloom + buckets) e/ou DT_HASH do próprio binário.
         """
-        # Em um SO real, isso seria feito pelo compilador/linker ou na primeira execução.
-        # Aqui, simulamos a criação de uma tabela de hash otimizada.
-        
-        # Simulação de 100 símbolos
-        self.hash_table = {f"symbol_{i}": 0xDEADBEEF + i for i in range(100)}
-        print(f"  Otimização ELF: Tabela de Hash pré-computada com {len(self.hash_table)} símbolos.")
+        try:
+            self.hash_table = DynamicSymbolTable(self)
+        except (ValueError, struct.error) as e:
+            print(f"  Aviso: Tabela de símbolos dinâmicos inválida: {e}")
+            self.hash_table = None
+            return
+        kind = 'GNU hash' if self.hash_table.gnu else 'SysV hash' if self.hash_table.sysv else 'sem hash'
+        print(f"  Otimização ELF: Tabela de símbolos dinâmicos com {len(self.hash_table)} símbolos ({kind}).")
         
-    def resolve_symbol(self, symbol_name):
-        """Resolve um símbolo usando a tabela de hash pré-computada."""
-        return self.hash_table.get(symbol_name, 0)
+    def resolve_symbol(self, symbol_name, version=None):
+        """
+        Resolve um símbolo exportado (opcionalmente 'nome@VERSÃO').
+        Retorna o endereço (st_value) ou 0 se o símbolo não for definido aqui.
+        """
+        if self.hash_table is None:
+            self._precompute_hash()
+        found = self.hash_table.lookup(symbol_name, version) if self.hash_table is not None else None
+        return found[1].value if found is not None else 0
 
 # Exemplo de uso (para teste interno)
 if __name__ == "__main__":
@@ -0,0 +1,409 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem NumPy o patch em lote é aplicado com structs pré-compiladas
+    np = None
+
+# Adiciona a camada Linux (dwce_linux) ao PATH para os módulos irmãos do loader
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elf_loader.elf_loader import ELFLoader, PT_LOAD, EM_X86_64
+from elf_loader.elf_symbols import DynamicSymbolTable, STB_LOCAL
+
+# --- Cache de Relocações Pré-computadas (estilo prelink) ---
+# Para um grafo de dependências e um conjunto de bibliotecas, cada objeto recebe um
+# endereço base fixo e todas as relocações dinâmicas (R_X86_64_* / R_386_*) são resolvidas
+# uma única vez, com a mesma busca de símbolos do ld.so. O resultado (endereço, largura,
+# valor final) é gravado em disco, chaveado pelo estado de todos os arquivos do grafo:
+# a próxima execução aplica tudo como um patch em lote, sem consultar nenhum símbolo.
+
+DT_PLTRELSZ = 2
+DT_RELA = 7
+DT_RELASZ = 8
+DT_RELAENT = 9
+DT_REL = 17
+DT_RELSZ = 18
+DT_RELENT = 19
+DT_PLTREL = 20
+DT_JMPREL = 23
+
+# x86-64
+R_X86_64_NONE = 0
+R_X86_64_64 = 1
+R_X86_64_PC32 = 2
+R_X86_64_COPY = 5
+R_X86_64_GLOB_DAT = 6
+R_X86_64_JUMP_SLOT = 7
+R_X86_64_RELATIVE = 8
+R_X86_64_32 = 10
+R_X86_64_32S = 11
+
+# i386
+R_386_NONE = 0
+R_386_32 = 1
+R_386_PC32 = 2
+R_386_COPY = 5
+R_386_GLOB_DAT = 6
+R_386_JMP_SLOT = 7
+R_386_RELATIVE = 8
+
+STB_WEAK = 2
+STT_GNU_IFUNC = 10 # O endereço final só é conhecido após executar o resolvedor no processo
+
+# Tipos resolvidos antecipadamente: {tipo: (largura, fórmula)}
+#   'S+A' símbolo + addend, 'B+A' base + addend, 'S+A-P' relativo ao PC
+_X86_64_TYPES = {
+    R_X86_64_64: (8, 'S+A'),
+    R_X86_64_GLOB_DAT: (8, 'S+A'),
+    R_X86_64_JUMP_SLOT: (8, 'S+A'),
+    R_X86_64_RELATIVE: (8, 'B+A'),
+    R_X86_64_PC32: (4, 'S+A-P'),
+    R_X86_64_32: (4, 'S+A'),
+    R_X86_64_32S: (4, 'S+A'),
+}
+_I386_TYPES = {
+    R_386_32: (4, 'S+A'),
+    R_386_GLOB_DAT: (4, 'S+A'),
+    R_386_JMP_SLOT: (4, 'S+A'),
+    R_386_RELATIVE: (4, 'B+A'),
+    R_386_PC32: (4, 'S+A-P'),
+}
+
+CACHE_DIR = os.environ.get("DWCE_PRELINK_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "dwce", "prelink"))
+CACHE_MAGIC = b'DWPL'
+CACHE_VERSION = 2
+
+# Cabeçalho: magic, versão, digest da chave, objetos, símbolos não resolvidos, relocações adiadas
+_FILE_HEADER = struct.Struct('<4sH20sLLL')
+# Por objeto: base, tamanho do caminho, quantidade de correções
+_OBJECT_HEADER = struct.Struct('<QHL')
+
+LIBRARY_BASE = 0x7F0000000000 # Primeira base atribuída às bibliotecas
+PIE_BASE = 0x555555554000 # Base do executável principal (ET_DYN)
+BASE_ALIGNMENT = 0x200000
+
+_WIDTH_RECORDS = {4: struct.Struct('<L'), 8: struct.Struct('<Q')}
+
+def _words(typecode, data=b''):
+    words = array(typecode)
+    words.frombytes(data)
+    if sys.byteorder != 'little':
+        words.byteswap()
+    return words
+
+def _image_span(loader):
+    """(menor vaddr, maior vaddr+memsz) dos segmentos PT_LOAD."""
+    loads = [h for h in loader.program_headers if h.type == PT_LOAD]
+    if not loads:
+        return 0, 0
+    return min(h.vaddr for h in loads) & ~0xFFF, max(h.vaddr + h.memsz for h in loads)
+
+def map_image(loader):
+    """
+    Imagem gravável dos segmentos PT_LOAD (bss zerado).
+    Retorna (vaddr inicial, bytearray); as correções são gravadas em vaddr - inicial.
+    """
+    start, end = _image_span(loader)
+    image = bytearray(end - start)
+    for header in loader.program_headers:
+        if header.type == PT_LOAD:
+            data = loader.elf_data[header.offset:header.offset + header.filesz]
+            image[header.vaddr - start:header.vaddr - start + len(data)] = data
+            data.release()
+    return start, image
+
+class Prelink:
+    """Resultado da pré-computação: bases fixas e correções finais por objeto."""
+
+    def __init__(self, bases):
+        self.bases = bases # {caminho: base de carga}
+        self.fixups = {} # {caminho: (vaddrs 'Q', larguras 'B', valores 'Q')}
+        self.unresolved = 0
+        self.deferred = 0 # Relocações que continuam para o ld.so (IRELATIVE, TLS, COPY)
+        self.from_cache = False
+
+    @property
+    def count(self):
+        return sum(len(vaddrs) for vaddrs, _, _ in self.fixups.values())
+
+    def apply(self, images):
+        """
+        Aplica todas as correções como um patch em lote.
+        images: {caminho: (vaddr inicial, buffer gravável)} (ver map_image)
+        """
+        applied = 0
+        for path, (vaddrs, widths, values) in self.fixups.items():
+            if path not in images or not vaddrs:
+                continue
+            start, buffer = images[path]
+            for width in (4, 8):
+                if np is not None:
+                    selected = np.frombuffer(widths, dtype=np.uint8) == width
+                    offsets = np.frombuffer(vaddrs, dtype=np.uint64)[selected].astype(np.int64) - start
+                    patch = np.frombuffer(values, dtype=np.uint64)[selected]
+                    if not len(offsets):
+                        continue
+                    image = np.frombuffer(buffer, dtype=np.uint8)
+                    dtype = '<u4' if width == 4 else '<u8'
+                    patch = (patch & ((1 << (8 * width)) - 1)).astype(dtype)
+                    image[offsets[:, None] + np.arange(width)] = patch.view(np.uint8).reshape(-1, width)
+                    applied += len(offsets)
+                else:
+                    record = _WIDTH_RECORDS[width]
+                    mask = (1 << (8 * width)) - 1
+                    for vaddr, fixup_width, value in zip(vaddrs, widths, values):
+                        if fixup_width == width:
+                            record.pack_into(buffer, vaddr - start, value & mask)
+                            applied += 1
+        return applied
+
+class PrelinkCache:
+    def __init__(self, cache_dir=None, use_cache=True, header_cache=None):
+        self.cache_dir = cache_dir or CACHE_DIR
+        # Cache de cabeçalhos repassado ao ELFLoader no caminho frio (independente deste cache)
+        self.use_cache = use_cache
+        self.header_cache = header_cache
+        self.hits = 0
+        self.misses = 0
+
+    def layout(self, graph, loaders):
+        """Bases fixas: executável no endereço de ligação (ou PIE_BASE), bibliotecas em sequência."""
+        bases = {}
+        next_base = LIBRARY_BASE
+        for path in graph.order:
+            loader = loaders[path]
+            start, end = _image_span(loader)
+            if loader.header.type == 2: # ET_EXEC: endereços absolutos
+                bases[path] = 0
+            elif path == graph.root:
+                bases[path] = PIE_BASE
+            else:
+                bases[path] = next_base - start
+                next_base += (end - start + BASE_ALIGNMENT - 1) // BASE_ALIGNMENT * BASE_ALIGNMENT
+        return bases
+
+    def _key(self, graph):
+        """Digest do grafo: ordem de carga e estado (tamanho, mtime, inode) de cada arquivo."""
+        digest = hashlib.sha1(f"v{CACHE_VERSION}".encode('utf-8'))
+        for path in graph.order:
+            digest.update(f"{path}|{graph.states[path]}\n".encode('utf-8'))
+        return digest.digest()
+
+    def _entry_path(self, graph):
+        return os.path.join(self.cache_dir, hashlib.sha1(graph.root.encode('utf-8')).hexdigest() + '.prelink')
+
+    def get(self, graph):
+        """Resultado em cache para o grafo, ou recalculado (e gravado) se algum arquivo mudou."""
+        key = self._key(graph)
+        prelink = self.load(graph, key)
+        if prelink is not None:
+            self.hits += 1
+            return prelink
+        self.misses += 1
+        prelink = self.compute(graph)
+        self.store(graph, key, prelink)
+        return prelink
+
+    def load(self, graph, key=None):
+        key = key if key is not None else self._key(graph)
+        try:
+            with open(self._entry_path(graph), 'rb') as f:
+                data = f.read()
+            magic, version, digest, objects, unresolved, deferred = _FILE_HEADER.unpack_from(data, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION or digest != key:
+                return None
+            offset = _FILE_HEADER.size
+            bases = {}
+            fixups = {}
+            for _ in range(objects):
+                base, path_size, count = _OBJECT_HEADER.unpack_from(data, offset)
+                offset += _OBJECT_HEADER.size
+                path = data[offset:offset + path_size].decode('utf-8')
+                offset += path_size
+                vaddrs = _words('Q', data[offset:offset + count * 8])
+                offset += count * 8
+                widths = _words('B', data[offset:offset + count])
+                offset += count
+                values = _words('Q', data[offset:offset + count * 8])
+                offset += count * 8
+                bases[path] = base
+                fixups[path] = (vaddrs, widths, values)
+        except (OSError, struct.error, UnicodeDecodeError, ValueError):
+            return None
+
+        prelink = Prelink(bases)
+        prelink.fixups = fixups
+        prelink.unresolved = unresolved
+        prelink.deferred = deferred
+        prelink.from_cache = True
+        return prelink
+
+    def store(self, graph, key, prelink):
+        chunks = [_FILE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, key, len(prelink.bases), prelink.unresolved, prelink.deferred)]
+        for path, base in prelink.bases.items():
+            vaddrs, widths, values = prelink.fixups.get(path, (array('Q'), array('B'), array('Q')))
+            encoded = path.encode('utf-8')
+            chunks.append(_OBJECT_HEADER.pack(base, len(encoded), len(vaddrs)))
+            chunks.append(encoded)
+            for words in (vaddrs, widths, values):
+                if sys.byteorder != 'little':
+                    words = array(words.typecode, words)
+                    words.byteswap()
+                chunks.append(words.tobytes())
+
+        # Escrita atômica: um leitor concorrente nunca vê um arquivo pela metade
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(chunks))
+            os.replace(temp_path, self._entry_path(graph))
+        except OSError as e:
+            print(f"Prelink Cache: Aviso - Não foi possível gravar o cache de {graph.root}: {e}")
+            return False
+        return True
+
+    def compute(self, graph):
+        """Resolve todas as relocações dinâmicas do grafo (caminho frio)."""
+        start = time.perf_counter()
+        loaders = {}
+        try:
+            for path in graph.order:
+                loader = ELFLoader(path, use_cache=self.use_cache, header_cache=self.header_cache)
+                if not loader.parse_headers():
+                    raise ValueError(f"{path} não é um ELF válido")
+                loaders[path] = loader
+            bases = self.layout(graph, loaders)
+            tables = {path: DynamicSymbolTable(loader) for path, loader in loaders.items()}
+            prelink = Prelink(bases)
+            scope = [(path, tables[path]) for path in graph.order] # Escopo global, na ordem de carga
+            resolved_symbols = {}
+
+            for path in graph.order:
+                prelink.fixups[path] = self._relocate_object(prelink, loaders[path], tables[path], bases[path],
+                                                             scope, resolved_symbols)
+        finally:
+            for loader in loaders.values():
+                loader.close()
+
+        print(f"  Prelink: {prelink.count} relocações resolvidas em {len(graph.order)} objetos "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms, {prelink.deferred} adiadas, "
+              f"{prelink.unresolved} símbolos não resolvidos).")
+        return prelink
+
+    def _relocations(self, loader):
+        """Gera (vaddr, tipo, índice do símbolo, addend ou None) de DT_RELA, DT_REL e DT_JMPREL."""
+        values = loader._dynamic_values
+        if loader.is_64bit:
+            rela, rel = struct.Struct('<QQq'), struct.Struct('<QQ')
+            split = lambda info: (info >> 32, info & 0xFFFFFFFF)
+        else:
+            rela, rel = struct.Struct('<LLl'), struct.Struct('<LL')
+            split = lambda info: (info >> 8, info & 0xFF)
+
+        tables = []
+        if values(DT_RELA) and values(DT_RELASZ):
+            tables.append((values(DT_RELA)[0], values(DT_RELASZ)[0], rela))
+        if values(DT_REL) and values(DT_RELSZ):
+            tables.append((values(DT_REL)[0], values(DT_RELSZ)[0], rel))
+        if values(DT_JMPREL) and values(DT_PLTRELSZ):
+            plt_format = rela if (values(DT_PLTREL) or [DT_RELA])[0] == DT_RELA else rel
+            tables.append((values(DT_JMPREL)[0], values(DT_PLTRELSZ)[0], plt_format))
+
+        for vaddr, size, record in tables:
+            offset = loader.vaddr_to_offset(vaddr)
+            if offset is None:
+                continue
+            count = min(size, len(loader.elf_data) - offset) // record.size
+            view = loader.elf_data[offset:offset + count * record.size]
+            try:
+                for entry in record.iter_unpack(view):
+                    symbol_index, reloc_type = split(entry[1])
+                    yield entry[0], reloc_type, symbol_index, entry[2] if record is rela else None
+            finally:
+                view.release()
+
+    def _implicit_addend(self, loader, vaddr, width):
+        """Addend de relocações REL: o valor já gravado no arquivo."""
+        offset = loader.vaddr_to_offset(vaddr)
+        if offset is None or offset + width > len(loader.elf_data):
+            return 0 # Dentro do bss
+        return _WIDTH_RECORDS[width].unpack_from(loader.elf_data, offset)[0]
+
+    def _resolve(self, table, symbol_index, scope, resolved_symbols):
+        """Endereço final do símbolo referenciado (busca no escopo global, como o ld.so)."""
+        symbol = table.symbol(symbol_index)
+        name = table.string(symbol.name)
+        version, _ = table.version_of(symbol_index)
+        key = (name, version)
+        if key not in resolved_symbols:
+            resolved_symbols[key] = None
+            for path, candidate in scope:
+                found = candidate.lookup(name, version)
+                if found is not None:
+                    resolved_symbols[key] = (path, found[1].value, found[1].info & 0xF)
+                    break
+        return symbol, resolved_symbols[key]
+
+    def _relocate_object(self, prelink, loader, table, base, scope, resolved_symbols):
+        types = _X86_64_TYPES if loader.machine == EM_X86_64 else _I386_TYPES
+        vaddrs, widths, values = array('Q'), array('B'), array('Q')
+        for vaddr, reloc_type, symbol_index, addend in self._relocations(loader):
+            if reloc_type == 0: # R_*_NONE
+                continue
+            if reloc_type not in types:
+                prelink.deferred += 1 # COPY, IRELATIVE e TLS continuam dinâmicos
+                continue
+            width, formula = types[reloc_type]
+            if addend is None:
+                addend = self._implicit_addend(loader, vaddr, width)
+                if reloc_type in (R_386_GLOB_DAT, R_386_JMP_SLOT):
+                    addend = 0 # O valor no arquivo é apenas o stub do PLT
+
+            if formula == 'B+A':
+                value = base + addend
+            else:
+                if symbol_index == 0:
+                    symbol_value = 0 # Símbolo nulo: S = 0
+                elif (table.symbol(symbol_index).info >> 4) == STB_LOCAL:
+                    # Símbolo local: resolve no próprio objeto
+                    symbol = table.symbol(symbol_index)
+                    if (symbol.info & 0xF) == STT_GNU_IFUNC:
+                        prelink.deferred += 1
+                        continue
+                    symbol_value = base + symbol.value
+                else:
+                    symbol, definition = self._resolve(table, symbol_index, scope, resolved_symbols)
+                    if definition is None:
+                        if (symbol.info >> 4) != STB_WEAK:
+                            prelink.unresolved += 1
+                        symbol_value = 0 # Fraco indefinido: S = 0, o valor final é A (ou A-P)
+                    elif definition[2] == STT_GNU_IFUNC:
+                        prelink.deferred += 1 # Como IRELATIVE: depende do resolvedor em tempo de carga
+                        continue
+                    else:
+                        symbol_value = prelink.bases[definition[0]] + definition[1]
+                value = symbol_value + addend
+                if formula == 'S+A-P':
+                    value -= base + vaddr
+            vaddrs.append(vaddr)
+            widths.append(width)
+            values.append(value & 0xFFFFFFFFFFFFFFFF)
+        return vaddrs, widths, values
+
+_shared_cache = None
+
+def get_prelink_cache():
+    """Retorna o cache de relocações padrão do motor."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PrelinkCache()
+    return _shared_cache
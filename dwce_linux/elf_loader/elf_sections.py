@@ -0,0 +1,198 @@
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+# Adiciona o DWCE Core ao PATH para importação dos registros binários
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dwce_core'))
+
+from binary_records.binary_records import record_type, RecordLayout
+
+# --- Seções e Tabelas de Símbolos ELF (streaming) ---
+# Os section headers são lidos sob demanda em uma única passada. As tabelas .symtab e
+# .dynsym são percorridas como geradores sobre o arquivo mapeado, em blocos de tamanho
+# fixo: a memória não cresce com o número de símbolos. Nomes só são decodificados da
+# tabela de strings quando acessados, e o índice endereço -> símbolo (para simbolizar
+# IPs amostrados pelo profiler) é montado apenas quando pedido, em arrays compactos.
+
+SHT_NULL = 0
+SHT_SYMTAB = 2
+SHT_STRTAB = 3
+SHT_DYNSYM = 11
+
+SHN_UNDEF = 0
+SHN_LORESERVE = 0xFF00
+SHN_XINDEX = 0xFFFF
+
+STT_OBJECT = 1
+STT_FUNC = 2
+
+SYMBOL_CHUNK = 4096 # Símbolos desempacotados por bloco
+
+SectionHeader = record_type('SectionHeader', ('name', 'type', 'flags', 'addr', 'offset', 'size',
+                                              'link', 'info', 'addralign', 'entsize'))
+ELF64_SECTION_HEADER = RecordLayout('<LLQQQQLLQQ', SectionHeader)
+ELF32_SECTION_HEADER = RecordLayout('<LLLLLLLLLL', SectionHeader)
+
+# Elf_Sym na ordem de cada classe: (st_name, st_value, st_size, st_info, st_other, st_shndx)
+_ELF64_SYMBOL = struct.Struct('<LBBHQQ')
+_ELF32_SYMBOL = struct.Struct('<LLLBBH')
+
+def parse_section_headers(loader):
+    """Tabela de section headers de um ELFLoader já analisado (vazia se não houver)."""
+    header = loader.header
+    if header is None or not header.shoff:
+        return []
+    layout = ELF64_SECTION_HEADER if loader.is_64bit else ELF32_SECTION_HEADER
+    if header.shentsize < layout.size:
+        raise ValueError("e_shentsize menor que o section header")
+    count = header.shnum
+    if count == 0:
+        # Numeração estendida: a quantidade real fica em sh_size da seção 0
+        count = layout.unpack_from(loader.elf_data, header.shoff).size
+    return layout.unpack_table(loader.elf_data, header.shoff, count, header.shentsize)
+
+class SymbolEntry:
+    """Símbolo de uma tabela; o nome é decodificado apenas no primeiro acesso."""
+    __slots__ = ('_table', 'index', 'name_offset', 'value', 'size', 'info', 'other', 'shndx', '_name')
+
+    def __init__(self, table, index, name_offset, value, size, info, other, shndx):
+        self._table = table
+        self.index = index
+        self.name_offset = name_offset
+        self.value = value
+        self.size = size
+        self.info = info
+        self.other = other
+        self.shndx = shndx
+        self._name = None
+
+    @property
+    def name(self):
+        if self._name is None:
+            self._name = self._table.string(self.name_offset)
+        return self._name
+
+    @property
+    def bind(self):
+        return self.info >> 4
+
+    @property
+    def type(self):
+        return self.info & 0xF
+
+    def __repr__(self):
+        return f"<SymbolEntry {self.name} {hex(self.value)} size={self.size}>"
+
+class SymbolTable:
+    """Tabela .symtab/.dynsym percorrida diretamente sobre o arquivo mapeado."""
+
+    def __init__(self, loader, section, strtab):
+        self.loader = loader
+        self.section = section
+        self.strtab = strtab # Section header da tabela de strings associada (sh_link)
+        self.record = _ELF64_SYMBOL if loader.is_64bit else _ELF32_SYMBOL
+        entsize = section.entsize or self.record.size
+        if entsize != self.record.size:
+            raise ValueError(f"sh_entsize inesperado para símbolos: {entsize}")
+        available = max(0, len(loader.elf_data) - section.offset) // self.record.size
+        self.count = min(section.size // self.record.size, available)
+
+    def __len__(self):
+        return self.count
+
+    def string(self, offset):
+        start = self.strtab.offset + offset
+        if offset >= self.strtab.size:
+            return None
+        end = self.loader._image.find(b'\x00', start, self.strtab.offset + self.strtab.size)
+        if end < 0:
+            end = self.strtab.offset + self.strtab.size
+        return bytes(self.loader.elf_data[start:end]).decode('utf-8', errors='replace')
+
+    def _rows(self, start=0):
+        """Tuplas (índice, campos...) desempacotadas em blocos de SYMBOL_CHUNK."""
+        is_64bit = self.loader.is_64bit
+        for chunk_start in range(start, self.count, SYMBOL_CHUNK):
+            chunk_end = min(chunk_start + SYMBOL_CHUNK, self.count)
+            offset = self.section.offset + chunk_start * self.record.size
+            view = self.loader.elf_data[offset:offset + (chunk_end - chunk_start) * self.record.size]
+            try:
+                for index, fields in enumerate(self.record.iter_unpack(view), chunk_start):
+                    if is_64bit:
+                        name, info, other, shndx, value, size = fields
+                    else:
+                        name, value, size, info, other, shndx = fields
+                    yield index, name, value, size, info, other, shndx
+            finally:
+                view.release()
+
+    def __iter__(self):
+        for row in self._rows(1): # A entrada 0 é sempre nula
+            yield SymbolEntry(self, *row)
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        fields = self.record.unpack_from(self.loader.elf_data, self.section.offset + index * self.record.size)
+        if self.loader.is_64bit:
+            name, info, other, shndx, value, size = fields
+        else:
+            name, value, size, info, other, shndx = fields
+        return SymbolEntry(self, index, name, value, size, info, other, shndx)
+
+class AddressIndex:
+    """
+    Índice de intervalos endereço -> símbolo (funções e objetos definidos).
+    Guarda apenas arrays paralelos (início, fim, tabela, índice), ordenados por endereço;
+    os nomes continuam na tabela de strings até a consulta.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        starts, sizes, owners, indexes = array('Q'), array('Q'), array('H'), array('I')
+        for table_number, table in enumerate(tables):
+            for index, _, value, size, info, _, shndx in table._rows(1):
+                if shndx == SHN_UNDEF or value == 0 or (info & 0xF) not in (STT_FUNC, STT_OBJECT):
+                    continue
+                starts.append(value)
+                sizes.append(size)
+                owners.append(table_number)
+                indexes.append(index)
+
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        self.starts = array('Q', (starts[i] for i in order))
+        self.owners = array('H', (owners[i] for i in order))
+        self.indexes = array('I', (indexes[i] for i in order))
+        # Símbolos sem tamanho vão até o próximo endereço inicial distinto (aliases não contam)
+        self.ends = array('Q', (starts[i] + sizes[i] for i in order))
+        for position in range(len(order)):
+            if self.ends[position] == self.starts[position]:
+                following = bisect_right(self.starts, self.starts[position])
+                self.ends[position] = self.starts[following] if following < len(order) else self.starts[position] + 1
+        # Maior fim até cada posição: limita a busca por intervalos que envolvem o endereço
+        self.max_ends = array('Q', accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lookup(self, address):
+        """Símbolo que contém o endereço, ou None."""
+        position = bisect_right(self.starts, address) - 1
+        # Volta pelos inícios anteriores enquanto algum intervalo ainda pode conter o endereço:
+        # o primeiro encontrado é o mais interno (símbolos aninhados ou aliases)
+        while position >= 0 and self.max_ends[position] > address:
+            if address < self.ends[position]:
+                return self.tables[self.owners[position]][self.indexes[position]]
+            position -= 1
+        return None
+
+    def symbolize(self, address):
+        """'nome+0xdeslocamento' no formato de backtraces, ou None."""
+        symbol = self.lookup(address)
+        if symbol is None:
+            return None
+        offset = address - symbol.value
+        return f"{symbol.name}+{hex(offset)}" if offset else symbol.name
@@ -0,0 +1,274 @@
+import os
+import struct
+import sys
+from array import array
+
+# Adiciona o DWCE Core ao PATH para importação dos registros binários
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dwce_core'))
+
+from binary_records.binary_records import record_type, RecordLayout
+
+# --- Tabela de Símbolos Dinâmicos (DT_GNU_HASH / DT_HASH) ---
+# Resolve símbolos exportados exatamente como o ld.so: o filtro de Bloom do GNU hash
+# rejeita a maioria das consultas sem tocar na tabela, e só então o bucket e a cadeia
+# são percorridos comparando o hash antes do nome. Versões de símbolos (DT_VERSYM /
+# DT_VERDEF) são respeitadas, incluindo versões ocultas (símbolo@VERSÃO).
+
+DT_HASH = 4
+DT_STRTAB = 5
+DT_SYMTAB = 6
+DT_STRSZ = 10
+DT_SYMENT = 11
+DT_GNU_HASH = 0x6FFFFEF5
+DT_VERSYM = 0x6FFFFFF0
+DT_VERDEF = 0x6FFFFFFC
+DT_VERDEFNUM = 0x6FFFFFFD
+DT_VERNEED = 0x6FFFFFFE
+DT_VERNEEDNUM = 0x6FFFFFFF
+
+SHN_UNDEF = 0
+STB_LOCAL = 0
+STT_TLS = 6
+
+VER_NDX_LOCAL = 0
+VER_NDX_GLOBAL = 1
+VERSYM_HIDDEN = 0x8000
+VER_FLG_BASE = 0x1
+
+Symbol = record_type('Symbol', ('name', 'value', 'size', 'info', 'other', 'shndx'))
+ELF64_SYMBOL = RecordLayout('<LBBHQQ', Symbol, ('name', 'info', 'other', 'shndx', 'value', 'size'))
+ELF32_SYMBOL = RecordLayout('<LLLBBH', Symbol)
+
+_VERDEF = struct.Struct('<HHHHLLL') # vd_version, vd_flags, vd_ndx, vd_cnt, vd_hash, vd_aux, vd_next
+_VERDAUX = struct.Struct('<LL') # vda_name, vda_next
+_VERNEED = struct.Struct('<HHLLL') # vn_version, vn_cnt, vn_file, vn_aux, vn_next
+_VERNAUX = struct.Struct('<LHHLL') # vna_hash, vna_flags, vna_other, vna_name, vna_next
+
+def gnu_hash(name):
+    """Hash DJB usado pelo DT_GNU_HASH (name em bytes)."""
+    h = 5381
+    for c in name:
+        h = (h * 33 + c) & 0xFFFFFFFF
+    return h
+
+def elf_hash(name):
+    """Hash SysV clássico do DT_HASH (também usado em vd_hash)."""
+    h = 0
+    for c in name:
+        h = ((h << 4) + c) & 0xFFFFFFFF
+        g = h & 0xF0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g
+    return h
+
+def _words(data, offset, count, typecode):
+    """Copia um vetor de palavras little-endian do binário (nenhuma view fica presa ao mmap)."""
+    words = array(typecode)
+    if count:
+        words.frombytes(data[offset:offset + count * words.itemsize])
+        if sys.byteorder != 'little':
+            words.byteswap()
+    return words
+
+class DynamicSymbolTable:
+    def __init__(self, loader):
+        self.loader = loader
+        self.layout = ELF64_SYMBOL if loader.is_64bit else ELF32_SYMBOL
+        self.symtab = None # Offset de .dynsym no arquivo
+        self.strtab = None # Offset de .dynstr no arquivo
+        self.strsz = 0
+        self.count = 0
+        self.gnu = None # (nbuckets, symoffset, bloom_shift, bloom, buckets, chain)
+        self.sysv = None # (buckets, chains)
+        self.versym = None # Índice de versão por símbolo
+        self.versions = {} # {índice: (nome, hash)} de DT_VERDEF
+        self.needed_versions = {} # {índice: (nome, hash)} exigidos via DT_VERNEED
+        self.lookups = 0
+        self.bloom_rejects = 0
+        self._parse()
+
+    def _offset(self, tag):
+        values = self.loader._dynamic_values(tag)
+        return self.loader.vaddr_to_offset(values[0]) if values else None
+
+    def _parse(self):
+        data = self.loader.elf_data
+        self.symtab = self._offset(DT_SYMTAB)
+        self.strtab = self._offset(DT_STRTAB)
+        strsz = self.loader._dynamic_values(DT_STRSZ)
+        self.strsz = strsz[0] if strsz else 0
+        if self.symtab is None or self.strtab is None:
+            return
+
+        syment = self.loader._dynamic_values(DT_SYMENT)
+        if syment and syment[0] != self.layout.size:
+            raise ValueError(f"DT_SYMENT inesperado: {syment[0]}")
+
+        word = 'Q' if self.loader.is_64bit else 'I'
+        offset = self._offset(DT_GNU_HASH)
+        if offset is not None and offset + 16 <= len(data):
+            nbuckets, symoffset, bloom_size, bloom_shift = struct.unpack_from('<4L', data, offset)
+            bloom = _words(data, offset + 16, bloom_size, word)
+            buckets_offset = offset + 16 + bloom_size * bloom.itemsize
+            buckets = _words(data, buckets_offset, nbuckets, 'I')
+            # A cadeia não declara o tamanho: termina no último símbolo do maior bucket
+            last = max(buckets) if buckets else 0
+            chain_offset = buckets_offset + nbuckets * 4
+            if last >= symoffset:
+                while chain_offset + (last - symoffset + 1) * 4 <= len(data):
+                    if struct.unpack_from('<L', data, chain_offset + (last - symoffset) * 4)[0] & 1:
+                        break
+                    last += 1
+                self.count = last + 1
+            else:
+                self.count = symoffset
+            chain = _words(data, chain_offset, max(0, self.count - symoffset), 'I')
+            if bloom_size and nbuckets:
+                self.gnu = (nbuckets, symoffset, bloom_shift, bloom, buckets, chain)
+
+        offset = self._offset(DT_HASH)
+        if offset is not None and offset + 8 <= len(data):
+            nbucket, nchain = struct.unpack_from('<LL', data, offset)
+            buckets = _words(data, offset + 8, nbucket, 'I')
+            chains = _words(data, offset + 8 + nbucket * 4, nchain, 'I')
+            if nbucket:
+                self.sysv = (buckets, chains)
+            self.count = max(self.count, nchain) # DT_HASH declara o total de símbolos
+
+        offset = self._offset(DT_VERSYM)
+        if offset is not None:
+            self.versym = _words(data, offset, self.count, 'H')
+        self._parse_verdef()
+        self._parse_verneed()
+
+    def _parse_verdef(self):
+        offset = self._offset(DT_VERDEF)
+        count = self.loader._dynamic_values(DT_VERDEFNUM)
+        if offset is None or not count:
+            return
+        data = self.loader.elf_data
+        for _ in range(count[0]):
+            if offset + _VERDEF.size > len(data):
+                break
+            _, flags, ndx, cnt, vd_hash, aux, next_offset = _VERDEF.unpack_from(data, offset)
+            if cnt and not flags & VER_FLG_BASE:
+                name = self.string(_VERDAUX.unpack_from(data, offset + aux)[0])
+                self.versions[ndx] = (name, vd_hash)
+            if not next_offset:
+                break
+            offset += next_offset
+
+    def _parse_verneed(self):
+        offset = self._offset(DT_VERNEED)
+        count = self.loader._dynamic_values(DT_VERNEEDNUM)
+        if offset is None or not count:
+            return
+        data = self.loader.elf_data
+        for _ in range(count[0]):
+            if offset + _VERNEED.size > len(data):
+                break
+            _, cnt, _, aux, next_offset = _VERNEED.unpack_from(data, offset)
+            aux_offset = offset + aux
+            for _ in range(cnt):
+                if aux_offset + _VERNAUX.size > len(data):
+                    break
+                vna_hash, _, other, name, aux_next = _VERNAUX.unpack_from(data, aux_offset)
+                self.needed_versions[other] = (self.string(name), vna_hash)
+                if not aux_next:
+                    break
+                aux_offset += aux_next
+            if not next_offset:
+                break
+            offset += next_offset
+
+    def __len__(self):
+        return self.count
+
+    def string(self, string_offset):
+        start = self.strtab + string_offset
+        end = self.loader._image.find(b'\x00', start)
+        if end < 0:
+            return None
+        return bytes(self.loader.elf_data[start:end]).decode('utf-8', errors='replace')
+
+    def _name_matches(self, index, encoded):
+        """Compara o nome do símbolo sem decodificá-lo."""
+        start = self.strtab + self.symbol(index).name
+        data = self.loader.elf_data
+        return data[start:start + len(encoded)] == encoded and \
+            start + len(encoded) < len(data) and data[start + len(encoded)] == 0
+
+    def symbol(self, index):
+        return self.layout.unpack_from(self.loader.elf_data, self.symtab + index * self.layout.size)
+
+    def version_of(self, index):
+        """(nome_da_versão, oculta) do símbolo, ou (None, False) sem versionamento."""
+        if self.versym is None or index >= len(self.versym):
+            return None, False
+        ndx = self.versym[index]
+        version = self.versions.get(ndx & ~VERSYM_HIDDEN) or self.needed_versions.get(ndx & ~VERSYM_HIDDEN)
+        return (version[0] if version else None), bool(ndx & VERSYM_HIDDEN)
+
+    def _accept(self, index, version, version_hash):
+        """Filtro do ld.so: definido, não local e com a versão pedida (ou a padrão)."""
+        symbol = self.symbol(index)
+        if symbol.shndx == SHN_UNDEF or (symbol.info >> 4) == STB_LOCAL:
+            return False
+        if symbol.value == 0 and (symbol.info & 0xF) != STT_TLS:
+            return False
+        if self.versym is None or index >= len(self.versym):
+            return True
+        ndx = self.versym[index]
+        if version is None:
+            # Referência sem versão: apenas a definição padrão (não oculta) é visível
+            return not ndx & VERSYM_HIDDEN
+        defined = self.versions.get(ndx & ~VERSYM_HIDDEN)
+        if defined is None:
+            return (ndx & ~VERSYM_HIDDEN) == VER_NDX_GLOBAL
+        return defined[1] == version_hash and defined[0] == version
+
+    def lookup(self, name, version=None, use_gnu=True):
+        """
+        Procura um símbolo definido. name pode trazer a versão ('memcpy@GLIBC_2.2.5').
+        Retorna (índice, Symbol) ou None.
+        """
+        if self.symtab is None:
+            return None
+        if version is None and '@' in name:
+            name, _, version = name.partition('@')
+            version = version.lstrip('@')
+        encoded = name.encode('utf-8')
+        version_hash = elf_hash(version.encode('utf-8')) if version is not None else None
+        self.lookups += 1
+
+        if self.gnu is not None and use_gnu:
+            nbuckets, symoffset, bloom_shift, bloom, buckets, chain = self.gnu
+            h = gnu_hash(encoded)
+            bits = bloom.itemsize * 8
+            word = bloom[(h // bits) % len(bloom)]
+            mask = (1 << (h % bits)) | (1 << ((h >> bloom_shift) % bits))
+            if word & mask != mask:
+                self.bloom_rejects += 1
+                return None
+            index = buckets[h % nbuckets]
+            if index < symoffset:
+                return None
+            while index - symoffset < len(chain):
+                chain_hash = chain[index - symoffset]
+                if (chain_hash | 1) == (h | 1) and self._name_matches(index, encoded) \
+                        and self._accept(index, version, version_hash):
+                    return index, self.symbol(index)
+                if chain_hash & 1:
+                    break # Fim da cadeia deste bucket
+                index += 1
+            return None
+
+        if self.sysv is not None:
+            buckets, chains = self.sysv
+            index = buckets[elf_hash(encoded) % len(buckets)]
+            while index and index < len(chains):
+                if self._name_matches(index, encoded) and self._accept(index, version, version_hash):
+                    return index, self.symbol(index)
+                index = chains[index]
+        return None
@@ -0,0 +1,72 @@
+import importlib
+import inspect
+import os
+import sys
+
+# Adiciona a camada Windows (dwce_windows) ao PATH para importar os shims das DLLs
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Índice de Exports (dll!símbolo -> shim Python) ---
+# Em vez de procurar função por função a cada import, o índice é montado uma única vez
+# por instância do motor e compartilhado por todos os módulos PE carregados.
+# A resolução da IAT vira apenas consultas em dicionário.
+
+# DLL emulada -> módulo Python que implementa seus exports
+SHIM_MODULES = {
+    "kernel32.dll": "win32_api.kernel32",
+    "user32.dll": "win32_api.user32",
+    "ntdll.dll": "ntdll.ntdll",
+}
+
+class ExportIndex:
+    def __init__(self, shim_modules=None):
+        self.shim_modules = shim_modules if shim_modules is not None else SHIM_MODULES
+        self.exports = {} # {"dll!símbolo": função} e {"dll!#ordinal": função}
+        self.dlls = set()
+        self._build()
+
+    def _build(self):
+        """Importa cada módulo de shim e registra suas funções públicas."""
+        for dll_name, module_name in self.shim_modules.items():
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                print(f"Export Index: Aviso - Shim de {dll_name} indisponível: {e}")
+                continue
+
+            dll_name = dll_name.lower()
+            self.dlls.add(dll_name)
+            for symbol, function in inspect.getmembers(module, inspect.isfunction):
+                # Apenas funções definidas no próprio shim (ignora imports auxiliares)
+                if symbol.startswith('_') or function.__module__ != module.__name__:
+                    continue
+                self.exports[f"{dll_name}!{symbol}"] = function
+
+            # Exports por ordinal são opcionais: o shim declara ORDINAL_EXPORTS = {ordinal: nome}
+            for ordinal, symbol in getattr(module, 'ORDINAL_EXPORTS', {}).items():
+                function = self.exports.get(f"{dll_name}!{symbol}")
+                if function is not None:
+                    self.exports[f"{dll_name}!#{ordinal}"] = function
+
+    def lookup(self, dll_name, symbol):
+        """Resolve um import por nome. Retorna None se a DLL/símbolo não for emulado."""
+        return self.exports.get(f"{dll_name.lower()}!{symbol}")
+
+    def lookup_ordinal(self, dll_name, ordinal):
+        """Resolve um import por ordinal."""
+        return self.exports.get(f"{dll_name.lower()}!#{ordinal}")
+
+    def __len__(self):
+        return len(self.exports)
+
+    def __contains__(self, key):
+        return key in self.exports
+
+_shared_index = None
+
+def get_export_index():
+    """Retorna o índice compartilhado do motor, construindo-o na primeira chamada."""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = ExportIndex()
+    return _shared_index
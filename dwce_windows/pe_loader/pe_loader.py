@@ -1,38 +1,93 @@
 import struct
 import os
+import sys
 import mmap
 
+# Executado como script, o diretório deste arquivo (sys.path[0]) esconderia o pacote pe_loader
+if __name__ == "__main__" and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+    del sys.path[0]
+
+# Adiciona a camada Windows (dwce_windows) e o DWCE Core ao PATH para importação
+_WINDOWS_LAYER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(_WINDOWS_LAYER)
+sys.path.append(os.path.join(os.path.dirname(_WINDOWS_LAYER), 'dwce_core'))
+
+from pe_loader.export_index import get_export_index
+from pe_loader.pe_relocations import get_relocation_engine
+from pe_loader.pe_sections import SectionMap, SectionRegion
+from pe_loader.pe_resources import ResourceIndex
+from header_cache.header_cache import get_header_cache, STRINGS_FORMAT
+from binary_records.binary_records import record_type, RecordLayout
+
 # --- Constantes PE (Simplificadas) ---
 IMAGE_DOS_SIGNATURE = b'MZ'
 IMAGE_NT_SIGNATURE = b'PE\x00\x00'
 IMAGE_FILE_MACHINE_I386 = 0x014c
 IMAGE_FILE_MACHINE_AMD64 = 0x8664
 
+# Índices do Data Directory
+IMAGE_DIRECTORY_ENTRY_IMPORT = 1
+IMAGE_DIRECTORY_ENTRY_DELAY_IMPORT = 13
+IMAGE_NUMBEROF_DIRECTORY_ENTRIES = 16
+
+IMAGE_FILE_RELOCS_STRIPPED = 0x0001
+
+IMAGE_ORDINAL_FLAG32 = 0x80000000
+IMAGE_ORDINAL_FLAG64 = 0x8000000000000000
+
+# --- Registros de cabeçalho (layouts pré-compilados) ---
+FileHeader = record_type('FileHeader', ('machine', 'number_of_sections', 'time_date_stamp', 'pointer_to_symbol_table',
+                                        'number_of_symbols', 'size_of_optional_header', 'characteristics'))
+FILE_HEADER = RecordLayout('<HHLLLHH', FileHeader)
+
+class SectionHeader(record_type('SectionHeader', ('raw_name', 'virtual_size', 'virtual_address', 'size_of_raw_data',
+                                                  'pointer_to_raw_data', 'pointer_to_relocations', 'pointer_to_linenumbers',
+                                                  'number_of_relocations', 'number_of_linenumbers', 'characteristics'))):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.raw_name.rstrip(b'\x00').decode('utf-8', errors='ignore')
+
+SECTION_HEADER = RecordLayout('<8sLLLLLLHHL', SectionHeader) # IMAGE_SECTION_HEADER (40 bytes)
+
+# Layouts das tabelas gravadas no Header Cache
+_CACHE_HEADER_FORMAT = '<LBHHLLQH' # nt_header_offset, is_64bit, seções, SizeOfOptionalHeader, início da tabela de seções, entry point, ImageBase, subsistema
+_CACHE_IMPORT_FORMAT = '<LLHLB' # índice da dll, índice do nome (NO_NAME = por ordinal), ordinal, RVA na IAT, delay-load
+_CACHE_NO_NAME = 0xFFFFFFFF
+
 class PELoader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_mmap=True, export_index=None, use_cache=True, header_cache=None,
+                 lazy_sections=False, max_resident_bytes=None):
         self.file_path = file_path
+        self.use_mmap = use_mmap # Acesso zero-copy via mmap + memoryview
+        self.use_cache = use_cache # Reaproveita cabeçalhos analisados em execuções anteriores
+        self.header_cache = header_cache # None -> cache padrão do motor
         self.pe_data = None
         self.dos_header = None
         self.nt_headers = None
         self.file_header = None
         self.optional_header = None
         self.section_headers = []
+        # Modo lazy: cada seção é uma região virtual materializada apenas no primeiro acesso
+        self.lazy_sections = lazy_sections
+        self.section_views = SectionMap(max_resident_bytes) # {nome_da_seção: conteúdo (memoryview)}
         self.is_64bit = False
+        self.entry_point = 0
+        self.image_base = 0
+        self.subsystem = 0
+        self.data_directories = [] # [(rva, tamanho)]
+        self.imports = [] # [{'dll', 'name', 'ordinal', 'iat_rva', 'delay'}]
+        self.iat = {} # {rva_da_entrada_na_IAT: shim Python}
+        self.unresolved_imports = []
+        self.export_index = export_index # None -> índice compartilhado do motor
+        self._resources = None # Índice de recursos, montado no primeiro acesso
+        self._mmap = None
+        self._image = None # Objeto base (mmap ou bytes) para buscas como find()
 
     def load(self):
         """Carrega e valida o arquivo PE."""
-        try:
-            with open(self.file_path, 'rb') as f:
-                self.pe_data = f.read()
-        except FileNotFoundError:
-            print(f"Erro: Arquivo não encontrado em {self.file_path}")
-            return False
-
-        if not self._parse_dos_header():
-            return False
-        if not self._parse_nt_headers():
-            return False
-        if not self._parse_section_headers():
+        if not self.parse_headers():
             return False
         
         print(f"PE Loader: Arquivo {self.file_path} carregado com sucesso.")
@@ -46,20 +101,158 @@ class PELoader:
         
         return True
 
+    def parse_headers(self):
+        """
+        Abre a imagem e analisa apenas cabeçalhos, seções e imports (sem mapeamento nem
+        saída de console), para ferramentas que só precisam de metadados.
+        """
+        if not self._open_image():
+            return False
+
+        if not self._load_cached_headers():
+            if not self._parse_dos_header():
+                return False
+            if not self._parse_nt_headers():
+                return False
+            if not self._parse_section_headers():
+                return False
+            if not self._parse_import_directories():
+                return False
+            self._store_cached_headers()
+        return True
+
+    def _open_image(self):
+        """
+        Abre o executável. No modo mmap a imagem nunca é lida inteira para a memória:
+        todo acesso a cabeçalhos e seções passa por fatias de memoryview sobre o mapeamento,
+        então a latência e o pico de RSS não crescem com o tamanho do arquivo.
+        """
+        try:
+            f = open(self.file_path, 'rb')
+        except FileNotFoundError:
+            print(f"Erro: Arquivo não encontrado em {self.file_path}")
+            return False
+
+        with f:
+            if self.use_mmap:
+                try:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    # Arquivos vazios (ou não mapeáveis) voltam para a leitura tradicional
+                    self._mmap = None
+            self._image = self._mmap if self._mmap is not None else f.read()
+            self.pe_data = memoryview(self._image)
+        return True
+
+    def _get_cache(self):
+        if not self.use_cache:
+            return None
+        return self.header_cache if self.header_cache is not None else get_header_cache()
+
+    def _load_cached_headers(self):
+        """Restaura os cabeçalhos do Header Cache. Em um acerto nenhuma análise do PE é feita."""
+        cache = self._get_cache()
+        cached = cache.load('pe', self.file_path) if cache is not None else None
+        if cached is None:
+            return False
+
+        try:
+            (self.nt_header_offset, is_64bit, self.number_of_sections, self.size_of_optional_header,
+             self.section_header_start, self.entry_point, self.image_base, self.subsystem) = cached['header'][0]
+            self.is_64bit = bool(is_64bit)
+            self.file_header = FileHeader._make(cached['file_header'][0])
+            self.data_directories = list(cached['directories'])
+            self.section_headers = list(SECTION_HEADER.iter_records(cached['sections']))
+            strings = cached['strings']
+            self.imports = [{
+                'dll': strings[dll_index],
+                'name': strings[name_index] if name_index != _CACHE_NO_NAME else None,
+                'ordinal': ordinal if name_index == _CACHE_NO_NAME else None,
+                'iat_rva': iat_rva,
+                'delay': bool(delay)
+            } for dll_index, name_index, ordinal, iat_rva, delay in cached['imports']]
+        except (KeyError, IndexError, TypeError):
+            return False
+        finally:
+            cached.close()
+
+        optional_header_offset = self.section_header_start - self.size_of_optional_header
+        optional_header_size = 240 if self.is_64bit else 224
+        self.optional_header = self.pe_data[optional_header_offset:optional_header_offset + optional_header_size]
+        return True
+
+    def _store_cached_headers(self):
+        """Grava os cabeçalhos analisados no Header Cache para as próximas execuções."""
+        cache = self._get_cache()
+        if cache is None:
+            return
+
+        strings = {}
+        def intern(value):
+            return strings.setdefault(value, len(strings))
+
+        imports = []
+        for entry in self.imports:
+            name_index = intern(entry['name']) if entry['name'] is not None else _CACHE_NO_NAME
+            imports.append((intern(entry['dll']), name_index, entry['ordinal'] or 0, entry['iat_rva'], entry['delay']))
+
+        cache.store('pe', self.file_path, {
+            'header': (_CACHE_HEADER_FORMAT, [(self.nt_header_offset, self.is_64bit, self.number_of_sections,
+                                              self.size_of_optional_header, self.section_header_start,
+                                              self.entry_point, self.image_base, self.subsystem)]),
+            'file_header': (FILE_HEADER.struct.format, [self.file_header]),
+            'directories': ('<LL', self.data_directories),
+            'sections': (SECTION_HEADER.struct.format, self.section_headers),
+            'imports': (_CACHE_IMPORT_FORMAT, imports),
+            'strings': (STRINGS_FORMAT, list(strings)),
+        })
+
+    @property
+    def resources(self):
+        """Índice da árvore de recursos (.rsrc), percorrida uma única vez por imagem."""
+        if self._resources is None:
+            self._resources = ResourceIndex(self)
+        return self._resources
+
+    def close(self):
+        """Libera as views das seções e o mapeamento do arquivo."""
+        self._resources = None
+        self.section_views.release()
+        if self.optional_header is not None:
+            self.optional_header.release()
+            self.optional_header = None
+        if self.pe_data is not None:
+            self.pe_data.release()
+            self.pe_data = None
+        self._image = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Algum chamador ainda guarda uma view de seção ou de recurso; o GC libera o mapeamento
+                pass
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _parse_dos_header(self):
         """Analisa o cabeçalho DOS e verifica a assinatura 'MZ'."""
-        if self.pe_data[:2] != IMAGE_DOS_SIGNATURE:
+        if len(self.pe_data) < 0x40 or self.pe_data[:2] != IMAGE_DOS_SIGNATURE:
             print("Erro: Assinatura DOS 'MZ' inválida.")
             return False
         
         # e_lfanew (offset para o cabeçalho NT) está no offset 0x3C
-        self.nt_header_offset = struct.unpack('<L', self.pe_data[0x3C:0x40])[0]
+        self.nt_header_offset = struct.unpack_from('<L', self.pe_data, 0x3C)[0]
         return True
 
     def _parse_nt_headers(self):
         """Analisa o cabeçalho NT e verifica a assinatura 'PE\x00\x00'."""
         nt_signature = self.pe_data[self.nt_header_offset:self.nt_header_offset + 4]
-        if nt_signature != IMAGE_NT_SIGNATURE:
+        if nt_signature != IMAGE_NT_SIGNATURE or len(self.pe_data) < self.nt_header_offset + 24:
             print("Erro: Assinatura NT 'PE\\x00\\x00' inválida.")
             return False
         
@@ -67,10 +260,9 @@ class PELoader:
         file_header_offset = self.nt_header_offset + 4
         
         # O File Header tem 20 bytes. O campo Machine (2 bytes) está no offset 4 do File Header.
-        file_header_data = self.pe_data[file_header_offset:file_header_offset + 20]
-        self.file_header = struct.unpack('<HHLLLHH', file_header_data)
+        self.file_header = FILE_HEADER.unpack_from(self.pe_data, file_header_offset)
         
-        machine = self.file_header[0]
+        machine = self.file_header.machine
         if machine == IMAGE_FILE_MACHINE_AMD64:
             self.is_64bit = True
             optional_header_size = 240 # IMAGE_OPTIONAL_HEADER64
@@ -85,85 +277,230 @@ class PELoader:
         optional_header_offset = file_header_offset + 20
         self.optional_header = self.pe_data[optional_header_offset:optional_header_offset + optional_header_size]
         
-        self.number_of_sections = self.file_header[2]
-        self.size_of_optional_header = self.file_header[6]
+        self.number_of_sections = self.file_header.number_of_sections
+        self.size_of_optional_header = self.file_header.size_of_optional_header
         
         self.section_header_start = optional_header_offset + self.size_of_optional_header
         
+        return self._parse_optional_header(optional_header_offset)
+
+    def _parse_optional_header(self, offset):
+        """Extrai ponto de entrada, ImageBase, subsistema e o Data Directory."""
+        if self.is_64bit:
+            # PE32+: ImageBase é QWORD e o Data Directory começa em +112
+            layout, directory_offset = '<16xL4xQ36xH38xL', 112
+        else:
+            layout, directory_offset = '<16xL8xL36xH22xL', 96
+
+        if offset + directory_offset > len(self.pe_data):
+            print("Erro: Optional Header truncado.")
+            return False
+        self.entry_point, self.image_base, self.subsystem, number_of_rva_and_sizes = struct.unpack_from(layout, self.pe_data, offset)
+
+        # O número de entradas declarado não pode ultrapassar o tamanho real do Optional Header
+        available = min(self.size_of_optional_header - directory_offset,
+                        len(self.pe_data) - offset - directory_offset) // 8
+        count = max(0, min(number_of_rva_and_sizes, IMAGE_NUMBEROF_DIRECTORY_ENTRIES, available))
+        directories = struct.unpack_from(f'<{count * 2}L', self.pe_data, offset + directory_offset)
+        self.data_directories = list(zip(directories[0::2], directories[1::2]))
         return True
 
+    def _get_data_directory(self, index):
+        """Retorna (rva, tamanho) de uma entrada do Data Directory, ou (0, 0)."""
+        if index < len(self.data_directories):
+            return self.data_directories[index]
+        return (0, 0)
+
+    def _rva_to_offset(self, rva):
+        """Converte um RVA para offset no arquivo usando a tabela de seções."""
+        for section in self.section_headers:
+            start = section.virtual_address
+            if start <= rva < start + max(section.virtual_size, section.size_of_raw_data):
+                delta = rva - start
+                if delta >= section.size_of_raw_data:
+                    return None # Dentro da seção, mas na parte sem dados no arquivo (bss)
+                return section.pointer_to_raw_data + delta
+        # RVAs abaixo da primeira seção apontam para os cabeçalhos, mapeados 1:1
+        if rva < len(self.pe_data) and all(rva < s.virtual_address for s in self.section_headers):
+            return rva
+        return None
+
+    def _read_cstring(self, rva):
+        """Lê uma string ASCII terminada em zero a partir de um RVA."""
+        offset = self._rva_to_offset(rva)
+        if offset is None:
+            return None
+        end = self._image.find(b'\x00', offset)
+        if end < 0:
+            end = len(self.pe_data)
+        return bytes(self.pe_data[offset:end]).decode('ascii', errors='replace')
+
     def _parse_section_headers(self):
         """Analisa os cabeçalhos de seção."""
-        offset = self.section_header_start
-        for i in range(self.number_of_sections):
-            # Cada cabeçalho de seção tem 40 bytes
-            section_data = self.pe_data[offset:offset + 40]
-            
-            # Campos importantes: Name (8), VirtualSize (4), VirtualAddress (4), SizeOfRawData (4), PointerToRawData (4)
-            # Formato de unpack simplificado para os campos principais
-            name = section_data[:8].decode('utf-8', errors='ignore').strip('\x00')
-            virtual_size, virtual_address, size_of_raw_data, pointer_to_raw_data = struct.unpack('<LLLL', section_data[8:24])
-            
-            self.section_headers.append({
+        # A tabela inteira (40 bytes por seção) sai de uma única passada de iter_unpack
+        try:
+            self.section_headers = SECTION_HEADER.unpack_table(self.pe_data, self.section_header_start, self.number_of_sections)
+        except ValueError:
+            print("Erro: Tabela de seções truncada.")
+            return False
+        return True
+
+    def _parse_import_directories(self):
+        """Percorre os descritores de import (normais e delay-load) do Data Directory."""
+        self.imports = []
+
+        # IMAGE_IMPORT_DESCRIPTOR: OriginalFirstThunk, TimeDateStamp, ForwarderChain, Name, FirstThunk
+        rva, size = self._get_data_directory(IMAGE_DIRECTORY_ENTRY_IMPORT)
+        if rva:
+            offset = self._rva_to_offset(rva)
+            while offset is not None and offset + 20 <= len(self.pe_data):
+                original_first_thunk, _, _, name_rva, first_thunk = struct.unpack_from('<LLLLL', self.pe_data, offset)
+                if name_rva == 0 and first_thunk == 0:
+                    break # Descritor nulo termina a tabela
+                self._parse_thunks(name_rva, original_first_thunk or first_thunk, first_thunk, delay=False)
+                offset += 20
+
+        # ImgDelayDescr: Attributes, DllNameRVA, ModuleHandleRVA, ImportAddressTableRVA,
+        # ImportNameTableRVA, BoundImportAddressTableRVA, UnloadInformationTableRVA, TimeDateStamp
+        rva, size = self._get_data_directory(IMAGE_DIRECTORY_ENTRY_DELAY_IMPORT)
+        if rva:
+            offset = self._rva_to_offset(rva)
+            while offset is not None and offset + 32 <= len(self.pe_data):
+                attributes, name_rva, _, iat_rva, int_rva = struct.unpack_from('<LLLLL', self.pe_data, offset)
+                if name_rva == 0:
+                    break
+                if not attributes & 1:
+                    # Formato antigo (VC6): os campos são VAs em vez de RVAs
+                    name_rva, iat_rva, int_rva = (name_rva - self.image_base, iat_rva - self.image_base,
+                                                  int_rva - self.image_base)
+                self._parse_thunks(name_rva, int_rva, iat_rva, delay=True)
+                offset += 32
+        return True
+
+    def _parse_thunks(self, name_rva, lookup_rva, iat_rva, delay):
+        """Lê a Import Lookup Table de uma DLL (por nome ou por ordinal)."""
+        dll_name = self._read_cstring(name_rva)
+        offset = self._rva_to_offset(lookup_rva)
+        if dll_name is None or offset is None:
+            return
+
+        if self.is_64bit:
+            thunk_format, thunk_size, ordinal_flag = '<Q', 8, IMAGE_ORDINAL_FLAG64
+        else:
+            thunk_format, thunk_size, ordinal_flag = '<L', 4, IMAGE_ORDINAL_FLAG32
+
+        index = 0
+        while offset + thunk_size <= len(self.pe_data):
+            thunk = struct.unpack_from(thunk_format, self.pe_data, offset)[0]
+            if thunk == 0:
+                break
+            if thunk & ordinal_flag:
+                name, ordinal = None, thunk & 0xFFFF
+            else:
+                # IMAGE_IMPORT_BY_NAME: Hint (2 bytes) seguido do nome
+                name, ordinal = self._read_cstring((thunk & 0x7FFFFFFF) + 2), None
+            self.imports.append({
+                'dll': dll_name,
                 'name': name,
-                'virtual_size': virtual_size,
-                'virtual_address': virtual_address,
-                'size_of_raw_data': size_of_raw_data,
-                'pointer_to_raw_data': pointer_to_raw_data
+                'ordinal': ordinal,
+                'iat_rva': iat_rva + index * thunk_size,
+                'delay': delay
             })
-            offset += 40
-        return True
+            offset += thunk_size
+            index += 1
 
     def _map_sections(self):
-        """Simula o mapeamento das seções na memória virtual do Winlinos."""
+        """Registra as seções como regiões virtuais do Winlinos (materializadas já ou sob demanda)."""
         print("\n--- Mapeamento de Seções ---")
         for section in self.section_headers:
-            # Em um SO real, usaríamos mmap ou alocação de memória virtual
-            # Aqui, apenas simulamos o processo
+            # Calcula o tamanho dos dados vindos do arquivo (o menor entre VirtualSize e SizeOfRawData)
+            map_size = min(section.virtual_size or section.size_of_raw_data, section.size_of_raw_data)
+            if max(map_size, section.virtual_size) == 0:
+                continue
             
-            # Calcula o tamanho real a ser mapeado (o menor entre VirtualSize e SizeOfRawData)
-            map_size = min(section['virtual_size'], section['size_of_raw_data'])
+            # Conteúdo da seção no arquivo: uma view sobre a imagem, sem cópia
+            start = min(section.pointer_to_raw_data, len(self.pe_data))
+            raw_data = self.pe_data[start:start + map_size]
+            region = SectionRegion(section.name, section.virtual_address, section.virtual_size, raw_data)
+            self.section_views.add(region)
             
-            if map_size > 0:
-                # Simulação de alocação de memória no endereço virtual (VirtualAddress)
-                # O conteúdo é copiado de PointerToRawData
-                
-                # Conteúdo da seção no arquivo
-                raw_data = self.pe_data[section['pointer_to_raw_data']:section['pointer_to_raw_data'] + map_size]
-                
-                # Ação: Alocar e copiar 'raw_data' para o endereço 'virtual_address'
-                print(f"  Mapeando seção '{section['name']}' ({map_size} bytes) para VA: {hex(section['virtual_address'])}")
-                
-                # Exemplo de como o código seria executado a partir daqui
-                if section['name'] == '.text':
-                    print("  Seção .text (Código) mapeada. Ponto de entrada pronto para execução.")
+            if self.lazy_sections:
+                print(f"  Região virtual '{section.name}' ({region.size} bytes) registrada em VA: {hex(section.virtual_address)}")
+                continue
+            
+            # Ação: Alocar e copiar 'raw_data' para o endereço 'virtual_address'
+            self.section_views.materialize(region.index)
+            print(f"  Mapeando seção '{section.name}' ({region.size} bytes) para VA: {hex(section.virtual_address)}")
+            
+            # Exemplo de como o código seria executado a partir daqui
+            if section.name == '.text':
+                print("  Seção .text (Código) mapeada. Ponto de entrada pronto para execução.")
+
+    def relocate(self, new_base, engine=None):
+        """
+        Rebase da imagem para new_base aplicando o diretório .reloc.
+        Apenas as seções que recebem correções ganham uma cópia gravável; as demais
+        continuam como views sobre o arquivo. Em regiões ainda não materializadas as
+        correções ficam pendentes e são aplicadas no primeiro acesso.
+        """
+        delta = new_base - self.image_base
+        if delta == 0:
+            return True
+        if self.file_header.characteristics & IMAGE_FILE_RELOCS_STRIPPED:
+            print(f"Erro: {os.path.basename(self.file_path)} não possui relocações e não pode ser movido de {hex(self.image_base)}.")
+            return False
+
+        engine = engine if engine is not None else get_relocation_engine()
+        pages = engine.parse(self)
+        # Delta em relação ao conteúdo do arquivo, usado quando uma região é rematerializada
+        file_image_base = getattr(self, '_file_image_base', self.image_base)
+        self._file_image_base = file_image_base
+
+        module_name = os.path.basename(self.file_path)
+        pending = 0
+        for region in self.section_views.regions:
+            start = region.virtual_address
+            region_pages = {page: entries for page, entries in pages.items() if start <= page < start + region.size}
+            if not region_pages:
+                continue
+            if not region.resident:
+                pending += 1
+            region.apply_relocation(engine, module_name, region_pages, delta, new_base - file_image_base)
+
+        fixups = sum(len(offsets) for page in pages.values() for offsets in page.values())
+        print(f"  Relocação: {fixups} correções ({hex(self.image_base)} -> {hex(new_base)}), "
+              f"{pending} regiões com correções pendentes.")
+        self.image_base = new_base
+        return True
 
     def _resolve_imports(self):
-        """Simula a resolução de funções importadas (Import Address Table - IAT)."""
+        """Resolve a Import Address Table (IAT) contra o índice de exports do motor."""
         print("\n--- Resolução de Imports (IAT) ---")
         
-        # Em um PE real, buscaríamos a Data Directory Entry para Imports
-        # Para simulação, assumimos que precisamos de kernel32.dll e user32.dll
-        
-        required_dlls = ["kernel32.dll", "user32.dll", "gdi32.dll"]
+        index = self.export_index if self.export_index is not None else get_export_index()
+        self.iat = {}
+        self.unresolved_imports = []
         
-        for dll in required_dlls:
-            print(f"  Carregando biblioteca de compatibilidade: {dll}")
-            
-            # Em um SO real, isso chamaria o LoadLibrary do nosso sistema
-            # Ex: handle = LoadLibrary(dll)
+        # Resumo por DLL: {dll: [resolvidos, total]}
+        summary = {}
+        for entry in self.imports:
+            if entry['name'] is not None:
+                function = index.lookup(entry['dll'], entry['name'])
+            else:
+                function = index.lookup_ordinal(entry['dll'], entry['ordinal'])
             
-            # Simulação de resolução de funções
-            if dll == "kernel32.dll":
-                functions = ["CreateProcessA", "ExitProcess", "GetSystemInfo"]
-            elif dll == "user32.dll":
-                functions = ["MessageBoxA", "CreateWindowExA"]
+            counts = summary.setdefault(entry['dll'], [0, 0])
+            counts[1] += 1
+            if function is not None:
+                self.iat[entry['iat_rva']] = function
+                counts[0] += 1
             else:
-                functions = []
+                self.unresolved_imports.append(entry)
                 
-            for func in functions:
-                print(f"    Resolvendo: {func} -> Endereço de compatibilidade Winlinos")
-                # Ex: address = GetProcAddress(handle, func)
+        for dll, (resolved, total) in summary.items():
+            print(f"  Carregando biblioteca de compatibilidade: {dll} ({resolved}/{total} funções resolvidas)")
+        if self.unresolved_imports:
+            print(f"  Aviso: {len(self.unresolved_imports)} imports sem implementação Winlinos.")
                 
         print("\nPE Loader pronto para iniciar a execução.")
 
@@ -0,0 +1,143 @@
+import struct
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # Sem NumPy as correções são aplicadas uma a uma com structs pré-compiladas
+    np = None
+
+# --- Motor de Relocação Base (.reloc) ---
+# Quando uma imagem não pode ser carregada no ImageBase preferido, cada ponteiro absoluto
+# listado no diretório de relocação precisa ser corrigido pelo delta entre as bases.
+# As correções são agrupadas por página/seção e aplicadas em lote com NumPy sobre um
+# buffer gravável, e o motor registra custo e quantidade de correções por módulo.
+
+IMAGE_DIRECTORY_ENTRY_BASERELOC = 5
+
+IMAGE_REL_BASED_ABSOLUTE = 0 # Preenchimento, ignorado
+IMAGE_REL_BASED_HIGHLOW = 3 # Ponteiro de 32 bits
+IMAGE_REL_BASED_DIR64 = 10 # Ponteiro de 64 bits
+
+_HIGHLOW = struct.Struct('<L')
+_DIR64 = struct.Struct('<Q')
+
+def _parse_entries(entries):
+    """Converte as entradas (WORD) de um bloco em arrays de tipo e offset na página."""
+    if np is not None:
+        words = np.frombuffer(entries, dtype='<u2')
+        return words >> 12, words & 0xFFF
+    words = array('H')
+    words.frombytes(entries)
+    if sys.byteorder != 'little':
+        words.byteswap()
+    return [w >> 12 for w in words], [w & 0xFFF for w in words]
+
+class RelocationEngine:
+    def __init__(self):
+        self.stats = {} # {módulo: {'fixups': n, 'pages': n, 'seconds': s}}
+
+    def parse(self, loader):
+        """
+        Percorre os blocos IMAGE_BASE_RELOCATION de uma imagem.
+        Retorna {rva_da_página: {tipo: offsets}} com os offsets em ordem crescente.
+        """
+        rva, size = loader._get_data_directory(IMAGE_DIRECTORY_ENTRY_BASERELOC)
+        offset = loader._rva_to_offset(rva) if rva else None
+        if offset is None:
+            return {}
+
+        data = loader.pe_data
+        end = min(offset + size, len(data))
+        pages = {}
+        while offset + 8 <= end:
+            page_rva, block_size = struct.unpack_from('<LL', data, offset)
+            if block_size < 8:
+                break # Bloco inválido termina a tabela
+            count = (min(offset + block_size, end) - offset - 8) // 2
+            types, offsets = _parse_entries(data[offset + 8:offset + 8 + count * 2])
+
+            page = pages.setdefault(page_rva, {})
+            for reloc_type in (IMAGE_REL_BASED_HIGHLOW, IMAGE_REL_BASED_DIR64):
+                if np is not None:
+                    selected = offsets[types == reloc_type]
+                else:
+                    selected = [o for t, o in zip(types, offsets) if t == reloc_type]
+                if len(selected):
+                    page.setdefault(reloc_type, []).append(selected)
+            offset += block_size
+
+        # Uma mesma página pode aparecer em mais de um bloco: concatena e ordena
+        for page in pages.values():
+            for reloc_type, chunks in page.items():
+                if np is not None:
+                    page[reloc_type] = np.sort(np.concatenate(chunks))
+                else:
+                    page[reloc_type] = sorted(o for chunk in chunks for o in chunk)
+        return pages
+
+    def apply(self, module_name, sections, pages, delta):
+        """
+        Aplica as correções sobre os buffers graváveis das seções.
+        sections: [(virtual_address, buffer_gravável)]
+        pages: resultado de parse()
+        """
+        start = time.perf_counter()
+        fixups = 0
+
+        for virtual_address, buffer in sections:
+            section_end = virtual_address + len(buffer)
+            for reloc_type, width, record in ((IMAGE_REL_BASED_HIGHLOW, 4, _HIGHLOW), (IMAGE_REL_BASED_DIR64, 8, _DIR64)):
+                # Junta os offsets de todas as páginas da seção, relativos ao início da seção
+                groups = [(page_rva - virtual_address, page[reloc_type]) for page_rva, page in pages.items()
+                          if reloc_type in page and virtual_address <= page_rva < section_end]
+                if not groups:
+                    continue
+                if np is not None:
+                    offsets = np.concatenate([np.asarray(o, dtype=np.int64) + base for base, o in groups])
+                    offsets = offsets[offsets + width <= len(buffer)]
+                    self._patch_vectorized(buffer, offsets, width, delta)
+                else:
+                    offsets = [base + o for base, group in groups for o in group if base + o + width <= len(buffer)]
+                    self._patch_scalar(buffer, offsets, record, delta)
+                fixups += len(offsets)
+
+        stats = self.stats.setdefault(module_name, {'fixups': 0, 'pages': 0, 'seconds': 0.0})
+        stats['fixups'] += fixups
+        stats['pages'] += len(pages)
+        stats['seconds'] += time.perf_counter() - start
+        return fixups
+
+    def _patch_vectorized(self, buffer, offsets, width, delta):
+        """Lê todos os ponteiros de uma vez, soma o delta e grava de volta (módulo 2^bits)."""
+        image = np.frombuffer(buffer, dtype=np.uint8)
+        dtype = '<u4' if width == 4 else '<u8'
+        index = offsets[:, None] + np.arange(width)
+        values = np.ascontiguousarray(image[index]).view(dtype).reshape(-1)
+        values += np.array(delta % (1 << (8 * width)), dtype=dtype)
+        image[index] = values.view(np.uint8).reshape(-1, width)
+
+    def _patch_scalar(self, buffer, offsets, record, delta):
+        mask = (1 << (8 * record.size)) - 1
+        for offset in offsets:
+            record.pack_into(buffer, offset, (record.unpack_from(buffer, offset)[0] + delta) & mask)
+
+    def report(self):
+        """Mostra o custo de rebase por módulo, do mais caro para o mais barato."""
+        print("\n--- Relatório de Relocação ---")
+        ranking = sorted(self.stats.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        for module_name, stats in ranking:
+            print(f"  {module_name}: {stats['fixups']} correções em {stats['pages']} páginas, "
+                  f"{stats['seconds'] * 1000:.3f} ms")
+        return ranking
+
+_shared_engine = None
+
+def get_relocation_engine():
+    """Retorna o motor de relocação compartilhado (estatísticas de todo o processo)."""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = RelocationEngine()
+    return _shared_engine
@@ -0,0 +1,302 @@
+import struct
+
+# --- Índice de Recursos PE (.rsrc) ---
+# A árvore de recursos (tipo -> nome -> idioma) é percorrida uma única vez, lendo apenas
+# os nós de diretório. As folhas (version info, manifesto, tabelas de strings, ícones)
+# só são decodificadas quando consultadas, direto do buffer da imagem, e o resultado
+# fica memorizado: consultas repetidas não releem a árvore nem os dados.
+
+IMAGE_DIRECTORY_ENTRY_RESOURCE = 2
+
+# Tipos de recurso predefinidos (RT_*)
+RT_ICON = 3
+RT_STRING = 6
+RT_GROUP_ICON = 14
+RT_VERSION = 16
+RT_MANIFEST = 24
+
+_RESOURCE_DIRECTORY = struct.Struct('<LLHHHH') # Characteristics, TimeDateStamp, Major, Minor, NamedEntries, IdEntries
+_RESOURCE_DIRECTORY_ENTRY = struct.Struct('<LL') # Name/Id, OffsetToData (bit alto = subdiretório)
+_RESOURCE_DATA_ENTRY = struct.Struct('<LLLL') # OffsetToData (RVA), Size, CodePage, Reserved
+_GROUP_ICON_ENTRY = struct.Struct('<BBBBHHLH') # Width, Height, ColorCount, Reserved, Planes, BitCount, BytesInRes, Id
+_FIXED_FILE_INFO = struct.Struct('<13L')
+
+_SUBDIRECTORY_FLAG = 0x80000000
+_VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+
+class ResourceIndex:
+    def __init__(self, loader):
+        self.loader = loader
+        self.entries = {} # {(tipo, nome, idioma): {'rva', 'size', 'codepage'}}
+        self._languages = {} # {(tipo, nome): [idiomas]}
+        self._names = {} # {tipo: {nome: None}} (conjunto ordenado: consulta O(1) por folha)
+        self._decoded = {} # Folhas já decodificadas
+        self.decodes = 0 # Quantidade de decodificações de folhas (consultas memorizadas não contam)
+        self._build()
+
+    def _build(self):
+        """Percorre os três níveis de diretório registrando cada folha."""
+        rva, size = self.loader._get_data_directory(IMAGE_DIRECTORY_ENTRY_RESOURCE)
+        base = self.loader._rva_to_offset(rva) if rva else None
+        if base is None:
+            return
+        self._base = base
+        self._end = min(base + size, len(self.loader.pe_data))
+        visited = set()
+
+        for type_id, type_offset in self._walk_directory(0, visited):
+            if type_offset is None:
+                continue
+            for name, name_offset in self._walk_directory(type_offset, visited):
+                if name_offset is None:
+                    continue
+                for lang, leaf_offset in self._walk_directory(name_offset, visited, leaves=True):
+                    if leaf_offset is None or leaf_offset + _RESOURCE_DATA_ENTRY.size > self._end:
+                        continue
+                    data_rva, data_size, codepage, _ = _RESOURCE_DATA_ENTRY.unpack_from(self.loader.pe_data, leaf_offset)
+                    self.entries[(type_id, name, lang)] = {'rva': data_rva, 'size': data_size, 'codepage': codepage}
+                    self._languages.setdefault((type_id, name), []).append(lang)
+                    self._names.setdefault(type_id, {})[name] = None
+
+    def _walk_directory(self, relative_offset, visited, leaves=False):
+        """
+        Gera (id_ou_nome, offset_absoluto_do_filho) das entradas de um diretório.
+        O filho é None quando não é do tipo esperado (subdiretório ou folha).
+        """
+        offset = self._base + relative_offset
+        if relative_offset in visited or offset + _RESOURCE_DIRECTORY.size > self._end:
+            return # Árvores cíclicas ou truncadas são ignoradas
+        visited.add(relative_offset)
+
+        named, ids = _RESOURCE_DIRECTORY.unpack_from(self.loader.pe_data, offset)[4:]
+        offset += _RESOURCE_DIRECTORY.size
+        for _ in range(named + ids):
+            if offset + _RESOURCE_DIRECTORY_ENTRY.size > self._end:
+                return
+            name, child = _RESOURCE_DIRECTORY_ENTRY.unpack_from(self.loader.pe_data, offset)
+            offset += _RESOURCE_DIRECTORY_ENTRY.size
+            key = self._read_name(name & 0x7FFFFFFF) if name & _SUBDIRECTORY_FLAG else name
+            is_subdirectory = bool(child & _SUBDIRECTORY_FLAG)
+            if is_subdirectory == leaves:
+                yield key, None
+            elif leaves:
+                yield key, self._base + child
+            else:
+                yield key, child & 0x7FFFFFFF
+
+    def _read_name(self, relative_offset):
+        """IMAGE_RESOURCE_DIR_STRING_U: tamanho (em caracteres) seguido de UTF-16LE."""
+        offset = self._base + relative_offset
+        if offset + 2 > self._end:
+            return None
+        length = struct.unpack_from('<H', self.loader.pe_data, offset)[0]
+        return bytes(self.loader.pe_data[offset + 2:offset + 2 + length * 2]).decode('utf-16-le', errors='replace')
+
+    # --- Consultas ---
+
+    def names(self, type_id):
+        """Nomes/IDs registrados para um tipo de recurso."""
+        return list(self._names.get(type_id, ()))
+
+    def languages(self, type_id, name):
+        return list(self._languages.get((type_id, name), ()))
+
+    def find(self, type_id, name=None, lang=None):
+        """
+        Localiza uma folha por (tipo, nome, idioma). Sem nome, usa o primeiro do tipo;
+        sem idioma (ou se o pedido não existir), o primeiro idioma disponível.
+        Retorna (chave, entrada) ou None.
+        """
+        if name is None:
+            names = self._names.get(type_id)
+            if not names:
+                return None
+            name = next(iter(names))
+        entry = self.entries.get((type_id, name, lang)) if lang is not None else None
+        if entry is not None:
+            return (type_id, name, lang), entry
+        languages = self._languages.get((type_id, name))
+        if not languages:
+            return None
+        key = (type_id, name, languages[0])
+        return key, self.entries[key]
+
+    def data(self, type_id, name=None, lang=None):
+        """Dados brutos de uma folha: memoryview sobre a imagem (sem cópia), ou None."""
+        found = self.find(type_id, name, lang)
+        return self._leaf_data(found[1]) if found is not None else None
+
+    def _leaf_data(self, entry):
+        offset = self.loader._rva_to_offset(entry['rva'])
+        if offset is None:
+            return None
+        return self.loader.pe_data[offset:offset + entry['size']]
+
+    def _decode(self, kind, type_id, name, lang, decoder):
+        """Decodifica uma folha uma única vez por (tipo de decodificação, chave)."""
+        found = self.find(type_id, name, lang)
+        if found is None:
+            return None
+        key, entry = found
+        memo_key = (kind,) + key
+        if memo_key not in self._decoded:
+            data = self._leaf_data(entry)
+            self.decodes += 1
+            try:
+                self._decoded[memo_key] = decoder(data) if data is not None else None
+            except (struct.error, UnicodeDecodeError, ValueError):
+                self._decoded[memo_key] = None # Recurso malformado
+            finally:
+                if data is not None:
+                    data.release()
+        return self._decoded[memo_key]
+
+    # --- Decodificadores de folhas ---
+
+    def manifest(self, name=None, lang=None):
+        """Manifesto de aplicação (RT_MANIFEST) como texto."""
+        return self._decode('manifest', RT_MANIFEST, name, lang,
+                            lambda data: bytes(data).decode('utf-8-sig', errors='replace'))
+
+    def version_info(self, lang=None):
+        """
+        VS_VERSIONINFO decodificado: versões do VS_FIXEDFILEINFO, tabelas StringFileInfo
+        e traduções declaradas em VarFileInfo.
+        """
+        return self._decode('version', RT_VERSION, None, lang, _parse_version_info)
+
+    def string(self, string_id, lang=None):
+        """
+        Uma string de RT_STRING. As strings são agrupadas em blocos de 16:
+        o bloco de string_id tem nome (string_id // 16) + 1.
+        """
+        table = self._decode('string', RT_STRING, string_id // 16 + 1, lang, _parse_string_block)
+        if table is None:
+            return None
+        return table[string_id % 16] or None
+
+    def icons(self, name=None, lang=None):
+        """Entradas de um grupo de ícones (RT_GROUP_ICON), cada uma apontando para um RT_ICON."""
+        return self._decode('group_icon', RT_GROUP_ICON, name, lang, _parse_group_icon)
+
+    def icon_file(self, name=None, lang=None):
+        """Monta um arquivo .ico completo a partir de um grupo de ícones e suas imagens."""
+        group = self.icons(name, lang)
+        if not group:
+            return None
+        images = []
+        for icon in group:
+            data = self.data(RT_ICON, icon['id'], lang)
+            if data is not None:
+                images.append((icon, bytes(data)))
+                data.release()
+
+        header = struct.pack('<HHH', 0, 1, len(images))
+        offset = 6 + 16 * len(images)
+        directory, payload = [], []
+        for icon, image in images:
+            directory.append(struct.pack('<BBBBHHLL', icon['width'] & 0xFF, icon['height'] & 0xFF,
+                                         icon['color_count'], 0, icon['planes'], icon['bit_count'],
+                                         len(image), offset))
+            payload.append(image)
+            offset += len(image)
+        return header + b''.join(directory) + b''.join(payload)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+def _parse_string_block(data):
+    """Bloco RT_STRING: 16 strings, cada uma com tamanho (WORD, em caracteres) + UTF-16LE."""
+    strings = []
+    offset = 0
+    for _ in range(16):
+        if offset + 2 > len(data):
+            strings.append('')
+            continue
+        length = struct.unpack_from('<H', data, offset)[0]
+        offset += 2
+        strings.append(bytes(data[offset:offset + length * 2]).decode('utf-16-le'))
+        offset += length * 2
+    return strings
+
+def _parse_group_icon(data):
+    """GRPICONDIR (Reserved, Type, Count) seguido de GRPICONDIRENTRY de 14 bytes."""
+    _, _, count = struct.unpack_from('<HHH', data, 0)
+    icons = []
+    for index in range(count):
+        width, height, color_count, _, planes, bit_count, size, icon_id = \
+            _GROUP_ICON_ENTRY.unpack_from(data, 6 + index * _GROUP_ICON_ENTRY.size)
+        icons.append({
+            'width': width or 256, # 0 significa 256 pixels
+            'height': height or 256,
+            'color_count': color_count,
+            'planes': planes,
+            'bit_count': bit_count,
+            'size': size,
+            'id': icon_id
+        })
+    return icons
+
+def _align4(offset):
+    return (offset + 3) & ~3
+
+def _parse_version_block(data, offset):
+    """
+    Lê o cabeçalho de um bloco da árvore VS_VERSIONINFO:
+    wLength, wValueLength, wType, szKey (UTF-16, terminado em zero), alinhado a 32 bits.
+    Retorna (chave, offset_do_valor, tamanho_do_valor_em_unidades, tipo, fim_do_bloco).
+    """
+    length, value_length, value_type = struct.unpack_from('<HHH', data, offset)
+    if length < 6:
+        raise ValueError("bloco de versão inválido")
+    end = min(offset + length, len(data))
+    key_start = offset + 6
+    key_end = key_start
+    while key_end + 2 <= end and data[key_end:key_end + 2] != b'\x00\x00':
+        key_end += 2
+    key = bytes(data[key_start:key_end]).decode('utf-16-le')
+    return key, _align4(key_end + 2), value_length, value_type, end
+
+def _children(data, start, end):
+    offset = _align4(start)
+    while offset + 6 <= end:
+        block = _parse_version_block(data, offset)
+        yield block
+        offset = _align4(block[4])
+
+def _version_string(ms, ls):
+    return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+
+def _parse_version_info(data):
+    key, value_offset, value_length, _, end = _parse_version_block(data, 0)
+    if key != 'VS_VERSION_INFO':
+        raise ValueError("recurso de versão sem VS_VERSION_INFO")
+
+    info = {'file_version': None, 'product_version': None, 'file_flags': 0, 'file_os': 0,
+            'file_type': 0, 'strings': {}, 'translations': []}
+    if value_length >= _FIXED_FILE_INFO.size:
+        fixed = _FIXED_FILE_INFO.unpack_from(data, value_offset)
+        if fixed[0] == _VS_FIXEDFILEINFO_SIGNATURE:
+            info['file_version'] = _version_string(fixed[2], fixed[3])
+            info['product_version'] = _version_string(fixed[4], fixed[5])
+            info['file_flags'] = fixed[7] & fixed[6] # dwFileFlags & dwFileFlagsMask
+            info['file_os'] = fixed[8]
+            info['file_type'] = fixed[9]
+
+    for child_key, child_value, _, _, child_end in _children(data, value_offset + value_length, end):
+        if child_key == 'StringFileInfo':
+            # StringTable por idioma/codepage ("040904b0") -> String (chave, valor)
+            for table_key, table_value, _, _, table_end in _children(data, child_value, child_end):
+                strings = info['strings'].setdefault(table_key, {})
+                for name, value_start, chars, _, _ in _children(data, table_value, table_end):
+                    value = bytes(data[value_start:value_start + chars * 2]).decode('utf-16-le')
+                    strings[name] = value.rstrip('\x00')
+        elif child_key == 'VarFileInfo':
+            for var_key, var_value, var_length, _, _ in _children(data, child_value, child_end):
+                if var_key == 'Translation':
+                    pairs = struct.unpack_from(f'<{var_length // 2}H', data, var_value)
+                    info['translations'].extend(zip(pairs[0::2], pairs[1::2]))
+    return info
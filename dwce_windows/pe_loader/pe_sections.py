@@ -0,0 +1,164 @@
+from collections import OrderedDict
+
+# --- Regiões Virtuais de Seção (materialização sob demanda) ---
+# Cada seção do PE é registrada como uma região virtual. O conteúdo só é materializado
+# no primeiro acesso: uma view direta sobre o arquivo quando possível, ou uma cópia
+# privada quando a seção precisa de preenchimento com zeros (bss) ou de relocações.
+# Regiões residentes podem ser descartadas sob pressão de memória e rematerializadas depois.
+# Descartar só solta a referência do mapa: views já entregues a chamadores continuam
+# válidas (mantêm o buffer vivo) e a próxima materialização cria um buffer novo.
+
+class SectionRegion:
+    def __init__(self, name, virtual_address, virtual_size, raw_view):
+        self.name = name
+        self.index = None # Posição na tabela de seções (atribuída pelo SectionMap)
+        self.virtual_address = virtual_address
+        # Seções com VirtualSize zero (alguns linkers) usam o tamanho dos dados brutos
+        self.size = virtual_size or len(raw_view)
+        self.raw_view = raw_view # memoryview sobre o arquivo (nunca copiada)
+        self.buffer = None # Conteúdo materializado (memoryview)
+        self.materializations = 0
+        self.accesses = 0
+        self.relocation = None # (motor, módulo, páginas, delta total) aplicado a cada materialização
+
+    @property
+    def resident(self):
+        return self.buffer is not None
+
+    def materialize(self):
+        """Retorna o conteúdo da seção, materializando-o no primeiro acesso."""
+        self.accesses += 1
+        if self.buffer is not None:
+            return self.buffer
+
+        self.materializations += 1
+        if self.relocation is None and len(self.raw_view) >= self.size:
+            # Caso comum: a seção é exatamente o trecho do arquivo -> zero-copy
+            self.buffer = self.raw_view[:self.size]
+        else:
+            private = bytearray(self.size)
+            data_size = min(len(self.raw_view), self.size)
+            private[:data_size] = self.raw_view[:data_size]
+            if self.relocation is not None:
+                engine, module_name, pages, delta = self.relocation
+                engine.apply(module_name, [(self.virtual_address, private)], pages, delta)
+            self.buffer = memoryview(private)
+        return self.buffer
+
+    def apply_relocation(self, engine, module_name, pages, delta, total_delta):
+        """
+        Registra as correções de relocação da região. Se ela já estiver residente,
+        aplica o delta incremental agora; caso contrário, na próxima materialização.
+        Uma região residente somente leitura (view do arquivo) ganha uma cópia privada; views
+        dela já entregues continuam mostrando o conteúdo do arquivo.
+        """
+        self.relocation = (engine, module_name, pages, total_delta)
+        if self.buffer is None:
+            return
+        if self.buffer.readonly:
+            self.buffer = memoryview(bytearray(self.buffer))
+        engine.apply(module_name, [(self.virtual_address, self.buffer.obj)], pages, delta)
+
+    def drop(self):
+        """Descarta o conteúdo materializado (será reconstruído no próximo acesso)."""
+        self.buffer = None
+
+    def release(self):
+        self.drop()
+        self.raw_view.release()
+
+class SectionMap:
+    """
+    Regiões na ordem da tabela de seções. O acesso por nome (interface de dicionário)
+    materializa a primeira seção com aquele nome; nomes repetidos continuam acessíveis
+    pelo índice na tabela.
+    """
+
+    def __init__(self, max_resident_bytes=None):
+        self.regions = [] # SectionRegion, na ordem da tabela de seções
+        self._by_name = {} # {nome: primeira região com o nome}
+        self.max_resident_bytes = max_resident_bytes # None -> sem limite
+        self._recent = OrderedDict() # {índice: região} residentes, da menos para a mais recentemente usada
+
+    def add(self, region):
+        region.index = len(self.regions)
+        self.regions.append(region)
+        self._by_name.setdefault(region.name, region)
+
+    def region(self, key):
+        """Região por nome (a primeira com o nome) ou por índice na tabela de seções."""
+        return self.regions[key] if isinstance(key, int) else self._by_name[key]
+
+    def __getitem__(self, name):
+        return self.materialize(name)
+
+    def materialize(self, key):
+        """Materializa a região (se preciso) e a marca como a mais recentemente usada."""
+        region = self.region(key)
+        buffer = region.materialize()
+        self._recent[region.index] = region
+        self._recent.move_to_end(region.index)
+        if self.max_resident_bytes is not None:
+            self.trim(self.max_resident_bytes, keep=region.index)
+        return buffer
+
+    def get(self, name, default=None):
+        return self[name] if name in self._by_name else default
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self._by_name)
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def keys(self):
+        return self._by_name.keys()
+
+    def values(self):
+        """
+        Conteúdo de cada seção, materializado só quando a iteração chega nela: com
+        max_resident_bytes, as seções já percorridas podem ser descartadas no caminho.
+        """
+        return (self[name] for name in self._by_name)
+
+    def items(self):
+        """(nome, conteúdo) de cada seção, materializados sob demanda como em values()."""
+        return ((name, self[name]) for name in self._by_name)
+
+    @property
+    def resident_bytes(self):
+        return sum(region.size for region in self.regions if region.resident)
+
+    def trim(self, max_resident_bytes, keep=None):
+        """Descarta as regiões usadas há mais tempo até caber no orçamento de memória."""
+        resident = self.resident_bytes
+        for index in list(self._recent):
+            if resident <= max_resident_bytes:
+                break
+            if index == keep:
+                continue
+            region = self._recent.pop(index)
+            resident -= region.size
+            region.drop()
+        return resident
+
+    def stats(self):
+        """Contadores de materialização por seção (nomes repetidos como 'nome#índice')."""
+        stats = {}
+        for region in self.regions:
+            key = region.name if self._by_name[region.name] is region else f"{region.name}#{region.index}"
+            stats[key] = {'size': region.size,
+                          'resident': region.resident,
+                          'materializations': region.materializations,
+                          'accesses': region.accesses}
+        return stats
+
+    def release(self):
+        for region in self.regions:
+            region.release()
+        self.regions.clear()
+        self._by_name.clear()
+        self._recent.clear()
@@ -1,7 +1,12 @@
 import os
 import sys
-import timefrom ...dwce_core.process_manager.process_manager import ProcessManager # Assumindo a criação futura do ProcessManager
-from ...dwce_core.syscall_unified.syscall_unified import translate_win_syscall # Para tradução de syscalls
+import time
+
+# Adiciona o DWCE Core ao PATH para importação (mesmo esquema da suíte de testes)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dwce_core'))
+
+from process_manager.process_manager import ProcessManager # Assumindo a criação futura do ProcessManager
+from syscall_unified.syscall_unified import translate_win_syscall # Para tradução de syscalls
 
 # --- Implementação da API kernel32.dll (Core System) ---
 
@@ -2,18 +2,654 @@ import os
 import sys
 import time
 import subprocess
+import struct
+import tempfile
+import hashlib
+import zlib
+import zipfile
+import shutil
+import mmap
+import io
+import json
+import contextlib
+from array import array
 
 # Importar os módulos principais para teste
 sys.path.append(os.path.join(os.path.dirname(__file__), 'dwce_core'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'dwce_windows'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'dwce_android'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'dwce_linux'))
 
 from process_manager.process_manager import ProcessManager
 from syscall_unified.syscall_unified import translate_win_syscall, translate_android_syscall
 from pe_loader.pe_loader import PELoader
+from elf_loader.elf_loader import ELFLoader, ProgramHeader, ELF32_PROGRAM_HEADER
+from elf_loader.elf_dependencies import DependencyResolver, SonameIndex
+from elf_loader.elf_relocations import PrelinkCache, map_image, PIE_BASE, LIBRARY_BASE
 from art_runtime.art_runtime import ART_Runtime
+from dex_loader.dex_loader import DEXLoader, DEX_HEADER
+from dex_loader.dex_multidex import MultiDexLoader
+from dex_loader.dex_class_index import ClassIndex
+from dex_loader.dex_strings import utf16_key
+from apk_parser.apk_parser import APKParser
+from apk_parser.axml_parser import iter_events, START, END
+from apk_parser.apk_index import APKIndex
+from apk_parser.arsc_parser import ResourceTable, ResConfig
+from apk_parser.apk_catalog import APKCatalog, main as catalog_main
+from apk_parser.native_libs import NativeLibStore, host_abis, select_abi
+from dex_loader.dex_code import decode_instructions, VerifyError
+from dex_loader.dex_artifacts import ArtifactCache
+from dex_loader.dex_checksum import compute_checksums, verify_dex, verify_all
+from art_runtime.dalvik_interpreter import Interpreter, DalvikError
+from art_runtime.art_profile import Profile, ProfileStore, FLAG_HOT, FLAG_STARTUP, FLAG_POST_STARTUP
 from filesystem.filesystem import translate_path
 from registry.registry import RegOpenKeyExA, RegQueryValueExA
+from header_cache.header_cache import HeaderCache
+from catalog_scanner.catalog_scanner import scan
+
+# --- Construtores de binários sintéticos ---
+
+def _build_test_pe(path, sections, is_64bit=True, entry_point=0x1000, image_base=0x140000000, data_directories=None):
+    """
+    Gera um PE mínimo e válido para os testes.
+    sections: lista de (nome, virtual_address, conteúdo, virtual_size ou None)
+    data_directories: {índice: (rva, tamanho)}
+    """
+    file_alignment = 0x200
+    optional_header_size = 240 if is_64bit else 224
+    header_size = 0x40 + 4 + 20 + optional_header_size + 40 * len(sections)
+    raw_offset = (header_size + file_alignment - 1) // file_alignment * file_alignment
+
+    section_table = b''
+    section_bodies = b''
+    size_of_image = 0x1000
+    for name, virtual_address, content, virtual_size in sections:
+        raw_size = (len(content) + file_alignment - 1) // file_alignment * file_alignment
+        virtual_size = virtual_size if virtual_size is not None else len(content)
+        section_table += struct.pack('<8sLLLLLLHHL', name.encode(), virtual_size, virtual_address, raw_size,
+                                     raw_offset + len(section_bodies), 0, 0, 0, 0, 0xE0000020)
+        section_bodies += content.ljust(raw_size, b'\x00')
+        size_of_image = max(size_of_image, (virtual_address + virtual_size + 0xFFF) // 0x1000 * 0x1000)
+
+    directories = [(0, 0)] * 16
+    for index, entry in (data_directories or {}).items():
+        directories[index] = entry
+    directory_data = b''.join(struct.pack('<LL', rva, size) for rva, size in directories)
+
+    if is_64bit:
+        optional_header = struct.pack('<HBBLLLLLQLLHHHHHHLLLLHHQQQQLL', 0x20B, 14, 0, 0, 0, 0, entry_point, 0x1000,
+                                      image_base, 0x1000, file_alignment, 6, 0, 0, 0, 6, 0, 0, size_of_image,
+                                      raw_offset, 0, 3, 0, 0x100000, 0x1000, 0x100000, 0x1000, 0, 16)
+        machine = 0x8664
+    else:
+        optional_header = struct.pack('<HBBLLLLLLLLLHHHHHHLLLLHHLLLLLL', 0x10B, 14, 0, 0, 0, 0, entry_point, 0x1000, 0,
+                                      image_base, 0x1000, file_alignment, 6, 0, 0, 0, 6, 0, 0, size_of_image,
+                                      raw_offset, 0, 3, 0, 0x100000, 0x1000, 0x100000, 0x1000, 0, 16)
+        machine = 0x014c
+    optional_header += directory_data
+
+    dos_header = b'MZ' + b'\x00' * 0x3A + struct.pack('<L', 0x40)
+    file_header = struct.pack('<HHLLLHH', machine, len(sections), 0, 0, 0, len(optional_header), 0x0022)
+    headers = dos_header + b'PE\x00\x00' + file_header + optional_header + section_table
+    with open(path, 'wb') as f:
+        f.write(headers.ljust(raw_offset, b'\x00') + section_bodies)
+
+def _build_import_section(base_rva, imports, delay_imports=(), is_64bit=True):
+    """
+    Gera o conteúdo de uma seção .idata.
+    imports/delay_imports: lista de (dll, [nome ou ordinal inteiro])
+    Retorna (conteúdo, (rva, tamanho) do import directory, (rva, tamanho) do delay directory).
+    """
+    thunk_format, ordinal_flag = ('<Q', 1 << 63) if is_64bit else ('<L', 1 << 31)
+    descriptor_size = 20 * (len(imports) + 1)
+    delay_size = 32 * (len(delay_imports) + 1) if delay_imports else 0
+    blob = bytearray(descriptor_size + delay_size)
+
+    def append(data):
+        offset = len(blob)
+        blob.extend(data)
+        return base_rva + offset
+
+    def thunk_table(functions):
+        entries = []
+        for function in functions:
+            if isinstance(function, int):
+                entries.append(ordinal_flag | function)
+            else:
+                entries.append(append(b'\x00\x00' + function.encode() + b'\x00'))
+        return append(b''.join(struct.pack(thunk_format, e) for e in entries + [0]))
+
+    for i, (dll, functions) in enumerate(imports):
+        name_rva = append(dll.encode() + b'\x00')
+        lookup_rva = thunk_table(functions)
+        iat_rva = thunk_table(functions)
+        struct.pack_into('<LLLLL', blob, 20 * i, lookup_rva, 0, 0, name_rva, iat_rva)
+    for i, (dll, functions) in enumerate(delay_imports):
+        name_rva = append(dll.encode() + b'\x00')
+        lookup_rva = thunk_table(functions)
+        iat_rva = thunk_table(functions)
+        struct.pack_into('<LLLLLLLL', blob, descriptor_size + 32 * i, 1, name_rva, 0, iat_rva, lookup_rva, 0, 0, 0)
+    delay_directory = (base_rva + descriptor_size, delay_size) if delay_imports else (0, 0)
+    return bytes(blob), (base_rva, descriptor_size), delay_directory
+
+def _build_reloc_section(fixups):
+    """Gera blocos IMAGE_BASE_RELOCATION para uma lista de (rva, tipo)."""
+    pages = {}
+    for rva, reloc_type in fixups:
+        pages.setdefault(rva & ~0xFFF, []).append((reloc_type << 12) | (rva & 0xFFF))
+    blob = b''
+    for page_rva, entries in sorted(pages.items()):
+        if len(entries) % 2:
+            entries.append(0) # IMAGE_REL_BASED_ABSOLUTE para alinhar o bloco
+        blob += struct.pack(f'<LL{len(entries)}H', page_rva, 8 + 2 * len(entries), *entries)
+    return blob
+
+def _build_resource_section(base_rva, resources):
+    """
+    Gera uma seção .rsrc com a árvore de três níveis (tipo -> nome -> idioma).
+    resources: {(tipo, nome, idioma): conteúdo}; tipo e nome podem ser inteiros ou strings.
+    """
+    tree = {}
+    for (type_id, name, lang), content in resources.items():
+        tree.setdefault(type_id, {}).setdefault(name, {})[lang] = content
+
+    def ordered(keys):
+        # Entradas com nome vêm antes das entradas por ID, como no formato PE
+        return sorted(keys, key=lambda k: (isinstance(k, int), str(k) if not isinstance(k, int) else k))
+
+    # Primeiro passo: reserva espaço para todos os diretórios e data entries
+    layout = []
+    def reserve(node, depth):
+        layout.append((node, depth))
+        if depth < 2:
+            for key in ordered(node):
+                reserve(node[key], depth + 1)
+    reserve(tree, 0)
+    offsets, position = {}, 0
+    for node, depth in layout:
+        offsets[id(node)] = position
+        position += 16 + 8 * len(node)
+    leaf_offsets = {}
+    for node, depth in layout:
+        if depth == 2:
+            for lang in ordered(node):
+                leaf_offsets[(id(node), lang)] = position
+                position += 16
+
+    blob = bytearray(position)
+    def name_field(key):
+        if isinstance(key, int):
+            return key
+        encoded = key.encode('utf-16-le')
+        offset = len(blob)
+        blob.extend(struct.pack('<H', len(key)) + encoded)
+        return 0x80000000 | offset
+
+    for node, depth in layout:
+        keys = ordered(node)
+        offset = offsets[id(node)]
+        named = sum(1 for k in keys if not isinstance(k, int))
+        struct.pack_into('<LLHHHH', blob, offset, 0, 0, 4, 0, named, len(keys) - named)
+        for i, key in enumerate(keys):
+            if depth < 2:
+                child = 0x80000000 | offsets[id(node[key])]
+            else:
+                child = leaf_offsets[(id(node), key)]
+            struct.pack_into('<LL', blob, offset + 16 + 8 * i, name_field(key), child)
+
+    for node, depth in layout:
+        if depth == 2:
+            for lang in ordered(node):
+                while len(blob) % 4:
+                    blob.append(0)
+                data_rva = base_rva + len(blob)
+                blob.extend(node[lang])
+                struct.pack_into('<LLLL', blob, leaf_offsets[(id(node), lang)], data_rva, len(node[lang]), 1252, 0)
+    return bytes(blob)
+
+def _build_version_block(key, value=b'', children=(), text=False):
+    """Gera um bloco da árvore VS_VERSIONINFO (cabeçalho, chave UTF-16, valor e filhos alinhados)."""
+    def pad(data):
+        return data + b'\x00' * (-len(data) % 4)
+    body = pad(b'\x00' * 6 + key.encode('utf-16-le') + b'\x00\x00') + value
+    for child in children:
+        body = pad(body) + child
+    value_length = len(value) // 2 if text else len(value)
+    return struct.pack('<HHH', len(body), value_length, 1 if text else 0) + body[6:]
+
+def _build_test_elf(path, symbols=(), needed=(), soname=None, runpath=None, rpath=None, interp=None, static_symbols=(),
+                    imports=(), relocations=(), data=b'', ifuncs=(), weak=()):
+    """
+    Gera um ELF64 (ET_DYN) mínimo com .dynsym, .dynstr, DT_GNU_HASH, DT_HASH e versionamento.
+    symbols: lista de (nome, endereço, versão ou None, oculta)
+    static_symbols: lista de (nome, endereço, tamanho, STT_*) para a .symtab
+    imports: nomes de símbolos indefinidos (importados) na .dynsym
+    relocations: lista de (endereço, tipo R_X86_64_*, nome do símbolo ou None, addend) em DT_RELA
+    data: bytes gravados no vaddr 0x200 (alvo das relocações)
+    ifuncs / weak: nomes de símbolos STT_GNU_IFUNC / STB_WEAK (os demais são funções globais)
+    O segmento PT_LOAD cobre o arquivo inteiro com vaddr == offset.
+    """
+    def gnu_hash(name):
+        h = 5381
+        for c in name.encode():
+            h = (h * 33 + c) & 0xFFFFFFFF
+        return h
+
+    def sysv_hash(name):
+        h = 0
+        for c in name.encode():
+            h = ((h << 4) + c) & 0xFFFFFFFF
+            h ^= (h & 0xF0000000) >> 24
+            h &= 0x0FFFFFFF
+        return h
+
+    def symbol_info(name):
+        return ((2 if name in weak else 1) << 4) | (10 if name in ifuncs else 2)
+
+    strings = bytearray(b'\x00')
+    string_offsets = {}
+    def add_string(text):
+        if text not in string_offsets:
+            string_offsets[text] = len(strings)
+            strings.extend(text.encode() + b'\x00')
+        return string_offsets[text]
+
+    nbuckets = max(1, len(symbols) // 2)
+    ordered = sorted(symbols, key=lambda symbol: gnu_hash(symbol[0]) % nbuckets)
+    versions = []
+    for _, _, version, _ in ordered:
+        if version is not None and version not in versions:
+            versions.append(version)
+
+    dynsym = b'\x00' * 24
+    versym = [0]
+    symoffset = 1 + len(imports)
+    for name in imports:
+        dynsym += struct.pack('<LBBHQQ', add_string(name), symbol_info(name), 0, 0, 0, 0)
+        versym.append(1)
+    for name, value, version, hidden in ordered:
+        dynsym += struct.pack('<LBBHQQ', add_string(name), symbol_info(name), 0, 1, value, 0)
+        index = versions.index(version) + 2 if version is not None else 1
+        versym.append(index | (0x8000 if hidden else 0))
+
+    # DT_GNU_HASH: um bucket por grupo, cadeia com o bit 0 marcando o último símbolo
+    bloom = [0] * 8
+    buckets = [0] * nbuckets
+    chain = []
+    for i, (name, _, _, _) in enumerate(ordered):
+        h = gnu_hash(name)
+        bloom[(h // 64) % 8] |= (1 << (h % 64)) | (1 << ((h >> 6) % 64))
+        if buckets[h % nbuckets] == 0:
+            buckets[h % nbuckets] = i + symoffset
+        last = i + 1 == len(ordered) or gnu_hash(ordered[i + 1][0]) % nbuckets != h % nbuckets
+        chain.append((h & ~1) | (1 if last else 0))
+    gnu = struct.pack('<4L', nbuckets, symoffset, len(bloom), 6) + struct.pack(f'<{len(bloom)}Q', *bloom) + \
+        struct.pack(f'<{nbuckets}L', *buckets) + struct.pack(f'<{len(chain)}L', *chain)
+
+    # DT_HASH
+    sysv_buckets = [0] * nbuckets
+    sysv_chains = [0] * (len(ordered) + symoffset)
+    for i, (name, _, _, _) in enumerate(ordered, symoffset):
+        sysv_chains[i] = sysv_buckets[sysv_hash(name) % nbuckets]
+        sysv_buckets[sysv_hash(name) % nbuckets] = i
+    sysv = struct.pack(f'<LL{nbuckets}L{len(sysv_chains)}L', nbuckets, len(sysv_chains), *sysv_buckets, *sysv_chains)
+
+    # DT_VERDEF: definição base (o próprio módulo) seguida de uma por versão
+    verdef = b''
+    definitions = [(1, 1, soname or os.path.basename(path))] + [(0, i + 2, v) for i, v in enumerate(versions)]
+    for i, (flags, ndx, name) in enumerate(definitions):
+        next_offset = 28 if i + 1 < len(definitions) else 0
+        verdef += struct.pack('<HHHHLLL', 1, flags, ndx, 1, sysv_hash(name), 20, next_offset)
+        verdef += struct.pack('<LL', add_string(name), 0)
+
+    dynamic = [(1, add_string(lib)) for lib in needed]
+    if soname is not None:
+        dynamic.append((14, add_string(soname)))
+    if rpath is not None:
+        dynamic.append((15, add_string(rpath)))
+    if runpath is not None:
+        dynamic.append((29, add_string(runpath)))
+    interp_data = interp.encode() + b'\x00' if interp else b''
+
+    blob = bytearray()
+    def place(data):
+        while len(blob) % 8:
+            blob.append(0)
+        offset = 0x200 + len(blob)
+        blob.extend(data)
+        return offset
+    place(data)
+    dynsym_offset = place(dynsym)
+    gnu_offset = place(gnu)
+    sysv_offset = place(sysv)
+    versym_offset = place(struct.pack(f'<{len(versym)}H', *versym))
+    verdef_offset = place(verdef)
+    interp_offset = place(interp_data)
+    strtab_offset = place(bytes(strings))
+    dynamic += [(6, dynsym_offset), (11, 24), (0x6FFFFEF5, gnu_offset), (4, sysv_offset), (0x6FFFFFF0, versym_offset),
+                (0x6FFFFFFC, verdef_offset), (0x6FFFFFFD, len(definitions)), (5, strtab_offset), (10, len(strings)), (0, 0)]
+    if relocations:
+        names = list(imports) + [symbol[0] for symbol in ordered]
+        rela = b''.join(struct.pack('<QQq', vaddr, ((names.index(name) + 1 if name else 0) << 32) | rtype, addend)
+                        for vaddr, rtype, name, addend in relocations)
+        dynamic[-1:-1] = [(7, place(rela)), (8, len(rela)), (9, 24)]
+    dynamic_data = b''.join(struct.pack('<qQ', tag, value) for tag, value in dynamic)
+    dynamic_offset = place(dynamic_data)
+
+    # Section headers: .dynsym/.dynstr, .symtab/.strtab e .shstrtab
+    static_strings = bytearray(b'\x00')
+    symtab = b'\x00' * 24
+    for name, value, size, symbol_type in static_symbols:
+        symtab += struct.pack('<LBBHQQ', len(static_strings), 0x10 | symbol_type, 0, 1, value, size)
+        static_strings.extend(name.encode() + b'\x00')
+    symtab_offset = place(symtab)
+    static_strtab_offset = place(bytes(static_strings))
+    section_names = b'\x00.dynsym\x00.dynstr\x00.symtab\x00.strtab\x00.shstrtab\x00'
+    shstrtab_offset = place(section_names)
+    section_headers = [
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        (1, 11, 2, dynsym_offset, dynsym_offset, len(dynsym), 2, 1, 8, 24),
+        (9, 3, 2, strtab_offset, strtab_offset, len(strings), 0, 0, 1, 0),
+        (17, 2, 0, 0, symtab_offset, len(symtab), 4, 1, 8, 24),
+        (25, 3, 0, 0, static_strtab_offset, len(static_strings), 0, 0, 1, 0),
+        (33, 3, 0, 0, shstrtab_offset, len(section_names), 0, 0, 1, 0),
+    ]
+    section_table_offset = place(b''.join(struct.pack('<LLQQQQLLQQ', *header) for header in section_headers))
+
+    file_size = 0x200 + len(blob)
+    program_headers = [(1, 5, 0, 0, 0, file_size, file_size, 0x1000),
+                       (2, 6, dynamic_offset, dynamic_offset, dynamic_offset, len(dynamic_data), len(dynamic_data), 8)]
+    if interp:
+        program_headers.append((3, 4, interp_offset, interp_offset, interp_offset, len(interp_data), len(interp_data), 1))
+    elf_header = struct.pack('<16sHHLQQQLHHHHHH', b'\x7fELF\x02\x01\x01' + b'\x00' * 9, 3, 0x3E, 1, 0, 0x40,
+                             section_table_offset, 0, 64, 56, len(program_headers), 64, len(section_headers), 5)
+    headers = elf_header + b''.join(struct.pack('<LLQQQQQQ', *header) for header in program_headers)
+    with open(path, 'wb') as f:
+        f.write(headers.ljust(0x200, b'\x00') + bytes(blob))
+
+def _build_test_string_pool(pool, utf8=False):
+    """Chunk RES_STRING_POOL_TYPE (compartilhado por AXML e resources.arsc)."""
+    def encode(text):
+        if utf8:
+            raw = text.encode('utf-8')
+            return bytes([len(text), len(raw)]) + raw + b'\x00'
+        return struct.pack('<H', len(text)) + text.encode('utf-16-le') + b'\x00\x00'
+    blobs, offsets = b'', []
+    for text in pool:
+        offsets.append(len(blobs))
+        blobs += encode(text)
+    blobs += b'\x00' * (-len(blobs) % 4)
+    strings_start = 28 + 4 * len(pool)
+    return struct.pack('<HHLLLLLL', 0x0001, 28, strings_start + len(blobs), len(pool), 0,
+                       0x100 if utf8 else 0, strings_start, 0) + struct.pack(f'<{len(pool)}L', *offsets) + blobs
+
+def _build_test_arsc(package_name, types, package_id=0x7F, sparse=False):
+    """
+    Monta um resources.arsc como o aapt2.
+    types: [(tipo, [nomes das entradas], [(qualificadores ResConfig, {nome: valor})])], na ordem dos type ids;
+    valores str/int/bool viram valores tipados e ('ref', id) uma referência.
+    sparse: chunks de tipo no formato esparso (índice, offset/4)
+    """
+    values = []
+    for _, _, configs in types:
+        for _, entries in configs:
+            values += [value for value in entries.values() if isinstance(value, str) and value not in values]
+    keys = [name for _, names, _ in types for name in names]
+    
+    package = b''
+    for type_id, (_, names, configs) in enumerate(types, 1):
+        package += struct.pack('<HHLBBHL', 0x0202, 16, 16 + 4 * len(names), type_id, 0, 0, len(names)) + b'\x00' * 4 * len(names)
+        for qualifiers, entries in configs:
+            config = ResConfig(**qualifiers)
+            config_bytes = struct.pack('<LHH2s2sBBHBBBBHHHHBBHHH', 64, config.mcc, config.mnc, config.language.encode(),
+                                       config.country.encode(), config.orientation, config.touchscreen, config.density,
+                                       config.keyboard, config.navigation, 0, 0, config.screen_width, config.screen_height,
+                                       config.sdk_version, 0, config.screen_layout, config.ui_mode,
+                                       config.smallest_screen_width_dp, config.screen_width_dp, config.screen_height_dp)
+            config_bytes = config_bytes.ljust(64, b'\x00')
+            body, offsets = b'', []
+            for entry_idx, name in enumerate(names):
+                if name not in entries:
+                    offsets.append(None)
+                    continue
+                value = entries[name]
+                if isinstance(value, tuple):
+                    data_type, data = 0x01, value[1]
+                elif isinstance(value, bool):
+                    data_type, data = 0x12, int(value)
+                elif isinstance(value, int):
+                    data_type, data = 0x10, value & 0xFFFFFFFF
+                else:
+                    data_type, data = 0x03, values.index(value)
+                offsets.append(len(body))
+                body += struct.pack('<HHL', 8, 0, keys.index(name)) + struct.pack('<HBBL', 8, 0, data_type, data)
+            header_size = 8 + 12 + len(config_bytes)
+            if sparse:
+                present = [(idx, offset) for idx, offset in enumerate(offsets) if offset is not None]
+                table = b''.join(struct.pack('<HH', idx, offset // 4) for idx, offset in present)
+                count, flags = len(present), 0x01
+            else:
+                table = b''.join(struct.pack('<L', 0xFFFFFFFF if offset is None else offset) for offset in offsets)
+                count, flags = len(names), 0
+            entries_start = header_size + len(table)
+            package += struct.pack('<HHLBBHLL', 0x0201, header_size, entries_start + len(body), type_id, flags, 0,
+                                   count, entries_start) + config_bytes + table + body
+    
+    type_pool = _build_test_string_pool([name for name, _, _ in types])
+    key_pool = _build_test_string_pool(keys)
+    header = struct.pack('<L256sLLLLL', package_id, package_name.encode('utf-16-le'), 288, len(types),
+                         288 + len(type_pool), len(keys), 0)
+    package = type_pool + key_pool + package
+    package_chunk = struct.pack('<HHL', 0x0200, 288, 288 + len(package)) + header + package
+    global_pool = _build_test_string_pool(values)
+    return struct.pack('<HHLL', 0x0002, 12, 12 + len(global_pool) + len(package_chunk), 1) + global_pool + package_chunk
+
+def _build_test_axml(root, utf8=False, strip_names=False):
+    """
+    Monta um AndroidManifest.xml binário (AXML) como o aapt.
+    root: (tag, [(atributo, valor)], [filhos]); atributos 'android:x' usam o namespace e o
+    ID de recurso do Android; valores int/bool viram valores tipados.
+    strip_names: remove do pool os nomes dos atributos android (como fazem ofuscadores)
+    """
+    android_ids = {'label': 0x01010001, 'icon': 0x01010002, 'name': 0x01010003, 'minSdkVersion': 0x0101020C,
+                   'versionCode': 0x0101021B, 'versionName': 0x0101021C, 'targetSdkVersion': 0x01010270}
+    android_ns = "http://schemas.android.com/apk/res/android"
+    
+    # Nomes de atributos com ID de recurso vêm primeiro no pool (alinhados ao mapa de recursos)
+    attributes, others = [], []
+    def collect(element):
+        tag, attrs, children = element
+        others.append(tag)
+        for name, value in attrs:
+            if name.startswith("android:"):
+                if name[8:] not in attributes:
+                    attributes.append(name[8:])
+            else:
+                others.append(name)
+            if isinstance(value, str):
+                others.append(value)
+        for child in children:
+            collect(child)
+    collect(root)
+    pool = [("" if strip_names else name) for name in attributes]
+    index = {name: i for i, name in enumerate(attributes)}
+    for text in ["android", android_ns] + others:
+        if text not in index:
+            index[text] = len(pool)
+            pool.append(text)
+    
+    string_pool = _build_test_string_pool(pool, utf8)
+    resource_map = struct.pack('<HHL', 0x0180, 8, 8 + 4 * len(attributes)) + \
+                   struct.pack(f'<{len(attributes)}L', *(android_ids[name] for name in attributes))
+    
+    ns_idx = index[android_ns]
+    def element_chunks(element):
+        tag, attrs, children = element
+        body = b''
+        for name, value in attrs:
+            android = name.startswith("android:")
+            name_idx = index[name[8:]] if android else index[name]
+            if isinstance(value, bool):
+                raw, data_type, data = 0xFFFFFFFF, 0x12, 0xFFFFFFFF if value else 0
+            elif isinstance(value, int):
+                raw, data_type, data = 0xFFFFFFFF, 0x10, value & 0xFFFFFFFF
+            else:
+                raw, data_type, data = index[value], 0x03, index[value]
+            body += struct.pack('<LLLHBBL', ns_idx if android else 0xFFFFFFFF, name_idx, raw, 8, 0, data_type, data)
+        chunks = struct.pack('<HHLLLLLHHHHHH', 0x0102, 16, 36 + len(body), 1, 0xFFFFFFFF, 0xFFFFFFFF, index[tag],
+                             20, 20, len(attrs), 0, 0, 0) + body
+        for child in children:
+            chunks += element_chunks(child)
+        return chunks + struct.pack('<HHLLLLL', 0x0103, 16, 24, 1, 0xFFFFFFFF, 0xFFFFFFFF, index[tag])
+    
+    namespace = struct.pack('<LLLL', 1, 0xFFFFFFFF, index["android"], ns_idx)
+    body = (string_pool + resource_map + struct.pack('<HHL', 0x0100, 16, 24) + namespace + element_chunks(root)
+            + struct.pack('<HHL', 0x0101, 16, 24) + namespace)
+    return struct.pack('<HHL', 0x0003, 8, 8 + len(body)) + body
+
+def _build_test_dex(classes, version=b'035', strings=(), method_refs=()):
+    """
+    Gera um DEX mínimo com todas as tabelas de IDs, checksum Adler-32 e assinatura SHA-1.
+    classes: lista de (descritor, superclasse ou None, [(campo, tipo)], [(método, retorno, [parâmetros], código?)])
+    código: (registers_size, ins_size, [unidades de 16 bits]); ('method', classe, nome), ('field', classe, nome)
+    e ('string', texto) nas unidades são substituídos pelos índices correspondentes
+    strings: strings adicionais no pool (constantes)
+    method_refs: métodos referenciados sem definição, [(classe, nome, retorno, [parâmetros])]
+    """
+    def shorty(descriptor):
+        return 'L' if descriptor[0] in 'L[' else descriptor
+
+    def proto_of(return_type, parameters):
+        return shorty(return_type) + ''.join(map(shorty, parameters)), return_type, tuple(parameters)
+
+    def uleb128(value):
+        out = bytearray()
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            out.append(byte | (0x80 if value else 0))
+            if not value:
+                return bytes(out)
+
+    def mutf8(text):
+        out = bytearray()
+        for char in text:
+            if char == '\x00':
+                out += b'\xc0\x80'
+            elif ord(char) > 0xFFFF: # Par de surrogates, 3 bytes cada
+                value = ord(char) - 0x10000
+                for unit in (0xD800 | (value >> 10), 0xDC00 | (value & 0x3FF)):
+                    out += chr(unit).encode('utf-8', errors='surrogatepass')
+            else:
+                out += char.encode('utf-8')
+        return bytes(out)
+
+    declared = [(descriptor, method[0], method[1], method[2]) for descriptor, _, _, methods in classes for method in methods]
+    extra_strings = set(strings)
+    for _, _, _, methods in classes:
+        for method in methods:
+            for unit in (method[3][2] if len(method) > 3 else ()):
+                if isinstance(unit, tuple) and unit[0] == 'string':
+                    extra_strings.add(unit[1])
+    strings, types, protos = set(), set(), set()
+    for descriptor, superclass, fields, _ in classes:
+        types.update([descriptor, superclass or "Ljava/lang/Object;"])
+        for name, field_type in fields:
+            strings.add(name)
+            types.add(field_type)
+    for descriptor, name, return_type, parameters in declared + list(method_refs):
+        strings.add(name)
+        types.update([descriptor, return_type, *parameters])
+        protos.add(proto_of(return_type, parameters))
+    # string_ids são ordenadas por unidades UTF-16 (suplementares antes de U+E000-U+FFFF)
+    strings = sorted(strings | extra_strings | types | {proto[0] for proto in protos},
+                     key=utf16_key)
+    string_idx = {text: i for i, text in enumerate(strings)}
+    types = sorted(types, key=string_idx.get)
+    type_idx = {descriptor: i for i, descriptor in enumerate(types)}
+    protos = sorted(protos, key=lambda proto: (type_idx[proto[1]], [type_idx[t] for t in proto[2]]))
+    proto_idx = {proto: i for i, proto in enumerate(protos)}
+    fields = sorted((type_idx[descriptor], string_idx[name], type_idx[field_type])
+                    for descriptor, _, class_fields, _ in classes for name, field_type in class_fields)
+    field_index = {(types[f[0]], strings[f[1]]): i for i, f in enumerate(fields)}
+    methods = sorted({(type_idx[descriptor], string_idx[name], proto_idx[proto_of(return_type, parameters)])
+                      for descriptor, name, return_type, parameters in declared + list(method_refs)})
+    method_index = {(types[m[0]], strings[m[1]]): i for i, m in enumerate(methods)}
+
+    sizes = [len(strings) * 4, len(types) * 4, len(protos) * 12, len(fields) * 8, len(methods) * 8, len(classes) * 32]
+    offsets = []
+    offset = 0x70
+    for size in sizes:
+        offsets.append(offset if size else 0)
+        offset += size
+    data_off = offset
+
+    # Área de dados: listas de parâmetros (alinhadas em 4), strings, code_items e class_data
+    data = bytearray()
+    def align4():
+        while len(data) % 4:
+            data.append(0)
+    parameters_off = {}
+    for proto in protos:
+        if proto[2]:
+            align4()
+            parameters_off[proto] = data_off + len(data)
+            data += struct.pack(f'<L{len(proto[2])}H', len(proto[2]), *(type_idx[t] for t in proto[2]))
+    string_data_off = []
+    for text in strings:
+        string_data_off.append(data_off + len(data))
+        data += uleb128(len(text.encode('utf-16-le')) // 2) + mutf8(text) + b'\x00'
+
+    def resolve(unit):
+        if isinstance(unit, tuple):
+            kind, *key = unit
+            return {'method': lambda: method_index[tuple(key)], 'field': lambda: field_index[tuple(key)],
+                    'string': lambda: string_idx[key[0]]}[kind]()
+        return unit
+    class_data_off = []
+    for descriptor, _, _, class_methods in classes:
+        entries = []
+        for method in class_methods:
+            code_off = 0
+            if len(method) > 3:
+                registers, ins, insns = method[3]
+                align4()
+                code_off = data_off + len(data)
+                data += struct.pack('<HHHHLL', registers, ins, ins, 0, 0, len(insns))
+                data += struct.pack(f'<{len(insns)}H', *map(resolve, insns))
+            flags = 0x10001 if method[0] == '<init>' else (0x9 if code_off else 0x109) # public static (native)
+            entries.append((method_index[(descriptor, method[0])], flags, code_off))
+        if not entries:
+            class_data_off.append(0)
+            continue
+        class_data_off.append(data_off + len(data))
+        data += uleb128(0) + uleb128(0) + uleb128(len(entries)) + uleb128(0)
+        previous = 0
+        for method_idx, flags, code_off in sorted(entries):
+            data += uleb128(method_idx - previous) + uleb128(flags) + uleb128(code_off)
+            previous = method_idx
+
+    tables = struct.pack(f'<{len(strings)}L', *string_data_off)
+    tables += struct.pack(f'<{len(types)}L', *(string_idx[t] for t in types))
+    for proto in protos:
+        tables += struct.pack('<LLL', string_idx[proto[0]], type_idx[proto[1]], parameters_off.get(proto, 0))
+    for class_idx, name_idx, field_type in fields:
+        tables += struct.pack('<HHL', class_idx, field_type, name_idx)
+    for class_idx, name_idx, method_proto in methods:
+        tables += struct.pack('<HHL', class_idx, method_proto, name_idx)
+    for (descriptor, superclass, _, _), class_data in zip(classes, class_data_off):
+        tables += struct.pack('<8L', type_idx[descriptor], 0x1, type_idx[superclass or "Ljava/lang/Object;"],
+                              0, 0xFFFFFFFF, 0, class_data, 0)
+
+    file_size = data_off + len(data)
+    counts = [len(strings), len(types), len(protos), len(fields), len(methods), len(classes)]
+    table_fields = [value for pair in zip(counts, offsets) for value in pair]
+    header = struct.pack('<8sL20s20L', b'dex\n' + version + b'\x00', 0, b'\x00' * 20, file_size, 0x70, 0x12345678,
+                         0, 0, 0, *table_fields, len(data), data_off)
+    dex = bytearray(header + tables + data)
+    dex[12:32] = hashlib.sha1(dex[32:]).digest()
+    struct.pack_into('<L', dex, 8, zlib.adler32(dex[12:]))
+    return bytes(dex)
 
 # --- Testes de Sanidade ---
 
@@ -51,6 +687,1287 @@ def test_windows_compatibility(pm):
     
     print("  Teste Windows concluído com sucesso.")
 
+def test_pe_loader_mmap():
+    print("\n--- Teste do PE Loader (mmap zero-copy) ---")
+    
+    test_exe_path = "/tmp/test_pe_loader.exe"
+    text = b'\xC3' * 0x300
+    _build_test_pe(test_exe_path, [(".text", 0x1000, text, None), (".data", 0x2000, b'DATA', 0x100)])
+    
+    for use_mmap in (True, False):
+        with PELoader(test_exe_path, use_mmap=use_mmap, use_cache=False) as loader:
+            assert loader.load(), "Falha ao carregar PE sintético."
+            assert loader.number_of_sections == 2, "Número de seções incorreto."
+            text_view = loader.section_views['.text']
+            assert isinstance(text_view, memoryview), "Seção não foi entregue como view."
+            assert text_view.tobytes() == text, "Conteúdo da seção .text incorreto."
+            data_view = loader.section_views['.data']
+            assert len(data_view) == 0x100 and data_view[:4] == b'DATA', "Conteúdo da seção .data incorreto."
+            kept = text_view[:4] # Fatia ainda em uso após o fechamento: close não pode falhar
+    assert loader.pe_data is None, "O mapeamento não foi liberado."
+    assert kept.tobytes() == text[:4], "Fatia mantida pelo chamador foi invalidada."
+    del kept
+    os.remove(test_exe_path)
+    
+    print("  Teste do PE Loader concluído com sucesso.")
+
+def test_pe_import_resolution():
+    print("\n--- Teste de Resolução de Imports (IAT) ---")
+    
+    test_exe_path = "/tmp/test_pe_imports.exe"
+    for is_64bit in (True, False):
+        idata, import_directory, delay_directory = _build_import_section(
+            0x2000,
+            [("KERNEL32.dll", ["CreateProcessA", "ExitProcess"]), ("gdi32.dll", ["BitBlt", 17])],
+            delay_imports=[("user32.dll", ["MessageBoxA"])],
+            is_64bit=is_64bit)
+        _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3', None), (".idata", 0x2000, idata, None)],
+                       is_64bit=is_64bit, image_base=0x140000000 if is_64bit else 0x400000,
+                       data_directories={1: import_directory, 13: delay_directory})
+        
+        # Sem cache: as duas variantes reescrevem o mesmo arquivo (mesmo tamanho e inode)
+        with PELoader(test_exe_path, use_cache=False) as loader:
+            assert loader.load(), "Falha ao carregar PE com imports."
+            names = [(e['dll'], e['name'] or e['ordinal'], e['delay']) for e in loader.imports]
+            assert names == [("KERNEL32.dll", "CreateProcessA", False), ("KERNEL32.dll", "ExitProcess", False),
+                             ("gdi32.dll", "BitBlt", False), ("gdi32.dll", 17, False),
+                             ("user32.dll", "MessageBoxA", True)], f"Imports incorretos: {names}"
+            resolved = sorted(f.__name__ for f in loader.iat.values())
+            assert resolved == ["CreateProcessA", "ExitProcess", "MessageBoxA"], "Falha na resolução da IAT."
+            assert len(loader.unresolved_imports) == 2, "Imports de gdi32 deveriam ficar sem resolução."
+    os.remove(test_exe_path)
+    
+    print("  Teste de Resolução de Imports concluído com sucesso.")
+
+def test_pe_relocation():
+    print("\n--- Teste de Relocação Base (.reloc) ---")
+    
+    test_exe_path = "/tmp/test_pe_reloc.exe"
+    for is_64bit, image_base, new_base in ((True, 0x140000000, 0x7FF600000000), (False, 0x400000, 0x10000000)):
+        width, reloc_type, fmt = (8, 10, '<Q') if is_64bit else (4, 3, '<L')
+        # Ponteiros absolutos espalhados por duas páginas da seção .data
+        offsets = [0x0, 0x10, 0x800, 0x1008, 0x1FF0]
+        data = bytearray(0x2000)
+        for i, offset in enumerate(offsets):
+            struct.pack_into(fmt, data, offset, image_base + 0x1000 + i)
+        reloc = _build_reloc_section([(0x3000 + offset, reloc_type) for offset in offsets])
+        _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3', None), (".data", 0x3000, bytes(data), None),
+                                       (".reloc", 0x6000, reloc, None)],
+                       is_64bit=is_64bit, image_base=image_base, data_directories={5: (0x6000, len(reloc))})
+        
+        with PELoader(test_exe_path, use_cache=False) as loader:
+            assert loader.load(), "Falha ao carregar PE com relocações."
+            assert loader.relocate(new_base), "Falha ao aplicar relocações."
+            data_view = loader.section_views['.data']
+            for i, offset in enumerate(offsets):
+                value = struct.unpack_from(fmt, data_view, offset)[0]
+                assert value == new_base + 0x1000 + i, f"Ponteiro em {hex(offset)} não foi corrigido."
+            assert loader.section_views['.text'].readonly, "Seção sem correções não deveria ser copiada."
+    os.remove(test_exe_path)
+    
+    print("  Teste de Relocação concluído com sucesso.")
+
+def test_pe_lazy_sections():
+    print("\n--- Teste de Materialização Lazy de Seções ---")
+    
+    test_exe_path = "/tmp/test_pe_lazy.exe"
+    data = bytearray(0x1000)
+    struct.pack_into('<Q', data, 0x20, 0x140001000)
+    reloc = _build_reloc_section([(0x2020, 10)])
+    _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3', None), (".data", 0x2000, bytes(data), None),
+                                   (".rsrc", 0x3000, b'R' * 0x800, None), (".bss", 0x4000, b'', 0x1000),
+                                   (".reloc", 0x5000, reloc, None)],
+                   data_directories={5: (0x5000, len(reloc))})
+    
+    with PELoader(test_exe_path, use_cache=False, lazy_sections=True) as loader:
+        assert loader.load(), "Falha ao carregar PE em modo lazy."
+        stats = loader.section_views.stats()
+        assert not any(s['resident'] for s in stats.values()), "Nenhuma seção deveria estar materializada."
+        
+        # Relocação em modo lazy fica pendente até o primeiro acesso
+        assert loader.relocate(0x7FF600000000), "Falha ao registrar relocações."
+        assert not loader.section_views.stats()['.data']['resident'], "Relocação materializou a seção."
+        assert struct.unpack_from('<Q', loader.section_views['.data'], 0x20)[0] == 0x7FF600001000, "Relocação pendente não aplicada."
+        assert loader.section_views['.bss'].tobytes() == b'\x00' * 0x1000, "Seção bss não foi zerada."
+        
+        # Sob pressão de memória as regiões antigas são descartadas e rematerializadas depois
+        loader.section_views['.rsrc']
+        loader.section_views.trim(0x1000)
+        stats = loader.section_views.stats()
+        assert stats['.rsrc']['resident'] and not stats['.data']['resident'], "Descarte não seguiu a ordem LRU."
+        assert struct.unpack_from('<Q', loader.section_views['.data'], 0x20)[0] == 0x7FF600001000, "Rematerialização perdeu a relocação."
+        assert loader.section_views.stats()['.data']['materializations'] == 2, "Contador de materializações incorreto."
+        assert loader.section_views.stats()['.text']['materializations'] == 0, "Seção não acessada foi materializada."
+    
+    # Orçamento de memória: views já entregues sobrevivem ao descarte e à relocação da região
+    with PELoader(test_exe_path, use_cache=False, lazy_sections=True, max_resident_bytes=0x1000) as loader:
+        assert loader.load(), "Falha ao carregar PE com orçamento de memória."
+        data_view = loader.section_views['.data']
+        rsrc_view = loader.section_views['.rsrc']
+        assert not loader.section_views.stats()['.data']['resident'], "Orçamento de memória não aplicado."
+        assert struct.unpack_from('<Q', data_view, 0x20)[0] == 0x140001000, "View descartada foi invalidada."
+        assert loader.relocate(0x7FF600000000), "Falha ao relocar com região residente."
+        assert rsrc_view[:1] == b'R' and data_view[0x20:0x28].tobytes() == struct.pack('<Q', 0x140001000), "View entregue foi alterada."
+        assert struct.unpack_from('<Q', loader.section_views['.data'], 0x20)[0] == 0x7FF600001000, "Relocação não aplicada."
+        
+        # Percorrer todas as seções materializa uma de cada vez, dentro do orçamento
+        sections = loader.section_views
+        items = sections.items()
+        assert sections.stats()['.text']['materializations'] == 0, "items() materializou seções antes da iteração."
+        sizes = []
+        for name, view in items:
+            sizes.append((name, len(view)))
+            assert sections.resident_bytes <= 0x1000, "Iteração ultrapassou o orçamento de memória."
+        assert [name for name, _ in sizes] == ['.text', '.data', '.rsrc', '.bss', '.reloc'], f"Seções percorridas: {sizes}"
+    os.remove(test_exe_path)
+    
+    # Nomes de seção repetidos: cada região continua registrada (acessível pelo índice)
+    _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3' * 0x10, None), (".text", 0x2000, b'\x90' * 0x10, None)])
+    with PELoader(test_exe_path, use_cache=False, lazy_sections=True) as loader:
+        assert loader.load(), "Falha ao carregar PE com seções homônimas."
+        sections = loader.section_views
+        assert len(sections.regions) == 2 and sections['.text'][:1] == b'\xC3', "Seção homônima sobrescreveu a primeira."
+        assert sections.materialize(1)[:1] == b'\x90' and sorted(sections.stats()) == ['.text', '.text#1'], "Segunda seção inacessível."
+    os.remove(test_exe_path)
+    
+    print("  Teste de Materialização Lazy concluído com sucesso.")
+
+def test_pe_resources():
+    print("\n--- Teste do Índice de Recursos PE ---")
+    
+    test_exe_path = "/tmp/test_pe_resources.exe"
+    fixed_info = struct.pack('<13L', 0xFEEF04BD, 0x10000, 0x00020001, 0x00040003, 0x00020001, 0x00040003,
+                             0x3F, 0, 0x40004, 1, 0, 0, 0)
+    strings = [_build_version_block(name, (value + '\x00').encode('utf-16-le'), text=True)
+               for name, value in (("CompanyName", "Winlinos"), ("ProductName", "Demo"))]
+    version = _build_version_block("VS_VERSION_INFO", fixed_info, [
+        _build_version_block("StringFileInfo", children=[_build_version_block("040904b0", children=strings, text=True)], text=True),
+        _build_version_block("VarFileInfo", children=[_build_version_block("Translation", struct.pack('<HH', 0x409, 1200))], text=True),
+    ])
+    string_block = b''.join(struct.pack('<H', len(text)) + text.encode('utf-16-le')
+                            for text in [""] * 5 + ["Olá mundo"] + [""] * 10)
+    icon = b'\x89PNG' + b'\x00' * 12
+    group_icon = struct.pack('<HHH', 0, 1, 1) + struct.pack('<BBBBHHLH', 0, 0, 0, 0, 1, 32, len(icon), 1)
+    manifest = b'<?xml version="1.0"?><assembly manifestVersion="1.0"/>'
+    rsrc = _build_resource_section(0x2000, {
+        (16, 1, 0x409): version,
+        (6, 1, 0x409): string_block,
+        (6, 1, 0x416): string_block.replace("Olá mundo".encode('utf-16-le'), "Olá Terra".encode('utf-16-le')),
+        (3, 1, 0x409): icon,
+        (14, "MAINICON", 0x409): group_icon,
+        (24, 1, 0x409): manifest,
+    })
+    _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3', None), (".rsrc", 0x2000, rsrc, None)],
+                   data_directories={2: (0x2000, len(rsrc))})
+    
+    with PELoader(test_exe_path, use_cache=False) as loader:
+        assert loader.parse_headers(), "Falha ao analisar o PE com recursos."
+        resources = loader.resources
+        assert len(resources) == 6, "Folhas da árvore de recursos não foram indexadas."
+        assert resources.names(14) == ["MAINICON"], "Nome textual de recurso incorreto."
+        
+        info = resources.version_info()
+        assert info['file_version'] == "2.1.4.3", "Versão do arquivo incorreta."
+        assert info['strings']['040904b0'] == {"CompanyName": "Winlinos", "ProductName": "Demo"}, "StringFileInfo incorreto."
+        assert info['translations'] == [(0x409, 1200)], "Traduções incorretas."
+        assert resources.manifest().startswith('<?xml'), "Manifesto não decodificado."
+        assert resources.string(5) == "Olá mundo" and resources.string(5, lang=0x416) == "Olá Terra", "Tabela de strings incorreta."
+        assert resources.string(6) is None, "String inexistente deveria ser None."
+        assert resources.icons("MAINICON")[0]['width'] == 256, "Grupo de ícones incorreto."
+        assert resources.icon_file().endswith(icon), "Arquivo .ico montado incorretamente."
+        
+        # Consultas repetidas usam o índice e as folhas memorizadas
+        decodes = resources.decodes
+        assert loader.resources is resources, "A árvore de recursos foi reconstruída."
+        assert resources.version_info() is info and resources.string(5) == "Olá mundo", "Consulta repetida divergente."
+        assert resources.decodes == decodes, "Consulta repetida decodificou a folha novamente."
+    os.remove(test_exe_path)
+    
+    print("  Teste do Índice de Recursos concluído com sucesso.")
+
+def test_binary_records():
+    print("\n--- Teste dos Registros Binários ---")
+    
+    # ELF32: p_flags fica depois de p_memsz no binário, mas o registro usa a ordem canônica
+    header = ProgramHeader(type=1, flags=5, offset=0x100, vaddr=0x8048000, paddr=0, filesz=0x200, memsz=0x300, align=0x1000)
+    packed = ELF32_PROGRAM_HEADER.pack(header)
+    assert struct.unpack('<8L', packed)[6] == 5, "Campo fora da ordem do binário."
+    assert ELF32_PROGRAM_HEADER.unpack_from(packed) == header, "Registro não sobreviveu ao round-trip."
+    assert not hasattr(header, '__dict__'), "Registro não deveria ter dicionário por instância."
+    
+    # Tabelas inteiras em uma passada; passos maiores que o registro (e_phentsize estendido)
+    table = b''.join(ELF32_PROGRAM_HEADER.pack(header._replace(vaddr=i)) for i in range(1000))
+    assert [h.vaddr for h in ELF32_PROGRAM_HEADER.unpack_table(table, 0, 1000)] == list(range(1000)), "Tabela incorreta."
+    padded = b''.join(ELF32_PROGRAM_HEADER.pack(header._replace(vaddr=i)) + b'\xFF' * 8 for i in range(3))
+    assert [h.vaddr for h in ELF32_PROGRAM_HEADER.unpack_table(padded, 0, 3, stride=40)] == [0, 1, 2], "Passo ignorado."
+    try:
+        ELF32_PROGRAM_HEADER.unpack_table(table, 0, 1001)
+        assert False, "Tabela truncada deveria falhar."
+    except ValueError:
+        pass
+    
+    print("  Teste dos Registros Binários concluído com sucesso.")
+
+def test_elf_symbol_lookup():
+    print("\n--- Teste de Resolução de Símbolos ELF (GNU hash / SysV hash) ---")
+    
+    test_lib_path = "/tmp/test_libdemo.so"
+    symbols = [("dragon_init", 0x1000, None, False), ("memcpy", 0x2000, "DEMO_1.0", True),
+               ("memcpy", 0x2100, "DEMO_2.0", False), ("realpath", 0x3000, "DEMO_1.0", False)]
+    symbols += [(f"helper_{i}", 0x4000 + i * 0x10, "DEMO_2.0", False) for i in range(40)]
+    _build_test_elf(test_lib_path, symbols, soname="libdemo.so.1")
+    
+    with ELFLoader(test_lib_path, use_cache=False) as loader:
+        assert loader.load(), "Falha ao carregar ELF com símbolos."
+        assert len(loader.hash_table) == len(symbols) + 1, "Quantidade de símbolos incorreta."
+        assert loader.resolve_symbol("dragon_init") == 0x1000, "Símbolo sem versão não resolvido."
+        assert loader.resolve_symbol("memcpy") == 0x2100, "Deveria resolver a versão padrão (@@)."
+        assert loader.resolve_symbol("memcpy", "DEMO_1.0") == 0x2000, "Versão oculta não resolvida."
+        assert loader.resolve_symbol("memcpy@DEMO_2.0") == 0x2100, "Sintaxe nome@VERSÃO não suportada."
+        assert loader.resolve_symbol("memcpy", "DEMO_3.0") == 0, "Versão inexistente foi aceita."
+        assert loader.resolve_symbol("helper_39") == 0x4000 + 39 * 0x10, "Cadeia do bucket percorrida incorretamente."
+        
+        # O caminho SysV (DT_HASH) precisa concordar com o GNU hash
+        table = loader.hash_table
+        for name, _, version, _ in symbols:
+            assert table.lookup(name, version) == table.lookup(name, version, use_gnu=False), f"Divergência em {name}."
+        
+        # Símbolos ausentes são rejeitados pelo filtro de Bloom na maioria das vezes
+        for i in range(200):
+            assert loader.resolve_symbol(f"missing_{i}") == 0, "Símbolo inexistente resolvido."
+        assert table.bloom_rejects > 100, "Filtro de Bloom não está rejeitando consultas."
+    os.remove(test_lib_path)
+    
+    print("  Teste de Resolução de Símbolos concluído com sucesso.")
+
+def test_elf_dependency_graph():
+    print("\n--- Teste do Grafo de Dependências ELF (DT_NEEDED) ---")
+    
+    with tempfile.TemporaryDirectory() as root:
+        app_dir, system_dir = os.path.join(root, "app"), os.path.join(root, "system")
+        os.makedirs(os.path.join(app_dir, "lib"))
+        os.makedirs(system_dir)
+        _build_test_elf(os.path.join(app_dir, "game"), needed=["libengine.so.1", "libaudio.so.2"], runpath="$ORIGIN/lib")
+        _build_test_elf(os.path.join(app_dir, "lib", "libengine.so.1"), needed=["libc.so.6"], soname="libengine.so.1")
+        _build_test_elf(os.path.join(app_dir, "lib", "libaudio.so.2"), needed=["libc.so.6", "libmissing.so"], soname="libaudio.so.2")
+        _build_test_elf(os.path.join(system_dir, "libc.so.6"), soname="libc.so.6")
+        _build_test_elf(os.path.join(app_dir, "tool"), needed=["libc.so.6"])
+        
+        preload_dir = os.path.join(root, "preload")
+        os.makedirs(preload_dir)
+        index_path = os.path.join(root, "soname_index.json")
+        resolver = DependencyResolver(SonameIndex([system_dir], index_path), library_path=preload_dir, use_cache=False)
+        graph = resolver.resolve(os.path.join(app_dir, "game"))
+        names = [os.path.basename(path) for path in graph.order]
+        assert names == ["game", "libengine.so.1", "libaudio.so.2", "libc.so.6"], f"Ordem de carga incorreta: {names}"
+        assert graph.missing == [(os.path.realpath(os.path.join(app_dir, "lib", "libaudio.so.2")), "libmissing.so")], "Dependência ausente não reportada."
+        assert resolver.objects_parsed == 4, "A libc compartilhada deveria ser analisada uma única vez."
+        
+        # Grafos e bibliotecas já resolvidos são reaproveitados entre binários
+        assert resolver.resolve(os.path.join(app_dir, "game")) is graph and resolver.graph_hits == 1, "Grafo não memorizado."
+        resolver.resolve(os.path.join(app_dir, "tool"))
+        assert resolver.objects_parsed == 5, "libc foi reanalisada para outro binário."
+        
+        # O índice persistente só revarre diretórios alterados
+        assert SonameIndex([system_dir], index_path).rescanned == [], "Índice persistido não foi reutilizado."
+        
+        # Alterar uma biblioteca do grafo invalida a memorização
+        time.sleep(0.01)
+        _build_test_elf(os.path.join(app_dir, "lib", "libengine.so.1"), soname="libengine.so.1")
+        graph = resolver.resolve(os.path.join(app_dir, "game"))
+        assert graph.nodes[graph.order[1]]['needed'] == {}, "Grafo obsoleto reutilizado."
+        
+        # Instalar a dependência ausente no sistema invalida o grafo incompleto
+        time.sleep(0.01)
+        _build_test_elf(os.path.join(system_dir, "libmissing.so"), soname="libmissing.so")
+        graph = resolver.resolve(os.path.join(app_dir, "game"))
+        assert graph.missing == [], f"Dependência instalada não encontrada: {graph.missing}"
+        assert "libmissing.so" in [os.path.basename(path) for path in graph.order], "Dependência instalada fora do grafo."
+        
+        # Uma biblioteca nova mais cedo na ordem de busca passa a ter precedência
+        time.sleep(0.01)
+        _build_test_elf(os.path.join(preload_dir, "libc.so.6"), soname="libc.so.6")
+        graph = resolver.resolve(os.path.join(app_dir, "game"))
+        libc = dict(graph.ldd())["libc.so.6"]
+        assert libc == os.path.realpath(os.path.join(preload_dir, "libc.so.6")), f"Biblioteca sombreada ignorada: {libc}"
+    
+    print("  Teste do Grafo de Dependências concluído com sucesso.")
+
+def test_elf_symbol_tables():
+    print("\n--- Teste de Seções e Tabelas de Símbolos ELF (streaming) ---")
+    
+    test_bin_path = "/tmp/test_unstripped.so"
+    static_symbols = [(f"fn_{i}", 0x10000 + i * 0x40, 0x30, 2) for i in range(10000)]
+    static_symbols += [("fn_0_alias", 0x10000, 0x30, 2), ("table", 0x900000, 0x100, 1), ("label", 0x900200, 0, 2),
+                       ("label_alias", 0x900200, 0x8, 2), ("tail", 0x900300, 0x10, 2),
+                       ("outer", 0x800000, 0x100, 2), ("inner", 0x800010, 0x10, 2)]
+    _build_test_elf(test_bin_path, [("exported", 0x10040, None, False)], static_symbols=static_symbols)
+    
+    with ELFLoader(test_bin_path, use_cache=False) as loader:
+        assert loader.parse_headers(), "Falha ao analisar ELF com section headers."
+        names = [loader.section_name(section) for section in loader.sections]
+        assert names == ['', '.dynsym', '.dynstr', '.symtab', '.strtab', '.shstrtab'], f"Seções incorretas: {names}"
+        assert loader.section_by_name('.symtab').size == 24 * (len(static_symbols) + 1), "Tamanho da .symtab incorreto."
+        
+        # Geração sob demanda: nomes só são decodificados quando acessados
+        symbols = loader.symbols(dynamic=False)
+        first = next(symbols)
+        assert first._name is None and first.name == "fn_0" and first.value == 0x10000, "Primeiro símbolo incorreto."
+        assert sum(1 for _ in symbols) == len(static_symbols) - 1, "Gerador perdeu símbolos."
+        assert [s.name for s in loader.symbols(dynamic=True)] == ["exported"], "Tabela .dynsym incorreta."
+        
+        # Índice de intervalos para simbolização de IPs amostrados
+        index = loader.build_address_index()
+        assert len(index) == len(static_symbols), "Índice de endereços incompleto."
+        assert loader.symbolize(0x10000 + 1234 * 0x40 + 0x10) == "fn_1234+0x10", "Simbolização incorreta."
+        assert loader.symbolize(0x10000 + 1234 * 0x40 + 0x38) is None, "Endereço entre símbolos foi simbolizado."
+        assert loader.symbolize(0x900080) == "table+0x80", "Objeto não simbolizado."
+        assert loader.symbolize(0x900210) == "label+0x10", "Símbolo sem tamanho deveria ir até o próximo."
+        assert loader.symbolize(0x900204) in ("label+0x4", "label_alias+0x4"), "Alias com tamanho não simbolizado."
+        assert loader.symbolize(0x800014) == "inner+0x4", "Símbolo aninhado deveria ter precedência."
+        assert loader.symbolize(0x800080) == "outer+0x80", "Endereço após símbolo aninhado não simbolizado."
+        assert loader.symbolize(0x10010) in ("fn_0+0x10", "fn_0_alias+0x10"), "Alias não simbolizado."
+        assert loader.build_address_index() is index, "Índice reconstruído."
+    os.remove(test_bin_path)
+    
+    print("  Teste de Tabelas de Símbolos concluído com sucesso.")
+
+def test_elf_prelink_cache():
+    print("\n--- Teste do Cache de Relocações ELF (prelink) ---")
+    
+    with tempfile.TemporaryDirectory() as root:
+        lib_dir = os.path.join(root, "lib")
+        os.makedirs(lib_dir)
+        app_path, lib_path = os.path.join(root, "game"), os.path.join(lib_dir, "libcore.so.1")
+        # R_X86_64_GLOB_DAT, _64, _RELATIVE, _JUMP_SLOT (símbolo ausente), _IRELATIVE e GLOB_DAT de IFUNC
+        # (adiadas), _64 de fraco indefinido (S = 0) e _64 sem símbolo (S = 0, sem base)
+        _build_test_elf(app_path, symbols=[("hook", 0x1400, None, False)], needed=["libcore.so.1"], runpath="$ORIGIN/lib",
+                        imports=["engine_tick", "absent", "fast_copy", "optional"], weak=["optional"], data=b'\x00' * 64,
+                        relocations=[(0x200, 6, "engine_tick", 0), (0x208, 1, "engine_tick", 8), (0x210, 8, None, 0x300),
+                                     (0x218, 7, "absent", 0), (0x220, 37, None, 0x1400), (0x228, 6, "fast_copy", 0),
+                                     (0x230, 1, "optional", 0x10), (0x238, 1, None, 0x40)])
+        # A biblioteca referencia o próprio "hook", mas a definição do executável tem precedência
+        _build_test_elf(lib_path, symbols=[("engine_tick", 0x1000, None, False), ("hook", 0x1500, None, False),
+                                           ("fast_copy", 0x1200, None, False)], ifuncs=["fast_copy"],
+                        soname="libcore.so.1", data=b'\x00' * 8, relocations=[(0x200, 6, "hook", 0)])
+        
+        resolver = DependencyResolver(SonameIndex([], None), library_path="", use_cache=False)
+        cache = PrelinkCache(os.path.join(root, "prelink"), use_cache=False)
+        prelink = cache.get(resolver.resolve(app_path))
+        app, lib = os.path.realpath(app_path), os.path.realpath(lib_path)
+        assert not prelink.from_cache and cache.misses == 1, "O primeiro acesso deveria calcular as relocações."
+        assert prelink.bases == {app: PIE_BASE, lib: LIBRARY_BASE}, f"Bases incorretas: {prelink.bases}"
+        assert list(prelink.fixups[app][0]) == [0x200, 0x208, 0x210, 0x218, 0x230, 0x238], "Relocações do executável incorretas."
+        assert list(prelink.fixups[app][2]) == [LIBRARY_BASE + 0x1000, LIBRARY_BASE + 0x1008, PIE_BASE + 0x300, 0, 0x10, 0x40], \
+            "Valores resolvidos incorretos."
+        assert list(prelink.fixups[lib][2]) == [PIE_BASE + 0x1400], "Interposição do executável não respeitada."
+        assert prelink.unresolved == 1 and prelink.deferred == 2, "Contagem de não resolvidas/adiadas incorreta."
+        
+        # Execução seguinte: tudo vem do cache em disco
+        cached = cache.get(resolver.resolve(app_path))
+        assert cached.from_cache and cache.hits == 1, "Cache de relocações não reutilizado."
+        assert cached.bases == prelink.bases and cached.fixups == prelink.fixups, "Cache divergente do cálculo."
+        
+        # Aplicação em lote sobre as imagens mapeadas
+        images = {}
+        for path in (app, lib):
+            with ELFLoader(path, use_cache=False) as loader:
+                loader.parse_headers()
+                images[path] = map_image(loader)
+        assert cached.apply(images) == 7, "Nem todas as correções foram aplicadas."
+        start, image = images[app]
+        assert struct.unpack_from('<3Q', image, 0x200 - start) == (LIBRARY_BASE + 0x1000, LIBRARY_BASE + 0x1008, PIE_BASE + 0x300), \
+            "Imagem não corrigida."
+        
+        # Alterar uma biblioteca do grafo invalida o cache
+        time.sleep(0.01)
+        _build_test_elf(lib_path, symbols=[("engine_tick", 0x1100, None, False)], soname="libcore.so.1")
+        prelink = cache.get(resolver.resolve(app_path))
+        assert not prelink.from_cache and prelink.fixups[app][2][0] == LIBRARY_BASE + 0x1100, "Cache obsoleto reutilizado."
+    
+    print("  Teste do Cache de Relocações concluído com sucesso.")
+
+def test_dex_id_tables():
+    print("\n--- Teste das Tabelas de IDs DEX ---")
+    
+    engine = "Lcom/example/game/Engine;"
+    classes = [
+        ("Lcom/example/game/MainActivity;", "Landroid/app/Activity;", [("engine", engine)],
+         [("<init>", "V", []), ("onCreate", "V", ["Landroid/os/Bundle;"])]),
+        (engine, None, [("frames", "I"), ("pontuação", "J"), ("title", "Ljava/lang/String;")],
+         [("<init>", "V", []), ("create", engine, []), ("tick", "V", ["J", "I"])]),
+    ]
+    loader = DEXLoader(_build_test_dex(classes))
+    assert loader.load(), "Falha ao carregar o DEX sintético."
+    assert len(loader.method_ids) == 5 and len(loader.field_ids) == 4 and len(loader.class_defs) == 2, "Tabelas de IDs incompletas."
+    
+    # Consultas cruzadas vetorizadas
+    names = sorted(loader.method_name(int(index)) for index in loader.methods_of(engine))
+    assert names == [f"{engine}->{name}" for name in ("<init>", "create", "tick")], f"Métodos da classe incorretos: {names}"
+    fields = sorted(loader.string(loader.field_ids[int(index)][2]) for index in loader.fields_of(engine))
+    assert fields == ["frames", "pontuação", "title"], f"Campos da classe incorretos: {fields}"
+    references = loader.references_to(engine)
+    assert [loader.string(loader.field_ids[int(index)][2]) for index in references['fields']] == ["engine"], "Campos do tipo incorretos."
+    assert [loader.method_name(int(index)) for index in references['methods']] == [f"{engine}->create"], "Métodos que retornam o tipo incorretos."
+    assert loader.superclass_of(1) == "Ljava/lang/Object;" and loader.superclass_of(0) == "Landroid/app/Activity;", "Superclasse incorreta."
+    assert loader.type_index("Lcom/example/Missing;") is None and len(loader.methods_of("Lcom/example/Missing;")) == 0, "Tipo inexistente encontrado."
+    
+    # Versões 035-039 são aceitas; versões desconhecidas e tabelas truncadas são rejeitadas
+    assert DEXLoader(_build_test_dex(classes, version=b'039')).load(), "DEX 039 rejeitado."
+    assert not DEXLoader(_build_test_dex(classes, version=b'099')).load(), "Versão DEX desconhecida aceita."
+    truncated = bytearray(_build_test_dex(classes))
+    struct.pack_into('<L', truncated, 0x5C, len(truncated)) # method_ids_off além do fim do arquivo
+    assert not DEXLoader(bytes(truncated), verify=False).load(), "Tabela truncada aceita."
+    
+    print("  Teste das Tabelas de IDs DEX concluído com sucesso.")
+
+def test_dex_string_pool():
+    print("\n--- Teste do Pool de Strings DEX (MUTF-8) ---")
+    
+    constants = ["olá mundo", "nul\x00interno", "emoji \U0001F3AE", "Tela inicial", "emoji \uFF01", "emoji \uE000"]
+    classes = [("Lcom/example/game/Main;", None, [], [("run", "V", [])])]
+    loader = DEXLoader(_build_test_dex(classes, strings=constants), string_cache_size=4)
+    assert loader.load(), "Falha ao carregar o DEX sintético."
+    pool = loader.strings
+    assert pool.misses == 0 and pool.stats()['resident'] == 0, "Strings decodificadas antes do primeiro acesso."
+    
+    # Decodificação MUTF-8 (NUL em 2 bytes e caracteres suplementares em pares de surrogates)
+    for text in constants:
+        index = loader.string_index(text)
+        assert index is not None and loader.string(index) == text, f"String MUTF-8 decodificada incorretamente: {text!r}"
+    
+    # LRU limitado: acessos repetidos são acertos, e o pool nunca passa da capacidade
+    pool.hits = pool.misses = 0
+    index = loader.string_index("Tela inicial")
+    for _ in range(10):
+        loader.string(index)
+    assert pool.hits >= 9, "Acessos repetidos não vieram do LRU."
+    for other in range(len(pool)):
+        pool[other]
+    assert pool.stats()['resident'] == 4, "O LRU ultrapassou a capacidade."
+    misses = pool.misses
+    pool[len(pool) - 1]
+    pool[0]
+    assert pool.misses == misses + 1, "Entrada recente foi descartada antes da mais antiga."
+    
+    # Caminho em lote para ferramentas: pool inteiro, sem passar pelo LRU
+    hits, misses = pool.hits, pool.misses
+    everything = pool.decode_all()
+    assert everything == sorted(everything, key=utf16_key) and set(constants) <= set(everything), "Decodificação em lote incorreta."
+    assert (pool.hits, pool.misses) == (hits, misses), "Decodificação em lote passou pelo LRU."
+    
+    print("  Teste do Pool de Strings concluído com sucesso.")
+
+def test_multidex_loading():
+    print("\n--- Teste do Carregador Multidex ---")
+    
+    def dex(*descriptors):
+        return _build_test_dex([(descriptor, None, [], [("run", "V", [])]) for descriptor in descriptors])
+    
+    with tempfile.TemporaryDirectory() as root:
+        apk_path = os.path.join(root, "game.apk")
+        with zipfile.ZipFile(apk_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("AndroidManifest.xml", _build_test_axml(("manifest", [("package", "com.example.game")], [])))
+            zf.writestr("classes.dex", dex("Lcom/example/game/MainActivity;", "Lcom/example/util/Log;"))
+            zf.writestr("classes2.dex", dex("Lcom/example/util/Log;", "Lcom/example/game/Engine;"))
+            zf.writestr("classes3.dex", dex("Lcom/example/game/Audio;"))
+            zf.writestr("classes5.dex", dex("Lcom/example/game/Orphan;")) # Após uma lacuna: ignorado, como no ART
+        
+        parser = APKParser(apk_path)
+        assert parser.parse(), "Falha ao analisar o APK multidex."
+        assert parser.dex_files == ["classes.dex", "classes2.dex", "classes3.dex"], f"DEX descobertos incorretos: {parser.dex_files}"
+        assert parser.get_info()["dex_file_present"], "classes.dex não reportado."
+        
+        cache = HeaderCache(os.path.join(root, "cache"))
+        artifacts = ArtifactCache(os.path.join(root, "artifacts"))
+        loader = MultiDexLoader(apk_path, workers=3, header_cache=cache, artifact_cache=artifacts)
+        assert loader.load(), "Falha ao carregar os DEX em paralelo."
+        assert len(loader.loaders) == 3 and len(loader.classes) == 4, "Classes não mescladas."
+        
+        # A primeira definição vence; a cópia em classes2.dex fica sombreada
+        found, class_def_idx = loader.find_class("Lcom/example/util/Log;")
+        assert found is loader.loaders[0] and found.class_descriptors()[class_def_idx] == "Lcom/example/util/Log;", "Sombreamento incorreto."
+        assert loader.shadowed == [("Lcom/example/util/Log;", 1)], f"Sombreamento não registrado: {loader.shadowed}"
+        assert loader.find_class("Lcom/example/game/Engine;")[0] is loader.loaders[1], "Classe do classes2.dex ausente."
+        assert loader.find_class("Lcom/example/game/Orphan;") is None, "DEX após lacuna foi carregado."
+        
+        # Segunda carga: cabeçalhos vêm do Header Cache (chaves 'game.apk!classesN.dex')
+        again = MultiDexLoader(apk_path, header_cache=cache, artifact_cache=artifacts)
+        assert again.load() and again.classes == loader.classes and cache.hits > 0, "Recarga multidex divergente."
+        assert all(dex_file.from_artifacts for dex_file in again.loaders), "Código dos DEX não veio do cache de artefatos."
+        
+        # Sem APK: buffers já em memória
+        buffers = MultiDexLoader(dex_buffers=[("a.dex", dex("LA;")), ("b.dex", dex("LA;", "LB;"))])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert buffers.load() and buffers.classes == {"LA;": (0, 0), "LB;": (1, 1)}, "Mescla de buffers incorreta."
+        
+        # As mensagens de cada DEX saem agrupadas e em ordem; o bytecode é decodificado na thread chamadora
+        lines = [line for line in output.getvalue().splitlines() if line.startswith("DEX Loader:")]
+        assert [("carregado" in line, "concluída" in line) for line in lines if "pré-decodificação" not in line] == \
+            [(True, False), (False, True)] * 2, f"Mensagens dos DEX intercaladas: {lines}"
+        assert all(dex_file.log is print for dex_file in buffers.loaders), "Mensagens do DEX ainda acumuladas após a carga."
+        deferred = DEXLoader(dex("LC;"), use_cache=False, log=[].append)
+        assert deferred.load(compile_code=False) and deferred.code == {}, "compile_code=False decodificou o bytecode."
+    
+    print("  Teste do Carregador Multidex concluído com sucesso.")
+
+def test_dex_class_index():
+    print("\n--- Teste do Índice de Classes DEX ---")
+    
+    # Enumeração por pacote: 'com.example' não inclui 'com.examples'
+    index = ClassIndex()
+    index.add_dex(0, ["Lcom/example/A;", "Lcom/example/ui/B;", "Lcom/examples/C;", "LRoot;"])
+    index.add_dex(1, ["Lcom/example/A;", "Lcom/example/ui/deep/D;"])
+    assert index.lookup("Lcom/example/A;") == (0, 0) and index.shadowed == [("Lcom/example/A;", 1)], "Primeira definição não venceu."
+    assert index.in_package("com.example") == ["Lcom/example/A;"], "Enumeração do pacote incorreta."
+    assert sorted(index.in_package("com/example/", recursive=True)) == ["Lcom/example/A;", "Lcom/example/ui/B;", "Lcom/example/ui/deep/D;"], \
+        "Enumeração por prefixo incorreta."
+    assert index.in_package("") == ["LRoot;"] and len(index.in_package("", recursive=True)) == 5, "Pacote padrão incorreto."
+    
+    # Ligação de classes do ART através do índice (multidex)
+    activity = "Lcom/example/game/ui/MainActivity;"
+    first = _build_test_dex([(activity, "Lcom/example/game/ui/BaseActivity;", [], [("onCreate", "V", [])]),
+                             ("Lcom/example/game/Broken;", "Lcom/thirdparty/Missing;", [], [])])
+    second = _build_test_dex([("Lcom/example/game/ui/BaseActivity;", "Landroid/app/Activity;", [], [("onStart", "V", [])]),
+                              ("Lcom/example/game/Engine;", None, [], [])])
+    dex = MultiDexLoader(dex_buffers=[("classes.dex", first), ("classes2.dex", second)])
+    assert dex.load(), "Falha ao carregar os DEX."
+    assert sorted(dex.classes_in_package("com.example.game", recursive=True)) == sorted(dex.classes), "Classes do pacote incompletas."
+    
+    runtime = ART_Runtime()
+    runtime.attach_dex("com.example.game", dex)
+    linked = runtime.resolve_class("com.example.game", activity)
+    assert linked is not None and linked['dex'] is dex.loaders[0], "Classe não ligada."
+    base = linked['superclass']
+    assert base['descriptor'] == "Lcom/example/game/ui/BaseActivity;" and base['dex'] is dex.loaders[1], "Superclasse de outro DEX não ligada."
+    assert base['superclass']['boot'] and base['superclass']['descriptor'] == "Landroid/app/Activity;", "Classe do framework não resolvida."
+    assert runtime.resolve_class("com.example.game", activity) is linked, "Classe ligada novamente."
+    assert runtime.resolve_class("com.example.game", "Lcom/example/game/Broken;") is None, "Superclasse ausente deveria falhar a ligação."
+    assert runtime.link_package("com.example.game", "com.example.game") == 3, "Ligação do pacote incorreta."
+    
+    print("  Teste do Índice de Classes concluído com sucesso.")
+
+def test_dalvik_interpreter():
+    print("\n--- Teste do Interpretador Dalvik ---")
+    
+    main, math = "Lcom/example/myapp/MainActivity;", "Lcom/example/myapp/MathUtil;"
+    log = ("Landroid/util/Log;", "i", "I", ["Ljava/lang/String;", "Ljava/lang/String;"])
+    classes = [
+        (math, None, [], [
+            # sum(n): for (i = 0; i < n; i++) total += i
+            ("sum", "I", ["I"], (3, 1, [0x0012, 0x0112, 0x2135, 6, 0x10B0, 0x01D8, 0x0101, 0xFB28, 0x000F])),
+            ("div", "I", ["I", "I"], (3, 2, [0x0093, 0x0201, 0x000F])), # div-int v0, v1, v2
+            ("mulLong", "J", ["J", "J"], (6, 4, [0x009D, 0x0402, 0x0010])), # mul-long v0, v2, v4
+            ("allocate", "V", [], (1, 0, [0x0022, 0, 0x000E])), # new-instance: fora do subconjunto
+        ]),
+        (main, "Landroid/app/Activity;", [("total", "I")], [
+            ("onCreate", "V", ["Landroid/os/Bundle;"], (4, 2, [
+                0x0013, 100, # const/16 v0, 100
+                0x1071, ('method', math, 'sum'), 0x0000, # invoke-static {v0}
+                0x000A, # move-result v0
+                0x0067, ('field', main, 'total'), # sput v0
+                0x011A, ('string', 'iniciado'), # const-string v1
+                0x2071, ('method', *log[:2]), 0x0011, # invoke-static {v1, v1}, Log.i
+                0x000E])),
+            ("onResume", "V", [], (2, 1, [0x0060, ('field', main, 'total'), 0x00DA, 0x0200,
+                                          0x0067, ('field', main, 'total'), 0x000E])), # total *= 2
+            ("recurse", "I", ["I"], (2, 1, [0x1071, ('method', main, 'recurse'), 0x0001, 0x000A, 0x000F])),
+        ]),
+    ]
+    dex = DEXLoader(_build_test_dex(classes, method_refs=[log]))
+    assert dex.load(), "Falha ao carregar o DEX com código."
+    assert len(dex.code) == 6 and len(dex.rejected) == 1, f"Pré-decodificação incorreta: {len(dex.code)} / {dex.rejected}"
+    
+    # Verificação estrutural na pré-decodificação
+    for units, registers in (([0x0512, 0x000E], 2), ([0x0028 | (3 << 8), 0x000E], 1), ([0x0012], 1)):
+        try:
+            decode_instructions(array('H', units), registers, 0)
+            assert False, f"Código inválido aceito: {units}"
+        except VerifyError:
+            pass
+    
+    interpreter = Interpreter(dex)
+    assert interpreter.run(math, "sum", [100]) == 4950, "Laço interpretado incorretamente."
+    assert interpreter.run(math, "div", [7, -2]) == -3 and interpreter.run(math, "div", [-7, 2]) == -3, "Divisão Java deve truncar."
+    assert interpreter.run(math, "mulLong", [-3, 0, 7, 0]) == -21, "Aritmética long incorreta."
+    assert interpreter.run(math, "mulLong", [1 << 32, 0, 1 << 32, 0]) == 0, "Overflow de long não truncado em 64 bits."
+    for descriptor, name, args, expected in ((math, "div", [1, 0], "Ljava/lang/ArithmeticException;"),
+                                             (math, "allocate", [], "Ljava/lang/VerifyError;"),
+                                             (main, "recurse", [1], "Ljava/lang/StackOverflowError;")):
+        try:
+            interpreter.run(descriptor, name, args)
+            assert False, f"{name} deveria lançar {expected}"
+        except DalvikError as e:
+            assert e.exception_class == expected, f"Exceção incorreta: {e}"
+    assert interpreter.depth == 0, "Profundidade de chamadas não restaurada após exceção."
+    
+    # Microbenchmark do laço de despacho: 4 instruções por iteração + 4 fixas
+    result = interpreter.benchmark(math, "sum", [2000], repeat=3)
+    assert result['instructions'] == 3 * (4 * 2000 + 4) and result['ips'] > 0, "Contagem de instruções incorreta."
+    
+    # Ciclo de vida interpretado pelo ART, com contadores alimentando o PGO
+    with tempfile.TemporaryDirectory() as profile_dir:
+        store = ProfileStore(profile_dir)
+        runtime = ART_Runtime(store)
+        runtime.attach_dex("com.example.myapp", dex)
+        logged = []
+        runtime.interpreters["com.example.myapp"].natives["Landroid/util/Log;->i"] = lambda args: logged.append(args) or 0
+        runtime.launch_app("/tmp/test_interpreted_app.apk")
+        interpreted = runtime.interpreters["com.example.myapp"]
+        assert interpreted.statics[(main, "total")] == 9900, "Estado estático incorreto após onCreate/onResume."
+        assert logged == [["iniciado", "iniciado"]], "Chamada nativa do framework não executada."
+        profile = store.get("com.example.myapp")
+        assert profile.has_method("classes.dex", dex.find_method(math, "sum"), FLAG_STARTUP), "Contadores de invocação não chegaram ao PGO."
+        assert profile.has_class("classes.dex", dex.type_index(math)), "Classe do método não registrada no perfil."
+        
+        # Após a inicialização: pós-inicialização, e quente a partir de HOT_INVOCATIONS chamadas
+        for _ in range(8):
+            runtime.execute_method("com.example.myapp", math, "div", [8, 2])
+        runtime.stop_app("com.example.myapp")
+        store.close()
+        div = dex.find_method(math, "div")
+        persisted = ProfileStore(profile_dir).get("com.example.myapp")
+        assert persisted.has_method("classes.dex", div, FLAG_HOT | FLAG_POST_STARTUP), "Método pós-inicialização não persistido."
+        assert not persisted.has_method("classes.dex", div, FLAG_STARTUP), "Método pós-inicialização marcado como de inicialização."
+        assert persisted.methods("classes.dex", FLAG_STARTUP) == profile.methods("classes.dex", FLAG_STARTUP), "Perfil persistido difere do coletado."
+    
+    print("  Teste do Interpretador Dalvik concluído com sucesso.")
+
+def test_dex_artifact_cache():
+    print("\n--- Teste do Cache de Artefatos DEX ---")
+    
+    math = "Lcom/example/myapp/MathUtil;"
+    def dex(name):
+        return _build_test_dex([(math, None, [], [
+            (name, "I", ["I"], (3, 1, [0x0012, 0x0112, 0x2135, 6, 0x10B0, 0x01D8, 0x0101, 0xFB28, 0x000F])),
+            ("allocate", "V", [], (1, 0, [0x0022, 0, 0x000E])), # Rejeitado na verificação
+        ])])
+    
+    with tempfile.TemporaryDirectory() as root:
+        cache = ArtifactCache(os.path.join(root, "artifacts"))
+        cold = DEXLoader(dex("sum"), artifact_cache=cache)
+        assert cold.load() and not cold.from_artifacts and cache.misses == 1, "Primeira carga deveria compilar."
+        
+        # Segunda carga: nenhum code_item é decodificado, os arrays são views sobre o mmap
+        warm = DEXLoader(dex("sum"), artifact_cache=cache)
+        assert warm.load() and warm.from_artifacts and cache.hits == 1, "Segunda carga não usou o artefato."
+        assert all(isinstance(decoded.a, memoryview) for decoded in warm.code.values()) or sys.byteorder != 'little', "Artefato copiado em vez de mapeado."
+        assert warm.rejected == cold.rejected and len(warm.rejected) == 1, "Métodos rejeitados não restaurados."
+        for method_idx, decoded in cold.code.items():
+            cached = warm.code[method_idx]
+            assert (cached.registers, cached.ins) == (decoded.registers, decoded.ins), "Cabeçalho do método divergente."
+            assert [list(column) for column in (cached.opcodes, cached.a, cached.b, cached.c)] == \
+                   [list(column) for column in (decoded.opcodes, decoded.a, decoded.b, decoded.c)], "Código em cache divergente."
+        assert Interpreter(warm).run(math, "sum", [100]) == 4950, "Código do artefato executado incorretamente."
+        
+        # Outra versão do runtime não reaproveita o artefato
+        other = ArtifactCache(os.path.join(root, "artifacts"), runtime_version="dwce-art0")
+        assert DEXLoader(dex("sum"), artifact_cache=other).load() and other.misses == 1 and other.hits == 0, "Artefato de outro runtime reutilizado."
+        
+        # Artefato corrompido: descartado e recompilado
+        for name in os.listdir(cache.cache_dir):
+            with open(os.path.join(cache.cache_dir, name), 'r+b') as f:
+                f.write(b'XXXX')
+        again = DEXLoader(dex("sum"), artifact_cache=cache)
+        assert again.load() and not again.from_artifacts and len(again.code) == 1, "Artefato corrompido foi aceito."
+        
+        # Remoção por tamanho entre apps: o artefato usado há mais tempo sai primeiro
+        small = ArtifactCache(os.path.join(root, "small"))
+        DEXLoader(dex("first"), artifact_cache=small).load()
+        entry_size = small.size()
+        small.max_bytes = entry_size * 2
+        os.utime(os.path.join(small.cache_dir, os.listdir(small.cache_dir)[0]), (1, 1))
+        DEXLoader(dex("second"), artifact_cache=small).load()
+        DEXLoader(dex("third"), artifact_cache=small).load()
+        assert small.evictions == 1 and small.size() <= small.max_bytes, "Cache de artefatos excedeu o limite."
+        oldest = DEXLoader(dex("first"), artifact_cache=small)
+        assert oldest.load() and not oldest.from_artifacts and small.hits == 0, "Artefato mais antigo não foi removido."
+        assert not any(name.endswith('.tmp') for name in os.listdir(small.cache_dir)), "Arquivo temporário deixado para trás."
+    
+    print("  Teste do Cache de Artefatos DEX concluído com sucesso.")
+
+def test_dex_integrity():
+    print("\n--- Teste de Integridade DEX (checksum e signature) ---")
+    
+    classes = [("Lcom/example/app/Main;", None, [], [("run", "V", [])])]
+    data = _build_test_dex(classes)
+    loader = DEXLoader(data)
+    assert loader.load() and loader.verified, "DEX íntegro não verificado."
+    
+    # Passada por blocos pequenos equivale ao cálculo sobre o arquivo inteiro
+    assert compute_checksums(data, chunk_size=7) == (zlib.adler32(data[12:]), hashlib.sha1(data[32:]).digest()), "Checksums por blocos divergentes."
+    
+    corrupted = bytearray(data)
+    corrupted[data.index(b"Main;")] = ord("N") # Um caractere alterado no pool de strings
+    assert not DEXLoader(bytes(corrupted)).load(), "DEX corrompido aceito."
+    assert "Adler-32" in verify_dex(corrupted, loader.header), "Checksum corrompido não detectado."
+    struct.pack_into('<L', corrupted, 8, zlib.adler32(corrupted[12:])) # Checksum refeito, signature antiga
+    assert "SHA-1" in verify_dex(corrupted, DEX_HEADER.unpack_from(corrupted)), "Signature corrompida não detectada."
+    assert DEXLoader(bytes(corrupted), verify=False).load(), "verify=False deveria ignorar a integridade."
+    
+    # Várias DEX em paralelo (instalação em lote)
+    buffers = (data, bytes(corrupted), data)
+    results = verify_all([(buffer, DEX_HEADER.unpack_from(buffer)) for buffer in buffers], workers=3)
+    assert results[0] is None and results[2] is None and "SHA-1" in results[1], f"Verificação em lote incorreta: {results}"
+    
+    # Resultado guardado junto do cabeçalho: APK inalterado não é reprocessado
+    import dex_loader.dex_loader as dex_loader_module
+    with tempfile.TemporaryDirectory() as root:
+        apk_path = os.path.join(root, "app.apk")
+        with zipfile.ZipFile(apk_path, 'w') as zf:
+            zf.writestr("classes.dex", data)
+            zf.writestr("classes2.dex", _build_test_dex([("Lcom/example/app/Extra;", None, [], [])]))
+        cache = HeaderCache(os.path.join(root, "cache"))
+        artifacts = ArtifactCache(os.path.join(root, "artifacts"))
+        assert MultiDexLoader(apk_path, header_cache=cache, artifact_cache=artifacts).load(), "Falha na carga verificada."
+        
+        verified = []
+        original = dex_loader_module.verify_dex
+        dex_loader_module.verify_dex = lambda dex_data, header: verified.append(header) or original(dex_data, header)
+        try:
+            again = MultiDexLoader(apk_path, header_cache=cache, artifact_cache=artifacts)
+            assert again.load() and all(dex_file.verified for dex_file in again.loaders), "DEX não marcados como verificados."
+            assert verified == [], "DEX inalterado foi verificado de novo."
+            
+            os.utime(apk_path, ns=(0, 10 ** 9)) # Novo mtime: o resultado em cache deixa de valer
+            assert MultiDexLoader(apk_path, header_cache=cache, artifact_cache=artifacts).load(), "Falha na recarga."
+            assert len(verified) == 2, "DEX com mtime novo não foi verificado."
+        finally:
+            dex_loader_module.verify_dex = original
+    
+    # Custo da verificação sempre ativa: throughput do streaming
+    blob = bytes(range(256)) * (64 * 1024) # 16 MB
+    start = time.perf_counter()
+    compute_checksums(blob)
+    elapsed = time.perf_counter() - start
+    print(f"  Checksum + signature: {len(blob) / (1024 * 1024) / max(elapsed, 1e-9):.0f} MB/s")
+    
+    print("  Teste de Integridade DEX concluído com sucesso.")
+
+def test_axml_manifest():
+    print("\n--- Teste do Parser de Manifesto Binário (AXML) ---")
+    
+    launcher = ("intent-filter", [], [("action", [("android:name", "android.intent.action.MAIN")], []),
+                                      ("category", [("android:name", "android.intent.category.LAUNCHER")], [])])
+    manifest = ("manifest", [("package", "com.example.myapp"), ("android:versionCode", 7), ("android:versionName", "1.2")], [
+        ("uses-permission", [("android:name", "android.permission.INTERNET")], []),
+        ("uses-permission", [("android:name", "android.permission.CAMERA")], []),
+        ("application", [("android:label", "My App")], [
+            ("activity", [("android:name", "com.example.myapp.SettingsActivity")], [
+                ("intent-filter", [], [("action", [("android:name", "android.intent.action.MAIN")], [])])]),
+            ("activity", [("android:name", ".MainActivity"), ("android:label", "Main")], [launcher]),
+        ]),
+    ])
+    
+    events = list(iter_events(_build_test_axml(manifest)))
+    assert events[0] == (START, "manifest", {"package": "com.example.myapp",
+                                             "{http://schemas.android.com/apk/res/android}versionCode": "7",
+                                             "{http://schemas.android.com/apk/res/android}versionName": "1.2"}), f"Evento inicial incorreto: {events[0]}"
+    assert events[-1] == (END, "manifest", None) and sum(1 for event in events if event[0] == START) == 11, "Eventos de elemento incorretos."
+    
+    with tempfile.TemporaryDirectory() as root:
+        # Pool UTF-16, pool UTF-8 e nomes de atributos removidos (resolvidos pelo ID de recurso)
+        for variant in ({}, {"utf8": True}, {"strip_names": True}):
+            apk_path = os.path.join(root, "app.apk")
+            with zipfile.ZipFile(apk_path, 'w') as zf:
+                zf.writestr("AndroidManifest.xml", _build_test_axml(manifest, **variant))
+            parser = APKParser(apk_path)
+            assert parser.parse(), f"Falha ao analisar o manifesto binário {variant}."
+            assert parser.package_name == "com.example.myapp", f"Pacote incorreto: {parser.package_name}"
+            assert parser.permissions == ["android.permission.INTERNET", "android.permission.CAMERA"], "Permissões incorretas."
+            assert parser.main_activity == "com.example.myapp.MainActivity", f"Atividade principal incorreta: {parser.main_activity}"
+        
+        with zipfile.ZipFile(apk_path, 'w') as zf:
+            zf.writestr("AndroidManifest.xml", b"\x03\x00\x08\x00")
+        assert not APKParser(apk_path).parse(), "Manifesto truncado aceito."
+    
+    # Custo por manifesto (catálogos com milhares de APKs)
+    data = _build_test_axml(manifest)
+    start = time.perf_counter()
+    for _ in range(1000):
+        parser = APKParser("unused.apk")
+        parser._extract_info_from_manifest(iter_events(data))
+    print(f"  Manifesto binário: {(time.perf_counter() - start):.3f} ms por manifesto")
+    
+    print("  Teste do Parser de Manifesto Binário concluído com sucesso.")
+
+def test_apk_index():
+    print("\n--- Teste do Índice de APK (diretório central) ---")
+    
+    dex = _build_test_dex([("Lcom/example/game/MainActivity;", None, [], [("run", "V", [])])])
+    arsc = bytes(range(256)) * 64
+    asset = b"nivel " * 200000 # ~1.2 MB comprimível
+    with tempfile.TemporaryDirectory() as root:
+        apk_path = os.path.join(root, "game.apk")
+        with zipfile.ZipFile(apk_path, 'w') as zf:
+            zf.writestr("AndroidManifest.xml", _build_test_axml(("manifest", [("package", "com.example.game")], [])),
+                        zipfile.ZIP_DEFLATED)
+            zf.writestr("classes.dex", dex)
+            zf.writestr("resources.arsc", arsc)
+            zf.writestr("lib/arm64-v8a/libgame.so", b"\x7fELF" + b"\x00" * 60)
+            zf.writestr("assets/level.bin", asset, zipfile.ZIP_DEFLATED)
+            zf.comment = b"assinatura v1"
+        
+        with APKIndex(apk_path) as index:
+            with zipfile.ZipFile(apk_path) as zf:
+                assert index.names() == zf.namelist(), "Diretório central divergente do zipfile."
+            
+            # STORED: view sobre o mmap, sem cópia
+            view = index.read("resources.arsc")
+            assert isinstance(view, memoryview) and isinstance(view.obj, mmap.mmap) and view == arsc, "resources.arsc não mapeado."
+            assert index.view("lib/arm64-v8a/libgame.so")[:4] == b"\x7fELF", "Biblioteca STORED incorreta."
+            
+            # DEFLATED: fluxo em blocos com CRC conferido
+            blocks = list(index.stream("assets/level.bin", chunk_size=64 * 1024))
+            assert len(blocks) > 1 and b"".join(blocks) == asset, "Descompressão em fluxo incorreta."
+            assert index.read("assets/level.bin") == asset, "Leitura de entrada DEFLATED incorreta."
+            try:
+                index.view("assets/level.bin")
+                assert False, "View de entrada comprimida deveria falhar."
+            except ValueError:
+                pass
+            index.entries["assets/level.bin"].crc ^= 1
+            try:
+                index.read("assets/level.bin")
+                assert False, "CRC divergente não detectado."
+            except zipfile.BadZipFile:
+                pass
+            del view
+        
+        parser = APKParser(apk_path)
+        assert parser.parse() and parser.package_name == "com.example.game", "Falha ao analisar o APK pelo índice."
+        assert parser.native_libs == ["lib/arm64-v8a/libgame.so"] and parser.dex_files == ["classes.dex"], "Entradas do APK incorretas."
+        
+        # DEX STORED carregado direto do mapeamento
+        loader = MultiDexLoader(apk_path, use_cache=False)
+        assert loader.load() and isinstance(loader.loaders[0].dex_data, memoryview), "DEX STORED foi copiado."
+        assert loader.find_class("Lcom/example/game/MainActivity;") is not None, "Classe do DEX mapeado ausente."
+        
+        with open(os.path.join(root, "broken.apk"), 'wb') as f:
+            f.write(b"PK\x03\x04" + b"\x00" * 100)
+        try:
+            APKIndex(os.path.join(root, "broken.apk"))
+            assert False, "ZIP sem diretório central aceito."
+        except zipfile.BadZipFile:
+            pass
+    
+    print("  Teste do Índice de APK concluído com sucesso.")
+
+def test_resource_table():
+    print("\n--- Teste da Tabela de Recursos (resources.arsc) ---")
+    
+    types = [
+        ("string", ["app_name", "launcher_name"], [
+            ({}, {"app_name": "My App", "launcher_name": ("ref", 0x7F010000)}),
+            ({"language": "pt"}, {"app_name": "Meu App"}),
+            ({"language": "pt", "country": "BR"}, {"app_name": "Meu App (BR)"}),
+        ]),
+        ("drawable", ["icon"], [
+            ({"density": density}, {"icon": f"res/drawable-{name}/icon.png"})
+            for density, name in ((160, "mdpi"), (240, "hdpi"), (320, "xhdpi"), (640, "xxxhdpi"))
+        ]),
+        ("integer", ["columns", "theme_dark"], [
+            ({}, {"columns": 2, "theme_dark": False}),
+            ({"sdk_version": 21}, {"columns": 3}),
+            ({"ui_mode": 0x20}, {"theme_dark": True}),
+        ]),
+    ]
+    for sparse in (False, True):
+        table = ResourceTable(_build_test_arsc("com.example.myapp", types, sparse=sparse))
+        package = table.packages[0x7F]
+        assert package.name == "com.example.myapp" and package.types is None, "Pacote indexado antes da primeira consulta."
+        
+        # Localidade: o qualificador mais específico compatível vence
+        assert table.resolve(0x7F010000) == "My App", "Rótulo padrão incorreto."
+        assert table.resolve(0x7F010000, ResConfig(language="pt")) == "Meu App", "Rótulo pt incorreto."
+        assert table.resolve(0x7F010000, ResConfig(language="pt", country="BR")) == "Meu App (BR)", "Rótulo pt-BR incorreto."
+        assert table.resolve(0x7F010000, ResConfig(language="pt", country="PT")) == "Meu App", "Rótulo pt-PT incorreto."
+        assert table.resolve(0x7F010001, ResConfig(language="pt")) == "Meu App", "Referência @string não seguida."
+        
+        # Densidade: exata, senão a menor acima, senão a maior abaixo
+        for density, expected in ((320, "xhdpi"), (480, "xxxhdpi"), (800, "xxxhdpi"), (120, "mdpi"), (0, "mdpi")):
+            icon = table.resolve(0x7F020000, ResConfig(density=density))
+            assert icon == f"res/drawable-{expected}/icon.png", f"Ícone para {density} dpi incorreto: {icon}"
+        
+        # Versão mínima do SDK, modo noturno e entradas ausentes na configuração mais específica
+        assert table.resolve(0x7F030000, ResConfig(sdk_version=19)) == 2 and table.resolve(0x7F030000, ResConfig(sdk_version=33)) == 3, "Qualificador de SDK incorreto."
+        assert table.resolve(0x7F030001, ResConfig(ui_mode=0x20)) is True and table.resolve(0x7F030001, ResConfig(ui_mode=0x10)) is False, "Modo noturno incorreto."
+        assert table.resolve(0x7F030001, ResConfig(sdk_version=33)) is False, "Fallback para a configuração padrão incorreto."
+        assert table.name(0x7F020000) == "com.example.myapp:drawable/icon", f"Nome do recurso incorreto: {table.name(0x7F020000)}"
+        try:
+            table.resolve(0x7F020005)
+            assert False, "Entrada inexistente resolvida."
+        except KeyError:
+            pass
+    
+    # Escolha de configuração memoizada: consultas repetidas só decodificam a entrada
+    ranked = len(table._ranked)
+    decoded = table.decoded_entries
+    for _ in range(100):
+        table.resolve(0x7F020000, ResConfig(density=480))
+    assert len(table._ranked) == ranked and table.decoded_entries == decoded + 100, "Escolha de configuração não memoizada."
+    
+    # Launcher: rótulo e ícone do manifesto resolvidos pelo APKParser
+    manifest = ("manifest", [("package", "com.example.myapp")], [
+        ("application", [("android:label", "@0x7f010001"), ("android:icon", "@0x7f020000")], [])])
+    with tempfile.TemporaryDirectory() as root:
+        apk_path = os.path.join(root, "app.apk")
+        with zipfile.ZipFile(apk_path, 'w') as zf:
+            zf.writestr("AndroidManifest.xml", _build_test_axml(manifest))
+            zf.writestr("resources.arsc", _build_test_arsc("com.example.myapp", types))
+        parser = APKParser(apk_path)
+        assert parser.parse() and parser.resources is None, "resources.arsc lido sem necessidade."
+        assert parser.label == "@0x7f010001" and parser.icon == "@0x7f020000", "Atributos da <application> não lidos."
+        assert parser.get_label(ResConfig(language="pt", country="BR")) == "Meu App (BR)", "Rótulo do launcher incorreto."
+        assert parser.get_icon(ResConfig(density=240)) == "res/drawable-hdpi/icon.png", "Ícone do launcher incorreto."
+        
+        start = time.perf_counter()
+        device = ResConfig(language="pt", country="BR", density=480, sdk_version=33)
+        for _ in range(1000):
+            parser.get_label(device)
+            parser.get_icon(device)
+        print(f"  Rótulo + ícone: {(time.perf_counter() - start) * 1000:.0f} µs por app")
+    
+    print("  Teste da Tabela de Recursos concluído com sucesso.")
+
+def test_apk_catalog():
+    print("\n--- Teste do Catálogo de APKs ---")
+    
+    def write_apk(path, package, launcher=True, permissions=(), label="@0x7f010000", translations=None):
+        activity = [("activity", [("android:name", ".MainActivity")], [
+            ("intent-filter", [], [("action", [("android:name", "android.intent.action.MAIN")], []),
+                                   ("category", [("android:name", "android.intent.category.LAUNCHER")], [])])])]
+        manifest = ("manifest", [("package", package)],
+                    [("uses-permission", [("android:name", permission)], []) for permission in permissions] +
+                    [("application", [("android:label", label)], activity if launcher else [])])
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr("AndroidManifest.xml", _build_test_axml(manifest))
+            configs = [({}, {"app_name": package.split('.')[-1].title()})]
+            configs += [({"language": language}, {"app_name": text}) for language, text in (translations or {}).items()]
+            zf.writestr("resources.arsc", _build_test_arsc(package, [("string", ["app_name"], configs)]))
+            zf.writestr("classes.dex", _build_test_dex([(f"L{package.replace('.', '/')}/MainActivity;", None, [], [])]))
+            zf.writestr("lib/arm64-v8a/libnative.so", b"\x7fELF")
+    
+    with tempfile.TemporaryDirectory() as root:
+        apps = os.path.join(root, "apps")
+        os.makedirs(os.path.join(apps, "backup"))
+        write_apk(os.path.join(apps, "camera.apk"), "com.example.camera", permissions=["android.permission.CAMERA"],
+                  translations={"pt": "Câmera"})
+        write_apk(os.path.join(apps, "service.apk"), "com.example.service", launcher=False, label="Serviço")
+        shutil.copy(os.path.join(apps, "camera.apk"), os.path.join(apps, "backup", "camera.apk"))
+        with open(os.path.join(apps, "broken.apk"), 'wb') as f:
+            f.write(b"not a zip")
+        
+        with APKCatalog(os.path.join(root, "index.sqlite")) as catalog:
+            stats = catalog.index([apps], workers=2)
+            assert stats == {'indexed': 3, 'reused': 0, 'unchanged': 0, 'removed': 0, 'errors': 1}, f"Indexação incorreta: {stats}"
+            
+            # Consultas respondidas pelo índice
+            launchable = catalog.launchable()
+            assert [entry[:4] for entry in launchable] == [("com.example.camera", "Camera", None, "com.example.camera.MainActivity")] * 2, f"Gaveta incorreta: {launchable}"
+            service = catalog.find_package("com.example.service")
+            assert service['label'] == "Serviço" and service['native_libs'] == ["lib/arm64-v8a/libnative.so"], "Registro do pacote incorreto."
+            assert service['dex_files'] == ["classes.dex"] and service['main_activity'] is None, "Registro do pacote incorreto."
+            assert catalog.with_permission("android.permission.CAMERA") == ["com.example.camera"] * 2, "Consulta por permissão incorreta."
+            assert catalog.with_permission("android.permission.CAMER_") == [], "'_' tratado como curinga na consulta por permissão."
+            assert list(catalog.errors()) == [os.path.join(apps, "broken.apk")], "Erro de análise não registrado."
+            
+            # Segunda indexação: nada mudou, nenhum APK é reaberto
+            assert catalog.index([apps], workers=2)['unchanged'] == 4, "APK inalterado foi reindexado."
+            
+            # APK apenas tocado: reaproveitado pelo digest; APK removido sai do índice
+            os.utime(os.path.join(apps, "service.apk"), ns=(0, 10 ** 9))
+            os.remove(os.path.join(apps, "backup", "camera.apk"))
+            write_apk(os.path.join(apps, "maps.apk"), "com.example.maps")
+            stats = catalog.index([apps], workers=2)
+            assert stats == {'indexed': 1, 'reused': 1, 'unchanged': 2, 'removed': 1, 'errors': 0}, f"Reindexação incremental incorreta: {stats}"
+            assert [entry[0] for entry in catalog.launchable()] == ["com.example.camera", "com.example.maps"], "Índice não atualizado."
+            
+            # Outra configuração do dispositivo: rótulos e ícones são resolvidos de novo
+            portuguese = ResConfig(language="pt")
+            stats = catalog.index([apps], workers=2, config=portuguese)
+            assert stats == {'indexed': 3, 'reused': 0, 'unchanged': 0, 'removed': 0, 'errors': 1}, f"Troca de configuração ignorada: {stats}"
+            assert catalog.find_package("com.example.camera")['label'] == "Câmera", "Rótulo da configuração anterior reaproveitado."
+            assert catalog.index([apps], workers=2, config=portuguese)['unchanged'] == 4, "APK inalterado foi reindexado."
+        
+        # Outro processo (ou a próxima inicialização) lê o mesmo índice
+        with APKCatalog(os.path.join(root, "index.sqlite")) as catalog:
+            assert catalog.find_package("com.example.maps")['label'] == "Maps", "Índice persistido incorreto."
+        
+        # Linha de comando: chamada direta de main() e execução do módulo como script
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert catalog_main([apps, '--index', os.path.join(root, "cli.sqlite"), '--workers', '2', '--list']) == 0
+        lines = output.getvalue().splitlines()
+        assert json.loads(lines[0]) == {'indexed': 3, 'reused': 0, 'unchanged': 0, 'removed': 0, 'errors': 1}, f"Saída da CLI incorreta: {lines}"
+        assert [line.split('\t')[0] for line in lines[1:]] == ["com.example.camera", "com.example.maps"], f"Listagem da CLI incorreta: {lines}"
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dwce_android', 'apk_parser', 'apk_catalog.py')
+        result = subprocess.run([sys.executable, script, apps, '--index', os.path.join(root, "cli.sqlite")],
+                                cwd=os.path.dirname(script), capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0 and json.loads(result.stdout)['unchanged'] == 4, f"CLI falhou como script:\n{result.stderr}"
+    
+    print("  Teste do Catálogo de APKs concluído com sucesso.")
+
+def test_native_libs():
+    print("\n--- Teste de Extração de Bibliotecas Nativas ---")
+    
+    # Preferência de ABI por host (tradução ARM como último recurso no x86)
+    assert host_abis('x86_64', '64bit')[0] == 'x86_64' and host_abis('amd64', '32bit')[0] == 'x86', "ABI preferida incorreta."
+    assert host_abis('aarch64', '32bit')[0] == 'arm64-v8a', "aarch64 deve ser tratado como 64-bit."
+    assert 'x86_64' not in host_abis('i686'), "Host 32-bit não executa x86_64."
+    names = ["lib/armeabi-v7a/liba.so", "lib/x86/liba.so", "lib/x86/libb.so", "lib/x86/sub/libc.so", "assets/lib.so"]
+    assert select_abi(names, host_abis('x86_64', '64bit')) == ('x86', {'liba.so': 'lib/x86/liba.so', 'libb.so': 'lib/x86/libb.so'}), "Seleção de ABI incorreta."
+    assert select_abi(names, ('arm64-v8a',)) == (None, {}), "ABI ausente deve resultar em nenhuma biblioteca."
+    
+    shared = os.urandom(64 * 1024) + b"\0" * (256 * 1024) # libc++_shared.so idêntica nos dois apps
+    
+    def write_apk(path, own, shared_compression=zipfile.ZIP_DEFLATED):
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("AndroidManifest.xml", b"")
+            zf.writestr(zipfile.ZipInfo("lib/x86_64/libc++_shared.so"), shared, compress_type=shared_compression)
+            zf.writestr("lib/x86_64/libapp.so", own)
+            zf.writestr("lib/arm64-v8a/libc++_shared.so", b"arm " + shared)
+            zf.writestr("lib/arm64-v8a/libapp.so", b"arm " + own)
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = NativeLibStore(os.path.join(root, "store"))
+        write_apk(os.path.join(root, "a.apk"), b"\x7fELF app A")
+        write_apk(os.path.join(root, "b.apk"), b"\x7fELF app B", zipfile.ZIP_STORED)
+        
+        abi, libs_a = store.extract(os.path.join(root, "a.apk"), os.path.join(root, "a", "lib"), host_abis('x86_64', '64bit'), workers=2)
+        assert abi == 'x86_64' and sorted(libs_a) == ['libapp.so', 'libc++_shared.so'], "Bibliotecas da ABI do host não extraídas."
+        with open(libs_a['libc++_shared.so'], 'rb') as f:
+            assert f.read() == shared, "Conteúdo extraído incorreto."
+        assert (store.extracted, store.deduplicated) == (2, 0), "Contagem de extração incorreta."
+        
+        # Segundo app: a biblioteca compartilhada vira um hardlink para o mesmo objeto, sem descompressão
+        parser = APKParser(os.path.join(root, "b.apk"))
+        libs_b = parser.extract_native_libs(os.path.join(root, "b", "lib"), store, host_abis('x86_64', '64bit'))
+        assert parser.abi == 'x86_64', "ABI não registrada no parser."
+        assert os.path.samefile(libs_a['libc++_shared.so'], libs_b['libc++_shared.so']), "Biblioteca idêntica não deduplicada."
+        assert not os.path.samefile(libs_a['libapp.so'], libs_b['libapp.so']), "Bibliotecas distintas compartilhando objeto."
+        assert (store.extracted, store.deduplicated) == (3, 1), "Contagem de deduplicação incorreta."
+        
+        # Dica de CRC enganosa (colisão de CRC-32 e tamanho): o SHA-256 diverge e o conteúdo real é extraído
+        with zipfile.ZipFile(os.path.join(root, "b.apk")) as zf:
+            info = zf.getinfo("lib/x86_64/libapp.so")
+        with open(os.path.join(store.crc_dir, f"{info.CRC:08x}-{info.file_size}"), 'w') as f:
+            f.write(hashlib.sha256(shared).hexdigest())
+        libs_b = store.extract(os.path.join(root, "b.apk"), os.path.join(root, "b", "lib"), host_abis('x86_64', '64bit'))[1]
+        with open(libs_b['libapp.so'], 'rb') as f:
+            assert f.read() == b"\x7fELF app B", "Dica de CRC aceita sem conferir o SHA-256."
+        assert (store.extracted, store.deduplicated) == (3, 3), "Contagem após dica enganosa incorreta."
+        
+        # Host ARM: a outra ABI substitui as bibliotecas antigas do diretório do app
+        abi, libs_b = store.extract(os.path.join(root, "b.apk"), os.path.join(root, "b", "lib"), host_abis('aarch64'))
+        with open(libs_b['libapp.so'], 'rb') as f:
+            assert abi == 'arm64-v8a' and f.read() == b"arm \x7fELF app B", "Troca de ABI incorreta."
+        
+        # Entrada corrompida: o CRC-32 divergente é detectado e nada entra no armazenamento
+        with zipfile.ZipFile(os.path.join(root, "c.apk"), 'w') as zf:
+            zf.writestr("lib/x86_64/libbad.so", b"\x7fELF app C")
+        with open(os.path.join(root, "c.apk"), 'r+b') as f:
+            data = f.read()
+            f.seek(data.index(b"app C"))
+            f.write(b"app X")
+        try:
+            store.extract(os.path.join(root, "c.apk"), os.path.join(root, "c", "lib"), host_abis('x86_64', '64bit'))
+            assert False, "Biblioteca corrompida foi extraída."
+        except zipfile.BadZipFile:
+            pass
+        assert store.extracted == 5 and not [name for name in os.listdir(store.store_dir) if name.endswith('.tmp')], "Temporário órfão no armazenamento."
+        
+        # Remoção dos apps: o gc libera os objetos órfãos
+        shutil.rmtree(os.path.join(root, "a"))
+        removed = store.gc()
+        assert removed == 3, f"gc deveria remover só as bibliotecas x86_64 (removidos: {removed})"
+        shutil.rmtree(os.path.join(root, "b"))
+        assert store.gc() == 2 and not os.listdir(store.crc_dir), "Objetos órfãos não removidos."
+    
+    print("  Teste de Extração de Bibliotecas Nativas concluído com sucesso.")
+
+def test_art_profile():
+    print("\n--- Teste dos Perfis PGO ---")
+    
+    profile = Profile()
+    assert not profile, "Perfil novo deveria estar vazio."
+    assert profile.add("classes.dex", 0xCAFE, 1000, 100, [3, 500, 999], FLAG_STARTUP, classes=[7])
+    assert not profile.add("classes.dex", 0xCAFE, 1000, 100, [500], FLAG_STARTUP), "Mescla sem novidade não deveria alterar o perfil."
+    profile.add("classes.dex", 0xCAFE, 1000, 100, [500, 42], FLAG_HOT | FLAG_POST_STARTUP)
+    profile.add("classes2.dex", 0xBEEF, 10, 4, [9], FLAG_HOT)
+    assert profile.methods("classes.dex", FLAG_STARTUP) == [3, 500, 999] and profile.methods("classes.dex", FLAG_HOT) == [42, 500]
+    assert profile.has_method("classes.dex", 500, FLAG_HOT | FLAG_STARTUP) and not profile.has_method("classes.dex", 42, FLAG_STARTUP)
+    assert profile.method_count() == 5 and profile.method_count("classes.dex", FLAG_POST_STARTUP) == 2, "Contagem de métodos incorreta."
+    assert profile.classes("classes.dex") == [7] and profile.has_class("classes.dex", 7), "Conjunto de classes incorreto."
+    
+    # Formato binário: ida e volta, e arquivos malformados
+    parsed = Profile.parse(profile.serialize())
+    for name in ("classes.dex", "classes2.dex"):
+        for flag in (FLAG_HOT, FLAG_STARTUP, FLAG_POST_STARTUP):
+            assert parsed.methods(name, flag) == profile.methods(name, flag), f"Bitmap {flag} de {name} difere após serialização."
+    assert parsed.classes("classes.dex") == [7]
+    for data in (b"XXXX" + profile.serialize()[4:], profile.serialize()[:-4]):
+        try:
+            Profile.parse(data)
+            assert False, "Perfil malformado aceito."
+        except ValueError:
+            pass
+    
+    # DEX atualizado (outro checksum) descarta o perfil antigo daquele DEX
+    profile.add("classes.dex", 0xD00D, 1200, 100, [1], FLAG_STARTUP)
+    assert profile.methods("classes.dex", FLAG_STARTUP) == [1] and profile.methods("classes.dex", FLAG_HOT) == []
+    assert profile.methods("classes2.dex", FLAG_HOT) == [9], "Perfil de outro DEX não deveria mudar."
+    
+    with tempfile.TemporaryDirectory() as root:
+        # Dois processos coletando o mesmo app: a gravação mescla com o que está em disco
+        first, second = ProfileStore(root), ProfileStore(root)
+        first.record("com.example.game", "classes.dex", 1, 64, 8, [1, 2], FLAG_STARTUP, [3])
+        second.record("com.example.game", "classes.dex", 1, 64, 8, [60], FLAG_HOT)
+        assert first.flush() is not None and first.flush() is None, "Flush sem alterações deveria ser ignorado."
+        first.close()
+        second.close()
+        merged = ProfileStore(root).get("com.example.game")
+        assert merged.methods("classes.dex", FLAG_STARTUP) == [1, 2] and merged.methods("classes.dex", FLAG_HOT) == [60], "Mescla em disco incorreta."
+        assert merged.classes("classes.dex") == [3]
+        
+        with open(os.path.join(root, "com.example.broken.prof"), 'wb') as f:
+            f.write(b"DWPF\x01\x00\x01\x00lixo")
+        assert not ProfileStore(root).get("com.example.broken"), "Perfil corrompido deveria ser ignorado."
+        
+        # Falha de gravação (diretório de perfis é um arquivo): o pacote continua pendente
+        blocked = os.path.join(root, "com.example.broken.prof")
+        store = ProfileStore(blocked)
+        store.record("com.example.game", "classes.dex", 1, 64, 8, [5], FLAG_HOT)
+        assert store.flush(wait=True).result() == ["com.example.game"], "Falha de gravação não reportada."
+        assert "com.example.game" in store._dirty, "Perfil com gravação falha deixou de estar pendente."
+        store.profile_dir = root
+        store.close()
+        assert ProfileStore(root).get("com.example.game").methods("classes.dex", FLAG_HOT) == [5, 60], "Perfil pendente perdido após a falha."
+        
+        # Custo da coleta com centenas de milhares de métodos
+        store = ProfileStore(root)
+        methods = range(0, 400000, 2)
+        start = time.perf_counter()
+        store.record("com.example.big", "classes.dex", 7, 400000, 60000, methods, FLAG_STARTUP)
+        store.record("com.example.big", "classes.dex", 7, 400000, 60000, range(1, 400000, 4), FLAG_POST_STARTUP)
+        elapsed = time.perf_counter() - start
+        future = store.flush()
+        store.close()
+        assert future.done() and store.get("com.example.big").method_count("classes.dex") == 300000
+        size = os.path.getsize(os.path.join(root, "com.example.big.prof"))
+        print(f"  Coleta de 300000 métodos: {elapsed * 1000:.1f} ms; perfil em disco: {size} bytes.")
+        assert size < 400000 * 3 // 8, "Perfil deveria ocupar menos que os bitmaps sem compressão."
+    
+    print("  Teste dos Perfis PGO concluído com sucesso.")
+
+def test_module_scripts():
+    print("\n--- Teste dos Módulos Executados como Script ---")
+    
+    # Cada módulo com bloco __main__ roda direto do próprio diretório (sys.path[0] = diretório do
+    # script, que traz um arquivo com o mesmo nome do pacote)
+    # script -> trecho esperado na saída do exemplo
+    scripts = {
+        os.path.join('dwce_windows', 'pe_loader', 'pe_loader.py'): "",
+        os.path.join('dwce_linux', 'elf_loader', 'elf_loader.py'): "",
+        os.path.join('dwce_android', 'dex_loader', 'dex_loader.py'): "Ponto de Entrada:",
+        os.path.join('dwce_android', 'apk_parser', 'apk_parser.py'): "package_name: com.example.myapp",
+        os.path.join('dwce_android', 'art_runtime', 'art_runtime.py'): "com.example.myapp encerrado.",
+    }
+    base = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as home: # Caches e perfis dos exemplos fora do ~ real
+        for script, expected in scripts.items():
+            path = os.path.join(base, script)
+            result = subprocess.run([sys.executable, path], cwd=os.path.dirname(path), capture_output=True, text=True,
+                                    timeout=120, env=dict(os.environ, HOME=home))
+            assert result.returncode == 0, f"{script} falhou como script:\n{result.stderr}"
+            assert expected in result.stdout, f"Exemplo de {script} não concluído:\n{result.stdout}"
+    
+    print("  Teste dos Módulos como Script concluído com sucesso.")
+
+def test_header_cache():
+    print("\n--- Teste do Header Cache (PE) ---")
+    
+    test_exe_path = "/tmp/test_header_cache.exe"
+    idata, import_directory, _ = _build_import_section(0x2000, [("kernel32.dll", ["ExitProcess", 3])])
+    _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3', None), (".idata", 0x2000, idata, None)],
+                   data_directories={1: import_directory})
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = HeaderCache(cache_dir)
+        with PELoader(test_exe_path, header_cache=cache) as cold:
+            assert cold.load(), "Falha no carregamento a frio."
+        with PELoader(test_exe_path, header_cache=cache) as warm:
+            assert warm.load(), "Falha no carregamento a quente."
+        assert cache.hits == 1 and cache.misses == 1, "O segundo carregamento deveria vir do cache."
+        assert warm.section_headers == cold.section_headers, "Seções do cache divergem da análise."
+        assert warm.imports == cold.imports, "Imports do cache divergem da análise."
+        assert (warm.entry_point, warm.image_base) == (cold.entry_point, cold.image_base), "Campos divergentes."
+        
+        # Alterar o binário (tamanho/mtime) invalida a entrada
+        _build_test_pe(test_exe_path, [(".text", 0x1000, b'\xC3' * 0x400, None)])
+        with PELoader(test_exe_path, header_cache=cache) as changed:
+            assert changed.load(), "Falha ao recarregar binário alterado."
+        assert cache.misses == 2 and changed.imports == [], "Entrada obsoleta foi reutilizada."
+    
+    # Limites do diretório: entradas antigas expiram e as menos usadas saem primeiro
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = HeaderCache(cache_dir, max_bytes=1 << 30, max_age=3600)
+        paths = [f"{test_exe_path}.{i}" for i in range(3)]
+        for i, path in enumerate(paths):
+            shutil.copy(test_exe_path, path)
+            with PELoader(path, header_cache=cache) as loader:
+                assert loader.load(), "Falha ao popular o cache."
+        entries = sorted(os.listdir(cache_dir))
+        assert len(entries) == 3 and cache.evictions == 0, "Entradas removidas sem necessidade."
+        stale = os.path.join(cache_dir, cache._entry_path('pe', paths[0]))
+        os.utime(stale, (time.time() - 7200, time.time() - 7200))
+        assert cache.prune() == 1 and not os.path.exists(stale), "Entrada expirada não removida."
+        
+        os.utime(cache._entry_path('pe', paths[1]), (time.time() - 60, time.time() - 60))
+        with PELoader(paths[1], header_cache=cache) as loader:
+            assert loader.load() and cache.hits == 1, "Acerto esperado no cache."
+        cache.max_bytes = os.path.getsize(cache._entry_path('pe', paths[1]))
+        assert cache.prune() == 1, "Limite de tamanho não aplicado."
+        assert os.listdir(cache_dir) == [os.path.basename(cache._entry_path('pe', paths[1]))], "A entrada usada por último deveria ficar."
+        for path in paths:
+            os.remove(path)
+    os.remove(test_exe_path)
+    
+    print("  Teste do Header Cache concluído com sucesso.")
+
+def test_catalog_scanner():
+    print("\n--- Teste do Catalog Scanner (PE/ELF) ---")
+    
+    with tempfile.TemporaryDirectory() as root:
+        exe_path = os.path.join(root, "app.exe")
+        idata, import_directory, _ = _build_import_section(0x2000, [("user32.dll", ["MessageBoxA"])])
+        _build_test_pe(exe_path, [(".text", 0x1000, b'\xC3', None), (".idata", 0x2000, idata, None)],
+                       data_directories={1: import_directory})
+        with open(os.path.join(root, "readme.txt"), 'w') as f:
+            f.write("not an executable")
+        # Arquivos malformados viram registros de erro sem interromper a varredura
+        with open(os.path.join(root, "broken.exe"), 'wb') as f:
+            f.write(b"MZ" + b"\xff" * 30)
+        _build_test_elf(os.path.join(root, "libodd.so"), interp="/lib64/ld-é.so")
+        manifest_path = os.path.join(root, "manifest.json")
+        
+        records = sorted(scan([root], manifest_path, workers=2), key=lambda record: record['path'])
+        assert [os.path.basename(record['path']) for record in records] == ["app.exe", "broken.exe", "libodd.so"], f"Registros inesperados: {records}"
+        broken, odd = records[1], records[2]
+        assert broken['format'] == 'pe' and broken['error'] and 'arch' not in broken, f"Registro de erro incorreto: {broken}"
+        assert odd['format'] == 'elf' and odd['interpreter'].startswith("/lib64/ld-") and "\ufffd" in odd['interpreter'], \
+            f"PT_INTERP não ASCII não tratado: {odd}"
+        assert records[0]['arch'] == 'x86_64' and records[0]['subsystem'] == 'windows_cui', "Metadados incorretos."
+        assert records[0]['imports'] == {"user32.dll": ["MessageBoxA"]}, "Imports incorretos no catálogo."
+        
+        # Segunda varredura: nada mudou, nada é reanalisado
+        assert list(scan([root], manifest_path, workers=2)) == [], "Arquivo inalterado foi reanalisado."
+        unchanged = sorted(scan([root], manifest_path, include_unchanged=True), key=lambda record: record['path'])
+        assert unchanged == records, "Registro do manifesto divergente."
+    
+    print("  Teste do Catalog Scanner concluído com sucesso.")
+
 def test_android_compatibility(pm):
     print("\n--- Teste de Compatibilidade Android (.apk) ---")
     
@@ -103,6 +2020,32 @@ def run_all_tests():
     
     try:
         test_windows_compatibility(pm)
+        test_pe_loader_mmap()
+        test_pe_import_resolution()
+        test_header_cache()
+        test_pe_relocation()
+        test_pe_lazy_sections()
+        test_pe_resources()
+        test_binary_records()
+        test_elf_symbol_lookup()
+        test_elf_dependency_graph()
+        test_elf_symbol_tables()
+        test_elf_prelink_cache()
+        test_dex_id_tables()
+        test_dex_string_pool()
+        test_multidex_loading()
+        test_dex_class_index()
+        test_dalvik_interpreter()
+        test_art_profile()
+        test_dex_artifact_cache()
+        test_dex_integrity()
+        test_axml_manifest()
+        test_apk_index()
+        test_resource_table()
+        test_apk_catalog()
+        test_native_libs()
+        test_catalog_scanner()
+        test_module_scripts()
         test_android_compatibility(pm)
         test_linux_compatibility(pm)
         